@@ -0,0 +1,59 @@
+import base64
+import hashlib
+import hmac
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Any, Dict, Optional
+
+from app.api.rag import require_admin
+from app.config import get_settings
+from app.services.ecommerce.catalog import CatalogSync
+
+
+router = APIRouter()
+settings = get_settings()
+
+
+def _verify_signature(body: bytes, signature: Optional[str]) -> bool:
+	# Shopify (X-Shopify-Hmac-Sha256) and WooCommerce (X-WC-Webhook-Signature) both sign base64(HMAC-SHA256(body)).
+	if not settings.CATALOG_WEBHOOK_SECRET or not signature:
+		return False
+	digest = hmac.new(settings.CATALOG_WEBHOOK_SECRET.encode(), body, hashlib.sha256).digest()
+	return hmac.compare_digest(base64.b64encode(digest).decode(), signature)
+
+
+@router.post("/sync", dependencies=[Depends(require_admin)])
+def trigger_sync(full: bool = False):
+	try:
+		sync = CatalogSync()
+		return sync.full_sync() if full else sync.incremental_sync()
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/webhook")
+async def catalog_webhook(request: Request):
+	if not settings.CATALOG_WEBHOOK_SECRET:
+		raise HTTPException(status_code=503, detail="Catalog webhooks disabled (CATALOG_WEBHOOK_SECRET not set)")
+	body = await request.body()
+	signature = request.headers.get("X-Shopify-Hmac-Sha256") or request.headers.get("X-WC-Webhook-Signature")
+	if not _verify_signature(body, signature):
+		raise HTTPException(status_code=401, detail="invalid signature")
+	topic = (request.headers.get("X-Shopify-Topic") or request.headers.get("X-WC-Webhook-Topic") or "").lower()
+	try:
+		payload: Dict[str, Any] = json.loads(body or b"{}")
+	except ValueError:
+		raise HTTPException(status_code=400, detail="invalid json")
+	if not payload.get("id"):
+		# WooCommerce sends a ping without a product when the webhook is created
+		return {"ok": True}
+	try:
+		sync = CatalogSync()
+		if "delete" in topic:
+			return {"ok": True, "deleted": sync.delete_products([str(payload["id"])])}
+		normalize = getattr(sync.adapter, "normalize_product", None)
+		if normalize is None:
+			return {"ok": True, "message": "active adapter does not support catalog webhooks"}
+		return {"ok": True, **sync.apply_products([normalize(payload)])}
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=str(e))
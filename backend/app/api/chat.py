@@ -1,8 +1,12 @@
+import json
+import time
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
 from app.services.conversation import run_conversation
+from app.services.streaming import CHAT_TURN, stream_conversation
 
 
 router = APIRouter()
@@ -24,6 +28,7 @@ class ChatResponse(BaseModel):
 
 @router.post("/chat", response_model=ChatResponse)
 def chat(req: ChatRequest):
+	started = time.monotonic()
 	try:
 		result = run_conversation(
 			session_id=req.session_id,
@@ -31,6 +36,7 @@ def chat(req: ChatRequest):
 			channel=req.channel,
 			user_meta=req.user_meta or {},
 		)
+		CHAT_TURN.observe(time.monotonic() - started, channel=req.channel, mode="sync")
 		return ChatResponse(
 			answer=result.get("assistant_response", ""),
 			handoff_to_human=result.get("handoff_to_human", False),
@@ -38,4 +44,25 @@ def chat(req: ChatRequest):
 			metadata={k: v for k, v in result.items() if k not in {"assistant_response", "handoff_to_human", "current_task"}},
 		)
 	except Exception:
-		raise HTTPException(status_code=500, detail="Internal error")
\ No newline at end of file
+		raise HTTPException(status_code=500, detail="Internal error")
+
+
+def _sse(event: Dict[str, Any]) -> str:
+	payload = {k: v for k, v in event.items() if k != "event"}
+	return f"event: {event['event']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+	"""Server-Sent Events: node/route/tool progress, answer tokens, then a final `done` (or `error`) event."""
+
+	async def events():
+		async for event in stream_conversation(
+			session_id=req.session_id,
+			message=req.message,
+			channel=req.channel,
+			user_meta=req.user_meta or {},
+		):
+			yield _sse(event)
+
+	return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
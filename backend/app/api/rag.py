@@ -1,7 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Header, Depends
 from fastapi.responses import JSONResponse
 from typing import List, Optional, Dict, Any
 import uuid
+import hmac
+import os
+import re
+import logging
+import threading
 from pydantic import BaseModel
 from datetime import datetime
 from sqlalchemy import text
@@ -9,8 +14,12 @@ from sqlalchemy import text
 from app.services.database_service import DatabaseService
 from app.services.document_service import DocumentService
 from app.services.vectorstore_service import VectorStoreService
+from app.services.vectorstores import bundle as vector_bundle
+from app.services.vectorstores.registry import STORE_FIELDS
+from app.config import RESTART_FIELDS, get_settings, on_settings_reload, reload_settings
 
 router = APIRouter(prefix="/rag", tags=["RAG System"])
+settings = get_settings()
 
 # Pydantic models
 class KnowledgeBaseCreate(BaseModel):
@@ -46,6 +55,9 @@ class SearchRequest(BaseModel):
     query: str
     knowledge_base: Optional[str] = None
     limit: int = 5
+    mmr: bool = True
+    fetch_k: Optional[int] = None
+    latency_budget_ms: Optional[float] = None  # caps fetch_k (MMR candidates) to fit the budget
 
 
 class ProcessEmbeddingsRequest(BaseModel):
@@ -64,25 +76,62 @@ class VectorDeleteRequest(BaseModel):
     ids: List[str]
     collection_name: Optional[str] = None
 
-# Initialize services
-try:
-    db_service = DatabaseService()
-    document_service = DocumentService()
-    vector_service = VectorStoreService()
-except Exception as e:
-    print(f"Warning: Failed to initialize database services: {e}")
-    db_service = None
-    document_service = None
-    vector_service = None
+
+class BundleExportRequest(BaseModel):
+    collection_name: str = "documents"
+    bundle: Optional[str] = None  # directory name under VECTOR_BUNDLE_DIR; generated when omitted
+
+
+class BundleImportRequest(BaseModel):
+    bundle: str
+    collection_name: Optional[str] = None  # defaults to the collection recorded in the bundle
+    replace: bool = False
+
+# Services are built on first use, not at import: DatabaseService connects to Postgres and
+# VectorStoreService builds the embedding model. A failed build is retried on the next request.
+_services: Dict[str, Any] = {}
+_services_lock = threading.Lock()
+
+
+def _service(name: str, factory) -> Optional[Any]:
+    if name not in _services:
+        with _services_lock:
+            if name not in _services:
+                try:
+                    _services[name] = factory()
+                except Exception as e:
+                    logging.getLogger(__name__).warning(f"Failed to initialize {name} service: {e}")
+                    return None
+    return _services[name]
+
+
+def _reset_vector_service():
+    _services.pop("vector", None)
+
+
+on_settings_reload(_reset_vector_service, *STORE_FIELDS)
+
+
+def _db_service() -> Optional[DatabaseService]:
+    return _service("database", DatabaseService)
+
+
+def _document_service() -> Optional[DocumentService]:
+    return _service("document", DocumentService)
+
+
+def _vector_service() -> Optional[VectorStoreService]:
+    return _service("vector", VectorStoreService)
+
 
 @router.post("/knowledge-bases", response_model=KnowledgeBaseResponse)
 async def create_knowledge_base(kb_data: KnowledgeBaseCreate):
     """Create a new knowledge base"""
     try:
-        kb = db_service.create_knowledge_base(kb_data.name, kb_data.description)
+        kb = _db_service().create_knowledge_base(kb_data.name, kb_data.description)
         if not kb:
             # If creation failed (possibly due to unique constraint), return existing if it exists
-            kb = db_service.get_knowledge_base(kb_data.name)
+            kb = _db_service().get_knowledge_base(kb_data.name)
             if not kb:
                 raise HTTPException(status_code=400, detail="Failed to create knowledge base")
         
@@ -102,7 +151,7 @@ async def create_knowledge_base(kb_data: KnowledgeBaseCreate):
 async def list_knowledge_bases():
     """List all knowledge bases"""
     try:
-        kbs = db_service.list_knowledge_bases()
+        kbs = _db_service().list_knowledge_bases()
         return [
             KnowledgeBaseResponse(
                 id=str(kb.id),
@@ -122,7 +171,7 @@ async def list_knowledge_bases():
 async def delete_knowledge_base(kb_name: str):
     """Delete a knowledge base"""
     try:
-        success = db_service.delete_knowledge_base(kb_name)
+        success = _db_service().delete_knowledge_base(kb_name)
         if not success:
             raise HTTPException(status_code=404, detail="Knowledge base not found")
         
@@ -141,10 +190,10 @@ async def upload_file(
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file provided")
         
-        if not document_service.is_supported_file(file.filename):
+        if not _document_service().is_supported_file(file.filename):
             raise HTTPException(
                 status_code=400, 
-                detail=f"Unsupported file type: {document_service.get_file_extension(file.filename)}"
+                detail=f"Unsupported file type: {_document_service().get_file_extension(file.filename)}"
             )
         
         # Read file content
@@ -153,10 +202,10 @@ async def upload_file(
             raise HTTPException(status_code=400, detail="Empty file")
         
         # RAG-only: process to chunks and ingest to vectorstore
-        chunks = document_service.process_file_to_chunks(file_content, file.filename, knowledge_base)
+        chunks = _document_service().process_file_to_chunks(file_content, file.filename, knowledge_base)
         if not chunks:
             raise HTTPException(status_code=400, detail="No text content extracted from file")
-        ids = vector_service.add_documents(chunks)
+        ids = _vector_service().add_documents(chunks)
         return UploadResponse(
             document_id=ids[0] if ids else str(uuid.uuid4()),
             filename=file.filename,
@@ -177,24 +226,36 @@ async def upload_file(
 
 @router.post("/search", response_model=List[SearchResponse])
 async def search_documents(req: SearchRequest):
-    """Search documents using vector similarity (LangChain PGVector only)."""
+    """Search documents using vector similarity (configured vector store backend)."""
     try:
         if not req.query.strip():
             raise HTTPException(status_code=400, detail="Query cannot be empty")
+        vector_service = _vector_service()
+        if not vector_service:
+            raise HTTPException(status_code=503, detail="Vector service unavailable")
         user_filter = None  # extend with authenticated user context
-        docs = vector_service.search(query=req.query, user_id=user_filter, k=req.limit)
+        hits = vector_service.search_with_scores(
+            query=req.query,
+            user_id=user_filter,
+            k=req.limit,
+            mmr=req.mmr,
+            fetch_k=req.fetch_k,
+            latency_budget_ms=req.latency_budget_ms,
+        )
         return [
             SearchResponse(
-                id=doc.metadata.get("id", str(uuid.uuid4())),
+                id=doc.id or doc.metadata.get("id") or str(uuid.uuid4()),
                 chunk_text=doc.page_content,
                 metadata=doc.metadata,
                 chunk_index=doc.metadata.get("chunk_index", 0),
                 filename=doc.metadata.get("filename", ""),
                 file_type=doc.metadata.get("file_type", ""),
-                similarity=float(doc.metadata.get("similarity", 0.0)),
+                similarity=similarity,
             )
-            for doc in docs
+            for doc, similarity in hits
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -204,7 +265,7 @@ async def search_documents(req: SearchRequest):
 async def get_stats(collection_name: Optional[str] = None, user_id: Optional[str] = None):
     """Vectorstore-centric stats."""
     try:
-        vs_stats = vector_service.get_collection_stats(collection_name=collection_name, user_id=user_id)
+        vs_stats = _vector_service().get_collection_stats(collection_name=collection_name, user_id=user_id)
         return {
             "vectorstore": vs_stats,
         }
@@ -216,7 +277,7 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        with db_service.get_session() as session:
+        with _db_service().get_session() as session:
             session.execute(text("SELECT 1"))
         
         return {
@@ -231,10 +292,11 @@ async def health_check():
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
 
-# --- VectorStore CRUD (LangChain PGVector) ---
+# --- VectorStore CRUD (PGVector or NumPy backend, see VECTOR_BACKEND) ---
 @router.post("/vector/add")
 async def vector_add(req: VectorAddRequest):
     try:
+        vector_service = _vector_service()
         if not vector_service:
             raise HTTPException(status_code=503, detail="Vector service unavailable")
         ids = vector_service.add_texts(
@@ -253,6 +315,7 @@ async def vector_add(req: VectorAddRequest):
 @router.post("/vector/delete")
 async def vector_delete(req: VectorDeleteRequest):
     try:
+        vector_service = _vector_service()
         if not vector_service:
             raise HTTPException(status_code=503, detail="Vector service unavailable")
         vector_service.delete_ids(req.ids, collection_name=req.collection_name)
@@ -260,4 +323,69 @@ async def vector_delete(req: VectorDeleteRequest):
     except HTTPException:
         raise
     except Exception:
-        raise HTTPException(status_code=500, detail="Internal error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal error")
+
+
+# --- Admin: vector bundle export/import (see services/vectorstores/bundle.py) ---
+_BUNDLE_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.-]*")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def _bundle_path(name: str) -> str:
+    if not _BUNDLE_NAME.fullmatch(name):
+        raise HTTPException(status_code=400, detail="Invalid bundle name")
+    return os.path.join(settings.VECTOR_BUNDLE_DIR, name)
+
+
+@router.get("/admin/bundles", dependencies=[Depends(require_admin)])
+def list_bundles():
+    """Complete bundles under VECTOR_BUNDLE_DIR with their manifests."""
+    bundles = []
+    if os.path.isdir(settings.VECTOR_BUNDLE_DIR):
+        for name in sorted(os.listdir(settings.VECTOR_BUNDLE_DIR)):
+            try:
+                bundles.append({"bundle": name, **vector_bundle.read_manifest(os.path.join(settings.VECTOR_BUNDLE_DIR, name))})
+            except (ValueError, OSError):
+                continue
+    return {"bundles": bundles}
+
+
+@router.post("/admin/export", dependencies=[Depends(require_admin)])
+def export_bundle(req: BundleExportRequest):
+    """Export a collection (ids, documents, metadata, vectors) to a bundle on the server."""
+    name = req.bundle or vector_bundle.new_bundle_name(req.collection_name)
+    path = _bundle_path(name)
+    try:
+        manifest = vector_bundle.export_collection(req.collection_name, path)
+    except Exception as e:
+        logging.getLogger(__name__).error("bundle export failed: %s", e)
+        raise HTTPException(status_code=500, detail="Export failed")
+    return {"bundle": name, **manifest}
+
+
+@router.post("/admin/import", dependencies=[Depends(require_admin)])
+def import_bundle(req: BundleImportRequest):
+    """Load a bundle from VECTOR_BUNDLE_DIR into a collection without re-embedding."""
+    path = _bundle_path(req.bundle)
+    if not os.path.isdir(path):
+        raise HTTPException(status_code=404, detail="Bundle not found")
+    try:
+        return vector_bundle.import_collection(path, collection_name=req.collection_name, replace=req.replace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.getLogger(__name__).error("bundle import failed: %s", e)
+        raise HTTPException(status_code=500, detail="Import failed")
+
+
+@router.post("/admin/reload-settings", dependencies=[Depends(require_admin)])
+def reload_app_settings():
+    """Re-read the environment/.env in this worker; models, adapters and agents are rebuilt on next use."""
+    changed = reload_settings()
+    return {"changed": sorted(changed), "restart_required": sorted(changed & RESTART_FIELDS)}
@@ -1,47 +1,47 @@
-import os
-import requests
+import hmac
 from fastapi import APIRouter, HTTPException, Request
 from typing import Any, Dict
 
 from app.config import get_settings
-from app.services.conversation import run_conversation
+from app.services.channels.inbox import InboundMessage, InboxFull, get_inbox
 
 
 router = APIRouter()
 settings = get_settings()
 
 
-def _send_telegram_message(chat_id: str, text: str):
-	if not settings.TELEGRAM_BOT_TOKEN:
-		raise RuntimeError("TELEGRAM_BOT_TOKEN not configured")
-	url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-	payload = {"chat_id": chat_id, "text": text}
-	requests.post(url, json=payload, timeout=15)
-
-
 @router.post("/webhook")
 async def telegram_webhook(request: Request):
+	# Acknowledge fast: validate, dedupe by update_id and queue; workers run the conversation and reply.
+	if settings.TELEGRAM_WEBHOOK_SECRET:
+		token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+		if not hmac.compare_digest(token, settings.TELEGRAM_WEBHOOK_SECRET):
+			raise HTTPException(status_code=401, detail="invalid secret token")
 	try:
 		update: Dict[str, Any] = await request.json()
-		message = update.get("message") or update.get("edited_message")
-		if not message:
-			return {"ok": True}
-
-		chat_id = str(message.get("chat", {}).get("id"))
-		text = message.get("text", "")
-		if not text:
-			return {"ok": True}
+	except ValueError:
+		raise HTTPException(status_code=400, detail="invalid json")
+	message = update.get("message") or update.get("edited_message")
+	if not message:
+		return {"ok": True}
 
-		# Use telegram:CHATID as session_id
-		session_id = f"telegram:{chat_id}"
-		result = run_conversation(
-			session_id=session_id,
-			message=text,
-			channel="telegram",
-			user_meta={"telegram_chat_id": chat_id},
-		)
-		answer = result.get("assistant_response", "")
-		_send_telegram_message(chat_id, answer)
+	chat_id = str(message.get("chat", {}).get("id"))
+	text = message.get("text", "")
+	if not text:
 		return {"ok": True}
-	except Exception as e:
-		raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+
+	# Use telegram:CHATID as session_id
+	msg = InboundMessage(
+		channel="telegram",
+		session_id=f"telegram:{chat_id}",
+		chat_id=chat_id,
+		text=text,
+		message_id=str(update.get("update_id") or f"{chat_id}:{message.get('message_id')}"),
+		user_meta={"telegram_chat_id": chat_id},
+	)
+	try:
+		queued = get_inbox().enqueue(msg)
+	except InboxFull:
+		# Let Telegram redeliver later instead of dropping the message
+		raise HTTPException(status_code=503, detail="busy")
+	return {"ok": True, "queued": queued}
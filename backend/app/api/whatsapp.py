@@ -1,43 +1,56 @@
+import hashlib
+import hmac
 from fastapi import APIRouter, HTTPException, Request
-from typing import Any, Dict
-import requests
+from typing import Any, Dict, List
 from app.config import get_settings
-from app.services.conversation import run_conversation
+from app.services.channels.inbox import InboundMessage, InboxFull, get_inbox
 
 
 router = APIRouter()
 settings = get_settings()
 
 
-def _wa_send(to: str, text: str):
-	if not (settings.WA_TOKEN and settings.WA_PHONE_ID):
-		raise RuntimeError("WhatsApp not configured")
-	url = f"https://graph.facebook.com/v19.0/{settings.WA_PHONE_ID}/messages"
-	headers = {"Authorization": f"Bearer {settings.WA_TOKEN}", "Content-Type": "application/json"}
-	payload = {"messaging_product": "whatsapp", "to": to, "type": "text", "text": {"body": text}}
-	requests.post(url, headers=headers, json=payload, timeout=20)
+def _valid_signature(body: bytes, header: str) -> bool:
+	if not settings.WA_APP_SECRET:
+		return True
+	expected = "sha256=" + hmac.new(settings.WA_APP_SECRET.encode(), body, hashlib.sha256).hexdigest()
+	return hmac.compare_digest(expected, header or "")
+
+
+def _text_messages(update: Dict[str, Any]) -> List[Dict[str, Any]]:
+	out = []
+	for entry in update.get("entry") or []:
+		for change in entry.get("changes") or []:
+			for msg in (change.get("value") or {}).get("messages") or []:
+				if msg.get("from") and (msg.get("text") or {}).get("body"):
+					out.append(msg)
+	return out
 
 
 @router.post("/webhook")
 async def webhook(request: Request):
 	if not (settings.WA_TOKEN and settings.WA_PHONE_ID):
 		return {"ok": True, "message": "whatsapp not configured"}
+	body = await request.body()
+	if not _valid_signature(body, request.headers.get("X-Hub-Signature-256", "")):
+		raise HTTPException(status_code=401, detail="invalid signature")
 	try:
 		update: Dict[str, Any] = await request.json()
-		entry = (update.get("entry") or [{}])[0]
-		changes = (entry.get("changes") or [{}])[0]
-		value = changes.get("value", {})
-		messages = value.get("messages", [])
-		if not messages:
-			return {"ok": True}
-		msg = messages[0]
-		from_ = msg.get("from")
-		text = (msg.get("text") or {}).get("body", "")
-		if not (from_ and text):
-			return {"ok": True}
-		session_id = f"whatsapp:{from_}"
-		result = run_conversation(session_id=session_id, message=text, channel="whatsapp", user_meta={"wa_from": from_})
-		_wa_send(from_, result.get("assistant_response", ""))
-		return {"ok": True}
-	except Exception as e:
-		raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+	except ValueError:
+		raise HTTPException(status_code=400, detail="invalid json")
+	inbox = get_inbox()
+	queued = 0
+	try:
+		for msg in _text_messages(update):
+			from_ = msg["from"]
+			queued += inbox.enqueue(InboundMessage(
+				channel="whatsapp",
+				session_id=f"whatsapp:{from_}",
+				chat_id=from_,
+				text=msg["text"]["body"],
+				message_id=str(msg.get("id") or f"{from_}:{msg.get('timestamp')}"),
+				user_meta={"wa_from": from_},
+			))
+	except InboxFull:
+		raise HTTPException(status_code=503, detail="busy")
+	return {"ok": True, "queued": queued}
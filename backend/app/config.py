@@ -1,10 +1,23 @@
+import logging
 import os
+import threading
+from pydantic import BaseModel, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class ModelProfile(BaseModel):
+	"""Model settings for one kind of LLM work (LLM_*_PROFILE)."""
+
+	# comma-separated failover chain of "provider" or "provider/model"; "*" is the LLM_PROVIDERS chain
+	providers: str = "*"
+	temperature: Optional[float] = None  # None: whatever the caller asks for
+	max_tokens: Optional[int] = None
+	timeout: Optional[float] = None  # seconds; None: LLM_TIMEOUT_SECONDS
 
 
 class Settings(BaseSettings):
-	model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+	model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore", env_nested_delimiter="__")
 
 	# LLM
 	OPENAI_API_KEY: Optional[str] = None
@@ -12,24 +25,117 @@ class Settings(BaseSettings):
 	OLLAMA_BASE_URL: str = "http://localhost:11434"
 	OLLAMA_MODEL: str = "llama3.1:8b-instruct"
 	OLLAMA_EMBED_MODEL: str = "nomic-embed-text"
+	OLLAMA_KEEP_ALIVE: Optional[str] = "30m"  # keeps models loaded, so the KV cache of shared prompt prefixes is reused
 	GROQ_API_KEY: Optional[str] = None
+	GROQ_MODEL: str = "moonshotai/kimi-k2-instruct"
+
+	# Chat model pool: providers tried in order ("openai,groq,ollama"; "name:N" caps that provider at N
+	# requests in flight per process). Default: openai and/or groq when their keys are set, else ollama.
+	LLM_PROVIDERS: Optional[str] = None
+	LLM_MAX_CONCURRENCY: int = 16  # per provider, unless set in LLM_PROVIDERS
+	LLM_ACQUIRE_TIMEOUT_SECONDS: float = 2.0  # wait for a free slot before failing over to the next provider
+	LLM_TIMEOUT_SECONDS: float = 60.0
+	LLM_MAX_RETRIES: int = 1  # retries within one provider before failing over
+	LLM_BREAKER_FAILURES: int = 5  # consecutive errors that open a provider's circuit breaker
+	LLM_BREAKER_RESET_SECONDS: float = 30.0  # open time before one trial call is let through
+	LLM_HTTP_MAX_CONNECTIONS: int = 32  # shared keep-alive pool per HTTP provider
+
+	# Per-task model profiles, as JSON or nested variables (LLM_ROUTER_PROFILE__PROVIDERS=groq/llama-3.1-8b-instant).
+	# Intent classification and translation default to a small local model, falling back to the main chain.
+	LLM_ROUTER_PROFILE: ModelProfile = ModelProfile(providers="ollama/qwen2.5:1.5b-instruct,*", temperature=0.0, max_tokens=16, timeout=10)
+	LLM_TRANSLATOR_PROFILE: ModelProfile = ModelProfile(providers="ollama/qwen2.5:1.5b-instruct,*", temperature=0.0, max_tokens=1024, timeout=20)
+	LLM_SUMMARIZER_PROFILE: ModelProfile = ModelProfile(temperature=0.0, max_tokens=512)
+	LLM_AGENT_PROFILE: ModelProfile = ModelProfile()
+
+	@field_validator("LLM_ROUTER_PROFILE", "LLM_TRANSLATOR_PROFILE", "LLM_SUMMARIZER_PROFILE", "LLM_AGENT_PROFILE", mode="before")
+	@classmethod
+	def _merge_profile(cls, value: Any, info: ValidationInfo) -> Any:
+		# a partial profile (one nested variable, or JSON with some keys) overrides the defaults key by key
+		if isinstance(value, dict):
+			return {**cls.model_fields[info.field_name].default.model_dump(), **value}
+		return value
 
 	# DB
 	DATABASE_URL: Optional[str] = None
 	DB_SCHEMA: str = "ai_cs"
 
+	# Vector store backend: pgvector (Postgres) or numpy (in-process; tests, dev, small deployments)
+	VECTOR_BACKEND: str = "pgvector"
+	VECTOR_STORE_PATH: Optional[str] = None  # numpy backend: persist collections here (memory-mapped on restart)
+	VECTOR_QUANTIZATION: str = "none"  # none | halfvec | binary: scan reduced-precision vectors, rescore the top candidates
+	VECTOR_RESCORE_FACTOR: int = 10  # candidates rescored at full precision = k * factor (binary needs more than halfvec)
+	VECTOR_BUNDLE_DIR: str = "./vector_bundles"  # export/import bundles for /api/rag/admin/*
+
+	# Admin endpoints (/api/rag/admin/*) are disabled unless set; matched against X-Admin-Token
+	ADMIN_TOKEN: Optional[str] = None
+
 	# LangSmith
 	LANGSMITH_API_KEY: Optional[str] = None
 	LANGSMITH_PROJECT: str = "ai-cs"
 	LANGCHAIN_TRACING_V2: bool = True
 
+	# Logging
+	LOG_LEVEL: str = "INFO"
+
 	# Telegram
 	TELEGRAM_BOT_TOKEN: Optional[str] = None
 	TELEGRAM_SUPPORT_CHAT_ID: Optional[str] = None
 
+	TELEGRAM_WEBHOOK_SECRET: Optional[str] = None  # matched against X-Telegram-Bot-Api-Secret-Token
+
 	# WhatsApp Business (optional)
 	WA_TOKEN: Optional[str] = None
 	WA_PHONE_ID: Optional[str] = None
+	WA_APP_SECRET: Optional[str] = None  # verifies X-Hub-Signature-256 on webhooks
+
+	# Inbound webhook queue (Telegram/WhatsApp): ack immediately, process on workers
+	INBOUND_WORKERS: int = 4
+	INBOUND_MAX_PENDING: int = 10000
+	INBOUND_DEDUPE_TTL_SECONDS: int = 3600
+	INBOUND_COALESCE_WINDOW_MS: int = 1500  # quiet period that closes a burst of messages; 0 disables coalescing
+	INBOUND_COALESCE_MAX_WAIT_MS: int = 5000  # upper bound on how long the first message of a burst waits
+	INBOUND_COALESCE_MAX_MESSAGES: int = 10
+
+	# Hot session state (conversation id, locale, profile, recent messages) per worker; SESSION_CACHE_URL
+	# (redis://...) shares versions/state across workers, otherwise an in-process store stands in
+	SESSION_CACHE_ENABLED: bool = True
+	SESSION_CACHE_URL: Optional[str] = None
+	SESSION_CACHE_MAX_ENTRIES: int = 10000
+	SESSION_CACHE_TTL_SECONDS: int = 900
+	SESSION_HISTORY_WINDOW: int = 50  # messages of history given to the graph
+
+	# Greetings, thanks and small talk are answered from templates before the graph runs
+	SMALLTALK_ENABLED: bool = True
+	SMALLTALK_PHRASES_PATH: Optional[str] = None  # JSON with extra/overriding intents and fillers (see app/services/smalltalk.py)
+	SMALLTALK_MAX_CHARS: int = 80  # longer messages always go through the graph
+
+	# Admission control per model backend (first provider of LLM_AGENT_PROFILE): turns beyond the limit
+	# wait in a bounded queue; shed turns get a cached/canned answer (web) or are deferred (Telegram/WhatsApp)
+	ADMISSION_ENABLED: bool = True
+	ADMISSION_LIMITS: Optional[str] = "ollama:4"  # "backend:N,..."; other backends use ADMISSION_DEFAULT_LIMIT
+	ADMISSION_DEFAULT_LIMIT: int = 32
+	ADMISSION_QUEUE_SIZE: int = 64  # waiting turns per backend; more are shed at once
+	ADMISSION_MAX_WAIT_SECONDS: float = 15.0  # deadline in the queue for interactive turns
+	ADMISSION_DEFER_WAIT_SECONDS: float = 1.0  # queued channels wait briefly, then defer the message
+	ADMISSION_DEFER_SECONDS: float = 20.0
+	ADMISSION_MAX_DEFERRALS: int = 3  # then the chat gets the busy reply
+	ADMISSION_ANSWER_CACHE_SIZE: int = 1000
+	ADMISSION_ANSWER_CACHE_TTL_SECONDS: int = 3600
+
+	# Heavy modules (graph, LLM providers, document parsers) load on first use; WARM_START builds the
+	# graph in the background right after startup so the first turn does not pay for it
+	WARM_START: bool = True
+
+	# Outbound channel delivery (rate limits per provider: global and per chat)
+	TELEGRAM_API_BASE: str = "https://api.telegram.org"
+	WA_API_BASE: str = "https://graph.facebook.com/v19.0"
+	TELEGRAM_RATE_PER_SEC: float = 30.0
+	TELEGRAM_CHAT_RATE_PER_SEC: float = 1.0
+	WA_RATE_PER_SEC: float = 80.0
+	WA_CHAT_RATE_PER_SEC: float = 1.0
+	CHANNEL_MAX_RETRIES: int = 4
+	CHANNEL_BACKOFF_SECONDS: float = 0.5
+	CHANNEL_MAX_CONNECTIONS: int = 20
 
 	# CRM (optional)
 	CRM_BASE_URL: Optional[str] = None
@@ -42,6 +148,15 @@ class Settings(BaseSettings):
 	SMTP_PASSWORD: Optional[str] = None
 	SUPPORT_EMAIL_TO: Optional[str] = None
 	SUPPORT_EMAIL_FROM: str = "no-reply@example.com"
+	SMTP_STARTTLS: bool = True  # disable for a local debug server (python -m aiosmtpd -n -l localhost:1025)
+	SMTP_IDLE_SECONDS: int = 60  # keep the SMTP session open this long between outbox batches
+
+	# Notification outbox (handover emails / Telegram)
+	OUTBOX_ENABLED: bool = True
+	OUTBOX_POLL_SECONDS: float = 2.0
+	OUTBOX_BATCH_SIZE: int = 50
+	OUTBOX_MAX_ATTEMPTS: int = 8
+	OUTBOX_BACKOFF_SECONDS: float = 5.0
 
 	# Ecommerce: Shopify (optional)
 	SHOPIFY_STORE_DOMAIN: Optional[str] = None  # e.g., mystore.myshopify.com
@@ -64,11 +179,97 @@ class Settings(BaseSettings):
 	TOKO_MERCHANT_ID: Optional[str] = None
 	TOKO_BASE_URL: Optional[str] = None
 
+	# Product catalog mirror
+	CATALOG_SYNC_ENABLED: bool = True
+	CATALOG_SYNC_INTERVAL_SECONDS: int = 900  # incremental poll; 0 disables the scheduler
+	CATALOG_FULL_SYNC_HOURS: int = 24
+	CATALOG_VECTOR_INDEX: bool = True
+	CATALOG_WEBHOOK_SECRET: Optional[str] = None
+
+	# Order status: messages with one order id and a plain status question are answered without the
+	# agent (one adapter call and a template); lookups are cached briefly for tools and fast path alike
+	ORDER_FAST_PATH_ENABLED: bool = True
+	ORDER_STATUS_CACHE_TTL_SECONDS: int = 60  # 0 disables the cache
+	ORDER_STATUS_CACHE_SIZE: int = 1000
+
 	# Policy
 	DATA_RETENTION_DAYS: int = 60
 	SENSITIVE_TTL_HOURS: int = 1
+	RETENTION_ENABLED: bool = True
+	RETENTION_INTERVAL_SECONDS: int = 3600  # 0 disables the scheduler
+	RETENTION_BATCH_SIZE: int = 1000
+	RETENTION_BATCH_PAUSE_SECONDS: float = 0.05
+	MEMORY_COMPACT_AFTER_DAYS: int = 7  # older memories of a session are folded into one summary vector
+	MEMORY_COMPACT_MIN_ROWS: int = 8
+	MESSAGE_PARTITIONING: bool = False  # Postgres: monthly range partitions for the message table
+	PARTITION_MONTHS_AHEAD: int = 2
+	MEMORY_MONTHLY_COLLECTIONS: bool = False  # one memory collection per month, dropped whole by retention
+	MEMORY_LOOKBACK_MONTHS: int = 2  # months of memory collections searched per query, newest first
 	DEFAULT_LOCALE: str = "id"
 
 
+logger = logging.getLogger(__name__)
+
+# Read once at import by the engine/ORM layer (table names, connection pool); changing them needs a restart
+RESTART_FIELDS = {"DATABASE_URL", "DB_SCHEMA"}
+
+_settings: Optional[Settings] = None
+_lock = threading.Lock()
+_listeners: List[Tuple[Callable[[], None], Tuple[str, ...]]] = []
+
+
 def get_settings() -> Settings:
-	return Settings()  # reads .env automatically
\ No newline at end of file
+	"""
+	The process-wide settings, loaded (environment + .env) on first call. Modules keep the returned
+	object and read it on use; treat it as read-only and change it through `reload_settings`.
+	"""
+	global _settings
+	if _settings is None:
+		with _lock:
+			if _settings is None:
+				_settings = Settings()
+	return _settings
+
+
+def on_settings_reload(callback: Callable[[], None], *fields: str):
+	"""
+	Call `callback` after a reload that changed any of `fields` (a trailing "_" matches a prefix,
+	e.g. "SHOPIFY_"; no fields: any change). Callbacks should only drop what they cached, so it is
+	rebuilt lazily on next use.
+	"""
+	_listeners.append((callback, fields))
+
+
+def _matches(changed: Set[str], fields: Tuple[str, ...]) -> bool:
+	if not fields:
+		return bool(changed)
+	return any(name == f or (f.endswith("_") and name.startswith(f)) for name in changed for f in fields)
+
+
+def reload_settings(**overrides: Any) -> Set[str]:
+	"""
+	Re-read the environment and .env (plus `overrides`), update the shared settings object in place
+	and notify the dependants whose fields changed. Returns the names of the changed settings.
+	"""
+	global _settings
+	fresh = Settings(**overrides)
+	with _lock:
+		current = _settings
+		if current is None:
+			_settings = fresh
+			return set()
+		values: Dict[str, Any] = {name: getattr(fresh, name) for name in Settings.model_fields}
+		changed = {name for name, value in values.items() if getattr(current, name) != value}
+		# one dict update: readers never see half of a reload
+		current.__dict__.update({name: values[name] for name in changed})
+	if changed & RESTART_FIELDS:
+		logger.warning("settings reloaded: %s only take effect after a restart", ", ".join(sorted(changed & RESTART_FIELDS)))
+	for callback, fields in list(_listeners):
+		if _matches(changed, fields):
+			try:
+				callback()
+			except Exception as e:
+				logger.warning("settings reload hook %s failed: %s", getattr(callback, "__qualname__", callback), e)
+	if changed:
+		logger.info("settings reloaded: %s", ", ".join(sorted(changed)))
+	return changed
\ No newline at end of file
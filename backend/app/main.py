@@ -1,6 +1,9 @@
+import asyncio
+import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
@@ -10,11 +13,23 @@ from app.api.docs import router as docs_router
 from app.api.whatsapp import router as whatsapp_router
 from app.api.crm import router as crm_router
 from app.api.rag import router as rag_router
+from app.api.catalog import router as catalog_router
 from app.persistence.db import init_db
+from app.services.ecommerce.catalog import start_catalog_scheduler, stop_catalog_scheduler
+from app.services.notifications.outbox import start_outbox_dispatcher, stop_outbox_dispatcher
+from app.services.retention import start_retention_scheduler, stop_retention_scheduler
+from app.services.channels.delivery import close_senders
+from app.services.channels.inbox import close_inbox
+from app.services.conversation import warm_up
+from app.utils.metrics import REGISTRY
 
 
 settings = get_settings()
 
+# Logging is configured once here; modules only create their own loggers.
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("app")
+
 # Propagate LangSmith envs if provided
 if settings.LANGSMITH_API_KEY:
     os.environ["LANGSMITH_API_KEY"] = settings.LANGSMITH_API_KEY or ""
@@ -22,21 +37,41 @@ os.environ["LANGSMITH_PROJECT"] = settings.LANGSMITH_PROJECT
 os.environ["LANGCHAIN_TRACING_V2"] = "true" if settings.LANGCHAIN_TRACING_V2 else "false"
 
 
+async def _warm_up():
+    # off the event loop: requests are served while the graph is being built
+    try:
+        await asyncio.to_thread(warm_up)
+        logger.info("✅ Conversation graph warmed up")
+    except Exception as e:
+        logger.warning(f"⚠️ Warm-up failed, building on first request instead: {e}")
+
+
 # === Lifespan handler ===
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # --- Startup ---
+    warming = asyncio.create_task(_warm_up()) if settings.WARM_START else None
     try:
         if settings.DATABASE_URL:
             init_db()
-            print("✅ Database initialized")
+            logger.info("✅ Database initialized")
+            start_catalog_scheduler()
+            start_outbox_dispatcher()
+            start_retention_scheduler()
     except Exception as e:
-            print(f"⚠️ Failed to init DB: {e}")
+            logger.warning(f"⚠️ Failed to init DB: {e}")
 
     yield
 
     # --- Shutdown ---
-    print("🛑 App shutting down...")
+    if warming is not None and not warming.done():
+        warming.cancel()
+    stop_catalog_scheduler()
+    stop_outbox_dispatcher()
+    stop_retention_scheduler()
+    await close_inbox()
+    await close_senders()
+    logger.info("🛑 App shutting down...")
 
 
 # Create FastAPI app with lifespan
@@ -63,6 +98,12 @@ def health():
     return {"status": "ok"}
 
 
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 # Register routers
 app.include_router(chat_router, prefix="/api")
 app.include_router(telegram_router, prefix="/api/telegram")
@@ -70,3 +111,4 @@ app.include_router(docs_router, prefix="/api/docs")
 app.include_router(whatsapp_router, prefix="/api/whatsapp")
 app.include_router(crm_router, prefix="/api/crm")
 app.include_router(rag_router, prefix="/api")
+app.include_router(catalog_router, prefix="/api/catalog")
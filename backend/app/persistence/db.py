@@ -1,28 +1,68 @@
-from typing import Generator
-from sqlalchemy import create_engine, text
+import logging
+from typing import Generator, Optional
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
-from app.persistence.models import Base
+from app.persistence.models import Base, Message, Product, SensitiveData
+from app.persistence import partitions
 
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 _engine = None
 _SessionLocal = None
 
 
-def init_db():
+def init_db(url: Optional[str] = None):
 	global _engine, _SessionLocal
-	if not settings.DATABASE_URL:
+	url = url or settings.DATABASE_URL
+	if not url:
 		raise RuntimeError("DATABASE_URL is not configured")
-	_engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+	if url.startswith("sqlite"):
+		_engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+	else:
+		_engine = create_engine(url, pool_pre_ping=True)
 	_SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+	if _engine.dialect.name != "postgresql":
+		# SQLite (tests, offline benchmarks): no extensions, schemas or GIN indexes.
+		Base.metadata.create_all(bind=_engine, tables=[t for t in Base.metadata.sorted_tables if t.schema is None])
+		return
 	with _engine.connect() as conn:
 		# Ensure pgvector extension and schema
 		conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
 		conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {settings.DB_SCHEMA}"))
+		if settings.MESSAGE_PARTITIONING and not inspect(conn).has_table(Message.__tablename__):
+			partitions.create_partitioned_messages(conn)
 		conn.commit()
 	# Create tables
 	Base.metadata.create_all(bind=_engine)
+	with _engine.connect() as conn:
+		# Product catalog mirror: full-text and trigram (typo-tolerant) GIN indexes
+		conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+		conn.execute(text(
+			f"CREATE INDEX IF NOT EXISTS {Product.__tablename__}_fts_idx ON {Product.__tablename__} "
+			"USING gin (to_tsvector('simple', title || ' ' || coalesce(description, '')))"
+		))
+		conn.execute(text(
+			f"CREATE INDEX IF NOT EXISTS {Product.__tablename__}_title_trgm_idx ON {Product.__tablename__} "
+			"USING gin (title gin_trgm_ops)"
+		))
+		# Retention purges range-scan these; create_all does not add indexes to existing tables
+		for table, column in ((Message.__tablename__, "created_at"), (SensitiveData.__tablename__, "expires_at")):
+			conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})"))
+		conn.execute(text(
+			f"CREATE INDEX IF NOT EXISTS ix_{settings.DB_SCHEMA}_message_conversation_id_id ON {Message.__tablename__} (conversation_id, id)"
+		))
+		if settings.MESSAGE_PARTITIONING:
+			if partitions.is_partitioned(conn):
+				partitions.ensure_partitions(conn)
+			else:
+				logger.warning("MESSAGE_PARTITIONING is set but %s is not partitioned; run `python setup_database.py partition-messages`", Message.__tablename__)
+		conn.commit()
+
+
+def get_engine():
+	return _engine
 
 
 def get_db() -> Generator:
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, Boolean, JSON, UniqueConstraint, Index
 from datetime import datetime, timedelta
 from typing import Optional
 from app.config import get_settings
@@ -36,10 +36,13 @@ class Message(Base):
 	role: Mapped[str] = mapped_column(String(20))  # user/assistant/system
 	content: Mapped[str] = mapped_column(Text)
 	pii_redactions: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
-	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
 	conversation: Mapped[Conversation] = relationship("Conversation", back_populates="messages")
 
+	# history/transcript: WHERE conversation_id = ? ORDER BY id, answered from the index alone
+	__table_args__ = (Index(f"ix_{settings.DB_SCHEMA}_message_conversation_id_id", "conversation_id", "id"),)
+
 
 class SensitiveData(Base):
 	__tablename__ = f"{settings.DB_SCHEMA}_sensitive"
@@ -47,13 +50,48 @@ class SensitiveData(Base):
 	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 	conversation_id: Mapped[int] = mapped_column(ForeignKey(f"{Conversation.__tablename__}.id", ondelete="CASCADE"))
 	data: Mapped[dict] = mapped_column(JSON)
-	expires_at: Mapped[datetime] = mapped_column(DateTime)
+	expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
 	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 	@staticmethod
 	def ttl_from_now(hours: int) -> datetime:
 		return datetime.utcnow() + timedelta(hours=hours)
 
+class NotificationOutbox(Base):
+	__tablename__ = f"{settings.DB_SCHEMA}_outbox"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	channel: Mapped[str] = mapped_column(String(20))  # email/telegram
+	dedupe_key: Mapped[str] = mapped_column(String(255), unique=True)
+	conversation_id: Mapped[Optional[int]] = mapped_column(ForeignKey(f"{Conversation.__tablename__}.id", ondelete="CASCADE"), nullable=True)
+	subject: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+	body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # None: render the transcript at dispatch time
+	status: Mapped[str] = mapped_column(String(20), default="pending")  # pending/sent/failed
+	attempts: Mapped[int] = mapped_column(Integer, default=0)
+	next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+	last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+	sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+	__table_args__ = (Index(f"ix_{settings.DB_SCHEMA}_outbox_due", "status", "next_attempt_at"),)
+
+
+class Product(Base):
+	__tablename__ = f"{settings.DB_SCHEMA}_product"
+	__table_args__ = (UniqueConstraint("source", "external_id", name=f"uq_{settings.DB_SCHEMA}_product_source_external"),)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	source: Mapped[str] = mapped_column(String(50))  # adapter name, e.g. shopify/woocommerce/mock
+	external_id: Mapped[str] = mapped_column(String(255))
+	title: Mapped[str] = mapped_column(String(512))
+	description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+	url: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+	price: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+	data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+	source_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+	synced_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class KnowledgeBase(Base):
     __tablename__ = "knowledge_bases"
     __table_args__ = {"schema": settings.DB_SCHEMA}
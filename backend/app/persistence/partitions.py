@@ -0,0 +1,167 @@
+"""
+Monthly range partitions for the message table (Postgres only, MESSAGE_PARTITIONING).
+
+`{DB_SCHEMA}_message` becomes `PARTITION BY RANGE (created_at)` with one child per month
+(`{table}_pYYYYMM`) and a default partition as a safety net. Upcoming months are created ahead of
+time by the retention scheduler, and retention detaches and drops whole months instead of deleting
+rows. `migrate_messages` converts an existing unpartitioned table.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.persistence.models import Conversation, Message
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MESSAGE_TABLE = Message.__tablename__
+
+
+def month_start(value: date) -> date:
+	return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+	index = value.year * 12 + value.month - 1 + months
+	return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+	return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+	"""Month covered by a child named by `partition_name`, None for the default partition or others."""
+	suffix = name[len(table) + 2 :] if name.startswith(f"{table}_p") else ""
+	if len(suffix) != 6 or not suffix.isdigit():
+		return None
+	return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def partitioned_table_sql(table: str = MESSAGE_TABLE, sequence: Optional[str] = None) -> str:
+	"""Parent table DDL; the primary key has to include the partition key."""
+	id_column = f"id integer NOT NULL DEFAULT nextval('{sequence}')" if sequence else "id serial NOT NULL"
+	return (
+		f"CREATE TABLE {table} ("
+		f"{id_column}, "
+		f"conversation_id integer NOT NULL REFERENCES {Conversation.__tablename__}(id) ON DELETE CASCADE, "
+		"role varchar(20) NOT NULL, "
+		"content text NOT NULL, "
+		"pii_redactions json, "
+		"created_at timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'utc'), "
+		"PRIMARY KEY (id, created_at)"
+		") PARTITION BY RANGE (created_at)"
+	)
+
+
+def partition_sql(table: str, month: date) -> str:
+	return (
+		f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+		f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+	)
+
+
+def expired_partitions(table: str, names: List[str], cutoff: datetime) -> List[str]:
+	"""Children whose whole month lies before `cutoff`."""
+	limit = month_start(cutoff.date())
+	return sorted(n for n in names if (m := partition_month(table, n)) is not None and add_months(m, 1) <= limit)
+
+
+def is_partitioned(conn, table: str = MESSAGE_TABLE) -> bool:
+	return bool(conn.execute(
+		text("SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :t"), {"t": table}
+	).scalar())
+
+
+def list_partitions(conn, table: str = MESSAGE_TABLE) -> List[str]:
+	return [r[0] for r in conn.execute(text(
+		"SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+		" JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :t"
+	), {"t": table}).fetchall()]
+
+
+def create_partitioned_messages(conn, sequence: Optional[str] = None):
+	conn.execute(text(partitioned_table_sql(MESSAGE_TABLE, sequence)))
+	conn.execute(text(f"CREATE TABLE IF NOT EXISTS {MESSAGE_TABLE}_default PARTITION OF {MESSAGE_TABLE} DEFAULT"))
+	conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{MESSAGE_TABLE}_created_at ON {MESSAGE_TABLE} (created_at)"))
+	conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{MESSAGE_TABLE}_conversation_id_id ON {MESSAGE_TABLE} (conversation_id, id)"))
+
+
+def ensure_partitions(conn, months_ahead: Optional[int] = None, start: Optional[date] = None) -> List[str]:
+	"""Create the month partitions from `start` (default: this month) through `months_ahead` months ahead."""
+	months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+	month = month_start(start or datetime.utcnow().date())
+	last = add_months(month_start(datetime.utcnow().date()), months_ahead)
+	existing = set(list_partitions(conn))
+	created = []
+	while month <= last:
+		if partition_name(MESSAGE_TABLE, month) not in existing:
+			conn.execute(text(partition_sql(MESSAGE_TABLE, month)))
+			created.append(partition_name(MESSAGE_TABLE, month))
+		month = add_months(month, 1)
+	return created
+
+
+def drop_partitions_before(conn, cutoff: datetime) -> List[str]:
+	"""Detach and drop message partitions entirely older than `cutoff` (no row deletes, no vacuum debt)."""
+	dropped = expired_partitions(MESSAGE_TABLE, list_partitions(conn), cutoff)
+	for name in dropped:
+		conn.execute(text(f"ALTER TABLE {MESSAGE_TABLE} DETACH PARTITION {name}"))
+		conn.execute(text(f"DROP TABLE {name}"))
+	return dropped
+
+
+def migrate_messages(engine, drop_legacy: bool = False) -> Dict[str, Any]:
+	"""
+	Convert an unpartitioned message table: rename it to `{table}_legacy`, create the partitioned table
+	on the same id sequence (new writes go there right away), then copy old rows one month per
+	transaction. The legacy table is kept unless `drop_legacy`.
+	"""
+	legacy = f"{MESSAGE_TABLE}_legacy"
+	with engine.connect() as conn:
+		if is_partitioned(conn):
+			return {"table": MESSAGE_TABLE, "migrated": False, "reason": "already partitioned"}
+		sequence = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": MESSAGE_TABLE}).scalar()
+		first = conn.execute(text(f"SELECT min(created_at) FROM {MESSAGE_TABLE}")).scalar()
+		conn.execute(text(f"ALTER TABLE {MESSAGE_TABLE} RENAME TO {legacy}"))
+		conn.execute(text(f"ALTER INDEX IF EXISTS ix_{MESSAGE_TABLE}_created_at RENAME TO ix_{legacy}_created_at"))
+		conn.execute(text(f"ALTER INDEX IF EXISTS ix_{MESSAGE_TABLE}_conversation_id_id RENAME TO ix_{legacy}_conversation_id_id"))
+		conn.execute(text(f"ALTER INDEX IF EXISTS {MESSAGE_TABLE}_pkey RENAME TO {legacy}_pkey"))
+		if sequence:
+			conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+		create_partitioned_messages(conn, sequence)
+		created = ensure_partitions(conn, start=first.date() if first else None)
+		if sequence:
+			conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {MESSAGE_TABLE}.id"))
+		conn.commit()
+
+	columns = "id, conversation_id, role, content, pii_redactions, created_at"
+	copied = 0
+	month = month_start(first.date()) if first else None
+	stop = add_months(month_start(datetime.utcnow().date()), 1)
+	while month is not None and month < stop:
+		with engine.connect() as conn:
+			copied += conn.execute(text(
+				f"INSERT INTO {MESSAGE_TABLE} ({columns}) SELECT {columns} FROM {legacy}"
+				" WHERE created_at >= :lo AND created_at < :hi"
+			), {"lo": month, "hi": add_months(month, 1)}).rowcount or 0
+			conn.commit()
+		month = add_months(month, 1)
+	with engine.connect() as conn:
+		# rows with a future or NULL timestamp land in the default partition
+		copied += conn.execute(text(
+			f"INSERT INTO {MESSAGE_TABLE} ({columns}) SELECT id, conversation_id, role, content, pii_redactions,"
+			f" coalesce(created_at, now() AT TIME ZONE 'utc') FROM {legacy} WHERE created_at IS NULL OR created_at >= :hi"
+		), {"hi": stop}).rowcount or 0
+		if drop_legacy:
+			conn.execute(text(f"DROP TABLE {legacy}"))
+		conn.commit()
+	result = {"table": MESSAGE_TABLE, "migrated": True, "partitions": created, "copied": copied, "legacy_dropped": drop_legacy}
+	logger.info("message table partitioned: %s", result)
+	return result
@@ -1,58 +1,156 @@
-from typing import Optional, List, Dict, Any
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterator
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import insert, select, func
+from sqlalchemy.dialects import postgresql, sqlite
 from app.persistence.db import get_db
-from app.persistence.models import Conversation, Message, SensitiveData, Base
+from app.persistence.models import Conversation, Message, SensitiveData, NotificationOutbox, Base
 from app.config import get_settings
 
 
 settings = get_settings()
 
 
+def _message_window(conversation_id: int) -> list:
+	"""Conditions selecting one conversation's messages; with partitioned messages, also bounded below by
+	the conversation's creation time so the planner prunes partitions older than the conversation."""
+	conditions = [Message.conversation_id == conversation_id]
+	if settings.MESSAGE_PARTITIONING:
+		conditions.append(Message.created_at >= select(Conversation.created_at).where(Conversation.id == conversation_id).scalar_subquery())
+	return conditions
+
+
+@contextmanager
+def unit_of_work() -> Iterator[Session]:
+	"""One session for a unit of work (e.g. a chat turn): committed on success, rolled back on error.
+	Objects stay usable after a commit, so a mid-turn commit costs no refresh queries."""
+	with next(get_db()) as db:  # type: ignore
+		db.expire_on_commit = False
+		try:
+			yield db
+			db.commit()
+		except Exception:
+			db.rollback()
+			raise
+
+
+@contextmanager
+def _scope(db: Optional[Session]) -> Iterator[Session]:
+	if db is not None:
+		yield db  # the caller's unit of work commits
+		return
+	with unit_of_work() as own:
+		yield own
+
+
 class ConversationRepository:
+	"""Conversation/message access. Every method takes an optional `db` from `unit_of_work()`; without one
+	it runs in its own short transaction."""
+
+	unit_of_work = staticmethod(unit_of_work)
+
 	def __init__(self):
 		pass
 
-	def get_or_create_conversation(self, session_id: str, channel: str, user_meta: Dict[str, Any]) -> Conversation:
-		with next(get_db()) as db:  # type: ignore
-			stmt = select(Conversation).where(Conversation.session_id == session_id)
-			conv = db.execute(stmt).scalar_one_or_none()
-			if conv:
-				return conv
-			conv = Conversation(session_id=session_id, channel=channel, user_profile=user_meta)
-			db.add(conv)
-			db.commit()
-			db.refresh(conv)
-			return conv
+	def get_or_create_conversation(self, session_id: str, channel: str, user_meta: Dict[str, Any], db: Optional[Session] = None) -> Conversation:
+		"""One statement: INSERT ... ON CONFLICT (session_id) DO UPDATE SET updated_at ... RETURNING the row,
+		so concurrent first messages of a session all get the same conversation instead of an IntegrityError."""
+		now = datetime.utcnow()
+		with _scope(db) as db:
+			dialect = db.get_bind().dialect.name
+			insert_ = postgresql.insert if dialect == "postgresql" else sqlite.insert
+			stmt = insert_(Conversation).values(session_id=session_id, channel=channel, user_profile=user_meta, created_at=now, updated_at=now)
+			stmt = stmt.on_conflict_do_update(index_elements=[Conversation.session_id], set_={"updated_at": now}).returning(Conversation)
+			return db.execute(stmt, execution_options={"populate_existing": True}).scalar_one()
 
-	def add_message(self, conversation_id: int, role: str, content: str, pii_redactions: Optional[dict] = None) -> Message:
-		with next(get_db()) as db:  # type: ignore
-			msg = Message(conversation_id=conversation_id, role=role, content=content, pii_redactions=pii_redactions or {})
-			db.add(msg)
-			db.commit()
-			db.refresh(msg)
-			return msg
+	def add_message(
+		self,
+		conversation_id: int,
+		role: str,
+		content: str,
+		pii_redactions: Optional[dict] = None,
+		notifications: Optional[List[Dict[str, Any]]] = None,
+		db: Optional[Session] = None,
+	) -> None:
+		"""Persist a message; `notifications` are outbox rows committed in the same transaction."""
+		self.add_messages(conversation_id, [{"role": role, "content": content, "pii_redactions": pii_redactions}], notifications, db)
 
-	def get_history_as_messages(self, conversation_id: int) -> List[Dict[str, Any]]:
-		with next(get_db()) as db:  # type: ignore
-			stmt = select(Message).where(Message.conversation_id == conversation_id).order_by(Message.id.asc())
-			rows = db.execute(stmt).scalars().all()
-			return [{"type": "human" if r.role == "user" else "ai", "content": r.content} for r in rows]
+	def add_messages(
+		self,
+		conversation_id: int,
+		messages: List[Dict[str, Any]],
+		notifications: Optional[List[Dict[str, Any]]] = None,
+		db: Optional[Session] = None,
+	) -> None:
+		"""Persist several messages ({role, content, pii_redactions, created_at?}) with one multi-row INSERT, in order."""
+		now = datetime.utcnow()
+		rows = [
+			{"conversation_id": conversation_id, "role": m["role"], "content": m["content"], "pii_redactions": m.get("pii_redactions") or {}, "created_at": m.get("created_at") or now}
+			for m in messages
+		]
+		with _scope(db) as db:
+			if rows:
+				db.execute(insert(Message).values(rows))
+			if notifications:
+				OutboxRepository.enqueue(db, notifications)
 
-	def get_transcript(self, conversation_id: int) -> str:
-		with next(get_db()) as db:  # type: ignore
-			stmt = select(Message).where(Message.conversation_id == conversation_id).order_by(Message.id.asc())
-			rows = db.execute(stmt).scalars().all()
+	def _history_rows(self, db: Session, conversation_id: int, limit: Optional[int] = None):
+		if limit is None:
+			stmt = select(Message.role, Message.content).where(*_message_window(conversation_id)).order_by(Message.id.asc())
+			return db.execute(stmt).all()
+		# newest `limit` rows straight off the (conversation_id, id) index, returned oldest first
+		stmt = select(Message.role, Message.content).where(*_message_window(conversation_id)).order_by(Message.id.desc()).limit(limit)
+		return list(reversed(db.execute(stmt).all()))
+
+	def get_history_as_messages(self, conversation_id: int, db: Optional[Session] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+		with _scope(db) as db:
+			return [{"type": "human" if r.role == "user" else "ai", "content": r.content} for r in self._history_rows(db, conversation_id, limit)]
+
+	def get_transcript(self, conversation_id: int, db: Optional[Session] = None) -> str:
+		with _scope(db) as db:
 			lines = []
-			for r in rows:
+			for r in self._history_rows(db, conversation_id):
 				prefix = "User" if r.role == "user" else "Assistant"
 				lines.append(f"{prefix}: {r.content}")
 			return "\n".join(lines)
 
-	def store_sensitive(self, conversation_id: int, data: Dict[str, Any]) -> SensitiveData:
-		with next(get_db()) as db:  # type: ignore
+	def store_sensitive(self, conversation_id: int, data: Dict[str, Any], db: Optional[Session] = None) -> SensitiveData:
+		with _scope(db) as db:
 			rec = SensitiveData(conversation_id=conversation_id, data=data, expires_at=SensitiveData.ttl_from_now(settings.SENSITIVE_TTL_HOURS))
 			db.add(rec)
+			db.flush()
+			return rec
+
+
+class OutboxRepository:
+	"""Transactional outbox for support notifications; rows are deduplicated by `dedupe_key`."""
+
+	@staticmethod
+	def enqueue(db: Session, rows: List[Dict[str, Any]]) -> None:
+		# INSERT ... ON CONFLICT (dedupe_key) DO NOTHING, without committing (caller owns the transaction)
+		dialect = db.get_bind().dialect.name
+		insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+		stmt = insert(NotificationOutbox).values([{"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow(), **r} for r in rows])
+		db.execute(stmt.on_conflict_do_nothing(index_elements=["dedupe_key"]))
+
+	def add(self, rows: List[Dict[str, Any]]) -> None:
+		with next(get_db()) as db:  # type: ignore
+			self.enqueue(db, rows)
 			db.commit()
-			db.refresh(rec)
-			return rec
\ No newline at end of file
+
+	@staticmethod
+	def claim_due(db: Session, limit: int) -> List[NotificationOutbox]:
+		# SKIP LOCKED lets several dispatchers share the table without double sends
+		stmt = (
+			select(NotificationOutbox)
+			.where(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= datetime.utcnow())
+			.order_by(NotificationOutbox.id.asc())
+			.limit(limit)
+			.with_for_update(skip_locked=True)
+		)
+		return list(db.execute(stmt).scalars().all())
+
+	def pending_count(self) -> int:
+		with next(get_db()) as db:  # type: ignore
+			return int(db.execute(select(func.count()).select_from(NotificationOutbox).where(NotificationOutbox.status == "pending")).scalar() or 0)
@@ -0,0 +1,236 @@
+"""
+Admission control for chat turns. Each model backend (the first provider of the agent profile) runs
+at most ADMISSION_LIMITS turns at once; further turns wait in a bounded FIFO queue until a slot
+frees up or their deadline passes. Turns that cannot be admitted are shed with `Overloaded`, and
+callers degrade instead of piling more load on a saturated model: interactive channels answer
+from the cache of recent general answers (or with a canned "busy" reply), queued channels defer.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from app.config import get_settings, on_settings_reload
+from app.utils.metrics import counter, gauge, histogram
+from app.utils.pii import mask_pii
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ADMISSION_WAIT = histogram("admission_wait_seconds", "Time a chat turn waited for an admission slot")
+ADMISSION_REJECTED = counter("admission_rejected_total", "Chat turns shed by admission control, by backend and reason (queue_full/timeout)")
+ADMISSION_DEGRADED = counter("admission_degraded_total", "Shed chat turns by fallback (cached/busy/deferred)")
+ADMISSION_IN_FLIGHT = gauge("admission_in_flight", "Admitted chat turns running per backend")
+ADMISSION_QUEUED = gauge("admission_queue_depth", "Chat turns waiting for an admission slot per backend")
+
+BUSY_MESSAGES = {
+	"id": "Maaf, kami sedang menerima banyak pesan. Silakan coba lagi dalam beberapa saat.",
+	"en": "Sorry, we are handling a lot of messages right now. Please try again in a moment.",
+}
+
+
+class Overloaded(Exception):
+	"""A turn was not admitted: the backend's queue is full or the wait deadline passed."""
+
+	def __init__(self, backend: str, reason: str):
+		super().__init__(f"{backend} is saturated ({reason})")
+		self.backend = backend
+		self.reason = reason
+
+
+class AdmissionController:
+	"""
+	At most `limit` admitted turns; up to `queue_size` more wait in arrival order, each for at most
+	its `timeout`. A released slot is handed straight to the oldest waiter.
+	"""
+
+	def __init__(self, backend: str, limit: int, queue_size: int):
+		self.backend = backend
+		self.limit = max(1, limit)
+		self.queue_size = max(0, queue_size)
+		self._active = 0
+		self._waiters: Deque[threading.Event] = deque()
+		self._lock = threading.Lock()
+
+	def acquire(self, timeout: float):
+		started = time.monotonic()
+		with self._lock:
+			if self._active < self.limit and not self._waiters:
+				self._active += 1
+				self._update()
+				return
+			if len(self._waiters) >= self.queue_size:
+				ADMISSION_REJECTED.inc(backend=self.backend, reason="queue_full")
+				raise Overloaded(self.backend, "queue_full")
+			ticket = threading.Event()
+			self._waiters.append(ticket)
+			self._update()
+		granted = ticket.wait(timeout)
+		with self._lock:
+			if not granted and not ticket.is_set():
+				self._waiters.remove(ticket)
+				self._update()
+				ADMISSION_REJECTED.inc(backend=self.backend, reason="timeout")
+				raise Overloaded(self.backend, "timeout")
+		ADMISSION_WAIT.observe(time.monotonic() - started, backend=self.backend)
+
+	def release(self):
+		with self._lock:
+			if self._waiters:
+				self._waiters.popleft().set()  # the slot passes on; _active stays the same
+			else:
+				self._active -= 1
+			self._update()
+
+	@contextmanager
+	def admit(self, timeout: float) -> Iterator[None]:
+		self.acquire(timeout)
+		try:
+			yield
+		finally:
+			self.release()
+
+	def stats(self) -> Dict[str, Any]:
+		return {"backend": self.backend, "limit": self.limit, "active": self._active, "waiting": len(self._waiters)}
+
+	def _update(self):
+		ADMISSION_IN_FLIGHT.set(self._active, backend=self.backend)
+		ADMISSION_QUEUED.set(len(self._waiters), backend=self.backend)
+
+
+class AnswerCache:
+	"""Recent answers to general questions by normalized text (bounded LRU with a TTL)."""
+
+	def __init__(self, max_entries: int, ttl: float):
+		self.max_entries = max_entries
+		self.ttl = ttl
+		self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _key(message: str) -> str:
+		return re.sub(r"[^\w]+", " ", message.lower()).strip()
+
+	def get(self, message: str) -> Optional[str]:
+		key = self._key(message)
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			if entry[1] < time.monotonic():
+				del self._entries[key]
+				return None
+			self._entries.move_to_end(key)
+			return entry[0]
+
+	def put(self, message: str, answer: str):
+		key = self._key(message)
+		if not key or self.max_entries <= 0:
+			return
+		with self._lock:
+			self._entries[key] = (answer, time.monotonic() + self.ttl)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_answers: Optional[AnswerCache] = None
+_lock = threading.Lock()
+
+
+def _limits() -> Dict[str, int]:
+	limits = {}
+	for item in (settings.ADMISSION_LIMITS or "").split(","):
+		name, _, limit = item.strip().partition(":")
+		if name and limit:
+			limits[name.lower()] = int(limit)
+	return limits
+
+
+def reset_admission():
+	"""Drop controllers and cached answers; turns holding a slot release it on their old controller."""
+	global _answers
+	with _lock:
+		_controllers.clear()
+		_answers = None
+
+
+on_settings_reload(reset_admission, "ADMISSION_", "LLM_")
+
+
+def turn_backend() -> str:
+	"""The model backend a turn loads most: the first provider of the agent profile chain."""
+	from app.services.llm.provider import model_specs, task_profile
+
+	specs = model_specs(task_profile("agent"), 0.2)
+	return specs[0].provider if specs else "default"
+
+
+def get_controller(backend: str) -> AdmissionController:
+	with _lock:
+		controller = _controllers.get(backend)
+		if controller is None:
+			limit = _limits().get(backend, settings.ADMISSION_DEFAULT_LIMIT)
+			controller = _controllers[backend] = AdmissionController(backend, limit, settings.ADMISSION_QUEUE_SIZE)
+		return controller
+
+
+@contextmanager
+def admit_turn(timeout: Optional[float] = None) -> Iterator[None]:
+	"""Hold an admission slot of the turn's backend for the block; raises Overloaded when shed."""
+	if not settings.ADMISSION_ENABLED:
+		yield
+		return
+	wait = settings.ADMISSION_MAX_WAIT_SECONDS if timeout is None else timeout
+	with get_controller(turn_backend()).admit(wait):
+		yield
+
+
+def _answer_cache() -> AnswerCache:
+	global _answers
+	with _lock:
+		if _answers is None:
+			_answers = AnswerCache(settings.ADMISSION_ANSWER_CACHE_SIZE, settings.ADMISSION_ANSWER_CACHE_TTL_SECONDS)
+		return _answers
+
+
+def remember_answer(message: str, result: Dict[str, Any]):
+	"""
+	Keep answers to general questions, the only ones safe to replay to another user, and only when the
+	graph saw nothing but the question (no session history or memory that could leak into the answer).
+	Stored PII-masked all the same.
+	"""
+	if result.get("current_task") != "General_Inquiry" or result.get("handoff_to_human") or not result.get("assistant_response"):
+		return
+	if len(result.get("conversation_history") or []) > 1:
+		return
+	_answer_cache().put(message, mask_pii(result["assistant_response"])[0])
+
+
+def busy_message(locale: Optional[str]) -> str:
+	return BUSY_MESSAGES.get((locale or "")[:2].lower()) or BUSY_MESSAGES.get(settings.DEFAULT_LOCALE[:2]) or BUSY_MESSAGES["en"]
+
+
+def degraded_result(message: str, error: Overloaded) -> Dict[str, Any]:
+	"""Stand-in turn result for a shed interactive turn: a cached answer when there is one, else a busy reply."""
+	answer = _answer_cache().get(message)
+	mode = "cached" if answer is not None else "busy"
+	if answer is None:
+		from app.utils.lang import detect_language
+
+		answer = busy_message(detect_language(message))
+	ADMISSION_DEGRADED.inc(backend=error.backend, mode=mode)
+	logger.warning("chat turn shed (%s), answered with %s reply", error, mode)
+	return {
+		"assistant_response": answer,
+		"handoff_to_human": False,
+		"current_task": None,
+		"degraded": mode,
+		"timings": {},
+	}
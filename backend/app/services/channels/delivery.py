@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from app.config import get_settings
+from app.utils.metrics import counter, histogram
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_LANE_IDLE_SECONDS = 30.0
+_MAX_BACKOFF_SECONDS = 30.0
+
+DELIVERY_SECONDS = histogram("channel_delivery_seconds", "Time from submit to provider acknowledgement, including queueing and rate limiting")
+DELIVERY_TOTAL = counter("channel_delivery_total", "Outbound channel messages by outcome")
+DELIVERY_RETRIES = counter("channel_delivery_retries_total", "Retried outbound sends (429/5xx/transport errors)")
+
+
+class DeliveryError(Exception):
+	def __init__(self, message: str, status_code: Optional[int] = None):
+		super().__init__(message)
+		self.status_code = status_code
+
+
+class TokenBucket:
+	"""Async token bucket; `rate` tokens per second with a burst of `capacity`."""
+
+	def __init__(self, rate: float, capacity: Optional[float] = None):
+		self.rate = rate
+		self.capacity = capacity if capacity is not None else max(1.0, rate)
+		self._tokens = self.capacity
+		self._updated = time.monotonic()
+		self._lock = asyncio.Lock()
+
+	async def acquire(self):
+		async with self._lock:
+			while True:
+				now = time.monotonic()
+				self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+				self._updated = now
+				if self._tokens >= 1.0:
+					self._tokens -= 1.0
+					return
+				await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class _ChatLane:
+	def __init__(self, rate: float):
+		self.queue: "asyncio.Queue[Tuple[str, asyncio.Future, float]]" = asyncio.Queue()
+		self.bucket = TokenBucket(rate)
+		self.task: Optional[asyncio.Task] = None
+
+
+class ChannelSender(ABC):
+	"""
+	Outbound sender for one provider: a pooled keep-alive AsyncClient, a global and a per-chat
+	rate limit, retries on 429/5xx with backoff, and one FIFO lane per chat so replies arrive in order.
+	"""
+
+	provider = "generic"
+	max_text_length = 4096
+
+	def __init__(
+		self,
+		base_url: str,
+		headers: Optional[Dict[str, str]] = None,
+		rate_per_sec: float = 30.0,
+		chat_rate_per_sec: float = 1.0,
+		max_retries: Optional[int] = None,
+		backoff_seconds: Optional[float] = None,
+		transport: Optional[httpx.AsyncBaseTransport] = None,
+	):
+		self.loop = asyncio.get_running_loop()
+		self.max_retries = settings.CHANNEL_MAX_RETRIES if max_retries is None else max_retries
+		self.backoff_seconds = settings.CHANNEL_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+		self._chat_rate = chat_rate_per_sec
+		self._global = TokenBucket(rate_per_sec)
+		self._lanes: Dict[str, _ChatLane] = {}
+		limits = httpx.Limits(max_connections=settings.CHANNEL_MAX_CONNECTIONS, max_keepalive_connections=settings.CHANNEL_MAX_CONNECTIONS)
+		self._client = httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=20.0, transport=transport)
+
+	@abstractmethod
+	def build_request(self, chat_id: str, text: str) -> Tuple[str, Dict[str, Any]]:
+		"""Path and JSON body of the provider's send-message call."""
+
+	def retry_after(self, response: httpx.Response) -> Optional[float]:
+		value = response.headers.get("Retry-After")
+		try:
+			return float(value) if value is not None else None
+		except ValueError:
+			return None
+
+	def submit(self, chat_id: str, text: str) -> List[asyncio.Future]:
+		"""Queue `text` (split to the provider's size limit) on the chat's lane; futures resolve on delivery."""
+		lane = self._lanes.get(chat_id)
+		if lane is None:
+			lane = self._lanes[chat_id] = _ChatLane(self._chat_rate)
+		futures = []
+		for part in _split(text, self.max_text_length):
+			fut = self.loop.create_future()
+			lane.queue.put_nowait((part, fut, time.monotonic()))
+			futures.append(fut)
+		if lane.task is None or lane.task.done():
+			lane.task = self.loop.create_task(self._run_lane(chat_id, lane))
+		return futures
+
+	async def send(self, chat_id: str, text: str) -> List[Dict[str, Any]]:
+		return list(await asyncio.gather(*self.submit(chat_id, text)))
+
+	async def _run_lane(self, chat_id: str, lane: _ChatLane):
+		while True:
+			try:
+				text, fut, enqueued = await asyncio.wait_for(lane.queue.get(), timeout=_LANE_IDLE_SECONDS)
+			except asyncio.TimeoutError:
+				if lane.queue.empty():
+					if self._lanes.get(chat_id) is lane:
+						del self._lanes[chat_id]
+					return
+				continue
+			try:
+				result = await self._deliver(chat_id, text, lane)
+				DELIVERY_TOTAL.inc(provider=self.provider, outcome="sent")
+				if not fut.done():
+					fut.set_result(result)
+			except Exception as e:
+				DELIVERY_TOTAL.inc(provider=self.provider, outcome="failed")
+				logger.warning("%s delivery to %s failed: %s", self.provider, chat_id, e)
+				if not fut.done():
+					fut.set_exception(e)
+			finally:
+				DELIVERY_SECONDS.observe(time.monotonic() - enqueued, provider=self.provider)
+
+	async def _deliver(self, chat_id: str, text: str, lane: _ChatLane) -> Dict[str, Any]:
+		path, payload = self.build_request(chat_id, text)
+		last_error = ""
+		status: Optional[int] = None
+		for attempt in range(self.max_retries + 1):
+			await lane.bucket.acquire()
+			await self._global.acquire()
+			delay = min(self.backoff_seconds * (2 ** attempt), _MAX_BACKOFF_SECONDS)
+			try:
+				r = await self._client.post(path, json=payload)
+			except httpx.TransportError as e:
+				last_error, status = f"transport error: {e!r}", None
+			else:
+				if r.status_code < 400:
+					return r.json() if r.content else {}
+				status, last_error = r.status_code, r.text[:500]
+				if r.status_code != 429 and r.status_code < 500:
+					raise DeliveryError(f"{self.provider} rejected message ({r.status_code}): {last_error}", r.status_code)
+				delay = self.retry_after(r) or delay
+			if attempt < self.max_retries:
+				DELIVERY_RETRIES.inc(provider=self.provider)
+				await asyncio.sleep(delay)
+		raise DeliveryError(f"{self.provider} delivery failed after {self.max_retries + 1} attempts: {last_error}", status)
+
+	async def aclose(self):
+		for lane in list(self._lanes.values()):
+			if lane.task is not None:
+				lane.task.cancel()
+		self._lanes.clear()
+		await self._client.aclose()
+
+
+class TelegramSender(ChannelSender):
+	provider = "telegram"
+
+	def __init__(self, **kwargs):
+		if not settings.TELEGRAM_BOT_TOKEN:
+			raise RuntimeError("TELEGRAM_BOT_TOKEN not configured")
+		kwargs.setdefault("rate_per_sec", settings.TELEGRAM_RATE_PER_SEC)
+		kwargs.setdefault("chat_rate_per_sec", settings.TELEGRAM_CHAT_RATE_PER_SEC)
+		super().__init__(base_url=f"{settings.TELEGRAM_API_BASE}/bot{settings.TELEGRAM_BOT_TOKEN}", **kwargs)
+
+	def build_request(self, chat_id: str, text: str) -> Tuple[str, Dict[str, Any]]:
+		return "/sendMessage", {"chat_id": chat_id, "text": text}
+
+	def retry_after(self, response: httpx.Response) -> Optional[float]:
+		# Telegram reports flood control in the body: {"parameters": {"retry_after": 5}}
+		try:
+			value = response.json().get("parameters", {}).get("retry_after")
+			if value is not None:
+				return float(value)
+		except Exception:
+			pass
+		return super().retry_after(response)
+
+
+class WhatsAppSender(ChannelSender):
+	provider = "whatsapp"
+
+	def __init__(self, **kwargs):
+		if not (settings.WA_TOKEN and settings.WA_PHONE_ID):
+			raise RuntimeError("WhatsApp not configured")
+		kwargs.setdefault("rate_per_sec", settings.WA_RATE_PER_SEC)
+		kwargs.setdefault("chat_rate_per_sec", settings.WA_CHAT_RATE_PER_SEC)
+		super().__init__(
+			base_url=f"{settings.WA_API_BASE}/{settings.WA_PHONE_ID}",
+			headers={"Authorization": f"Bearer {settings.WA_TOKEN}"},
+			**kwargs,
+		)
+
+	def build_request(self, chat_id: str, text: str) -> Tuple[str, Dict[str, Any]]:
+		return "/messages", {"messaging_product": "whatsapp", "to": chat_id, "type": "text", "text": {"body": text}}
+
+
+def _split(text: str, limit: int) -> List[str]:
+	if len(text) <= limit:
+		return [text]
+	parts = []
+	while text:
+		cut = text.rfind("\n", 0, limit)
+		cut = cut if cut > 0 else limit
+		parts.append(text[:cut])
+		text = text[cut:].lstrip("\n")
+	return parts
+
+
+_FACTORIES = {"telegram": TelegramSender, "whatsapp": WhatsAppSender}
+_senders: Dict[str, ChannelSender] = {}
+
+
+def get_sender(provider: str) -> ChannelSender:
+	"""Process-wide sender per provider, bound to the running event loop."""
+	loop = asyncio.get_running_loop()
+	sender = _senders.get(provider)
+	if sender is None or sender.loop is not loop:
+		sender = _senders[provider] = _FACTORIES[provider]()
+	return sender
+
+
+async def close_senders():
+	for sender in list(_senders.values()):
+		try:
+			await sender.aclose()
+		except Exception:
+			pass
+	_senders.clear()
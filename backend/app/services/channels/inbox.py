@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.services.admission import ADMISSION_DEGRADED, Overloaded
+from app.services.channels.delivery import get_sender
+from app.utils.metrics import counter, gauge, histogram
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INBOX_MESSAGES = counter("inbox_messages_total", "Inbound webhook messages by channel and outcome")
+INBOX_DEPTH = gauge("inbox_queue_depth", "Inbound messages waiting for a worker")
+INBOX_LAG = histogram("inbox_lag_seconds", "Time from webhook acknowledgement to processing start")
+INBOX_TURN = histogram("inbox_turn_seconds", "Processing time of one queued turn (conversation + reply)")
+INBOX_BURST = histogram("inbox_burst_size", "Messages merged into one turn", buckets=(1, 2, 3, 4, 6, 8, 10))
+
+
+@dataclass
+class InboundMessage:
+	channel: str  # telegram/whatsapp, also the outbound sender name
+	session_id: str
+	chat_id: str
+	text: str
+	message_id: str
+	user_meta: Dict[str, Any] = field(default_factory=dict)
+	received_at: float = field(default_factory=time.monotonic)
+	deferrals: int = 0  # times it was put back because the model backend was saturated
+	coalesced: int = 1  # inbound messages merged into this turn
+
+
+class InboxFull(Exception):
+	pass
+
+
+class Deduplicator:
+	"""Remembers provider message ids for `ttl` seconds (bounded), so webhook redeliveries are dropped."""
+
+	def __init__(self, ttl: float, max_size: int = 100_000):
+		self.ttl = ttl
+		self.max_size = max_size
+		self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+	def seen(self, key: str) -> bool:
+		now = time.monotonic()
+		while self._seen:
+			ts = next(iter(self._seen.values()))
+			if now - ts < self.ttl and len(self._seen) < self.max_size:
+				break
+			self._seen.popitem(last=False)
+		if key in self._seen:
+			return True
+		self._seen[key] = now
+		return False
+
+	def forget(self, key: str):
+		self._seen.pop(key, None)
+
+
+Handler = Callable[[InboundMessage], Awaitable[None]]
+
+
+class SessionInbox:
+	"""
+	Worker pool over a queue of sessions. Each session has its own FIFO of pending messages and is
+	held by at most one worker at a time: turns of one chat run in order, different chats in parallel.
+
+	Bursts are coalesced: a session becomes ready only after `coalesce_window` seconds without a new
+	message (bounded by `coalesce_max_wait` from the first one), and all its pending messages are
+	answered as a single turn.
+
+	A turn whose handler raises Overloaded (admission control shed it) is put back at the front of
+	its session right away, and the session stays held for `defer_delay` seconds before it is retried,
+	so newer messages of the chat cannot overtake it.
+	"""
+
+	def __init__(
+		self,
+		handler: Handler,
+		workers: Optional[int] = None,
+		max_pending: Optional[int] = None,
+		dedupe_ttl: Optional[float] = None,
+		coalesce_window: Optional[float] = None,
+		coalesce_max_wait: Optional[float] = None,
+		coalesce_max_messages: Optional[int] = None,
+		defer_delay: Optional[float] = None,
+	):
+		self.loop = asyncio.get_running_loop()
+		self.handler = handler
+		self.workers = workers or settings.INBOUND_WORKERS
+		self.max_pending = max_pending or settings.INBOUND_MAX_PENDING
+		self._dedupe = Deduplicator(settings.INBOUND_DEDUPE_TTL_SECONDS if dedupe_ttl is None else dedupe_ttl)
+		self.coalesce_window = settings.INBOUND_COALESCE_WINDOW_MS / 1000 if coalesce_window is None else coalesce_window
+		self.coalesce_max_wait = settings.INBOUND_COALESCE_MAX_WAIT_MS / 1000 if coalesce_max_wait is None else coalesce_max_wait
+		self.coalesce_max_messages = coalesce_max_messages or settings.INBOUND_COALESCE_MAX_MESSAGES
+		self.defer_delay = settings.ADMISSION_DEFER_SECONDS if defer_delay is None else defer_delay
+		self._deferred: Dict[str, asyncio.TimerHandle] = {}  # sessions held back after a shed turn
+		self._timers: Dict[str, asyncio.TimerHandle] = {}  # sessions waiting for their burst to end
+		self._pending: Dict[str, Deque[InboundMessage]] = {}
+		self._scheduled: Set[str] = set()  # sessions waiting on a timer, queued in _ready or held by a worker
+		self._ready: "asyncio.Queue[str]" = asyncio.Queue()
+		self._depth = 0
+		self._tasks: List[asyncio.Task] = []
+
+	def enqueue(self, msg: InboundMessage) -> bool:
+		"""Queue a message; returns False if it is a redelivery. Raises InboxFull when saturated."""
+		key = f"{msg.channel}:{msg.message_id}"
+		if self._dedupe.seen(key):
+			INBOX_MESSAGES.inc(channel=msg.channel, outcome="duplicate")
+			return False
+		if self._depth >= self.max_pending:
+			self._dedupe.forget(key)  # rejected, not processed: the provider's redelivery must get through
+			INBOX_MESSAGES.inc(channel=msg.channel, outcome="rejected")
+			raise InboxFull(f"{self._depth} messages pending")
+		self._add(msg)
+		INBOX_MESSAGES.inc(channel=msg.channel, outcome="enqueued")
+		return True
+
+	def _add(self, msg: InboundMessage):
+		self._ensure_workers()
+		self._pending.setdefault(msg.session_id, deque()).append(msg)
+		self._set_depth(self._depth + 1)
+		if msg.session_id in self._timers:
+			self._arm(msg.session_id)  # burst continues: slide the window
+		elif msg.session_id not in self._scheduled:
+			self._scheduled.add(msg.session_id)
+			self._arm(msg.session_id)
+
+	def stats(self) -> Dict[str, Any]:
+		return {"depth": self._depth, "sessions": len(self._pending), "workers": self.workers}
+
+	def _set_depth(self, value: int):
+		self._depth = value
+		INBOX_DEPTH.set(value)
+
+	def _ensure_workers(self):
+		self._tasks = [t for t in self._tasks if not t.done()]
+		while len(self._tasks) < self.workers:
+			self._tasks.append(self.loop.create_task(self._worker()))
+
+	def _arm(self, session_id: str):
+		pending = self._pending[session_id]
+		due = min(pending[-1].received_at + self.coalesce_window, pending[0].received_at + self.coalesce_max_wait)
+		delay = due - time.monotonic()
+		timer = self._timers.pop(session_id, None)
+		if timer is not None:
+			timer.cancel()
+		if delay <= 0 or len(pending) >= self.coalesce_max_messages:
+			self._ready.put_nowait(session_id)
+		else:
+			self._timers[session_id] = self.loop.call_later(delay, self._fire, session_id)
+
+	def _fire(self, session_id: str):
+		if self._timers.pop(session_id, None) is not None:
+			self._ready.put_nowait(session_id)
+
+	def _take(self, session_id: str) -> List[InboundMessage]:
+		pending = self._pending[session_id]
+		limit = self.coalesce_max_messages if self.coalesce_window > 0 else 1
+		return [pending.popleft() for _ in range(min(len(pending), limit))]
+
+	async def _worker(self):
+		while True:
+			session_id = await self._ready.get()
+			batch = self._take(session_id)
+			self._set_depth(self._depth - len(batch))
+			started = time.monotonic()
+			for m in batch:
+				INBOX_LAG.observe(started - m.received_at, channel=m.channel)
+			try:
+				await self._process(batch)
+				INBOX_MESSAGES.inc(len(batch), channel=batch[0].channel, outcome="processed")
+			except Overloaded as e:
+				INBOX_MESSAGES.inc(len(batch), channel=batch[0].channel, outcome="deferred")
+				ADMISSION_DEGRADED.inc(backend=e.backend, mode="deferred")
+				self._defer(session_id, batch)
+			except Exception as e:
+				INBOX_MESSAGES.inc(len(batch), channel=batch[0].channel, outcome="failed")
+				logger.error("inbox turn for %s failed: %s", session_id, e)
+			finally:
+				INBOX_TURN.observe(time.monotonic() - started, channel=batch[0].channel)
+				self._release(session_id)
+
+	async def _process(self, batch: List[InboundMessage]):
+		INBOX_BURST.observe(len(batch), channel=batch[0].channel)
+		await self.handler(coalesce(batch))
+
+	def _defer(self, session_id: str, batch: List[InboundMessage]):
+		pending = self._pending.setdefault(session_id, deque())
+		for m in reversed(batch):  # ahead of anything that arrived meanwhile, in their original order
+			m.deferrals += 1
+			pending.appendleft(m)
+		self._set_depth(self._depth + len(batch))
+		self._deferred[session_id] = self.loop.call_later(self.defer_delay, self._retry, session_id)
+
+	def _retry(self, session_id: str):
+		if self._deferred.pop(session_id, None) is not None:
+			self._arm(session_id)
+
+	def _release(self, session_id: str):
+		if session_id in self._deferred:
+			return  # still held: _retry arms it when the defer delay is over
+		if self._pending.get(session_id):
+			# Messages that arrived during the turn form the next burst
+			self._arm(session_id)
+		else:
+			self._pending.pop(session_id, None)
+			self._scheduled.discard(session_id)
+
+	async def aclose(self):
+		for timer in [*self._timers.values(), *self._deferred.values()]:
+			timer.cancel()
+		if self._depth:
+			logger.warning("inbox closed with %d messages pending in %d sessions", self._depth, len(self._pending))
+		self._timers.clear()
+		self._deferred.clear()
+		for t in self._tasks:
+			t.cancel()
+		await asyncio.gather(*self._tasks, return_exceptions=True)
+		self._tasks = []
+
+
+def coalesce(batch: List[InboundMessage]) -> InboundMessage:
+	"""Merge a burst of messages from one chat into a single turn (texts joined in arrival order)."""
+	if len(batch) == 1:
+		return batch[0]
+	last = batch[-1]
+	return InboundMessage(
+		channel=last.channel,
+		session_id=last.session_id,
+		chat_id=last.chat_id,
+		text="\n".join(m.text for m in batch),
+		message_id=last.message_id,
+		user_meta=last.user_meta,
+		received_at=batch[0].received_at,
+		deferrals=max(m.deferrals for m in batch),
+		coalesced=len(batch),
+	)
+
+
+async def handle_message(msg: InboundMessage):
+	"""
+	Default turn handler: run the conversation off the event loop, then reply on the same channel.
+	When the model backend is saturated the turn waits only briefly and raises Overloaded, so the
+	inbox defers it; the last try (after ADMISSION_MAX_DEFERRALS) waits the full deadline and
+	falls back to the degraded reply.
+	"""
+	from app.services.conversation import run_conversation
+
+	last_try = msg.deferrals >= settings.ADMISSION_MAX_DEFERRALS
+	result = await run_in_threadpool(
+		run_conversation,
+		session_id=msg.session_id,
+		message=msg.text,
+		channel=msg.channel,
+		user_meta=msg.user_meta,
+		degrade=last_try,
+		admission_timeout=None if last_try else settings.ADMISSION_DEFER_WAIT_SECONDS,
+	)
+	answer = result.get("assistant_response", "")
+	if answer:
+		await get_sender(msg.channel).send(msg.chat_id, answer)
+
+
+_inbox: Optional[SessionInbox] = None
+
+
+def get_inbox() -> SessionInbox:
+	global _inbox
+	loop = asyncio.get_running_loop()
+	if _inbox is None or _inbox.loop is not loop:
+		_inbox = SessionInbox(handle_message)
+	return _inbox
+
+
+async def close_inbox():
+	global _inbox
+	if _inbox is not None:
+		await _inbox.aclose()
+		_inbox = None
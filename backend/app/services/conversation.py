@@ -1,43 +1,189 @@
-from typing import Dict, Any
-from app.services.langgraph.graph import get_compiled_graph
+import logging
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import threading
+from uuid import uuid4
 from app.services.memory.vector_memory import add_memory, retrieve_memory
 from app.persistence.repositories import ConversationRepository
 from app.utils.lang import detect_language, translate_to_language
 from app.utils.pii import mask_pii
 from app.config import get_settings
-from app.services.notifications.email_service import send_support_email
-from app.services.notifications.telegram_service import notify_support_telegram
+from app.services.admission import Overloaded, admit_turn, degraded_result, remember_answer
+from app.services.notifications.outbox import handover_scope, handover_notifications
+from app.services.session_cache import SessionState, get_session_cache
+from app.services.smalltalk import SmallTalkMatch, match_small_talk, small_talk_reply
+from app.utils.metrics import counter
+from app.utils.tracing import PipelineCallbackHandler, Trace, span, start_trace
 
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
+TURNS = counter("conversation_turns_total", "Chat turns by path (graph, or the fast path that answered them)")
 _repo = ConversationRepository()
-_graph = get_compiled_graph()
+_graph = None  # compiled on first use (or by warm_up in the lifespan hook)
+_graph_lock = threading.Lock()
 
 
-def run_conversation(session_id: str, message: str, channel: str, user_meta: Dict[str, Any]) -> Dict[str, Any]:
-	# Load history and locale
-	conv = _repo.get_or_create_conversation(session_id=session_id, channel=channel, user_meta=user_meta)
-	locale = conv.locale or settings.DEFAULT_LOCALE
+def _get_graph():
+	global _graph
+	if _graph is None:
+		with _graph_lock:
+			if _graph is None:
+				from app.services.langgraph.graph import get_compiled_graph  # pulls in agents, tools and providers
 
-	# PII masking before persistence and processing
-	masked_message, redactions = mask_pii(message)
+				graph = get_compiled_graph()
+				if _graph is None:  # unless swapped in while compiling
+					_graph = graph
+	return _graph
 
-	_repo.add_message(conversation_id=conv.id, role="user", content=masked_message, pii_redactions=redactions)
-	# Persist memory to vectorstore as well
+
+def warm_up():
+	"""Build what the first turn would otherwise pay for (graph, providers, sentiment lexicon)."""
+	from app.utils.sentiment import _analyzer
+
+	_get_graph()
+	_analyzer()
+
+
+def run_conversation(
+	session_id: str,
+	message: str,
+	channel: str,
+	user_meta: Dict[str, Any],
+	callbacks: Optional[List[Any]] = None,
+	degrade: bool = True,
+	admission_timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+	"""
+	Run one turn. `callbacks` are extra LangChain callback handlers attached to the graph run (e.g. for streaming).
+
+	The result carries a per-stage timing breakdown under `timings`. A turn shed by admission control
+	returns a degraded result (`degraded`: cached/busy), or raises Overloaded when `degrade` is off.
+	Small talk skips the graph (and admission control, as it calls no model).
+	"""
+	small_talk = match_small_talk(message)
 	try:
-		add_memory(session_id=session_id, role="user", content=masked_message)
+		with (nullcontext() if small_talk else admit_turn(admission_timeout)), start_trace() as trace:
+			result = _run_turn(session_id, message, channel, user_meta, trace, callbacks or [], small_talk)
+	except Overloaded as e:
+		if not degrade:
+			raise
+		return degraded_result(message, e)
+	remember_answer(message, result)
+	return {**result, "timings": trace.summary()}
+
+
+def _run_turn(
+	session_id: str,
+	message: str,
+	channel: str,
+	user_meta: Dict[str, Any],
+	trace: Trace,
+	callbacks: List[Any],
+	small_talk: Optional[SmallTalkMatch] = None,
+) -> Dict[str, Any]:
+	# One session for the whole turn (it only connects on a cache miss); both messages are written together at the end.
+	with _repo.unit_of_work() as db:
+		if small_talk is not None:
+			result, state, written = _small_talk_turn_in(db, session_id, message, channel, user_meta, small_talk)
+		else:
+			result, state, written = _run_turn_in(db, session_id, message, channel, user_meta, trace, callbacks)
+	cache = get_session_cache()
+	if cache is not None:
+		cache.append(session_id, state, written)  # write-through, after the commit
+	return result
+
+
+def _load_state(db: Any, session_id: str, channel: str, user_meta: Dict[str, Any]) -> SessionState:
+	cache = get_session_cache()
+	state, version = cache.lookup(session_id) if cache is not None else (None, 0)
+	if state is not None:
+		return state
+	conv = _repo.get_or_create_conversation(session_id=session_id, channel=channel, user_meta=user_meta, db=db)
+	with span("load_history"):
+		history = _repo.get_history_as_messages(conv.id, db=db, limit=settings.SESSION_HISTORY_WINDOW)
+	db.commit()  # end the read transaction so no connection is held while the graph runs
+	state = SessionState(conversation_id=conv.id, locale=conv.locale, user_profile=conv.user_profile or {}, history=history)
+	return cache.put(session_id, state, version) if cache is not None else state
+
+
+def _persist_user_message(db: Any, session_id: str, conversation_id: int, row: Dict[str, Any]):
+	"""A failed turn still keeps the customer's message: written alone, in its own commit, before the error propagates."""
+	try:
+		db.rollback()
+		_repo.add_messages(conversation_id, [row], db=db)
+		db.commit()
 	except Exception:
-		pass
+		logger.exception("could not persist the user message of a failed turn (conversation %s)", conversation_id)
+	cache = get_session_cache()
+	if cache is not None:
+		cache.invalidate(session_id)  # reload the history, with this message, on the next turn
+
 
-	user_lang = detect_language(masked_message) or locale
+def _small_talk_turn_in(
+	db: Any, session_id: str, message: str, channel: str, user_meta: Dict[str, Any], match: SmallTalkMatch
+) -> Tuple[Dict[str, Any], SessionState, List[Dict[str, Any]]]:
+	"""Templated reply; the turn is persisted like any other but not embedded into memory."""
+	received_at = datetime.utcnow()
+	with span("load_conversation"):
+		state = _load_state(db, session_id, channel, user_meta)
+	with span("small_talk"):
+		answer = small_talk_reply(match, state.locale)
+	with span("persist_messages"):
+		_repo.add_messages(
+			state.conversation_id,
+			[
+				{"role": "user", "content": message, "pii_redactions": [], "created_at": received_at},
+				{"role": "assistant", "content": answer, "pii_redactions": []},
+			],
+			db=db,
+		)
+	TURNS.inc(path="small_talk")
+	result = {
+		"assistant_response": answer,
+		"handoff_to_human": False,
+		"current_task": "Small_Talk",
+		"small_talk": match.intent,
+		"locale": match.lang or state.locale or settings.DEFAULT_LOCALE,
+	}
+	return result, state, [{"type": "human", "content": message}, {"type": "ai", "content": answer}]
+
+
+def _run_turn_in(
+	db: Any, session_id: str, message: str, channel: str, user_meta: Dict[str, Any], trace: Trace, callbacks: List[Any]
+) -> Tuple[Dict[str, Any], SessionState, List[Dict[str, Any]]]:
+	usage = PipelineCallbackHandler(trace)
+	received_at = datetime.utcnow()
+
+	# PII masking before persistence and processing
+	with span("mask_pii"):
+		masked_message, redactions = mask_pii(message)
+
+	# Conversation, locale and recent history: from the session cache when warm
+	with span("load_conversation"):
+		state = _load_state(db, session_id, channel, user_meta)
+	conversation_id = state.conversation_id
+	locale = state.locale or settings.DEFAULT_LOCALE
+	history = state.history + [{"type": "human", "content": masked_message}]
+
+	# Persist memory to vectorstore as well
+	with span("add_memory"):
+		try:
+			add_memory(session_id=session_id, role="user", content=masked_message)
+		except Exception:
+			pass
+
+	with span("detect_language"):
+		user_lang = detect_language(masked_message) or locale
 
 	graph_input = {
 		"session_id": session_id,
 		"channel": channel,
 		"user_query": masked_message,
-		"conversation_history": _repo.get_history_as_messages(conv.id),
+		"conversation_history": history,
 		"current_task": None,
-		"user_profile": conv.user_profile or {},
+		"user_profile": state.user_profile or {},
 		"knowledge_refs": [],
 		"sentiment_score": 0.0,
 		"handoff_to_human": False,
@@ -48,33 +194,47 @@ def run_conversation(session_id: str, message: str, channel: str, user_meta: Dic
 	}
 
 	# Optionally retrieve recent memory context to enrich graph input
-	try:
-		mem_docs = retrieve_memory(session_id=session_id, query_text=masked_message, k=4)
-		if mem_docs:
-			graph_input["conversation_history"] = (
-				[{"type": "human" if d.metadata.get("role") == "user" else "ai", "content": d.page_content} for d in mem_docs]
-				+ graph_input["conversation_history"]
-			)[:20]
-	except Exception:
-		pass
+	with span("retrieve_memory"):
+		try:
+			mem_docs = retrieve_memory(session_id=session_id, query_text=masked_message, k=4)
+			if mem_docs:
+				graph_input["conversation_history"] = (
+					[{"type": "human" if d.metadata.get("role") == "user" else "ai", "content": d.page_content} for d in mem_docs]
+					+ graph_input["conversation_history"]
+				)[:20]
+		except Exception:
+			pass
 
-	final_state = _graph.invoke(graph_input, config={"configurable": {"thread_id": session_id}})
+	config: Dict[str, Any] = {"configurable": {"thread_id": session_id}, "callbacks": [usage, *callbacks]}
+	turn_id = uuid4().hex  # handover notifications are deduplicated per turn
+	user_row = {"role": "user", "content": masked_message, "pii_redactions": redactions, "created_at": received_at}
+	try:
+		with span("graph"), handover_scope(conversation_id, turn_id):
+			final_state = _get_graph().invoke(graph_input, config=config)
+		TURNS.inc(path="graph")
 
-	answer_raw = final_state.get("assistant_response", "")
-	answer = translate_to_language(answer_raw, target_lang=user_lang)
+		answer_raw = final_state.get("assistant_response", "")
+		with span("translate"):
+			answer = translate_to_language(answer_raw, target_lang=user_lang, callbacks=[usage])
 
-	_repo.add_message(conversation_id=conv.id, role="assistant", content=answer, pii_redactions=[])
-	try:
-		add_memory(session_id=session_id, role="assistant", content=answer)
+		# Handover: support notifications go into the outbox in the same transaction as the reply;
+		# the background dispatcher renders the transcript and delivers them.
+		notifications = handover_notifications(conversation_id, turn_id=turn_id) if final_state.get("handoff_to_human") else None
+		with span("persist_messages"):
+			_repo.add_messages(
+				conversation_id,
+				[user_row, {"role": "assistant", "content": answer, "pii_redactions": []}],
+				notifications=notifications,
+				db=db,
+			)
 	except Exception:
-		pass
-
-	# Handover notify if needed
-	if final_state.get("handoff_to_human"):
-		transcript = _repo.get_transcript(conv.id)
-		if settings.SMTP_HOST and settings.SUPPORT_EMAIL_TO:
-			send_support_email(subject="AI-CS Handover Needed", body=transcript)
-		if settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_SUPPORT_CHAT_ID:
-			notify_support_telegram(text=transcript)
+		_persist_user_message(db, session_id, conversation_id, user_row)
+		raise
+	written = [{"type": "human", "content": masked_message}, {"type": "ai", "content": answer}]
+	with span("add_memory"):
+		try:
+			add_memory(session_id=session_id, role="assistant", content=answer)
+		except Exception:
+			pass
 
-	return {**final_state, "assistant_response": answer}
\ No newline at end of file
+	return {**final_state, "assistant_response": answer}, state, written
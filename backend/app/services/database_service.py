@@ -1,5 +1,6 @@
 import os
 import json
+import logging
 from typing import Optional, List, Dict, Any
 from sqlalchemy import create_engine, text, inspect
 from sqlalchemy.orm import sessionmaker
@@ -8,6 +9,7 @@ from app.config import get_settings
 from app.persistence.models import Base, KnowledgeBase
 import uuid
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 class DatabaseService:
@@ -28,7 +30,7 @@ class DatabaseService:
                 ), {"schema_name": schema_name})
                 return result.fetchone() is not None
         except Exception as e:
-            print(f"Error checking schema existence: {e}")
+            logger.error(f"Error checking schema existence: {e}")
             return False
     
     def create_schema(self, schema_name: str) -> bool:
@@ -39,7 +41,7 @@ class DatabaseService:
                 conn.commit()
                 return True
         except Exception as e:
-            print(f"Error creating schema: {e}")
+            logger.error(f"Error creating schema: {e}")
             return False
     
     def create_vector_extension(self) -> bool:
@@ -50,7 +52,7 @@ class DatabaseService:
                 conn.commit()
                 return True
         except Exception as e:
-            print(f"Error creating vector extension: {e}")
+            logger.error(f"Error creating vector extension: {e}")
             return False
     
     def create_tables(self, schema_name: str = "public") -> bool:
@@ -66,7 +68,7 @@ class DatabaseService:
             metadata.create_all(bind=self.engine)
             return True
         except Exception as e:
-            print(f"Error creating tables: {e}")
+            logger.error(f"Error creating tables: {e}")
             return False
 
     
@@ -109,7 +111,7 @@ class DatabaseService:
                 session.refresh(kb)
                 return kb
         except Exception as e:
-            print(f"Error creating knowledge base: {e}")
+            logger.error(f"Error creating knowledge base: {e}")
             return None
     
     def list_knowledge_bases(self) -> List[KnowledgeBase]:
@@ -135,7 +137,7 @@ class DatabaseService:
                 session.commit()
                 return True
         except Exception as e:
-            print(f"Error deleting knowledge base: {e}")
+            logger.error(f"Error deleting knowledge base: {e}")
             return False
     
     # Legacy document APIs removed in RAG-only mode
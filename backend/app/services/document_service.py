@@ -1,19 +1,21 @@
 import os
 import json
-import pandas as pd
+import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import aiofiles
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema import Document as LangChainDocument
-import pypdf
-from docx import Document as DocxDocument
-import markdown
+from langchain_core.documents import Document as LangChainDocument
 import uuid
 from datetime import datetime
 
 from app.services.database_service import DatabaseService
 
+# pandas, pypdf, python-docx and markdown are imported inside the extractors that need them:
+# together they add about a second to startup and most processes never parse a file.
+
+logger = logging.getLogger(__name__)
+
 class DocumentService:
     def __init__(self):
         try:
@@ -71,52 +73,62 @@ class DocumentService:
     def extract_text_from_pdf(self, file_path: str) -> str:
         try:
             text = ""
+            import pypdf
+
             with open(file_path, 'rb') as file:
                 pdf_reader = pypdf.PdfReader(file)
                 for page in pdf_reader.pages:
                     text += page.extract_text() + "\n"
             return text
         except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
+            logger.error(f"Error extracting text from PDF: {e}")
             return ""
     
     def extract_text_from_docx(self, file_path: str) -> str:
         try:
+            from docx import Document as DocxDocument
+
             doc = DocxDocument(file_path)
             text = ""
             for paragraph in doc.paragraphs:
                 text += paragraph.text + "\n"
             return text
         except Exception as e:
-            print(f"Error extracting text from DOCX: {e}")
+            logger.error(f"Error extracting text from DOCX: {e}")
             return ""
     
     def extract_text_from_csv(self, file_path: str) -> str:
         try:
+            import pandas as pd
+
             df = pd.read_csv(file_path)
             return df.to_string()
         except Exception as e:
-            print(f"Error extracting text from CSV: {e}")
+            logger.error(f"Error extracting text from CSV: {e}")
             return ""
     
     def extract_text_from_excel(self, file_path: str) -> str:
         try:
+            import pandas as pd
+
             df = pd.read_excel(file_path)
             return df.to_string()
         except Exception as e:
-            print(f"Error extracting text from Excel: {e}")
+            logger.error(f"Error extracting text from Excel: {e}")
             return ""
     
     def extract_text_from_markdown(self, file_path: str) -> str:
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
                 md_content = file.read()
+                import markdown
+
                 html = markdown.markdown(md_content)
                 import re
                 text = re.sub(r'<[^>]+>', '', html)
                 return text
         except Exception as e:
-            print(f"Error extracting text from Markdown: {e}")
+            logger.error(f"Error extracting text from Markdown: {e}")
             return ""
     
     def extract_text_from_txt(self, file_path: str) -> str:
@@ -124,7 +136,7 @@ class DocumentService:
             with open(file_path, 'r', encoding='utf-8') as file:
                 return file.read()
         except Exception as e:
-            print(f"Error extracting text from TXT: {e}")
+            logger.error(f"Error extracting text from TXT: {e}")
             return ""
     
     def extract_text_from_file(self, file_path: str, file_type: str) -> str:
@@ -155,5 +167,5 @@ class DocumentService:
         try:
             return None
         except Exception as e:
-            print(f"Error processing file: {e}")
+            logger.error(f"Error processing file: {e}")
             return None
\ No newline at end of file
@@ -1,4 +1,5 @@
-from typing import Protocol, Optional, Dict, Any, List
+from datetime import datetime, timezone
+from typing import Protocol, Optional, Dict, Any, List, Iterator
 
 
 class OrderStatus(Protocol):
@@ -8,4 +9,23 @@ class OrderStatus(Protocol):
 
 class ProductCatalog(Protocol):
 	def search_products(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-		...
\ No newline at end of file
+		...
+
+
+class CatalogFeed(Protocol):
+	def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+		"""Yield normalized products: id, title, description, url, price, updated_at (naive UTC datetime or None)."""
+		...
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+	"""Parse an ISO-8601 timestamp from a store API into a naive UTC datetime."""
+	if not value:
+		return None
+	try:
+		ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+	except ValueError:
+		return None
+	if ts.tzinfo is not None:
+		ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+	return ts
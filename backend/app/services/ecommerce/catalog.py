@@ -0,0 +1,305 @@
+import difflib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func, or_, text
+from langchain_core.documents import Document
+from app.config import get_settings, on_settings_reload
+from app.persistence.db import get_db
+from app.persistence.models import Product
+from app.services.ecommerce.registry import get_active_ecommerce
+from app.services.vectorstores.registry import STORE_FIELDS, get_vector_store
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_BATCH_SIZE = 200
+_RRF_K = 60  # reciprocal-rank-fusion damping constant
+_FALLBACK_SCAN_LIMIT = 5000
+_product_vs = None
+
+
+def source_name(adapter: Any) -> str:
+	"""Stable short name of an adapter, used to namespace mirrored rows (shopify, woocommerce, mock, ...)."""
+	return adapter.__class__.__name__.replace("Adapter", "").replace("Ecommerce", "").lower()
+
+
+def _reset_product_vectorstore():
+	global _product_vs
+	_product_vs = None
+
+
+on_settings_reload(_reset_product_vectorstore, *STORE_FIELDS, "CATALOG_")
+
+
+def _get_product_vectorstore():
+	global _product_vs
+	if _product_vs is not None:
+		return _product_vs
+	if not settings.CATALOG_VECTOR_INDEX:
+		return None
+	_product_vs = get_vector_store(f"{settings.DB_SCHEMA}_products")
+	return _product_vs
+
+
+def _vector_id(source: str, external_id: str) -> str:
+	return f"{source}:{external_id}"
+
+
+def _embedding_text(p: Dict[str, Any]) -> str:
+	return f"{p.get('title') or ''}\n{p.get('description') or ''}".strip()
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+	batch: List[Dict[str, Any]] = []
+	for item in items:
+		batch.append(item)
+		if len(batch) >= size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+class CatalogSync:
+	"""Mirror the active adapter's catalog into the local product table (plus an optional vector index)."""
+
+	def __init__(self, adapter: Any = None):
+		self.adapter = adapter or get_active_ecommerce()
+		self.source = source_name(self.adapter)
+
+	def full_sync(self) -> Dict[str, Any]:
+		started = datetime.utcnow()
+		stats = self._ingest(self.adapter.iter_products())
+		# Anything not touched during a full pass no longer exists upstream.
+		stats["deleted"] = self._delete_not_synced_since(started)
+		stats["mode"] = "full"
+		return stats
+
+	def incremental_sync(self) -> Dict[str, Any]:
+		since = self.high_watermark()
+		if since is None:
+			return self.full_sync()
+		stats = self._ingest(self.adapter.iter_products(updated_since=since))
+		stats["mode"] = "incremental"
+		return stats
+
+	def apply_products(self, products: List[Dict[str, Any]]) -> Dict[str, Any]:
+		"""Upsert already-normalized products, e.g. from a store webhook."""
+		return self._ingest(products)
+
+	def delete_products(self, external_ids: List[str]) -> int:
+		if not external_ids:
+			return 0
+		with next(get_db()) as db:  # type: ignore
+			res = db.execute(delete(Product).where(Product.source == self.source, Product.external_id.in_(external_ids)))
+			db.commit()
+		vs = _get_product_vectorstore()
+		if vs is not None:
+			try:
+				vs.delete([_vector_id(self.source, eid) for eid in external_ids])
+			except Exception as e:
+				logger.warning("catalog vector delete failed: %s", e)
+		return int(res.rowcount or 0)
+
+	def high_watermark(self) -> Optional[datetime]:
+		with next(get_db()) as db:  # type: ignore
+			return db.execute(select(func.max(Product.source_updated_at)).where(Product.source == self.source)).scalar()
+
+	def _ingest(self, products: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+		stats = {"source": self.source, "upserted": 0, "reindexed": 0}
+		for batch in _chunks(products, _BATCH_SIZE):
+			changed = self._upsert_batch(batch)
+			stats["upserted"] += len(batch)
+			stats["reindexed"] += self._index_vectors(changed)
+		return stats
+
+	def _upsert_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+		"""Upsert one batch; return products whose searchable text changed (they need re-embedding)."""
+		now = datetime.utcnow()
+		changed: List[Dict[str, Any]] = []
+		with next(get_db()) as db:  # type: ignore
+			ids = [str(p["id"]) for p in batch]
+			existing = {
+				row.external_id: row
+				for row in db.execute(select(Product).where(Product.source == self.source, Product.external_id.in_(ids))).scalars()
+			}
+			for p in batch:
+				eid = str(p["id"])
+				row = existing.get(eid)
+				if row is None:
+					row = Product(source=self.source, external_id=eid)
+					db.add(row)
+					existing[eid] = row
+					changed.append(p)
+				elif row.title != (p.get("title") or "") or (row.description or "") != (p.get("description") or ""):
+					changed.append(p)
+				row.title = p.get("title") or ""
+				row.description = p.get("description") or ""
+				row.url = p.get("url")
+				row.price = str(p["price"]) if p.get("price") is not None else None
+				row.source_updated_at = p.get("updated_at")
+				row.data = {k: v for k, v in p.items() if k not in {"id", "title", "description", "url", "price", "updated_at"}}
+				row.synced_at = now
+			db.commit()
+		return changed
+
+	def _index_vectors(self, products: List[Dict[str, Any]]) -> int:
+		vs = _get_product_vectorstore()
+		if vs is None or not products:
+			return 0
+		try:
+			vs.add_documents(
+				[Document(page_content=_embedding_text(p), metadata={"source": self.source, "external_id": str(p["id"])}) for p in products],
+				ids=[_vector_id(self.source, str(p["id"])) for p in products],
+			)
+			return len(products)
+		except Exception as e:
+			# Lexical search still works; the next full sync re-embeds.
+			logger.warning("catalog vector indexing failed: %s", e)
+			return 0
+
+	def _delete_not_synced_since(self, started: datetime) -> int:
+		with next(get_db()) as db:  # type: ignore
+			stale = db.execute(select(Product.external_id).where(Product.source == self.source, Product.synced_at < started)).scalars().all()
+		return self.delete_products(list(stale))
+
+
+def _lexical_search(db, source: str, query: str, limit: int) -> List[int]:
+	if db.get_bind().dialect.name == "postgresql":
+		# Full-text match ranked by ts_rank, plus pg_trgm word similarity for typo tolerance.
+		# Both predicates are served by the GIN indexes created in init_db.
+		sql = text(
+			f"""
+			SELECT id FROM {Product.__tablename__}
+			WHERE source = :source AND (
+				to_tsvector('simple', title || ' ' || coalesce(description, '')) @@ plainto_tsquery('simple', :q)
+				OR :q <% title
+			)
+			ORDER BY ts_rank(to_tsvector('simple', title || ' ' || coalesce(description, '')), plainto_tsquery('simple', :q))
+				+ word_similarity(:q, title) DESC
+			LIMIT :limit
+			"""
+		)
+		return [r[0] for r in db.execute(sql, {"source": source, "q": query, "limit": limit})]
+	# Portable fallback (SQLite dev/test DBs): fuzzy token match in Python.
+	rows = db.execute(
+		select(Product.id, Product.title, Product.description).where(Product.source == source).limit(_FALLBACK_SCAN_LIMIT)
+	).all()
+	terms = [t for t in query.lower().split() if t]
+	scored: List[Tuple[float, int]] = []
+	for pid, title, desc in rows:
+		words = f"{title} {desc or ''}".lower().split()
+		score = sum(max((difflib.SequenceMatcher(None, t, w).ratio() for w in words), default=0.0) for t in terms)
+		if terms and score / len(terms) >= 0.75:
+			scored.append((score, pid))
+	scored.sort(reverse=True)
+	return [pid for _, pid in scored[:limit]]
+
+
+def _semantic_search(source: str, query: str, limit: int) -> List[str]:
+	vs = _get_product_vectorstore()
+	if vs is None:
+		return []
+	try:
+		docs = vs.similarity_search(query, k=limit, filter={"source": {"$eq": source}})
+	except Exception as e:
+		logger.warning("catalog semantic search failed: %s", e)
+		return []
+	return [d.metadata.get("external_id") for d in docs if d.metadata.get("external_id")]
+
+
+def search_catalog(query: str, limit: int = 5, adapter: Any = None) -> Optional[List[Dict[str, Any]]]:
+	"""Search the local mirror. Returns None when the mirror is unavailable or empty for the active source."""
+	if not query or not query.strip():
+		return []
+	source = source_name(adapter or get_active_ecommerce())
+	try:
+		db = next(get_db())  # type: ignore
+	except RuntimeError:
+		return None
+	with db:
+		if db.execute(select(Product.id).where(Product.source == source).limit(1)).first() is None:
+			return None
+		lexical_ids = _lexical_search(db, source, query, limit * 4)
+		semantic_eids = _semantic_search(source, query, limit * 4)
+		rows = db.execute(
+			select(Product).where(
+				Product.source == source,
+				or_(Product.id.in_(lexical_ids), Product.external_id.in_(semantic_eids)),
+			)
+		).scalars().all()
+		by_id = {r.id: r for r in rows}
+		id_by_eid = {r.external_id: r.id for r in rows}
+		# Reciprocal rank fusion of the lexical and vector rankings.
+		scores: Dict[int, float] = {}
+		for ranking in (lexical_ids, [id_by_eid.get(eid) for eid in semantic_eids]):
+			for rank, pid in enumerate(ranking):
+				if pid is not None:
+					scores[pid] = scores.get(pid, 0.0) + 1.0 / (_RRF_K + rank)
+		ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+		return [
+			{"id": by_id[pid].external_id, "title": by_id[pid].title, "url": by_id[pid].url, "price": by_id[pid].price}
+			for pid in ranked
+			if pid in by_id
+		]
+
+
+class CatalogScheduler:
+	"""Background thread: incremental polling every interval, full resync every CATALOG_FULL_SYNC_HOURS."""
+
+	def __init__(self, interval_seconds: int, full_sync_hours: int):
+		self.interval_seconds = interval_seconds
+		self.full_sync_every = timedelta(hours=full_sync_hours)
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+		self._last_full: Optional[datetime] = None
+
+	def start(self):
+		if self._thread and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name="catalog-sync", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		self._stop.set()
+
+	def run_once(self) -> Dict[str, Any]:
+		sync = CatalogSync()
+		if self._last_full is None or datetime.utcnow() - self._last_full >= self.full_sync_every:
+			stats = sync.full_sync()
+			self._last_full = datetime.utcnow()
+		else:
+			stats = sync.incremental_sync()
+		logger.info("catalog sync: %s", stats)
+		return stats
+
+	def _run(self):
+		while not self._stop.is_set():
+			try:
+				self.run_once()
+			except Exception as e:
+				logger.error("catalog sync failed: %s", e)
+			self._stop.wait(self.interval_seconds)
+
+
+_scheduler: Optional[CatalogScheduler] = None
+
+
+def start_catalog_scheduler() -> Optional[CatalogScheduler]:
+	global _scheduler
+	if not (settings.CATALOG_SYNC_ENABLED and settings.CATALOG_SYNC_INTERVAL_SECONDS > 0):
+		return None
+	if _scheduler is None:
+		_scheduler = CatalogScheduler(settings.CATALOG_SYNC_INTERVAL_SECONDS, settings.CATALOG_FULL_SYNC_HOURS)
+	_scheduler.start()
+	return _scheduler
+
+
+def stop_catalog_scheduler():
+	if _scheduler is not None:
+		_scheduler.stop()
@@ -1,12 +1,25 @@
-from typing import Dict, Any, List
-from .base import OrderStatus, ProductCatalog
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional
+from .base import OrderStatus, ProductCatalog, CatalogFeed
 
 
-class MockEcommerce(OrderStatus, ProductCatalog):
+_CATALOG = [
+	{"id": "sku-blue-shirt", "title": "Blue Casual Shirt", "description": "Cotton casual shirt, size L", "url": "https://example.com/product/blue-shirt", "price": "149000", "updated_at": datetime(2024, 1, 1)},
+	{"id": "sku-black-jeans", "title": "Black Slim Jeans", "description": "Stretch denim slim fit jeans", "url": "https://example.com/product/black-jeans", "price": "299000", "updated_at": datetime(2024, 1, 1)},
+	{"id": "sku-white-sneakers", "title": "White Canvas Sneakers", "description": "Lightweight canvas sneakers for daily wear", "url": "https://example.com/product/white-sneakers", "price": "259000", "updated_at": datetime(2024, 1, 1)},
+]
+
+
+class MockEcommerce(OrderStatus, ProductCatalog, CatalogFeed):
 	def get_order_status(self, order_id: str) -> Dict[str, Any]:
 		return {"order_id": order_id, "status": "in_transit", "eta": "tomorrow"}
 
 	def search_products(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
 		return [
 			{"id": "sku-blue-shirt", "title": "Blue Casual Shirt", "size": "L", "url": "https://example.com/product/blue-shirt"}
-		]
\ No newline at end of file
+		]
+
+	def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+		for p in _CATALOG:
+			if updated_since is None or p["updated_at"] > updated_since:
+				yield dict(p)
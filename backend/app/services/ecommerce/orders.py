@@ -0,0 +1,157 @@
+"""
+Order status lookups shared by the agent tools and the order-status fast path: order id extraction,
+a short-lived cache in front of the store adapter, and localized answer templates.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings, on_settings_reload
+from app.services.ecommerce.catalog import source_name
+from app.services.ecommerce.registry import ADAPTER_FIELDS, get_active_ecommerce
+from app.utils.metrics import counter
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ORDER_STATUS_LOOKUPS = counter("order_status_lookups_total", "Order status lookups by result (hit/miss/error)")
+
+_ORDER_ID = re.compile(r"(?<!\d)[#:]?(\d{5,})(?!\d)")
+
+# Requests about an order that need more than its status: left to the agent
+AMBIGUOUS_WORDS = (
+	"batal", "cancel", "refund", "retur", "return", "tukar", "ubah", "ganti", "change", "alamat", "address",
+	"komplain", "complain", "rusak", "broken", "kenapa", "why",
+)
+
+STATUS_LABELS: Dict[str, Dict[str, str]] = {
+	"pending": {"id": "menunggu pembayaran", "en": "awaiting payment"},
+	"on-hold": {"id": "sedang ditahan sementara", "en": "on hold"},
+	"processing": {"id": "sedang diproses", "en": "being processed"},
+	"unfulfilled": {"id": "sedang disiapkan", "en": "being prepared"},
+	"partial": {"id": "sudah dikirim sebagian", "en": "partially shipped"},
+	"fulfilled": {"id": "sudah dikirim", "en": "shipped"},
+	"shipped": {"id": "sudah dikirim", "en": "shipped"},
+	"in_transit": {"id": "sedang dalam pengiriman", "en": "in transit"},
+	"delivered": {"id": "sudah diterima", "en": "delivered"},
+	"completed": {"id": "sudah selesai", "en": "completed"},
+	"cancelled": {"id": "dibatalkan", "en": "cancelled"},
+	"refunded": {"id": "sudah dikembalikan dananya", "en": "refunded"},
+	"failed": {"id": "gagal diproses", "en": "failed"},
+}
+
+TEMPLATES: Dict[str, Dict[str, str]] = {
+	"status": {
+		"id": "Pesanan #{order_id} {status}.{eta} Ada lagi yang bisa saya bantu?",
+		"en": "Your order #{order_id} is {status}.{eta} Is there anything else I can help with?",
+	},
+	"eta": {"id": " Perkiraan tiba: {eta}.", "en": " Estimated arrival: {eta}."},
+	"not_found": {
+		"id": "Maaf, status pesanan #{order_id} belum bisa kami temukan. Mohon periksa kembali nomor pesanan Anda atau hubungi customer service kami.",
+		"en": "Sorry, we could not find the status of order #{order_id}. Please check the order number or contact our customer service.",
+	},
+}
+
+
+def extract_order_ids(text: str) -> List[str]:
+	"""Order ids (5+ digits, optionally prefixed with # or :) in order of appearance, without repeats."""
+	return list(dict.fromkeys(_ORDER_ID.findall(text or "")))
+
+
+def is_ambiguous_order_query(text: str) -> bool:
+	lowered = (text or "").lower()
+	return any(re.search(rf"\b{word}", lowered) for word in AMBIGUOUS_WORDS)
+
+
+class OrderStatusCache:
+	"""Adapter results per (store, order id) for `ttl` seconds (bounded LRU); errors are not cached."""
+
+	def __init__(self, max_entries: int, ttl: float):
+		self.max_entries = max_entries
+		self.ttl = ttl
+		self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None or entry[1] < time.monotonic():
+				return None
+			self._entries.move_to_end(key)
+			return entry[0]
+
+	def put(self, key: Tuple[str, str], value: Dict[str, Any]):
+		if self.ttl <= 0:
+			return
+		with self._lock:
+			self._entries[key] = (value, time.monotonic() + self.ttl)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+
+_cache: Optional[OrderStatusCache] = None
+
+
+def _reset_cache():
+	global _cache
+	_cache = None
+
+
+on_settings_reload(_reset_cache, "ORDER_", *ADAPTER_FIELDS)
+
+
+def _get_cache() -> OrderStatusCache:
+	global _cache
+	if _cache is None:
+		_cache = OrderStatusCache(settings.ORDER_STATUS_CACHE_SIZE, settings.ORDER_STATUS_CACHE_TTL_SECONDS)
+	return _cache
+
+
+def get_order_status(order_id: str, adapter: Any = None) -> Dict[str, Any]:
+	"""Status of `order_id` from `adapter` (default: the active store), cached briefly; adapter errors propagate."""
+	adapter = adapter or get_active_ecommerce()
+	cache, key = _get_cache(), (source_name(adapter), order_id)
+	status = cache.get(key)
+	if status is not None:
+		ORDER_STATUS_LOOKUPS.inc(result="hit")
+		return status
+	try:
+		status = adapter.get_order_status(order_id)
+	except Exception:
+		ORDER_STATUS_LOOKUPS.inc(result="error")
+		raise
+	ORDER_STATUS_LOOKUPS.inc(result="miss")
+	cache.put(key, status)
+	return status
+
+
+def _lang(locale: Optional[str]) -> str:
+	lang = (locale or settings.DEFAULT_LOCALE)[:2].lower()
+	return lang if lang in TEMPLATES["status"] else "en"
+
+
+def status_label(status: Dict[str, Any], lang: str) -> Optional[str]:
+	"""Localized state of an adapter result; adapters report `status` or Shopify's fulfillment/financial status."""
+	raw = status.get("status") or status.get("fulfillment_status")
+	if not raw and status.get("financial_status"):
+		raw = "unfulfilled" if status["financial_status"] == "paid" else status["financial_status"]
+	if not raw or raw == "unknown":
+		return None
+	raw = str(raw).lower()
+	return (STATUS_LABELS.get(raw) or {}).get(lang) or raw.replace("_", " ")
+
+
+def render_order_status(order_id: str, status: Optional[Dict[str, Any]], locale: Optional[str] = None) -> str:
+	"""Answer for an order status lookup; `status` None (or without a known state) means not found."""
+	lang = _lang(locale)
+	label = status_label(status, lang) if status else None
+	if label is None:
+		return TEMPLATES["not_found"][lang].format(order_id=order_id)
+	eta = TEMPLATES["eta"][lang].format(eta=status["eta"]) if status.get("eta") else ""
+	return TEMPLATES["status"][lang].format(order_id=order_id, status=label, eta=eta)
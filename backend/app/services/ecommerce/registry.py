@@ -1,5 +1,5 @@
-from typing import Union
-from app.config import get_settings
+from typing import Any, Optional, Union
+from app.config import get_settings, on_settings_reload
 from .mock import MockEcommerce
 
 # Optional imports guarded
@@ -23,8 +23,27 @@ except Exception:
 
 settings = get_settings()
 
+ADAPTER_FIELDS = ("SHOPIFY_", "WOO_", "SHOPEE_", "TOKO_")
+_active: Optional[Any] = None
+
+
+def reset_active_ecommerce():
+	global _active
+	_active = None
+
+
+on_settings_reload(reset_active_ecommerce, *ADAPTER_FIELDS)
+
 
 def get_active_ecommerce():
+	"""The configured adapter, built once and rebuilt after a reload changes store credentials."""
+	global _active
+	if _active is None:
+		_active = _build_active_ecommerce()
+	return _active
+
+
+def _build_active_ecommerce():
 	# Priority: Shopify -> WooCommerce -> Shopee -> Tokopedia -> Mock
 	if ShopifyAdapter and settings.SHOPIFY_STORE_DOMAIN and settings.SHOPIFY_ACCESS_TOKEN:
 		try:
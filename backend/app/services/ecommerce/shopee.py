@@ -2,9 +2,10 @@ import time
 import hmac
 import hashlib
 import requests
-from typing import Dict, Any, List
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional
 from app.config import get_settings
-from .base import OrderStatus, ProductCatalog
+from .base import OrderStatus, ProductCatalog, CatalogFeed
 
 
 settings = get_settings()
@@ -17,7 +18,7 @@ def _sign(path: str, timestamp: int, body: str = "") -> str:
 	return hmac.new(settings.SHOPEE_PARTNER_KEY.encode(), base_string.encode(), hashlib.sha256).hexdigest()
 
 
-class ShopeeAdapter(OrderStatus, ProductCatalog):
+class ShopeeAdapter(OrderStatus, ProductCatalog, CatalogFeed):
 	def __init__(self):
 		if not (settings.SHOPEE_PARTNER_ID and settings.SHOPEE_PARTNER_KEY and settings.SHOPEE_SHOP_ID and settings.SHOPEE_BASE_URL):
 			raise RuntimeError("Shopee not configured")
@@ -29,4 +30,8 @@ class ShopeeAdapter(OrderStatus, ProductCatalog):
 
 	def search_products(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
 		# Placeholder: Shopee product search API may require partner-level permissions.
-		return []
\ No newline at end of file
+		return []
+
+	def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+		# Placeholder: catalog listing is not wired for Shopee yet; the mirror stays empty.
+		return iter(())
@@ -1,7 +1,8 @@
 import requests
-from typing import Dict, Any, List
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional
 from app.config import get_settings
-from .base import OrderStatus, ProductCatalog
+from .base import OrderStatus, ProductCatalog, CatalogFeed, parse_timestamp
 
 
 settings = get_settings()
@@ -13,7 +14,7 @@ def _shopify_headers():
 	return {"X-Shopify-Access-Token": settings.SHOPIFY_ACCESS_TOKEN, "Content-Type": "application/json"}
 
 
-class ShopifyAdapter(OrderStatus, ProductCatalog):
+class ShopifyAdapter(OrderStatus, ProductCatalog, CatalogFeed):
 	base_url: str
 
 	def __init__(self):
@@ -42,4 +43,30 @@ class ShopifyAdapter(OrderStatus, ProductCatalog):
 				"url": f"https://{settings.SHOPIFY_STORE_DOMAIN}/products/{(p.get('handle') or '')}",
 			}
 			for p in products
-		]
\ No newline at end of file
+		]
+
+	def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+		# Page with since_id (ordered by id) so the cursor stays stable while products change.
+		params: Dict[str, Any] = {"limit": 250, "since_id": 0, "fields": "id,title,body_html,handle,variants,updated_at"}
+		if updated_since:
+			params["updated_at_min"] = updated_since.isoformat() + "Z"
+		while True:
+			r = requests.get(f"{self.base_url}/products.json", headers=_shopify_headers(), params=params, timeout=30)
+			r.raise_for_status()
+			products = r.json().get("products", [])
+			for p in products:
+				yield self.normalize_product(p)
+			if len(products) < params["limit"]:
+				return
+			params["since_id"] = products[-1].get("id")
+
+	def normalize_product(self, p: Dict[str, Any]) -> Dict[str, Any]:
+		variants = p.get("variants") or [{}]
+		return {
+			"id": str(p.get("id")),
+			"title": p.get("title") or "",
+			"description": p.get("body_html") or "",
+			"url": f"https://{settings.SHOPIFY_STORE_DOMAIN}/products/{(p.get('handle') or '')}",
+			"price": variants[0].get("price"),
+			"updated_at": parse_timestamp(p.get("updated_at")),
+		}
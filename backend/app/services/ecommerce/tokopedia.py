@@ -1,13 +1,14 @@
 import requests
-from typing import Dict, Any, List
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional
 from app.config import get_settings
-from .base import OrderStatus, ProductCatalog
+from .base import OrderStatus, ProductCatalog, CatalogFeed
 
 
 settings = get_settings()
 
 
-class TokopediaAdapter(OrderStatus, ProductCatalog):
+class TokopediaAdapter(OrderStatus, ProductCatalog, CatalogFeed):
 	def __init__(self):
 		if not (settings.TOKO_CLIENT_ID and settings.TOKO_CLIENT_SECRET and settings.TOKO_MERCHANT_ID and settings.TOKO_BASE_URL):
 			raise RuntimeError("Tokopedia not configured")
@@ -18,4 +19,8 @@ class TokopediaAdapter(OrderStatus, ProductCatalog):
 		return {"order_id": order_id, "status": "unknown", "note": "Tokopedia adapter stub"}
 
 	def search_products(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-		return []
\ No newline at end of file
+		return []
+
+	def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+		# Placeholder: catalog listing is not wired for Tokopedia yet; the mirror stays empty.
+		return iter(())
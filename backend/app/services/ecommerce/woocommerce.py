@@ -1,13 +1,14 @@
 import requests
-from typing import Dict, Any, List
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, Optional
 from app.config import get_settings
-from .base import OrderStatus, ProductCatalog
+from .base import OrderStatus, ProductCatalog, CatalogFeed, parse_timestamp
 
 
 settings = get_settings()
 
 
-class WooCommerceAdapter(OrderStatus, ProductCatalog):
+class WooCommerceAdapter(OrderStatus, ProductCatalog, CatalogFeed):
 	def __init__(self):
 		if not (settings.WOO_BASE_URL and settings.WOO_CONSUMER_KEY and settings.WOO_CONSUMER_SECRET):
 			raise RuntimeError("WooCommerce not configured")
@@ -31,4 +32,30 @@ class WooCommerceAdapter(OrderStatus, ProductCatalog):
 		return [
 			{"id": str(p.get("id")), "title": p.get("name"), "url": p.get("permalink")}
 			for p in items
-		]
\ No newline at end of file
+		]
+
+	def iter_products(self, updated_since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+		url = f"{settings.WOO_BASE_URL}/wp-json/wc/v3/products"
+		params: Dict[str, Any] = {**self._auth_params(), "per_page": 100, "page": 1, "orderby": "id", "order": "asc"}
+		if updated_since:
+			params["modified_after"] = updated_since.isoformat()
+			params["dates_are_gmt"] = "true"
+		while True:
+			r = requests.get(url, params=params, timeout=30)
+			r.raise_for_status()
+			items = r.json()
+			for p in items:
+				yield self.normalize_product(p)
+			if len(items) < params["per_page"]:
+				return
+			params["page"] += 1
+
+	def normalize_product(self, p: Dict[str, Any]) -> Dict[str, Any]:
+		return {
+			"id": str(p.get("id")),
+			"title": p.get("name") or "",
+			"description": p.get("short_description") or p.get("description") or "",
+			"url": p.get("permalink"),
+			"price": p.get("price"),
+			"updated_at": parse_timestamp(p.get("date_modified_gmt")),
+		}
@@ -1,54 +1,93 @@
 import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from langchain.agents import create_react_agent, AgentExecutor
-from langchain_core.prompts import PromptTemplate, ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
+from langchain_core.tools import BaseTool
+from app.config import on_settings_reload
+from app.services.llm import provider
 from app.services.llm.provider import get_chat_model
 from app.services.langgraph import tools as toolset
+from app.utils.tokens import count_tokens
 
-logging.basicConfig(level=logging.INFO)
 
-def _react_prompt(system_instructions: str) -> PromptTemplate:
+# Agent registry: executors are built once per model generation instead of on every turn.
+# A settings reload or model factory swap bumps `provider.generation` and they are rebuilt on next use.
+_agents: Dict[str, Tuple[int, AgentExecutor]] = {}
+_agents_lock = threading.Lock()
+
+
+def _registered(name: str, build: Callable[[], Optional[AgentExecutor]]) -> Optional[AgentExecutor]:
+	entry = _agents.get(name)
+	if entry is not None and entry[0] == provider.generation:
+		return entry[1]
+	built_for = provider.generation
+	agent = build()
+	if agent is not None and built_for == provider.generation:  # failures are retried next turn
+		with _agents_lock:
+			_agents[name] = (built_for, agent)
+	return agent
+
+
+def reset_agents():
+	with _agents_lock:
+		_agents.clear()
+
+
+on_settings_reload(reset_agents)
+
+
+# Shared by every agent and sent first, so all ReAct prompts start with the same text: providers
+# that cache prompt prefixes (OpenAI prompt caching, the KV cache of a loaded Ollama model) reuse it
+# across agents, and the agent's role and tools extend it with text that is fixed per agent. Only the
+# question and the scratchpad change between calls; they go last, in the human message.
+REACT_RULES = """Answer the customer's question. Use the tools listed below when you need information.
+
+Use exactly this format:
+Question: the question to answer
+Thought: what to do next
+Action: one tool name from the tool list
+Action Input: the tool input as plain text, without commas
+Observation: the tool result
+(Thought/Action/Action Input/Observation may repeat)
+Thought: I now know the final answer
+Final Answer: the answer to the question
+
+Rules:
+- One Action per step, then wait for its Observation.
+- Never write an Action and a Final Answer in the same step.
+- Keep each field on its own line."""
+
+TOOL_DESCRIPTION_CHARS = 120
+
+
+def render_tools(tools: Sequence[BaseTool]) -> str:
+	"""One short line per tool: name, arguments and the first sentence of its description."""
+	lines = []
+	for t in tools:
+		summary = " ".join(t.description.split())
+		summary = summary.split(". ", 1)[0].rstrip(".")
+		if len(summary) > TOOL_DESCRIPTION_CHARS:
+			summary = summary[: TOOL_DESCRIPTION_CHARS - 3].rstrip() + "..."
+		lines.append(f"- {t.name}({', '.join(t.args)}): {summary}")
+	return "\n".join(lines)
+
+
+def _react_prompt(system_instructions: str) -> ChatPromptTemplate:
 	# Must include variables: input, tools, tool_names, agent_scratchpad
-	template = f"""
-	{system_instructions}
-
-	You have access to the following tools:
-	{{tools}}
-
-	Tool names for reference:
-	{{tool_names}}
-
-	CRITICAL FORMATTING RULES:
-	- You MUST follow the EXACT format below
-	- Use EXACTLY one tool per Action step
-	- If you output an Action, DO NOT output Final Answer in the same step
-	- AFTER an Action, WAIT for an Observation before continuing
-	- Only output Final Answer when you have enough information and no further Action is needed
-	- NEVER combine multiple actions in one step
-	- ALWAYS use the exact format with proper line breaks
-	- NEVER use commas in Action Input - use separate lines
-
-	REQUIRED FORMAT:
-	Question: {{input}}
-	Thought: you should always think about what to do
-	Action: the tool to use, should be one of [{{tool_names}}]
-	Action Input: the input to the tool
-
-	Observation: the result of the action
-	... (this Thought/Action/Action Input/Observation can repeat N times)
-	Thought: I now know the final answer
-	Final Answer: the final answer to the original input question
-
-	Begin!
-	{{agent_scratchpad}}
-	"""
-	return PromptTemplate.from_template(template)
+	return ChatPromptTemplate.from_messages(
+		[
+			SystemMessagePromptTemplate.from_template(f"{REACT_RULES}\n\n{system_instructions}\n\nTools:\n{{tools}}\nTool names: {{tool_names}}"),
+			HumanMessagePromptTemplate.from_template("Question: {input}\nThought:{agent_scratchpad}"),
+		]
+	)
 
 
 def _create_agent_with_fallback(system: str, tools: list, temperature: float = 0.2):
 	"""Create agent with fallback mechanism"""
 	try:
-		model = get_chat_model(temperature=temperature)
-		agent = create_react_agent(model, tools, _react_prompt(system))
+		model = get_chat_model(temperature=temperature, task="agent")
+		agent = create_react_agent(model, tools, _react_prompt(system), tools_renderer=render_tools)
 		return AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True, max_iterations=3)
 	except Exception as e:
 		logging.error(f"Failed to create agent: {e}")
@@ -84,41 +123,72 @@ def _handover_tools():
 	]
 
 
+# name -> (role instructions, tools, temperature)
+AGENTS: Dict[str, Tuple[str, Callable[[], list], float]] = {
+	"order_status": (
+		"You are a customer service assistant for order status."
+		" Extract the order id if it is missing, then call the order status tool. Keep answers brief and polite.",
+		_order_status_tools,
+		0.0,
+	),
+	"product_reco": (
+		"You are a product recommendation assistant. Understand preferences and return 1-3 options with titles and links.",
+		_product_reco_tools,
+		0.2,
+	),
+	"general_qa": (
+		"You are a knowledgeable assistant. Translate the query to English for retrieval and answer concisely from the snippets."
+		" If nothing relevant is found, say you are not sure and suggest contacting support.",
+		_general_qa_tools,
+		0.2,
+	),
+	"handover": (
+		"You are a handover coordinator. Apologize, say that a human agent will take over, then notify support.",
+		_handover_tools,
+		0.0,
+	),
+}
+
+
+def _make(name: str) -> AgentExecutor:
+	system, tools, temperature = AGENTS[name]
+	return _registered(name, lambda: _create_agent_with_fallback(system, tools(), temperature=temperature))
+
+
 def make_order_status_agent() -> AgentExecutor:
-	system = (
-		"You are an expert customer service assistant focused on order status."
-		" Extract order id if missing, else call the order status tool."
-		" Keep answers brief and polite."
-		" IMPORTANT: Follow the exact format specified above."
-	)
-	return _create_agent_with_fallback(system, _order_status_tools(), temperature=0.0)
+	return _make("order_status")
 
 
 def make_product_reco_agent() -> AgentExecutor:
-	system = (
-		"You are a helpful product recommendation assistant."
-		" Understand preferences and return 1-3 options with titles and links."
-		" IMPORTANT: Follow the exact format specified above."
-	)
-	return _create_agent_with_fallback(system, _product_reco_tools(), temperature=0.2)
+	return _make("product_reco")
 
 
 def make_general_qa_agent() -> AgentExecutor:
-	system = (
-		"You are a knowledgeable assistant."
-		" Translate the query to English for retrieval and synthesize a concise answer from snippets."
-		" If not found, say you're not sure and suggest contacting support."
-		" IMPORTANT: Follow the exact format specified above."
-		" CRITICAL: Always use proper line breaks between Thought, Action, Action Input, and Observation."
-		" CRITICAL: Never use commas in Action Input - use separate lines or spaces."
-	)
-	return _create_agent_with_fallback(system, _general_qa_tools(), temperature=0.2)
+	return _make("general_qa")
 
 
 def make_handover_agent() -> AgentExecutor:
-	system = (
-		"You are a handover coordinator."
-		" Apologize and inform that a human agent will take over, then notify support channels."
-		" IMPORTANT: Follow the exact format specified above."
-	)
-	return _create_agent_with_fallback(system, _handover_tools(), temperature=0.0)
\ No newline at end of file
+	return _make("handover")
+
+
+def prompt_report(question: str = "Where is my order 12345?", exact: bool = True) -> List[Dict[str, Any]]:
+	"""
+	Token counts of each agent's first ReAct prompt: the part shared by all agents, the part fixed
+	per agent (role and tools) and the whole prompt. Later iterations add only their scratchpad.
+	"""
+	shared = count_tokens(REACT_RULES, exact)
+	rows = []
+	for name, (system, tools, _) in AGENTS.items():
+		tool_list = tools()
+		messages = _react_prompt(system).format_messages(
+			tools=render_tools(tool_list), tool_names=", ".join(t.name for t in tool_list), input=question, agent_scratchpad=""
+		)
+		rows.append(
+			{
+				"agent": name,
+				"shared_prefix_tokens": shared,
+				"static_tokens": count_tokens(messages[0].content, exact),
+				"total_tokens": sum(count_tokens(m.content, exact) for m in messages),
+			}
+		)
+	return rows
@@ -1,7 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 from langchain_core.exceptions import OutputParserException
+from app.config import get_settings
+from app.services.ecommerce.orders import extract_order_ids, get_order_status, is_ambiguous_order_query, render_order_status
 from app.services.llm.provider import get_chat_model
+from app.services.langgraph import tools as toolset
 from app.services.langgraph.state import GraphState
 from app.utils.sentiment import compute_sentiment
 from app.services.langgraph.policies import apply_safety_policies
@@ -12,8 +15,12 @@ from app.services.langgraph.agent_react import (
 	make_general_qa_agent,
 	make_handover_agent,
 )
+from app.utils.metrics import counter
+
+
+settings = get_settings()
+ORDER_FAST_PATH = counter("order_status_fast_path_total", "Order status turns by outcome (answered/not_found, or no_id/ambiguous/error: agent)")
 
-logging.basicConfig(level=logging.INFO)
 
 SYSTEM_PROMPT = (
 	"You are an AI customer service assistant. Default language to Indonesian for user-facing messages unless the user language is different."
@@ -32,7 +39,7 @@ def node_router(state: GraphState) -> GraphState:
 	if state.get("handoff_to_human"):
 		return {**state, "current_task": "Complaint"}
 
-	model = get_chat_model(temperature=0.0)
+	model = get_chat_model(temperature=0.0, task="router")
 	prompt = (
 		f"{SYSTEM_PROMPT}\n"
 		"Classify the user intent into one of: Order_Status, Product_Recommendation, General_Inquiry, Complaint."
@@ -44,7 +51,32 @@ def node_router(state: GraphState) -> GraphState:
 	return {**state, "current_task": current}
 
 
+def _order_status_fast_path(state: GraphState) -> Optional[GraphState]:
+	"""One order id and a plain status question: regex, one (cached) adapter call and a template, no agent."""
+	if not settings.ORDER_FAST_PATH_ENABLED:
+		return None
+	query = state.get("user_query", "")
+	ids = extract_order_ids(query)
+	if len(ids) != 1 or is_ambiguous_order_query(query):
+		ORDER_FAST_PATH.inc(outcome="ambiguous" if ids else "no_id")
+		return None
+	order_id, locale = ids[0], state.get("locale")
+	try:
+		status = get_order_status(order_id, adapter=toolset._ecom())
+	except Exception as e:
+		if getattr(getattr(e, "response", None), "status_code", None) != 404:
+			logging.warning(f"[Order Status] lookup of {order_id} failed, using the agent: {e}")
+			ORDER_FAST_PATH.inc(outcome="error")
+			return None
+		status = None
+	ORDER_FAST_PATH.inc(outcome="answered" if status else "not_found")
+	return {**state, "order_id": order_id, "assistant_response": render_order_status(order_id, status, locale)}
+
+
 def node_order_status_handler(state: GraphState) -> GraphState:
+	fast = _order_status_fast_path(state)
+	if fast is not None:
+		return fast
 	try:
 		agent = make_order_status_agent()
 		if agent is None:
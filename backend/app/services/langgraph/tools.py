@@ -1,15 +1,20 @@
 from typing import Dict, Any, List, Optional
 from langchain.tools import tool
 from app.services.ecommerce.registry import get_active_ecommerce
+from app.services.ecommerce.catalog import search_catalog
+from app.services.ecommerce.orders import extract_order_ids, get_order_status
 from app.services.rag.retriever import retrieve_knowledge
 from app.utils.sentiment import compute_sentiment
 from app.utils.lang import detect_language, translate_text
-from app.services.notifications.email_service import send_support_email
-from app.services.notifications.telegram_service import notify_support_telegram
+from app.services.notifications.outbox import request_notification
 from app.services.memory.vector_memory import add_memory, retrieve_memory
 
 
-ecom = get_active_ecommerce()
+ecom = None  # adapter override (benchmarks); otherwise the registry's active adapter
+
+
+def _ecom():
+	return ecom if ecom is not None else get_active_ecommerce()
 
 
 @tool("analyze_sentiment", return_direct=False)
@@ -22,9 +27,8 @@ def analyze_sentiment_tool(text: str) -> str:
 @tool("extract_order_id", return_direct=False)
 def extract_order_id_tool(text: str) -> str:
 	"""Extract an order id (5+ digits) from text. Return empty string if none found."""
-	import re
-	m = re.search(r"[#:]?(\d{5,})", text)
-	return m.group(1) if m else ""
+	ids = extract_order_ids(text)
+	return ids[0] if ids else ""
 
 
 @tool("get_order_status", return_direct=False)
@@ -32,45 +36,25 @@ def get_order_status_tool(order_id: str) -> Dict[str, Any]:
 	"""Get order status for a given order_id from active ecommerce provider."""
 	if not order_id:
 		return {"error": "missing_order_id"}
-	return ecom.get_order_status(order_id)
+	return get_order_status(order_id, adapter=_ecom())
 
 
 @tool("search_products", return_direct=False)
 def search_products_tool(query: str) -> Dict[str, Any]:
-	"""
-	Search products in catalog by a free-text query from active ecommerce provider.
-	
-	args:
-	query : query to search product
-	"""
-	items = ecom.search_products(query)
+	"""Search products in the catalog by a free-text query."""
+	# Served from the local catalog mirror; the live store API is only a fallback when the mirror is empty.
+	try:
+		items = search_catalog(query, adapter=_ecom())
+	except Exception:
+		items = None
+	if items is None:
+		items = _ecom().search_products(query)
 	return {"items": items}
 
 
 @tool("retrieve_kb_snippets", return_direct=False)
 def retrieve_kb_snippets_tool(query: str) -> Dict[str, Any]:
-	"""
-    Retrieve the top knowledge base snippets based on a given query.
-
-    This function processes a user query, translates it into English (if necessary), 
-    and retrieves the top relevant snippets from a knowledge base. The results are 
-    returned as a list of strings, with a maximum of five snippets per query.
-
-    Args:
-    query (str): A string containing the user's search query or question. 
-    The query may be automatically translated to English before processing 
-    if required.
-
-    Returns:
-    Dict[str, Any]: A dictionary containing the key "snippets", which maps to a list 
-    of the top 5 relevant knowledge base snippets (strings). 
-    If no relevant snippets are found, the list will be empty.
-
-    Notes:
-    - The function will return a maximum of 5 snippets per query.
-    - If no relevant snippets are found, the list will be empty.
-    - The query is translated internally into English if needed, ensuring accurate results.
-    """
+	"""Retrieve up to 5 knowledge base snippets for a question (translated to English if needed)."""
 	docs = retrieve_knowledge(query)
 	return {"snippets": [d.page_content for d in docs[:5]]}
 
@@ -108,8 +92,9 @@ def notify_email_support_tool(params: Dict[str, Any]) -> str:
 	"""Send an email to support with keys: subject, body. Returns 'ok' even if SMTP not configured."""
 	subject = params.get("subject", "AI-CS Handover Needed")
 	body = params.get("body", "")
+	# Queued via the outbox: delivered in the background, once per handover turn.
 	try:
-		send_support_email(subject=subject, body=body)
+		request_notification("email", subject=subject, body=body)
 		return "ok"
 	except Exception:
 		return "ok"
@@ -119,7 +104,7 @@ def notify_email_support_tool(params: Dict[str, Any]) -> str:
 def notify_telegram_support_tool(text: str) -> str:
 	"""Send a Telegram message to support chat with the given text. Returns 'ok' even if token not configured."""
 	try:
-		notify_support_telegram(text)
+		request_notification("telegram", body=text)
 		return "ok"
 	except Exception:
 		return "ok"
\ No newline at end of file
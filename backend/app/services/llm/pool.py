@@ -0,0 +1,258 @@
+"""
+Chat model pool: one client per (provider, model, temperature, limits), reused across calls, behind
+an ordered failover chain. Each provider has a concurrency limit and each of its models a circuit
+breaker; a call goes to the first route that is neither open nor saturated and fails over to the
+next one on error.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from app.utils.metrics import counter, gauge
+
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_CALLS = counter("llm_provider_calls_total", "Chat model calls per provider by result (ok/error/open/busy)")
+PROVIDER_IN_FLIGHT = gauge("llm_provider_in_flight", "Chat model requests in flight per provider")
+BREAKER_OPEN = gauge("llm_provider_breaker_open", "1 while the circuit breaker of a provider model is open")
+
+
+class ProviderUnavailable(RuntimeError):
+	"""No provider in the chain could take the call (all open, saturated or failing)."""
+
+
+class CircuitBreaker:
+	"""
+	Opens after `failures` consecutive errors and rejects calls for `reset_seconds`; then lets one
+	trial call through (half-open) and closes again if it succeeds.
+	"""
+
+	def __init__(self, failures: int = 5, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+		self.failures = max(1, failures)
+		self.reset_seconds = reset_seconds
+		self._clock = clock
+		self._errors = 0
+		self._opened_at: Optional[float] = None
+		self._trial = False
+		self._lock = threading.Lock()
+
+	@property
+	def state(self) -> str:
+		if self._opened_at is None:
+			return "closed"
+		return "half_open" if self._clock() - self._opened_at >= self.reset_seconds else "open"
+
+	def allow(self) -> bool:
+		with self._lock:
+			state = self.state
+			if state == "closed":
+				return True
+			if state == "half_open" and not self._trial:
+				self._trial = True
+				return True
+			return False
+
+	def record_success(self):
+		with self._lock:
+			self._errors, self._opened_at, self._trial = 0, None, False
+
+	def cancel_trial(self):
+		"""The call allowed as the half-open trial never ran; let the next one try."""
+		with self._lock:
+			self._trial = False
+
+	def record_failure(self):
+		with self._lock:
+			self._errors += 1
+			if self._trial or self._errors >= self.failures:
+				self._opened_at, self._trial = self._clock(), False
+
+
+class ModelSpec(NamedTuple):
+	"""What a provider client is built for; clients are pooled per spec."""
+
+	provider: str
+	model: str
+	temperature: float
+	max_tokens: Optional[int] = None
+	timeout: Optional[float] = None
+
+
+class ProviderSlot:
+	"""Concurrency limit shared by every model of one provider."""
+
+	def __init__(self, name: str, max_concurrency: int, acquire_timeout: float):
+		self.name = name
+		self.acquire_timeout = acquire_timeout
+		self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+
+	def acquire(self) -> bool:
+		if not self._semaphore.acquire(timeout=self.acquire_timeout):
+			return False
+		PROVIDER_IN_FLIGHT.inc(provider=self.name)
+		return True
+
+	def release(self):
+		self._semaphore.release()
+		PROVIDER_IN_FLIGHT.dec(provider=self.name)
+
+
+class Route:
+	"""One step of a failover chain: a pooled client behind its provider's slot and its own breaker."""
+
+	def __init__(self, spec: ModelSpec, client: Any, slot: ProviderSlot, breaker: CircuitBreaker):
+		self.spec = spec
+		self.client = client
+		self.slot = slot
+		self.breaker = breaker
+		self.name = f"{spec.provider}/{spec.model}" if spec.model else spec.provider
+
+	def acquire(self) -> Optional[str]:
+		"""None when the call may proceed, else why the route was skipped."""
+		if not self.breaker.allow():
+			return "open"
+		if not self.slot.acquire():
+			self.breaker.cancel_trial()  # a half-open trial that did not run would keep the breaker shut
+			return "busy"
+		return None
+
+	def release(self, ok: bool):
+		self.slot.release()
+		if ok:
+			self.breaker.record_success()
+		else:
+			self.breaker.record_failure()
+		BREAKER_OPEN.set(1 if self.breaker.state == "open" else 0, provider=self.spec.provider, model=self.spec.model)
+		PROVIDER_CALLS.inc(provider=self.spec.provider, result="ok" if ok else "error")
+
+
+class PooledChatModel(BaseChatModel):
+	"""Chat model that runs each call on the first available route of `chain`, failing over on errors."""
+
+	chain: List[Any]  # Route, in priority order
+
+	@property
+	def _llm_type(self) -> str:
+		return "pooled"
+
+	def _candidates(self) -> Iterator[Route]:
+		for route in self.chain:
+			skipped = route.acquire()
+			if skipped:
+				PROVIDER_CALLS.inc(provider=route.spec.provider, result=skipped)
+				continue
+			yield route
+
+	def _unavailable(self, error: Optional[Exception]) -> Exception:
+		names = ", ".join(route.name for route in self.chain)
+		return ProviderUnavailable(f"no chat model provider available ({names})" + (f": {error}" if error else ""))
+
+	def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+		error: Optional[Exception] = None
+		for route in self._candidates():
+			try:
+				result = route.client._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+			except Exception as e:
+				route.release(ok=False)
+				logger.warning("chat model %s failed, trying the next one: %s", route.name, e)
+				error = e
+				continue
+			route.release(ok=True)
+			return result
+		raise self._unavailable(error) from error
+
+	def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+		error: Optional[Exception] = None
+		for route in self._candidates():
+			started = finished = failed = False
+			try:
+				for chunk in route.client._stream(messages, stop=stop, **kwargs):
+					started = True
+					yield chunk
+				finished = True
+			except Exception as e:
+				failed = True
+				if started:  # part of the answer is already out; a second provider would repeat it
+					raise
+				logger.warning("chat model %s failed, trying the next one: %s", route.name, e)
+				error = e
+				continue
+			finally:
+				# also on GeneratorExit (stream closed early or abandoned): the slot is always given back,
+				# and a stream that was already delivering counts as a success
+				route.release(ok=not failed and (finished or started))
+			return
+		raise self._unavailable(error) from error
+
+
+class ModelPool:
+	"""
+	Clients per `ModelSpec`, one `ProviderSlot` (concurrency limit) per provider and one circuit
+	breaker per (provider, model), so a model that is missing or deprecated does not take its
+	provider's other models down with it. `builders` map a provider name to `build(spec) -> chat model`.
+	"""
+
+	def __init__(
+		self,
+		builders: Dict[str, Callable[[ModelSpec], Any]],
+		limits: Dict[str, int],
+		breaker_failures: int = 5,
+		breaker_reset_seconds: float = 30.0,
+		acquire_timeout: float = 2.0,
+		default_limit: int = 16,
+	):
+		self.builders = builders
+		self.limits = limits
+		self.breaker_failures = breaker_failures
+		self.breaker_reset_seconds = breaker_reset_seconds
+		self.acquire_timeout = acquire_timeout
+		self.default_limit = default_limit
+		self._clients: Dict[ModelSpec, Any] = {}
+		self._slots: Dict[str, ProviderSlot] = {}
+		self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+		self._lock = threading.Lock()
+
+	def slot(self, provider: str) -> ProviderSlot:
+		with self._lock:
+			slot = self._slots.get(provider)
+			if slot is None:
+				slot = self._slots[provider] = ProviderSlot(provider, self.limits.get(provider, self.default_limit), self.acquire_timeout)
+			return slot
+
+	def breaker(self, provider: str, model: str) -> CircuitBreaker:
+		with self._lock:
+			breaker = self._breakers.get((provider, model))
+			if breaker is None:
+				breaker = self._breakers[(provider, model)] = CircuitBreaker(self.breaker_failures, self.breaker_reset_seconds)
+			return breaker
+
+	def client(self, spec: ModelSpec) -> Any:
+		client = self._clients.get(spec)
+		if client is None:
+			client = self.builders[spec.provider](spec)
+			with self._lock:
+				client = self._clients.setdefault(spec, client)
+		return client
+
+	def chat_model(self, specs: List[ModelSpec]) -> PooledChatModel:
+		unknown = sorted({spec.provider for spec in specs if spec.provider not in self.builders})
+		if unknown:
+			raise ValueError(f"unknown chat model provider(s): {', '.join(unknown)}")
+		chain, error = [], None
+		for spec in dict.fromkeys(specs):  # same spec twice in a chain adds nothing
+			try:
+				chain.append(Route(spec, self.client(spec), self.slot(spec.provider), self.breaker(spec.provider, spec.model)))
+			except Exception as e:  # e.g. missing API key or SDK: leave it out of the chain
+				logger.warning("chat model %s/%s unavailable: %s", spec.provider, spec.model, e)
+				error = e
+		if not chain:
+			names = ", ".join(spec.provider for spec in specs)
+			raise ProviderUnavailable(f"no chat model provider could be built ({names}): {error}")
+		return PooledChatModel(chain=chain)
@@ -1,33 +1,230 @@
-from typing import Optional
-from app.config import get_settings
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config import ModelProfile, get_settings, on_settings_reload
+from app.services.llm.pool import ModelPool, ModelSpec
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings  # type: ignore
-from langchain_ollama import ChatOllama, OllamaEmbeddings
-from langchain_groq import ChatGroq
+# Provider SDKs (langchain_openai, langchain_ollama, langchain_groq) are imported on first use:
+# they dominate import time and a process only needs the ones in its provider chain.
 
 
 _settings = get_settings()
+_chat_model_factory: Optional[Callable[..., Any]] = None
+_embedding_model_factory: Optional[Callable[[], Any]] = None
 
+# Models are built once per configuration and shared (they hold no per-call state). `generation`
+# changes whenever they are dropped, so dependants holding models (agents) know to rebuild.
+_chat_models: Dict[Tuple[Optional[str], float], Any] = {}
+_embedding_model: Any = None
+_pool: Optional[ModelPool] = None
+_http_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+generation = 0
 
-def get_chat_model(temperature: float = 0.2):
-	"""Return a chat model: OpenAI if OPENAI_API_KEY exists, else Ollama (default)."""
-	if _settings.OPENAI_API_KEY:
-		return ChatOpenAI(model=_settings.OPENAI_MODEL, temperature=temperature)
-	elif _settings.GROQ_API_KEY:
-		return ChatGroq(
-				api_key=_settings.GROQ_API_KEY,
-				model="moonshotai/kimi-k2-instruct",
-				temperature=0,
-				max_tokens=None,
-				timeout=None,
-				max_retries=2)
-	return ChatOllama(base_url=_settings.OLLAMA_BASE_URL, model=_settings.OLLAMA_MODEL, temperature=temperature)
+PROVIDER_FIELDS = ("OPENAI_", "OLLAMA_", "GROQ_", "LLM_")
+
+# task -> settings field of its ModelProfile; other tasks (and None) use the LLM_PROVIDERS chain as is
+TASK_PROFILES = {
+	"router": "LLM_ROUTER_PROFILE",
+	"translator": "LLM_TRANSLATOR_PROFILE",
+	"summarizer": "LLM_SUMMARIZER_PROFILE",
+	"agent": "LLM_AGENT_PROFILE",
+}
+
+
+def reset_models():
+	"""Drop the cached models, clients and breakers; the next call builds them from the current settings."""
+	global _embedding_model, _pool, generation
+	with _lock:
+		_chat_models.clear()
+		_embedding_model = None
+		_pool = None
+		_http_clients.clear()  # in-flight calls keep their client; it is closed when collected
+		generation += 1
+
+
+on_settings_reload(reset_models, *PROVIDER_FIELDS)
+
+
+def _http_client(provider: str):
+	"""Keep-alive connection pool shared by every model of an HTTP provider."""
+	client = _http_clients.get(provider)
+	if client is None:
+		import httpx
+
+		limits = httpx.Limits(max_connections=_settings.LLM_HTTP_MAX_CONNECTIONS, max_keepalive_connections=_settings.LLM_HTTP_MAX_CONNECTIONS)
+		client = _http_clients.setdefault(provider, httpx.Client(limits=limits, timeout=_settings.LLM_TIMEOUT_SECONDS))
+	return client
+
+
+def _timeout(spec: ModelSpec) -> float:
+	return spec.timeout or _settings.LLM_TIMEOUT_SECONDS
+
+
+def _openai(spec: ModelSpec):
+	from langchain_openai import ChatOpenAI  # type: ignore
+
+	return ChatOpenAI(
+		model=spec.model,
+		temperature=spec.temperature,
+		max_tokens=spec.max_tokens,
+		timeout=_timeout(spec),
+		max_retries=_settings.LLM_MAX_RETRIES,
+		http_client=_http_client("openai"),
+	)
+
+
+def _groq(spec: ModelSpec):
+	from langchain_groq import ChatGroq
+
+	return ChatGroq(
+		api_key=_settings.GROQ_API_KEY,
+		model=spec.model,
+		temperature=spec.temperature,
+		max_tokens=spec.max_tokens,
+		timeout=_timeout(spec),
+		max_retries=_settings.LLM_MAX_RETRIES,
+		http_client=_http_client("groq"),
+	)
+
+
+def _ollama(spec: ModelSpec):
+	from langchain_ollama import ChatOllama
+
+	# the ollama client keeps its own keep-alive connections per model instance
+	return ChatOllama(
+		base_url=_settings.OLLAMA_BASE_URL,
+		model=spec.model,
+		temperature=spec.temperature,
+		num_predict=spec.max_tokens,
+		keep_alive=_settings.OLLAMA_KEEP_ALIVE,
+		client_kwargs={"timeout": _timeout(spec)},
+	)
+
+
+# name -> build(spec); register_provider adds more (self-hosted gateways, test fakes)
+PROVIDERS: Dict[str, Callable[[ModelSpec], Any]] = {"openai": _openai, "groq": _groq, "ollama": _ollama}
+
+
+def register_provider(name: str, build: Callable[[ModelSpec], Any]):
+	PROVIDERS[name] = build
+	reset_models()
+
+
+def provider_chain() -> List[Tuple[str, int]]:
+	"""(provider, max in-flight requests) in failover order, from LLM_PROVIDERS or the configured keys."""
+	if _settings.LLM_PROVIDERS:
+		chain = []
+		for item in _settings.LLM_PROVIDERS.split(","):
+			name, _, limit = item.strip().partition(":")
+			if name:
+				chain.append((name.lower(), int(limit) if limit else _settings.LLM_MAX_CONCURRENCY))
+		return chain
+	names = [name for name, key in (("openai", _settings.OPENAI_API_KEY), ("groq", _settings.GROQ_API_KEY)) if key]
+	return [(name, _settings.LLM_MAX_CONCURRENCY) for name in names or ["ollama"]]
+
+
+def default_model(provider: str) -> str:
+	return {"openai": _settings.OPENAI_MODEL, "groq": _settings.GROQ_MODEL, "ollama": _settings.OLLAMA_MODEL}.get(provider, "")
+
+
+def task_profile(task: Optional[str]) -> ModelProfile:
+	field = TASK_PROFILES.get(task or "")
+	return getattr(_settings, field) if field else ModelProfile()
+
+
+def model_specs(profile: ModelProfile, temperature: float) -> List[ModelSpec]:
+	"""The failover chain a profile resolves to ("*" expands to LLM_PROVIDERS with their default models)."""
+	if profile.temperature is not None:
+		temperature = profile.temperature
+	specs = []
+	for entry in (e.strip() for e in profile.providers.split(",")):
+		if entry == "*":
+			names = [(name, "") for name, _ in provider_chain()]
+		elif entry:
+			name, _, model = entry.partition("/")
+			names = [(name.strip().lower(), model.strip())]
+		else:
+			continue
+		for name, model in names:
+			specs.append(ModelSpec(name, model or default_model(name), temperature, profile.max_tokens, profile.timeout))
+	return specs
+
+
+def _get_pool() -> ModelPool:
+	global _pool
+	pool = _pool
+	if pool is None:
+		with _lock:
+			if _pool is None:
+				_pool = ModelPool(
+					PROVIDERS,
+					limits=dict(provider_chain()),
+					breaker_failures=_settings.LLM_BREAKER_FAILURES,
+					breaker_reset_seconds=_settings.LLM_BREAKER_RESET_SECONDS,
+					acquire_timeout=_settings.LLM_ACQUIRE_TIMEOUT_SECONDS,
+					default_limit=_settings.LLM_MAX_CONCURRENCY,
+				)
+			pool = _pool
+	return pool
+
+
+def set_model_factories(chat: Optional[Callable[..., Any]] = None, embeddings: Optional[Callable[[], Any]] = None):
+	"""
+	Override model construction (offline benchmarks, tests): `chat(temperature=..., task=...)`.
+	Call with no arguments to restore the providers.
+	"""
+	global _chat_model_factory, _embedding_model_factory
+	_chat_model_factory = chat
+	_embedding_model_factory = embeddings
+	reset_models()
+
+
+def get_chat_model(temperature: float = 0.2, task: Optional[str] = None):
+	"""
+	Return a chat model for `task` (router, translator, summarizer, agent: see TASK_PROFILES) on its
+	failover chain: pooled clients, per-provider limits and breakers. The profile's temperature wins.
+	"""
+	key = (task, temperature)
+	model = _chat_models.get(key)
+	if model is None:
+		built_for = generation
+		model = _build_chat_model(temperature, task)
+		with _lock:
+			if generation == built_for:  # not reset while building
+				model = _chat_models.setdefault(key, model)
+	return model
 
 
 def get_embedding_model():
 	"""Return embedding model aligned with selected provider."""
+	global _embedding_model
+	model = _embedding_model
+	if model is None:
+		built_for = generation
+		model = _build_embedding_model()
+		with _lock:
+			if generation == built_for:
+				_embedding_model = _embedding_model or model
+				model = _embedding_model
+	return model
+
+
+def _build_chat_model(temperature: float, task: Optional[str]):
+	profile = task_profile(task)
+	if _chat_model_factory is not None:
+		return _chat_model_factory(temperature=temperature if profile.temperature is None else profile.temperature, task=task)
+	return _get_pool().chat_model(model_specs(profile, temperature))
+
+
+def _build_embedding_model():
+	if _embedding_model_factory is not None:
+		return _embedding_model_factory()
 	if _settings.OPENAI_API_KEY:
+		from langchain_openai import OpenAIEmbeddings  # type: ignore
+
 		return OpenAIEmbeddings()
 	if _settings.OLLAMA_BASE_URL:
+		from langchain_ollama import OllamaEmbeddings
+
 		return OllamaEmbeddings(base_url=_settings.OLLAMA_BASE_URL, model=_settings.OLLAMA_EMBED_MODEL)
 	raise RuntimeError("No embedding provider configured. Set OPENAI_API_KEY or OLLAMA_BASE_URL")
\ No newline at end of file
@@ -1,54 +1,93 @@
-from typing import List
-from langchain.schema import Document
-from app.services.llm.provider import get_embedding_model
-from app.config import get_settings
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.documents import Document
+from app.config import get_settings, on_settings_reload
 from app.utils.lang import detect_language, translate_text
-
-try:
-	from langchain_postgres import PGVector
-except Exception:
-	PGVector = None  # type: ignore
+from app.services.vectorstores.registry import STORE_FIELDS, get_vector_store
 
 
 _settings = get_settings()
-_memstore = None
-
-
-def _get_memstore():
-	global _memstore
-	if _memstore is not None:
-		return _memstore
-	if PGVector is None:
-		return None
-	if not _settings.DATABASE_URL:
-		return None
-	embeddings = get_embedding_model()
-	_memstore = PGVector(
-		embeddings,
-		connection=_settings.DATABASE_URL,
-		collection_name=f"{_settings.DB_SCHEMA}_memory",
-	)
-	return _memstore
+_memstores: Dict[str, Any] = {}
+on_settings_reload(_memstores.clear, *STORE_FIELDS)
+
+
+def memory_collection(ts: Optional[float] = None) -> str:
+	"""Collection a memory written at `ts` goes to: `{DB_SCHEMA}_memory`, or `..._memory_YYYYMM` per month."""
+	base = f"{_settings.DB_SCHEMA}_memory"
+	if not _settings.MEMORY_MONTHLY_COLLECTIONS:
+		return base
+	return f"{base}_{time.strftime('%Y%m', time.gmtime(ts))}"
+
+
+def collection_month(name: str) -> Optional[int]:
+	"""YYYYMM of a monthly memory collection, None for the unpartitioned one."""
+	suffix = name[len(f"{_settings.DB_SCHEMA}_memory_"):]
+	return int(suffix) if name.startswith(f"{_settings.DB_SCHEMA}_memory_") and len(suffix) == 6 and suffix.isdigit() else None
+
+
+def recent_collections(months: Optional[int] = None) -> List[str]:
+	"""Collections searched by `retrieve_memory`, newest month first (the only one when not partitioned)."""
+	if not _settings.MEMORY_MONTHLY_COLLECTIONS:
+		return [memory_collection()]
+	months = _settings.MEMORY_LOOKBACK_MONTHS if months is None else months
+	now = time.gmtime()
+	names = []
+	for back in range(max(1, months)):
+		index = now.tm_year * 12 + now.tm_mon - 1 - back
+		names.append(f"{_settings.DB_SCHEMA}_memory_{index // 12}{index % 12 + 1:02d}")
+	return names
+
+
+def _get_memstore(collection: Optional[str] = None):
+	name = collection or memory_collection()
+	vs = _memstores.get(name)
+	if vs is None:
+		vs = get_vector_store(name)
+		if vs is not None:
+			_memstores[name] = vs
+	return vs
+
+
+def forget_memstore(collection: str):
+	_memstores.pop(collection, None)
 
 
 def add_memory(session_id: str, role: str, content: str):
 	vs = _get_memstore()
 	if vs is None or not content:
 		return
-	doc = Document(page_content=content, metadata={"session_id": session_id, "role": role})
+	doc = Document(page_content=content, metadata={"session_id": session_id, "role": role, "ts": int(time.time())})
 	vs.add_documents([doc])
 
 
 def retrieve_memory(session_id: str, query_text: str, k: int = 4) -> List[Document]:
-	vs = _get_memstore()
+	names = recent_collections()
+	if len(names) > 1:
+		return _retrieve_across(names, session_id, query_text, k)
+	vs = _get_memstore(names[0])
 	if vs is None or not query_text:
 		return []
-	lang = detect_language(query_text)
-	q = query_text if lang == "en" else translate_text(query_text, "en")
+	q = _english(query_text)
 	retriever = vs.as_retriever(search_kwargs={"k": k, "filter": {"session_id": {"$eq": session_id}}})
 	try:
 		return retriever.invoke(q)
 	except Exception:
 		# Fallback without filter if backend doesn't support it
 		docs = retriever.get_relevant_documents(q)
-		return [d for d in docs if d.metadata.get("session_id") == session_id][:k]
\ No newline at end of file
+		return [d for d in docs if d.metadata.get("session_id") == session_id][:k]
+
+
+def _english(text: str) -> str:
+	return text if detect_language(text) == "en" else translate_text(text, "en")
+
+
+def _retrieve_across(names: List[str], session_id: str, query_text: str, k: int) -> List[Document]:
+	"""One search per recent monthly collection, merged by distance."""
+	stores = [vs for vs in (_get_memstore(name) for name in names) if vs is not None]
+	if not stores or not query_text:
+		return []
+	q = _english(query_text)
+	scored = []
+	for vs in stores:
+		scored.extend(vs.similarity_search_with_score(q, k=k, filter={"session_id": {"$eq": session_id}}))
+	return [doc for doc, _ in sorted(scored, key=lambda pair: pair[1])[:k]]
@@ -15,7 +15,9 @@ def region_check(request: Request):
 	return
 
 
-def request_pii_deletion(user_id: Optional[str]) -> bool:
-	# Hook to trigger PII deletion workflow in DB and integrated systems.
-	# Return True if scheduled. Implement actual deletion with audit log and TTL policies.
-	return True
\ No newline at end of file
+def request_pii_deletion(session_id: Optional[str]) -> bool:
+	# Erase the session's memory vectors, messages, sensitive data and conversation in the background.
+	# Return True if scheduled.
+	from app.services.retention import schedule_erasure
+
+	return schedule_erasure(session_id or "")
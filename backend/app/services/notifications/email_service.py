@@ -1,20 +1,92 @@
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
+from typing import Callable, Optional
 from app.config import get_settings
 
 
 settings = get_settings()
 
 
-def send_support_email(subject: str, body: str):
-	if not (settings.SMTP_HOST and settings.SMTP_USER and settings.SMTP_PASSWORD and settings.SUPPORT_EMAIL_TO):
-		return
+def email_configured() -> bool:
+	return bool(settings.SMTP_HOST and settings.SUPPORT_EMAIL_TO)
+
+
+def _build_message(subject: str, body: str) -> MIMEText:
 	msg = MIMEText(body)
 	msg["Subject"] = subject
 	msg["From"] = settings.SUPPORT_EMAIL_FROM
 	msg["To"] = settings.SUPPORT_EMAIL_TO
+	return msg
+
+
+class SupportMailer:
+	"""Keeps one SMTP session (STARTTLS + login done once) and reuses it across messages."""
+
+	def __init__(self, smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP, idle_seconds: Optional[int] = None):
+		self._smtp_factory = smtp_factory
+		self._idle_seconds = settings.SMTP_IDLE_SECONDS if idle_seconds is None else idle_seconds
+		self._server: Optional[smtplib.SMTP] = None
+		self._last_used = 0.0
+		self._lock = threading.Lock()
+
+	def _connect(self) -> smtplib.SMTP:
+		server = self._smtp_factory(settings.SMTP_HOST, settings.SMTP_PORT, timeout=20)
+		if settings.SMTP_STARTTLS:
+			server.starttls()
+		if settings.SMTP_USER and settings.SMTP_PASSWORD:
+			server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+		return server
+
+	def _session(self) -> smtplib.SMTP:
+		if self._server is not None:
+			stale = time.monotonic() - self._last_used > self._idle_seconds
+			if stale or not self._alive():
+				self.close()
+		if self._server is None:
+			self._server = self._connect()
+		return self._server
+
+	def _alive(self) -> bool:
+		try:
+			return self._server is not None and self._server.noop()[0] == 250
+		except smtplib.SMTPException:
+			return False
+		except OSError:
+			return False
 
-	with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-		server.starttls()
-		server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-		server.sendmail(settings.SUPPORT_EMAIL_FROM, [settings.SUPPORT_EMAIL_TO], msg.as_string())
\ No newline at end of file
+	def send(self, subject: str, body: str):
+		with self._lock:
+			try:
+				self._session().sendmail(settings.SUPPORT_EMAIL_FROM, [settings.SUPPORT_EMAIL_TO], _build_message(subject, body).as_string())
+			except (smtplib.SMTPServerDisconnected, OSError):
+				# Server dropped the idle session; retry once on a fresh connection.
+				self.close()
+				self._session().sendmail(settings.SUPPORT_EMAIL_FROM, [settings.SUPPORT_EMAIL_TO], _build_message(subject, body).as_string())
+			self._last_used = time.monotonic()
+
+	def close(self):
+		if self._server is None:
+			return
+		try:
+			self._server.quit()
+		except Exception:
+			pass
+		self._server = None
+
+
+_mailer: Optional[SupportMailer] = None
+
+
+def get_mailer() -> SupportMailer:
+	global _mailer
+	if _mailer is None:
+		_mailer = SupportMailer()
+	return _mailer
+
+
+def send_support_email(subject: str, body: str):
+	if not email_configured():
+		return
+	get_mailer().send(subject, body)
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from app.config import get_settings
+from app.persistence.db import get_db
+from app.persistence.models import NotificationOutbox
+from app.persistence.repositories import ConversationRepository, OutboxRepository
+from app.services.notifications.email_service import SupportMailer, email_configured, get_mailer
+from app.services.notifications.telegram_service import notify_support_telegram, telegram_configured
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HANDOVER_SUBJECT = "AI-CS Handover Needed"
+_MAX_BACKOFF_SECONDS = 3600
+_ADHOC_DEDUPE_MINUTES = 10  # identical ad-hoc notifications within this window are sent once
+
+# (conversation, turn) being processed on this thread, so agent tools dedupe against the pipeline's own
+# handover rows for the same turn; a later handover in the same conversation is a new event.
+_current_turn: ContextVar[Optional[Tuple[int, str]]] = ContextVar("outbox_turn", default=None)
+
+
+@contextmanager
+def handover_scope(conversation_id: int, turn_id: Optional[str] = None):
+	token = _current_turn.set((conversation_id, turn_id or uuid4().hex))
+	try:
+		yield
+	finally:
+		_current_turn.reset(token)
+
+
+def configured_channels() -> List[str]:
+	channels = []
+	if email_configured():
+		channels.append("email")
+	if telegram_configured():
+		channels.append("telegram")
+	return channels
+
+
+def handover_notifications(conversation_id: int, subject: str = HANDOVER_SUBJECT, turn_id: Optional[str] = None) -> List[Dict[str, Any]]:
+	"""
+	Outbox rows for a handover: one per configured channel, at most once per turn of a conversation
+	(`turn_id`, else the current handover_scope's turn, else a new event).
+	"""
+	if turn_id is None:
+		scope = _current_turn.get()
+		turn_id = scope[1] if scope is not None and scope[0] == conversation_id else uuid4().hex
+	return [
+		{"channel": ch, "dedupe_key": f"handover:{conversation_id}:{turn_id}:{ch}", "conversation_id": conversation_id, "subject": subject, "body": None}
+		for ch in configured_channels()
+	]
+
+
+def request_notification(channel: str, subject: Optional[str] = None, body: str = "") -> bool:
+	"""Queue a support notification from inside an agent tool. Returns False if the channel is not configured."""
+	if channel not in configured_channels():
+		return False
+	scope = _current_turn.get()
+	if scope is not None:
+		cid, turn_id = scope
+		rows = [r for r in handover_notifications(cid, subject or HANDOVER_SUBJECT, turn_id) if r["channel"] == channel]
+	else:
+		digest = hashlib.sha1(f"{subject}\n{body}".encode()).hexdigest()
+		window = int(datetime.utcnow().timestamp() // (_ADHOC_DEDUPE_MINUTES * 60))
+		rows = [{"channel": channel, "dedupe_key": f"adhoc:{channel}:{digest}:{window}", "subject": subject or HANDOVER_SUBJECT, "body": body}]
+	OutboxRepository().add(rows)
+	return True
+
+
+def _backoff(attempts: int) -> timedelta:
+	return timedelta(seconds=min(settings.OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)), _MAX_BACKOFF_SECONDS))
+
+
+class OutboxDispatcher:
+	"""Drains the outbox in batches: one SMTP session per batch, exponential backoff, terminal 'failed' state."""
+
+	def __init__(self, mailer: Optional[SupportMailer] = None, batch_size: Optional[int] = None, max_attempts: Optional[int] = None):
+		self.mailer = mailer or get_mailer()
+		self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+		self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+		self._repo = ConversationRepository()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def run_once(self) -> Dict[str, int]:
+		stats = {"sent": 0, "retried": 0, "failed": 0}
+		with next(get_db()) as db:  # type: ignore
+			rows = OutboxRepository.claim_due(db, self.batch_size)
+			# Group by channel so all emails of a batch go over the same SMTP session.
+			for row in sorted(rows, key=lambda r: r.channel):
+				try:
+					self._deliver(row)
+				except Exception as e:
+					row.attempts += 1
+					row.last_error = str(e)[:1000]
+					if row.attempts >= self.max_attempts:
+						row.status = "failed"
+						stats["failed"] += 1
+					else:
+						row.next_attempt_at = datetime.utcnow() + _backoff(row.attempts)
+						stats["retried"] += 1
+					logger.warning("outbox %s #%s attempt %s failed: %s", row.channel, row.id, row.attempts, e)
+					continue
+				row.attempts += 1
+				row.status = "sent"
+				row.sent_at = datetime.utcnow()
+				stats["sent"] += 1
+			db.commit()
+		return stats
+
+	def _deliver(self, row: NotificationOutbox):
+		body = row.body
+		if body is None and row.conversation_id is not None:
+			body = self._repo.get_transcript(row.conversation_id)
+		body = body or ""
+		if row.channel == "email":
+			self.mailer.send(row.subject or HANDOVER_SUBJECT, body)
+		elif row.channel == "telegram":
+			notify_support_telegram(f"{row.subject}\n\n{body}" if row.subject else body)
+		else:
+			raise ValueError(f"unknown outbox channel: {row.channel}")
+
+	def start(self):
+		if self._thread and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		self._stop.set()
+		self.mailer.close()
+
+	def _run(self):
+		while not self._stop.is_set():
+			try:
+				stats = self.run_once()
+				if stats["sent"] or stats["retried"] or stats["failed"]:
+					logger.info("outbox dispatch: %s", stats)
+			except Exception as e:
+				logger.error("outbox dispatch failed: %s", e)
+			self._stop.wait(settings.OUTBOX_POLL_SECONDS)
+
+
+_dispatcher: Optional[OutboxDispatcher] = None
+
+
+def start_outbox_dispatcher() -> Optional[OutboxDispatcher]:
+	global _dispatcher
+	if not settings.OUTBOX_ENABLED:
+		return None
+	if _dispatcher is None:
+		_dispatcher = OutboxDispatcher()
+	_dispatcher.start()
+	return _dispatcher
+
+
+def stop_outbox_dispatcher():
+	if _dispatcher is not None:
+		_dispatcher.stop()
@@ -3,11 +3,17 @@ from app.config import get_settings
 
 
 settings = get_settings()
+_session = requests.Session()  # keep-alive to api.telegram.org across notifications
+
+
+def telegram_configured() -> bool:
+	return bool(settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_SUPPORT_CHAT_ID)
 
 
 def notify_support_telegram(text: str):
-	if not (settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_SUPPORT_CHAT_ID):
+	if not telegram_configured():
 		return
 	url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-	payload = {"chat_id": settings.TELEGRAM_SUPPORT_CHAT_ID, "text": text}
-	requests.post(url, json=payload, timeout=15)
\ No newline at end of file
+	payload = {"chat_id": settings.TELEGRAM_SUPPORT_CHAT_ID, "text": text[:4096]}
+	r = _session.post(url, json=payload, timeout=15)
+	r.raise_for_status()
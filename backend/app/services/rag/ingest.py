@@ -1,26 +1,14 @@
 from typing import List
-from langchain.schema import Document
-from app.services.llm.provider import get_embedding_model
+from langchain_core.documents import Document
 from app.config import get_settings
-
-try:
-	from langchain_postgres import PGVector
-except Exception:
-	PGVector = None  # type: ignore
+from app.services.vectorstores.registry import get_vector_store
 
 
 _settings = get_settings()
 
 
 def ingest_documents(docs: List[Document]):
-	if PGVector is None:
-		raise RuntimeError("langchain-postgres is not installed or DB not configured")
-	if not _settings.DATABASE_URL:
-		raise RuntimeError("DATABASE_URL not configured")
-	embeddings = get_embedding_model()
-	vs = PGVector(
-		embeddings,
-		connection=_settings.DATABASE_URL,
-		collection_name=f"{_settings.DB_SCHEMA}",
-	)
+	vs = get_vector_store(f"{_settings.DB_SCHEMA}")
+	if vs is None:
+		raise RuntimeError("Vector store not available: langchain-postgres missing or DATABASE_URL not configured")
 	vs.add_documents(docs)
\ No newline at end of file
@@ -1,38 +1,35 @@
 import logging
 from typing import List
-from langchain.schema import Document
+from langchain_core.documents import Document
 from app.services.llm.provider import get_embedding_model
-from app.config import get_settings
+from app.config import get_settings, on_settings_reload
 from app.utils.lang import detect_language, translate_text
-from langchain_postgres import PGVector
+from app.services.vectorstores.registry import STORE_FIELDS, get_vector_store
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 _settings = get_settings()
 _vectorstore = None
 
+def _reset_vectorstore():
+    global _vectorstore
+    _vectorstore = None
+
+on_settings_reload(_reset_vectorstore, *STORE_FIELDS)
+
 def _get_vectorstore():
     global _vectorstore
     if _vectorstore is not None:
         logger.debug("Returning existing vectorstore.")
         return _vectorstore
-    if PGVector is None:
-        logger.error("PGVector is not available.")
-        return None
-    if not _settings.DATABASE_URL:
-        logger.error("Database URL is not set in settings.")
-        return None
-    
+
     logger.info("Initializing new vectorstore...")
     try:
-        _embeddings = get_embedding_model()
-        _vectorstore = PGVector(
-            _embeddings,
-            connection=_settings.DATABASE_URL,
-            collection_name=f"{_settings.DB_SCHEMA}",
-        )
+        _vectorstore = get_vector_store(f"{_settings.DB_SCHEMA}")
+        if _vectorstore is None:
+            logger.error("Vector store backend is not available (check VECTOR_BACKEND / DATABASE_URL).")
+            return None
         logger.info("Vectorstore initialized successfully.")
     except Exception as e:
         logger.exception("Error initializing vectorstore: %s", e)
@@ -0,0 +1,457 @@
+"""
+Retention engine: enforces DATA_RETENTION_DAYS / SENSITIVE_TTL_HOURS on the database and the chat
+memory vectors, and compacts old per-session memories into one summary vector per session.
+With MESSAGE_PARTITIONING / MEMORY_MONTHLY_COLLECTIONS whole months are dropped instead.
+
+Every delete runs in short batches (select ids ... LIMIT n FOR UPDATE SKIP LOCKED, delete by id,
+commit) with a pause in between, so no run holds row locks for long or blocks live traffic.
+"""
+
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from sqlalchemy import delete, exists, select, text
+
+from app.config import get_settings
+from app.persistence import partitions
+from app.persistence.db import get_db, get_engine
+from app.persistence.models import Conversation, Message, NotificationOutbox, SensitiveData
+from app.services.memory.vector_memory import _get_memstore, collection_month, forget_memstore
+from app.services.session_cache import get_session_cache
+from app.services.vectorstores.numpy_store import drop_collection, get_collection, list_collections
+from app.services.vectorstores.registry import get_pg_engine, vector_backend
+from app.utils.metrics import counter, gauge, histogram
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ROWS_PURGED = counter("retention_rows_purged_total", "Rows removed by the retention engine, by kind")
+RUN_SECONDS = histogram("retention_run_seconds", "Duration of one retention run")
+LAST_RUN = gauge("retention_last_success_timestamp_seconds", "Unix time of the last successful retention run")
+
+SUMMARY_ROLE = "summary"
+_SUMMARY_PROMPT = (
+	"Summarize this customer service conversation history in at most 5 short bullet points. "
+	"Keep facts useful for later turns (preferences, orders, unresolved issues); drop greetings.\n\n{history}"
+)
+_EXTRACT_CHARS = 1500
+
+MemoryRow = Tuple[str, str, str, int]  # id, text, role, ts
+
+
+def _month_end(month: int) -> int:
+	"""Unix time at which the YYYYMM month ends."""
+	year, mon = divmod(month, 100)
+	return calendar.timegm((year + mon // 12, mon % 12 + 1, 1, 0, 0, 0))
+
+
+def _summarize(lines: List[str]) -> str:
+	"""LLM summary of old memories; falls back to an extractive digest when no model is reachable."""
+	history = "\n".join(lines)
+	try:
+		from app.services.llm.provider import get_chat_model
+
+		return str(get_chat_model(temperature=0.0, task="summarizer").invoke(_SUMMARY_PROMPT.format(history=history)).content).strip()
+	except Exception as e:
+		logger.warning("memory summary fell back to extractive: %s", e)
+		return history[:_EXTRACT_CHARS]
+
+
+class _PgMemory:
+	"""Memory rows in langchain_pg_embedding; `ts` lives in cmetadata (expression-indexed per collection)."""
+
+	def __init__(self, collection_name: str):
+		self.collection_name = collection_name
+
+	def _cid(self, conn) -> Optional[Any]:
+		return conn.execute(text("SELECT uuid FROM langchain_pg_collection WHERE name = :n"), {"n": self.collection_name}).scalar()
+
+	def _write(self, sql: str, **params) -> int:
+		with get_pg_engine().connect() as conn:
+			cid = self._cid(conn)
+			if cid is None:
+				return 0
+			count = conn.execute(text(sql), {"cid": cid, **params}).rowcount or 0
+			conn.commit()
+			return count
+
+	def ensure_index(self):
+		with get_pg_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+			cid = self._cid(conn)
+			if cid is not None:
+				# cid is a uuid read from langchain_pg_collection
+				conn.execute(text(
+					f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_mem_ts_{str(cid).replace('-', '')[:16]} "
+					f"ON langchain_pg_embedding (((cmetadata->>'ts')::bigint)) WHERE collection_id = '{cid}'"
+				))
+
+	def stamp_missing(self, now: int, limit: int) -> int:
+		return self._write(
+			"UPDATE langchain_pg_embedding SET cmetadata = cmetadata || jsonb_build_object('ts', CAST(:now AS bigint))"
+			" WHERE id IN (SELECT id FROM langchain_pg_embedding WHERE collection_id = :cid AND cmetadata->'ts' IS NULL"
+			" LIMIT :limit FOR UPDATE SKIP LOCKED)",
+			now=now, limit=limit,
+		)
+
+	def delete_older_than(self, cutoff: int, limit: int) -> int:
+		return self._write(
+			"DELETE FROM langchain_pg_embedding WHERE id IN (SELECT id FROM langchain_pg_embedding"
+			" WHERE collection_id = :cid AND (cmetadata->>'ts')::bigint < :cutoff LIMIT :limit FOR UPDATE SKIP LOCKED)",
+			cutoff=cutoff, limit=limit,
+		)
+
+	def delete_session(self, session_id: str, limit: int) -> int:
+		return self._write(
+			"DELETE FROM langchain_pg_embedding WHERE id IN (SELECT id FROM langchain_pg_embedding"
+			" WHERE collection_id = :cid AND cmetadata->>'session_id' = :sid LIMIT :limit FOR UPDATE SKIP LOCKED)",
+			sid=session_id, limit=limit,
+		)
+
+	def delete_ids(self, ids: List[str]) -> int:
+		if not ids:
+			return 0
+		return self._write("DELETE FROM langchain_pg_embedding WHERE collection_id = :cid AND id = ANY(:ids)", ids=list(ids))
+
+	def compactable_sessions(self, cutoff: int, min_rows: int, limit: int) -> List[str]:
+		with get_pg_engine().connect() as conn:
+			cid = self._cid(conn)
+			if cid is None:
+				return []
+			rows = conn.execute(text(
+				"SELECT cmetadata->>'session_id' FROM langchain_pg_embedding"
+				" WHERE collection_id = :cid AND (cmetadata->>'ts')::bigint < :cutoff AND coalesce(cmetadata->>'role', '') <> :summary"
+				" GROUP BY 1 HAVING count(*) >= :min_rows LIMIT :limit"
+			), {"cid": cid, "cutoff": cutoff, "summary": SUMMARY_ROLE, "min_rows": min_rows, "limit": limit}).fetchall()
+		return [r[0] for r in rows if r[0]]
+
+	def session_rows(self, session_id: str, cutoff: int) -> List[MemoryRow]:
+		with get_pg_engine().connect() as conn:
+			cid = self._cid(conn)
+			if cid is None:
+				return []
+			rows = conn.execute(text(
+				"SELECT id, document, coalesce(cmetadata->>'role', ''), (cmetadata->>'ts')::bigint FROM langchain_pg_embedding"
+				" WHERE collection_id = :cid AND cmetadata->>'session_id' = :sid"
+				" AND ((cmetadata->>'ts')::bigint < :cutoff OR cmetadata->>'role' = :summary) ORDER BY 4"
+			), {"cid": cid, "sid": session_id, "cutoff": cutoff, "summary": SUMMARY_ROLE}).fetchall()
+		return [(r[0], r[1] or "", r[2], int(r[3])) for r in rows]
+
+
+class _NumpyMemory:
+	"""Same operations on the in-process NumPy collection (metadata scanned in Python)."""
+
+	def __init__(self, collection_name: str):
+		self.collection = get_collection(collection_name, settings.VECTOR_STORE_PATH)
+
+	def _rows(self, predicate: Callable[[Dict[str, Any]], bool]) -> List[int]:
+		c = self.collection
+		return [row for row in c.row_of.values() if predicate(c.metadatas[row])]
+
+	def ensure_index(self):
+		pass
+
+	def stamp_missing(self, now: int, limit: int) -> int:
+		c = self.collection
+		with c.lock:
+			rows = self._rows(lambda m: "ts" not in m)[:limit]
+			if rows:
+				c.upsert(
+					[c.ids[r] for r in rows],
+					np.stack([c.vector(r) for r in rows]),
+					[c.texts[r] for r in rows],
+					[{**c.metadatas[r], "ts": now} for r in rows],
+				)
+			return len(rows)
+
+	def _delete_where(self, predicate: Callable[[Dict[str, Any]], bool], limit: int) -> int:
+		c = self.collection
+		with c.lock:
+			return c.delete([c.ids[r] for r in self._rows(predicate)[:limit]])
+
+	def delete_older_than(self, cutoff: int, limit: int) -> int:
+		return self._delete_where(lambda m: m.get("ts", cutoff) < cutoff, limit)
+
+	def delete_session(self, session_id: str, limit: int) -> int:
+		return self._delete_where(lambda m: m.get("session_id") == session_id, limit)
+
+	def delete_ids(self, ids: List[str]) -> int:
+		return self.collection.delete(ids)
+
+	def compactable_sessions(self, cutoff: int, min_rows: int, limit: int) -> List[str]:
+		counts: Dict[str, int] = {}
+		with self.collection.lock:
+			for row in self._rows(lambda m: m.get("ts", cutoff) < cutoff and m.get("role") != SUMMARY_ROLE):
+				sid = self.collection.metadatas[row].get("session_id")
+				if sid:
+					counts[sid] = counts.get(sid, 0) + 1
+		return [sid for sid, n in counts.items() if n >= min_rows][:limit]
+
+	def session_rows(self, session_id: str, cutoff: int) -> List[MemoryRow]:
+		c = self.collection
+		with c.lock:
+			rows = self._rows(
+				lambda m: m.get("session_id") == session_id and (m.get("ts", cutoff) < cutoff or m.get("role") == SUMMARY_ROLE)
+			)
+			out = [(c.ids[r], c.texts[r], c.metadatas[r].get("role", ""), int(c.metadatas[r].get("ts", 0))) for r in rows]
+		return sorted(out, key=lambda r: r[3])
+
+
+class RetentionEngine:
+	"""One retention pass over the database and the memory collections; see `run`."""
+
+	def __init__(
+		self,
+		memory_collection: Optional[str] = None,
+		batch_size: Optional[int] = None,
+		pause_seconds: Optional[float] = None,
+		summarizer: Optional[Callable[[List[str]], str]] = None,
+		stop: Optional[threading.Event] = None,
+	):
+		self.memory_collection = memory_collection
+		self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+		self.pause_seconds = settings.RETENTION_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+		self.summarizer = summarizer or _summarize
+		self._stop = stop or threading.Event()
+		self._indexed: set = set()
+
+	def _collections(self) -> List[str]:
+		"""Memory collections: the configured one, or every existing (monthly) `{DB_SCHEMA}_memory*`."""
+		if self.memory_collection:
+			return [self.memory_collection]
+		base = f"{settings.DB_SCHEMA}_memory"
+		if vector_backend() == "numpy":
+			names = list_collections(settings.VECTOR_STORE_PATH, base)
+		else:
+			with get_pg_engine().connect() as conn:
+				names = [r[0] for r in conn.execute(
+					text("SELECT name FROM langchain_pg_collection WHERE starts_with(name, :base)"), {"base": base}
+				).fetchall()]
+		return [n for n in names if n == base or collection_month(n) is not None]
+
+	def _memory(self, name: str):
+		return _NumpyMemory(name) if vector_backend() == "numpy" else _PgMemory(name)
+
+	def _drop_collection(self, name: str):
+		if vector_backend() == "numpy":
+			drop_collection(name, settings.VECTOR_STORE_PATH)
+		else:
+			with get_pg_engine().connect() as conn:
+				# embeddings go with it (ON DELETE CASCADE)
+				conn.execute(text("DELETE FROM langchain_pg_collection WHERE name = :name"), {"name": name})
+				conn.commit()
+		forget_memstore(name)
+
+	def _batches(self, step: Callable[[], int], kind: Optional[str]) -> int:
+		"""Repeat `step` (one short transaction) until it removes less than a full batch."""
+		total = 0
+		while not self._stop.is_set():
+			n = step()
+			total += n
+			if n and kind:
+				ROWS_PURGED.inc(n, kind=kind)
+			if n < self.batch_size:
+				break
+			self._stop.wait(self.pause_seconds)
+		return total
+
+	def _delete_rows(self, model, *conditions) -> Callable[[], int]:
+		def step() -> int:
+			with next(get_db()) as db:  # type: ignore
+				ids = db.execute(
+					select(model.id).where(*conditions).order_by(model.id).limit(self.batch_size).with_for_update(skip_locked=True)
+				).scalars().all()
+				if ids:
+					db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+				db.commit()
+				return len(ids)
+
+		return step
+
+	def maintain_partitions(self, cutoff: datetime) -> Dict[str, int]:
+		"""Create upcoming message partitions and drop the months entirely past `cutoff`."""
+		engine = get_engine()
+		if not settings.MESSAGE_PARTITIONING or engine is None or engine.dialect.name != "postgresql":
+			return {}
+		with engine.connect() as conn:
+			if not partitions.is_partitioned(conn):
+				return {}
+			created = partitions.ensure_partitions(conn)
+			dropped = partitions.drop_partitions_before(conn, cutoff)
+			conn.commit()
+		if dropped:
+			ROWS_PURGED.inc(len(dropped), kind="message_partitions")
+			logger.info("dropped message partitions %s", dropped)
+		return {"partitions_created": len(created), "partitions_dropped": len(dropped)}
+
+	def purge_database(self) -> Dict[str, int]:
+		now = datetime.utcnow()
+		cutoff = now - timedelta(days=settings.DATA_RETENTION_DAYS)
+		stats = self.maintain_partitions(cutoff)
+		stats.update({
+			"sensitive": self._batches(self._delete_rows(SensitiveData, SensitiveData.expires_at < now), "sensitive"),
+			# with partitions this only touches the boundary month; older months were dropped above
+			"messages": self._batches(self._delete_rows(Message, Message.created_at < cutoff), "messages"),
+			"outbox": self._batches(
+				self._delete_rows(NotificationOutbox, NotificationOutbox.status != "pending", NotificationOutbox.created_at < cutoff), "outbox"
+			),
+			"conversations": self._batches(
+				self._delete_rows(
+					Conversation,
+					Conversation.updated_at < cutoff,
+					~exists().where(Message.conversation_id == Conversation.id),
+				),
+				"conversations",
+			),
+		})
+		return stats
+
+	def purge_memory(self) -> Dict[str, int]:
+		now = int(time.time())
+		cutoff = now - settings.DATA_RETENTION_DAYS * 86400
+		stats = {"memory_stamped": 0, "memory": 0, "memory_collections_dropped": 0}
+		for name in self._collections():
+			month = collection_month(name)
+			if month is not None and _month_end(month) <= cutoff:
+				self._drop_collection(name)
+				ROWS_PURGED.inc(kind="memory_collections")
+				stats["memory_collections_dropped"] += 1
+				continue
+			memory = self._memory(name)
+			if name not in self._indexed:
+				memory.ensure_index()
+				self._indexed.add(name)
+			# rows written before memories carried a timestamp start their retention clock now
+			stats["memory_stamped"] += self._batches(lambda: memory.stamp_missing(now, self.batch_size), None)
+			stats["memory"] += self._batches(lambda: memory.delete_older_than(cutoff, self.batch_size), "memory")
+		return stats
+
+	def compact_memory(self, max_sessions: int = 100) -> Dict[str, int]:
+		"""Replace a session's memories older than MEMORY_COMPACT_AFTER_DAYS with one summary vector."""
+		cutoff = int(time.time()) - settings.MEMORY_COMPACT_AFTER_DAYS * 86400
+		sessions = rows_removed = 0
+		for name in self._collections():
+			store = _get_memstore(name)
+			if store is None:
+				continue
+			memory = self._memory(name)
+			for session_id in memory.compactable_sessions(cutoff, settings.MEMORY_COMPACT_MIN_ROWS, max_sessions - sessions):
+				if self._stop.is_set():
+					break
+				rows = memory.session_rows(session_id, cutoff)
+				if not rows:
+					continue
+				summary = self.summarizer([f"{role}: {content}" for _, content, role, _ in rows])
+				if not summary:
+					continue
+				# write the summary first: a crash in between leaves duplicates, never a gap
+				store.add_documents([Document(
+					page_content=summary,
+					metadata={"session_id": session_id, "role": SUMMARY_ROLE, "ts": max(r[3] for r in rows), "compacted": len(rows)},
+				)])
+				removed = memory.delete_ids([r[0] for r in rows])
+				ROWS_PURGED.inc(removed, kind="memory_compacted")
+				sessions += 1
+				rows_removed += removed
+				self._stop.wait(self.pause_seconds)
+			if sessions >= max_sessions:
+				break
+		return {"sessions_compacted": sessions, "memory_compacted": rows_removed}
+
+	def erase_session(self, session_id: str) -> Dict[str, int]:
+		"""Right-to-erasure: memory vectors, sensitive data, messages, outbox rows and the conversation itself."""
+		cache = get_session_cache()
+		if cache is not None:
+			cache.invalidate(session_id)
+		stats = {"memory": 0}
+		for name in self._collections():
+			memory = self._memory(name)
+			stats["memory"] += self._batches(lambda: memory.delete_session(session_id, self.batch_size), "erasure")
+		with next(get_db()) as db:  # type: ignore
+			cid = db.execute(select(Conversation.id).where(Conversation.session_id == session_id)).scalar_one_or_none()
+		if cid is None:
+			return stats
+		for name, model in (("sensitive", SensitiveData), ("messages", Message), ("outbox", NotificationOutbox)):
+			stats[name] = self._batches(self._delete_rows(model, model.conversation_id == cid), "erasure")
+		stats["conversations"] = self._batches(self._delete_rows(Conversation, Conversation.id == cid), "erasure")
+		logger.info("erased session %s: %s", session_id, stats)
+		return stats
+
+	def run(self) -> Dict[str, Any]:
+		started = time.perf_counter()
+		stats: Dict[str, Any] = {}
+		stats.update(self.purge_database())
+		stats.update(self.purge_memory())
+		stats.update(self.compact_memory())
+		seconds = time.perf_counter() - started
+		RUN_SECONDS.observe(seconds)
+		LAST_RUN.set(time.time())
+		stats["seconds"] = round(seconds, 3)
+		return stats
+
+
+def schedule_erasure(session_id: str) -> bool:
+	"""Run `erase_session` on a background thread; False when there is nothing to erase."""
+	if not session_id:
+		return False
+
+	def _erase():
+		try:
+			RetentionEngine().erase_session(session_id)
+		except Exception as e:
+			logger.error("erasure of %s failed: %s", session_id, e)
+
+	threading.Thread(target=_erase, name="retention-erasure", daemon=True).start()
+	return True
+
+
+class RetentionScheduler:
+	"""Background thread running a retention pass every RETENTION_INTERVAL_SECONDS."""
+
+	def __init__(self, interval_seconds: int):
+		self.interval_seconds = interval_seconds
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+		self.engine = RetentionEngine(stop=self._stop)
+
+	def start(self):
+		if self._thread and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		self._stop.set()
+
+	def _run(self):
+		while not self._stop.is_set():
+			try:
+				logger.info("retention run: %s", self.engine.run())
+			except Exception as e:
+				logger.error("retention run failed: %s", e)
+			self._stop.wait(self.interval_seconds)
+
+
+_scheduler: Optional[RetentionScheduler] = None
+
+
+def start_retention_scheduler() -> Optional[RetentionScheduler]:
+	global _scheduler
+	if not (settings.RETENTION_ENABLED and settings.RETENTION_INTERVAL_SECONDS > 0):
+		return None
+	if _scheduler is None:
+		_scheduler = RetentionScheduler(settings.RETENTION_INTERVAL_SECONDS)
+	_scheduler.start()
+	return _scheduler
+
+
+def stop_retention_scheduler():
+	if _scheduler is not None:
+		_scheduler.stop()
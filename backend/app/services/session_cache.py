@@ -0,0 +1,219 @@
+"""
+Hot session state: conversation id, locale, user profile and the recent message window, so a turn
+of an active chat reads nothing from the conversation tables.
+
+Entries live in a process-local LRU with a TTL. Every write bumps a per-session version in the shared
+store (Redis when SESSION_CACHE_URL is set, else an in-process stand-in); a local entry is only used
+while its version matches, so a turn served by another worker invalidates it. The serialized state
+is written through to the shared store too, so the other worker can pick it up without the database.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings, on_settings_reload
+from app.utils.metrics import counter
+
+# Optional imports guarded
+try:
+	import redis
+except Exception:
+	redis = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CACHE_LOOKUPS = counter("session_cache_lookups_total", "Session state lookups by result (hit/shared/miss/stale)")
+
+
+@dataclass
+class SessionState:
+	conversation_id: int
+	locale: Optional[str] = None
+	user_profile: Dict[str, Any] = field(default_factory=dict)
+	history: List[Dict[str, Any]] = field(default_factory=list)  # last SESSION_HISTORY_WINDOW messages
+	version: int = 0
+
+
+class LocalStore:
+	"""In-process stand-in for the shared store (single worker, tests)."""
+
+	def __init__(self):
+		self._data: Dict[str, Tuple[Any, float]] = {}
+		self._lock = threading.Lock()
+
+	def get(self, key: str) -> Optional[str]:
+		with self._lock:
+			item = self._data.get(key)
+			if item is None or item[1] < time.monotonic():
+				self._data.pop(key, None)
+				return None
+			return item[0]
+
+	def set(self, key: str, value: str, ttl: float):
+		with self._lock:
+			self._data[key] = (value, time.monotonic() + ttl)
+
+	def incr(self, key: str, ttl: float) -> int:
+		with self._lock:
+			item = self._data.get(key)
+			value = int(item[0]) + 1 if item is not None and item[1] >= time.monotonic() else 1
+			self._data[key] = (str(value), time.monotonic() + ttl)
+			return value
+
+	def delete(self, *keys: str):
+		with self._lock:
+			for key in keys:
+				self._data.pop(key, None)
+
+
+class RedisStore:
+	"""Shared store across workers."""
+
+	def __init__(self, url: str):
+		self._client = redis.Redis.from_url(url, socket_timeout=0.2, decode_responses=True)
+
+	def get(self, key: str) -> Optional[str]:
+		return self._client.get(key)
+
+	def set(self, key: str, value: str, ttl: float):
+		self._client.set(key, value, ex=max(1, int(ttl)))
+
+	def incr(self, key: str, ttl: float) -> int:
+		pipe = self._client.pipeline()
+		pipe.incr(key)
+		pipe.expire(key, max(1, int(ttl)))
+		return int(pipe.execute()[0])
+
+	def delete(self, *keys: str):
+		self._client.delete(*keys)
+
+
+class SessionCache:
+	def __init__(self, store: Any = None, max_entries: Optional[int] = None, ttl: Optional[float] = None, window: Optional[int] = None):
+		self.store = store or LocalStore()
+		self.max_entries = max_entries or settings.SESSION_CACHE_MAX_ENTRIES
+		self.ttl = ttl or settings.SESSION_CACHE_TTL_SECONDS
+		self.window = window or settings.SESSION_HISTORY_WINDOW
+		self._local: "OrderedDict[str, Tuple[SessionState, float]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _keys(session_id: str) -> Tuple[str, str]:
+		return f"session:{session_id}:v", f"session:{session_id}:state"
+
+	def _shared(self, op: str, *args, default=None):
+		# the shared store is an optimisation: when it is down, behave as a miss
+		try:
+			return getattr(self.store, op)(*args)
+		except Exception as e:
+			logger.warning("session cache %s failed: %s", op, e)
+			return default
+
+	def get(self, session_id: str) -> Optional[SessionState]:
+		return self.lookup(session_id)[0]
+
+	def lookup(self, session_id: str) -> Tuple[Optional[SessionState], int]:
+		"""Cached state (None on a miss) and the shared version it was checked against; pass that to put()."""
+		version_key, state_key = self._keys(session_id)
+		version = int(self._shared("get", version_key) or 0)
+		with self._lock:
+			entry = self._local.get(session_id)
+			if entry is not None:
+				state, expires = entry
+				if expires >= time.monotonic() and state.version == version:
+					self._local.move_to_end(session_id)
+					CACHE_LOOKUPS.inc(result="hit")
+					return state, version
+				del self._local[session_id]
+				CACHE_LOOKUPS.inc(result="stale")
+		raw = self._shared("get", state_key)
+		if raw:
+			state = SessionState(**json.loads(raw))
+			if state.version == version:
+				self._remember(session_id, state)
+				CACHE_LOOKUPS.inc(result="shared")
+				return state, version
+		CACHE_LOOKUPS.inc(result="miss")
+		return None, version
+
+	def put(self, session_id: str, state: SessionState, version: int) -> SessionState:
+		"""
+		Cache state loaded from the database after a lookup() that saw `version`. If another worker
+		wrote to the session since, the snapshot may miss its turn: it is returned but not cached.
+		"""
+		version_key, state_key = self._keys(session_id)
+		state.history = state.history[-self.window :]
+		state.version = version
+		if int(self._shared("get", version_key) or 0) != version:
+			return state
+		self._shared("set", state_key, json.dumps(asdict(state), default=str), self.ttl)
+		self._remember(session_id, state)
+		return state
+
+	def append(self, session_id: str, state: SessionState, messages: List[Dict[str, Any]]):
+		"""Write-through after messages were committed: bump the version and store the new window."""
+		version_key, state_key = self._keys(session_id)
+		version = self._shared("incr", version_key, self.ttl)
+		if version is None or version != state.version + 1:
+			# another worker wrote to this session concurrently (or the store is down): drop our copy
+			self.invalidate(session_id, bump=False)
+			return
+		state = SessionState(
+			conversation_id=state.conversation_id,
+			locale=state.locale,
+			user_profile=state.user_profile,
+			history=(state.history + messages)[-self.window :],
+			version=version,
+		)
+		self._shared("set", state_key, json.dumps(asdict(state), default=str), self.ttl)
+		self._remember(session_id, state)
+
+	def invalidate(self, session_id: str, bump: bool = True):
+		"""Forget the session everywhere (e.g. after erasure or an out-of-band change)."""
+		version_key, state_key = self._keys(session_id)
+		with self._lock:
+			self._local.pop(session_id, None)
+		if bump:
+			self._shared("incr", version_key, self.ttl)
+		self._shared("delete", state_key)
+
+	def _remember(self, session_id: str, state: SessionState):
+		with self._lock:
+			self._local[session_id] = (state, time.monotonic() + self.ttl)
+			self._local.move_to_end(session_id)
+			while len(self._local) > self.max_entries:
+				self._local.popitem(last=False)
+
+
+_cache: Optional[SessionCache] = None
+
+
+def _reset_cache():
+	global _cache
+	_cache = None
+
+
+on_settings_reload(_reset_cache, "SESSION_")
+
+
+def get_session_cache() -> Optional[SessionCache]:
+	"""Process-wide cache, or None when SESSION_CACHE_ENABLED is off."""
+	global _cache
+	if not settings.SESSION_CACHE_ENABLED:
+		return None
+	if _cache is None:
+		store = None
+		if settings.SESSION_CACHE_URL:
+			if redis is None:
+				logger.warning("SESSION_CACHE_URL is set but the redis package is not installed; using a local store")
+			else:
+				store = RedisStore(settings.SESSION_CACHE_URL)
+		_cache = SessionCache(store)
+	return _cache
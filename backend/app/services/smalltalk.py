@@ -0,0 +1,165 @@
+"""
+Fast path for trivial turns: greetings, thanks and small talk ("halo", "terima kasih", "selamat
+pagi") are answered from locale-aware templates before the graph runs, without routing, agents,
+translation or memory embeddings.
+
+A message counts as small talk only when it consists entirely of known phrases and fillers ("kak",
+"min", "ya"), so "halo, pesanan 12345 di mana?" still goes through the graph. The phrase set is
+extended or overridden with a JSON file (SMALLTALK_PHRASES_PATH) of the same shape as INTENTS:
+
+	{"intents": {"thanks": {"phrases": {"id": ["nuhun"]}}}, "fillers": ["bestie"]}
+"""
+
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.config import get_settings, on_settings_reload
+from app.utils.metrics import counter
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SMALLTALK_TURNS = counter("smalltalk_turns_total", "Turns answered by the small-talk fast path, by intent and language")
+
+# In priority order: "halo, selamat pagi" is answered as a time greeting, "ok makasih" as thanks.
+# Phrases under "*" are shared by several languages; the reply then follows the conversation locale.
+INTENTS: Dict[str, Dict[str, Dict[str, Any]]] = {
+	"time_greeting": {
+		"phrases": {
+			"id": ["selamat pagi", "selamat siang", "selamat sore", "selamat malam", "pagi", "siang", "sore", "malam"],
+			"en": ["good morning", "good afternoon", "good evening", "morning"],
+		},
+		"responses": {"id": "{phrase}! Ada yang bisa saya bantu hari ini?", "en": "{phrase}! How can I help you today?"},
+	},
+	"thanks": {
+		"phrases": {
+			"id": ["terima kasih", "terimakasih", "makasih", "makasi", "trims", "tengkyu"],
+			"en": ["thank you", "thanks", "thx", "ty"],
+		},
+		"responses": {"id": "Sama-sama! Ada yang bisa saya bantu lagi?", "en": "You're welcome! Is there anything else I can help with?"},
+	},
+	"how_are_you": {
+		"phrases": {"id": ["apa kabar", "gimana kabarnya", "bagaimana kabarnya"], "en": ["how are you", "how are you doing"]},
+		"responses": {"id": "Baik, terima kasih! Ada yang bisa saya bantu?", "en": "I'm doing well, thank you! How can I help you?"},
+	},
+	"goodbye": {
+		"phrases": {"id": ["sampai jumpa", "dadah"], "en": ["goodbye", "see you"], "*": ["bye"]},
+		"responses": {"id": "Sampai jumpa! Jangan ragu menghubungi kami lagi.", "en": "Goodbye! Feel free to reach out anytime."},
+	},
+	"greeting": {
+		"phrases": {"id": ["halo", "hallo", "hai", "permisi"], "en": ["hello", "hey"], "*": ["hi"]},
+		"responses": {"id": "Halo! Ada yang bisa saya bantu hari ini?", "en": "Hello! How can I help you today?"},
+	},
+}
+
+# Words that may surround the phrases without making the message a real question
+FILLERS = [
+	"kak", "kakak", "min", "admin", "gan", "sis", "mas", "mbak", "bang", "pak", "bu", "ya", "yah", "nya", "ok", "oke",
+	"banyak", "sekali", "semua", "bot", "there", "so much", "very much", "a lot", "all", "team", "again", "and", "dan",
+]
+
+
+class SmallTalkMatch(NamedTuple):
+	intent: str
+	lang: Optional[str]  # None for phrases shared by several languages
+	phrase: str
+
+
+class SmallTalkMatcher:
+	"""Whole-message matcher over the phrases of `intents` plus `fillers`, with reply templates per language."""
+
+	def __init__(self, intents: Dict[str, Dict[str, Any]], fillers: List[str], max_chars: int = 80):
+		self.intents = intents
+		self.max_chars = max_chars
+		self._phrases: Dict[str, SmallTalkMatch] = {}
+		for intent, spec in intents.items():
+			for lang, phrases in spec.get("phrases", {}).items():
+				for phrase in phrases:
+					self._phrases.setdefault(self._normalize(phrase), SmallTalkMatch(intent, None if lang == "*" else lang, phrase))
+		self._fillers = {self._normalize(f) for f in fillers} - set(self._phrases)
+		# longest first, so "selamat pagi" wins over "pagi" and "thank you" over "ty"
+		alternatives = sorted({*self._phrases, *self._fillers}, key=len, reverse=True)
+		self._pattern = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in alternatives if p) + r")\b")
+		self._priority = {intent: i for i, intent in enumerate(intents)}
+
+	@staticmethod
+	def _normalize(text: str) -> str:
+		text = re.sub(r"[^\w]+", " ", text.lower())
+		text = re.sub(r"(\w)\1{2,}", r"\1", text)  # "haloooo", "makasihhh"
+		return " ".join(text.split())
+
+	def match(self, text: str, whole: bool = True) -> Optional[SmallTalkMatch]:
+		"""The highest-priority phrase of `text`; with `whole`, only if nothing but phrases and fillers is left."""
+		if whole and len(text) > self.max_chars:
+			return None
+		normalized = self._normalize(text)
+		found = [m.group(0) for m in self._pattern.finditer(normalized)]
+		if whole and self._pattern.sub(" ", normalized).strip():
+			return None
+		matches = [self._phrases[p] for p in found if p in self._phrases]
+		if not matches:
+			return None
+		best = min(matches, key=lambda m: self._priority[m.intent])
+		lang = best.lang or next((m.lang for m in matches if m.lang), None)
+		return best._replace(lang=lang)
+
+	def render(self, match: SmallTalkMatch, locale: Optional[str] = None) -> str:
+		responses = self.intents[match.intent].get("responses", {})
+		lang = match.lang or (locale or settings.DEFAULT_LOCALE)[:2].lower()
+		template = responses.get(lang) or responses.get(settings.DEFAULT_LOCALE[:2]) or next(iter(responses.values()), "")
+		phrase = match.phrase if match.lang == lang else ""
+		return template.format(phrase=phrase[:1].upper() + phrase[1:]) if phrase else template.replace("{phrase}! ", "")
+
+
+_matcher: Optional[SmallTalkMatcher] = None
+_lock = threading.Lock()
+
+
+def _reset_matcher():
+	global _matcher
+	_matcher = None
+
+
+on_settings_reload(_reset_matcher, "SMALLTALK_")
+
+
+def _load_phrases() -> Dict[str, Any]:
+	intents = {name: dict(spec) for name, spec in INTENTS.items()}
+	fillers = list(FILLERS)
+	if settings.SMALLTALK_PHRASES_PATH:
+		try:
+			with open(settings.SMALLTALK_PHRASES_PATH, encoding="utf-8") as f:
+				custom = json.load(f)
+		except Exception as e:
+			logger.error("could not load small-talk phrases from %s: %s", settings.SMALLTALK_PHRASES_PATH, e)
+			custom = {}
+		for name, spec in (custom.get("intents") or {}).items():
+			base = intents.setdefault(name, {})
+			for key in ("phrases", "responses"):  # merged per language
+				base[key] = {**base.get(key, {}), **spec.get(key, {})}
+		fillers += custom.get("fillers") or []
+	return {"intents": intents, "fillers": fillers}
+
+
+def get_matcher() -> SmallTalkMatcher:
+	global _matcher
+	with _lock:
+		if _matcher is None:
+			_matcher = SmallTalkMatcher(**_load_phrases(), max_chars=settings.SMALLTALK_MAX_CHARS)
+		return _matcher
+
+
+def match_small_talk(text: str) -> Optional[SmallTalkMatch]:
+	"""The small-talk intent of a whole message, or None (also when SMALLTALK_ENABLED is off)."""
+	if not settings.SMALLTALK_ENABLED or not text:
+		return None
+	return get_matcher().match(text)
+
+
+def small_talk_reply(match: SmallTalkMatch, locale: Optional[str] = None) -> str:
+	SMALLTALK_TURNS.inc(intent=match.intent, lang=match.lang or "any")
+	return get_matcher().render(match, locale)
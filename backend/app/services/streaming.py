@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from langchain_core.callbacks import BaseCallbackHandler
+from app.utils.metrics import histogram
+
+
+logger = logging.getLogger(__name__)
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+CHAT_TTFT = histogram("chat_ttft_seconds", "Time from request to the first streamed answer token")
+CHAT_TURN = histogram("chat_turn_seconds", "Total chat turn latency, including translation and persistence")
+
+Emit = Callable[[Dict[str, Any]], None]
+
+
+class ConversationEventHandler(BaseCallbackHandler):
+	"""
+	Turns LangChain/LangGraph callbacks of one graph run into client events:
+	`node` when a graph node starts, `route` once the router picked a task, `tool` when an agent
+	calls a tool, and `token` for final-answer text as the model generates it.
+
+	The ReAct agents emit Thought/Action lines before the answer, so tokens of an LLM run are
+	held back until the "Final Answer:" marker shows up in that run's output.
+	"""
+
+	raise_error = False
+
+	def __init__(self, emit: Emit):
+		self.emit = emit
+		self._nodes: Dict[UUID, str] = {}
+		self._buffers: Dict[UUID, str] = {}
+		self._answering: Dict[UUID, bool] = {}  # run_id -> answer text already emitted
+
+	def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any):
+		node = (metadata or {}).get("langgraph_node")
+		if node and kwargs.get("name") == node and not node.startswith("__"):
+			self._nodes[run_id] = node
+			self.emit({"event": "node", "node": node})
+
+	def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+		node = self._nodes.pop(run_id, None)
+		if node == "router" and isinstance(outputs, dict):
+			self.emit({"event": "route", "task": outputs.get("current_task")})
+
+	def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any):
+		self.emit({"event": "tool", "tool": (serialized or {}).get("name") or kwargs.get("name")})
+
+	def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any):
+		if run_id in self._answering:
+			self._emit_token(run_id, token)
+			return
+		buf = self._buffers.get(run_id, "") + token
+		idx = buf.find(FINAL_ANSWER_MARKER)
+		if idx < 0:
+			self._buffers[run_id] = buf
+			return
+		self._buffers.pop(run_id, None)
+		self._answering[run_id] = False
+		self._emit_token(run_id, buf[idx + len(FINAL_ANSWER_MARKER):])
+
+	def _emit_token(self, run_id: UUID, text: str):
+		if not self._answering[run_id]:
+			text = text.lstrip()
+		if text:
+			self._answering[run_id] = True
+			self.emit({"event": "token", "text": text})
+
+	def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any):
+		self._buffers.pop(run_id, None)
+		self._answering.pop(run_id, None)
+
+
+async def stream_conversation(session_id: str, message: str, channel: str, user_meta: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+	"""
+	Run a conversation turn in the threadpool and yield its events as they happen.
+
+	The last event is `done` with the final (translated, persisted) answer, or `error`.
+	Streamed tokens are the model's raw answer; clients should replace them with `done.answer`.
+	"""
+	from app.services.conversation import run_conversation
+
+	loop = asyncio.get_running_loop()
+	queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+	started = time.monotonic()
+	handler = ConversationEventHandler(lambda event: loop.call_soon_threadsafe(queue.put_nowait, event))
+	task = asyncio.ensure_future(
+		run_in_threadpool(run_conversation, session_id=session_id, message=message, channel=channel, user_meta=user_meta, callbacks=[handler])
+	)
+	task.add_done_callback(lambda _: loop.call_soon(queue.put_nowait, None))
+
+	first_token: Optional[float] = None
+	while True:
+		event = await queue.get()
+		if event is None:
+			break
+		if event["event"] == "token" and first_token is None:
+			first_token = time.monotonic() - started
+			CHAT_TTFT.observe(first_token, channel=channel)
+		yield event
+
+	total = time.monotonic() - started
+	CHAT_TURN.observe(total, channel=channel, mode="stream")
+	try:
+		result = task.result()
+	except Exception as e:
+		logger.error("streamed chat turn failed: %s", e)
+		yield {"event": "error", "detail": "Internal error"}
+		return
+	yield {
+		"event": "done",
+		"answer": result.get("assistant_response", ""),
+		"handoff_to_human": result.get("handoff_to_human", False),
+		"current_task": result.get("current_task"),
+		**({"degraded": result["degraded"]} if result.get("degraded") else {}),
+		"timings": {
+			**(result.get("timings") or {}),
+			"ttft_ms": round(first_token * 1000, 1) if first_token is not None else None,
+			"total_ms": round(total * 1000, 1),
+		},
+	}
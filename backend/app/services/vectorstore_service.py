@@ -1,38 +1,38 @@
-from typing import List, Dict, Any, Optional
-from langchain.schema import Document
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from langchain_core.documents import Document
 from app.config import get_settings
 from app.services.llm.provider import get_embedding_model
+from app.services.vectorstores import search as vector_search
+from app.services.vectorstores.registry import PGVector, get_vector_store, vector_backend
 from sqlalchemy import create_engine, text
 
-try:
-	from langchain_postgres import PGVector
-except Exception:
-	PGVector = None  # type: ignore
-
 
 _settings = get_settings()
 
 
 class VectorStoreService:
-	"""Wrapper for LangChain PGVector vectorstore with simple CRUD ops and multi-tenant filtering via metadata."""
+	"""Wrapper for the configured vectorstore (PGVector or NumPy) with simple CRUD ops and multi-tenant filtering via metadata."""
 
 	def __init__(self, default_collection: str = "documents"):
-		if PGVector is None:
-			raise RuntimeError("langchain-postgres not installed")
-		if not _settings.DATABASE_URL:
-			raise RuntimeError("DATABASE_URL not configured")
+		self._backend = vector_backend()
+		if self._backend == "pgvector":
+			if PGVector is None:
+				raise RuntimeError("langchain-postgres not installed")
+			if not _settings.DATABASE_URL:
+				raise RuntimeError("DATABASE_URL not configured")
 		self._embeddings = get_embedding_model()
 		self._default_collection = default_collection
 
-	def _get_store(self, collection_name: Optional[str] = None) -> Any:  # PGVector
-		return PGVector(
-			self._embeddings,
-			connection=_settings.DATABASE_URL,
-			collection_name=(collection_name or self._default_collection),
-		)
+	def _get_store(self, collection_name: Optional[str] = None) -> Any:
+		return get_vector_store(collection_name or self._default_collection, embeddings=self._embeddings)
 
 	def get_collection_stats(self, collection_name: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
 		"""Return simple stats for a collection (total vectors; optionally filtered by user_id)."""
+		if self._backend == "numpy":
+			store = self._get_store(collection_name)
+			cnt = store.count({"user_id": {"$eq": user_id}} if user_id else None)
+			return {"collection": collection_name or self._default_collection, "total_vectors": cnt}
 		engine = create_engine(_settings.DATABASE_URL)
 		with engine.connect() as conn:
 			# Resolve collection id
@@ -84,7 +84,7 @@ class VectorStoreService:
 		vs = self._get_store(collection_name)
 		vs.delete(ids)
 
-	def search(
+	def search_with_scores(
 		self,
 		query: str,
 		user_id: Optional[str] = None,
@@ -92,27 +92,31 @@ class VectorStoreService:
 		k: int = 5,
 		mmr: bool = True,
 		filters: Optional[Dict[str, Any]] = None,
-	) -> List[Document]:
+		fetch_k: Optional[int] = None,
+		lambda_mult: float = 0.5,
+		latency_budget_ms: Optional[float] = None,
+	) -> List[Tuple[Document, float]]:
+		"""(document, cosine similarity) pairs; filtering and candidate selection run in the backend, MMR over the candidates."""
 		if not query or not query.strip():
 			return []
-		vs = self._get_store(collection_name)
-		search_kwargs: Dict[str, Any] = {"k": k}
+		started = time.perf_counter()
 		flt: Dict[str, Any] = filters.copy() if filters else {}
 		if user_id:
-			# Prefer vectorstore filtering if supported
 			flt = {**flt, "user_id": {"$eq": user_id}}
-		if flt:
-			search_kwargs["filter"] = flt
-		retriever = vs.as_retriever(
-			search_type=("mmr" if mmr else "similarity"),
-			search_kwargs=search_kwargs,
+		query_vector = self._embeddings.embed_query(query)
+		if latency_budget_ms is not None:
+			# the query embedding already spent part of the budget
+			latency_budget_ms = max(0.0, latency_budget_ms - (time.perf_counter() - started) * 1000)
+		return vector_search.search(
+			collection_name or self._default_collection,
+			query_vector,
+			k=k,
+			filter=flt or None,
+			mmr=mmr,
+			fetch_k=fetch_k,
+			lambda_mult=lambda_mult,
+			latency_budget_ms=latency_budget_ms,
 		)
-		try:
-			return retriever.get_relevant_documents(query)
-		except Exception:
-			# Fallback: no server-side filter support, filter client-side
-			docs = retriever.get_relevant_documents(query)
-			if user_id:
-				return [d for d in docs if d.metadata.get("user_id") == user_id][:k]
-			return docs[:k]
 
+	def search(self, query: str, **kwargs: Any) -> List[Document]:
+		return [doc for doc, _ in self.search_with_scores(query, **kwargs)]
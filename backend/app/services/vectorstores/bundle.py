@@ -0,0 +1,262 @@
+"""
+Vector bundles: move a collection between environments without re-embedding.
+
+A bundle is a directory with
+	vectors.f32    raw little-endian float32 block, `count` rows of `dim` values
+	records.jsonl  one {"id", "document", "metadata"} line per row, same order as the vectors
+	manifest.json  collection, dim, count, sha256 of the vector block; written last, so a bundle
+	               without a manifest is an interrupted export
+
+Export and import stream in batches (constant memory). pgvector imports go through COPY into a
+temporary table and one INSERT ... ON CONFLICT per batch, all in a single transaction; an id that
+belongs to another collection fails the import rather than moving that row.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from app.config import get_settings
+from .numpy_store import get_collection
+from .registry import get_pg_engine, get_vector_store, vector_backend
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FORMAT = "ai-cs-vector-bundle"
+VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+_DTYPE = np.dtype("<f4")
+
+Batch = Tuple[List[str], np.ndarray, List[str], List[Dict[str, Any]]]
+
+
+def new_bundle_name(collection_name: str) -> str:
+	return f"{collection_name}-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:6]}"
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+	manifest_path = os.path.join(path, MANIFEST_FILE)
+	if not os.path.exists(manifest_path):
+		raise ValueError(f"{path} is not a complete vector bundle (no {MANIFEST_FILE})")
+	with open(manifest_path, encoding="utf-8") as f:
+		manifest = json.load(f)
+	if manifest.get("format") != FORMAT or manifest.get("version") != VERSION:
+		raise ValueError(f"unsupported bundle format: {manifest.get('format')} v{manifest.get('version')}")
+	return manifest
+
+
+def export_collection(collection_name: str, path: str, batch_size: int = 5000) -> Dict[str, Any]:
+	"""Write `collection_name` from the configured backend to a bundle directory at `path`."""
+	os.makedirs(path, exist_ok=True)
+	manifest_path = os.path.join(path, MANIFEST_FILE)
+	if os.path.exists(manifest_path):
+		os.remove(manifest_path)
+	backend = vector_backend()
+	batches = _numpy_batches(collection_name, batch_size) if backend == "numpy" else _pg_batches(collection_name, batch_size)
+	started = time.perf_counter()
+	digest = hashlib.sha256()
+	count, dim = 0, None
+	with open(os.path.join(path, VECTORS_FILE), "wb") as vf, open(os.path.join(path, RECORDS_FILE), "w", encoding="utf-8") as rf:
+		for ids, vectors, documents, metadatas in batches:
+			if dim is None:
+				dim = vectors.shape[1]
+			block = np.ascontiguousarray(vectors, dtype=_DTYPE).tobytes()
+			vf.write(block)
+			digest.update(block)
+			for id_, doc, meta in zip(ids, documents, metadatas):
+				rf.write(json.dumps({"id": id_, "document": doc, "metadata": meta}, ensure_ascii=False) + "\n")
+			count += len(ids)
+	manifest = {
+		"format": FORMAT,
+		"version": VERSION,
+		"collection": collection_name,
+		"backend": backend,
+		"dim": dim or 0,
+		"count": count,
+		"dtype": _DTYPE.str,
+		"sha256": digest.hexdigest(),
+		"created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+	}
+	with open(manifest_path, "w", encoding="utf-8") as f:
+		json.dump(manifest, f, indent=2)
+	logger.info("exported %d vectors of %s to %s in %.1fs", count, collection_name, path, time.perf_counter() - started)
+	return manifest
+
+
+def import_collection(path: str, collection_name: Optional[str] = None, replace: bool = False, batch_size: int = 5000) -> Dict[str, Any]:
+	"""
+	Load a bundle into `collection_name` (default: the exported name) on the configured backend.
+	Rows are upserted by id; `replace` empties the collection first. The vector block is verified
+	against the manifest checksum before anything is written. On pgvector, ids already used by
+	another collection raise ValueError (nothing is imported).
+	"""
+	manifest = read_manifest(path)
+	name = collection_name or manifest["collection"]
+	_verify(path, manifest)
+	started = time.perf_counter()
+	batches = _bundle_batches(path, manifest, batch_size)
+	if vector_backend() == "numpy":
+		count = _numpy_import(name, batches, manifest["dim"], replace)
+	else:
+		count = _pg_import(name, batches, manifest["dim"], replace)
+	seconds = time.perf_counter() - started
+	logger.info("imported %d vectors into %s from %s in %.1fs", count, name, path, seconds)
+	return {"collection": name, "imported": count, "dim": manifest["dim"], "replaced": replace, "seconds": round(seconds, 3)}
+
+
+# --- bundle files -------------------------------------------------------------------------
+
+
+def _verify(path: str, manifest: Dict[str, Any]):
+	vectors_path = os.path.join(path, VECTORS_FILE)
+	expected = manifest["count"] * manifest["dim"] * _DTYPE.itemsize
+	if os.path.getsize(vectors_path) != expected:
+		raise ValueError(f"{VECTORS_FILE} has {os.path.getsize(vectors_path)} bytes, manifest expects {expected}")
+	digest = hashlib.sha256()
+	with open(vectors_path, "rb") as f:
+		for chunk in iter(lambda: f.read(1 << 20), b""):
+			digest.update(chunk)
+	if digest.hexdigest() != manifest["sha256"]:
+		raise ValueError(f"{VECTORS_FILE} checksum does not match the manifest")
+
+
+def _bundle_batches(path: str, manifest: Dict[str, Any], batch_size: int) -> Iterator[Batch]:
+	dim = manifest["dim"]
+	with open(os.path.join(path, VECTORS_FILE), "rb") as vf, open(os.path.join(path, RECORDS_FILE), encoding="utf-8") as rf:
+		ids: List[str] = []
+		documents: List[str] = []
+		metadatas: List[Dict[str, Any]] = []
+		for line in rf:
+			if not line.strip():
+				continue
+			record = json.loads(line)
+			ids.append(record["id"])
+			documents.append(record.get("document") or "")
+			metadatas.append(record.get("metadata") or {})
+			if len(ids) == batch_size:
+				yield ids, np.fromfile(vf, dtype=_DTYPE, count=len(ids) * dim).reshape(len(ids), dim), documents, metadatas
+				ids, documents, metadatas = [], [], []
+		if ids:
+			yield ids, np.fromfile(vf, dtype=_DTYPE, count=len(ids) * dim).reshape(len(ids), dim), documents, metadatas
+
+
+# --- numpy backend ------------------------------------------------------------------------
+
+
+def _numpy_batches(collection_name: str, batch_size: int) -> Iterator[Batch]:
+	collection = get_collection(collection_name, settings.VECTOR_STORE_PATH)
+	# The lock is held only to snapshot the ids and to copy each batch, never while the consumer writes
+	with collection.lock:
+		ids = [collection.ids[r] for r in np.flatnonzero(collection.alive[: collection.size])]
+	for i in range(0, len(ids), batch_size):
+		with collection.lock:
+			# rows are resolved per batch (a compaction renumbers them); ids deleted since the snapshot are skipped
+			chunk = [(id_, collection.row_of[id_]) for id_ in ids[i : i + batch_size] if id_ in collection.row_of]
+			rows = [r for _, r in chunk]
+			batch = (
+				[id_ for id_, _ in chunk],
+				np.array(collection.vectors[rows], dtype=np.float32),
+				[collection.texts[r] for r in rows],
+				[collection.metadatas[r] for r in rows],
+			)
+		if chunk:
+			yield batch
+
+
+def _numpy_import(collection_name: str, batches: Iterator[Batch], dim: int, replace: bool) -> int:
+	collection = get_collection(collection_name, settings.VECTOR_STORE_PATH)
+	count = 0
+	with collection.lock:
+		if replace and collection.size:
+			collection.delete(list(collection.row_of))
+		elif collection.dim not in (None, dim):
+			raise ValueError(f"collection {collection_name} has dimension {collection.dim}, bundle has {dim}")
+		for ids, vectors, documents, metadatas in batches:
+			collection.upsert(ids, vectors, documents, metadatas)
+			count += len(ids)
+	return count
+
+
+# --- pgvector backend ---------------------------------------------------------------------
+
+
+def _pg_batches(collection_name: str, batch_size: int) -> Iterator[Batch]:
+	sql = text(
+		"SELECT e.id, e.embedding::text AS embedding, e.document, e.cmetadata"
+		" FROM langchain_pg_embedding e JOIN langchain_pg_collection c ON c.uuid = e.collection_id"
+		" WHERE c.name = :name ORDER BY e.id"
+	)
+	with get_pg_engine().connect() as conn:
+		result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(sql, {"name": collection_name})
+		for rows in result.partitions():
+			yield (
+				[r.id for r in rows],
+				np.stack([np.array(r.embedding.strip("[]").split(","), dtype=_DTYPE) for r in rows]),
+				[r.document or "" for r in rows],
+				[r.cmetadata or {} for r in rows],
+			)
+
+
+def _pg_import(collection_name: str, batches: Iterator[Batch], dim: int, replace: bool) -> int:
+	get_vector_store(collection_name)  # PGVector creates the extension, tables and the collection row
+	raw = get_pg_engine().raw_connection()
+	count = 0
+	try:
+		conn = raw.driver_connection
+		with conn.cursor() as cur:
+			cur.execute("SELECT uuid FROM langchain_pg_collection WHERE name = %s", (collection_name,))
+			row = cur.fetchone()
+			if row is None:
+				raise RuntimeError(f"collection {collection_name} could not be created")
+			cid = row[0]
+			if replace:
+				cur.execute("DELETE FROM langchain_pg_embedding WHERE collection_id = %s", (cid,))
+			else:
+				cur.execute("SELECT vector_dims(embedding) FROM langchain_pg_embedding WHERE collection_id = %s LIMIT 1", (cid,))
+				existing = cur.fetchone()
+				if existing and existing[0] != dim:
+					raise ValueError(f"collection {collection_name} has dimension {existing[0]}, bundle has {dim}")
+			cur.execute(
+				"CREATE TEMP TABLE _vector_import (id varchar, embedding vector, document varchar, cmetadata jsonb) ON COMMIT DROP"
+			)
+			for ids, vectors, documents, metadatas in batches:
+				with cur.copy("COPY _vector_import (id, embedding, document, cmetadata) FROM STDIN") as copy:
+					for id_, vec, doc, meta in zip(ids, vectors.tolist(), documents, metadatas):
+						copy.write_row((id_, "[" + ",".join(map(str, vec)) + "]", doc, json.dumps(meta)))
+				# ids are the table's primary key across collections: never take over another collection's row
+				cur.execute(
+					"SELECT e.id FROM langchain_pg_embedding e JOIN _vector_import i ON i.id = e.id"
+					" WHERE e.collection_id <> %s LIMIT 5",
+					(cid,),
+				)
+				taken = [r[0] for r in cur.fetchall()]
+				if taken:
+					raise ValueError(f"ids already used by another collection: {', '.join(taken)}")
+				cur.execute(
+					"INSERT INTO langchain_pg_embedding (id, collection_id, embedding, document, cmetadata)"
+					" SELECT id, %s, embedding, document, cmetadata FROM _vector_import"
+					" ON CONFLICT (id) DO UPDATE SET embedding = EXCLUDED.embedding,"
+					" document = EXCLUDED.document, cmetadata = EXCLUDED.cmetadata"
+					" WHERE langchain_pg_embedding.collection_id = EXCLUDED.collection_id",
+					(cid,),
+				)
+				cur.execute("TRUNCATE _vector_import")
+				count += len(ids)
+		conn.commit()
+	except Exception:
+		raw.driver_connection.rollback()
+		raise
+	finally:
+		raw.close()
+	return count
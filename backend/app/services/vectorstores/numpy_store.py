@@ -0,0 +1,535 @@
+"""
+In-process vector store on NumPy: one contiguous float32 matrix of L2-normalized rows per collection,
+cosine top-k as a single matrix-vector product, and metadata filters evaluated as boolean masks
+over integer-coded metadata columns.
+
+Collections can be persisted under a directory as an append-only log (`vectors.f32` + `records.jsonl`
++ `deletes.jsonl`); on restart the vectors are memory-mapped instead of re-embedded or re-read.
+
+Optionally a collection keeps a quantized copy of its rows (float16 "halfvec" or sign bits "binary")
+that is scanned instead of the float32 matrix; the top `k * rescore_factor` candidates are then
+rescored at full precision. With a persisted collection only the quantized copy has to stay hot.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+
+_VECTORS_FILE = "vectors.f32"
+_RECORDS_FILE = "records.jsonl"
+_DELETES_FILE = "deletes.jsonl"
+_COMPACT_RATIO = 0.5  # rewrite storage once half of the rows are dead
+_SUBSET_RATIO = 0.25  # below this selectivity, score only the filtered rows
+_SCAN_CHUNK = 65536  # rows per block when scanning a quantized copy (bounds temporaries)
+_HALF_CHUNK = 1024  # float16 rows converted per block; small blocks stay in cache
+QUANTIZATIONS = ("none", "halfvec", "binary")
+_POPCOUNT16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+def _hashable(value: Any) -> Any:
+	if isinstance(value, (list, dict)):
+		return json.dumps(value, sort_keys=True, default=str)
+	return value
+
+
+class _Column:
+	"""Metadata key stored as int32 codes (-1 = missing), so filters compare integers."""
+
+	def __init__(self, capacity: int):
+		self.codes = np.full(capacity, -1, dtype=np.int32)
+		self.lookup: Dict[Any, int] = {}
+
+	def code(self, value: Any, create: bool = False) -> Optional[int]:
+		key = _hashable(value)
+		c = self.lookup.get(key)
+		if c is None and create:
+			c = self.lookup[key] = len(self.lookup)
+		return c
+
+	def grow(self, capacity: int):
+		codes = np.full(capacity, -1, dtype=np.int32)
+		codes[: len(self.codes)] = self.codes
+		self.codes = codes
+
+
+class _HalfQuantizer:
+	"""
+	float16 copy of the rows: half the memory. NumPy has no fp16 BLAS, so blocks are converted to float32
+	before the product; this saves memory but scans slower than float32 (binary is the fast mode).
+	"""
+
+	mode = "halfvec"
+
+	def __init__(self, dim: int, capacity: int):
+		self.codes = np.zeros((capacity, dim), dtype=np.float16)
+
+	def grow(self, capacity: int):
+		codes = np.zeros((capacity, self.codes.shape[1]), dtype=np.float16)
+		codes[: len(self.codes)] = self.codes
+		self.codes = codes
+
+	def set(self, start: int, vectors: np.ndarray):
+		self.codes[start : start + len(vectors)] = vectors
+
+	def scores(self, q: np.ndarray, rows: Optional[np.ndarray], size: int) -> np.ndarray:
+		if rows is not None:
+			return self.codes[rows].astype(np.float32) @ q
+		out = np.empty(size, dtype=np.float32)
+		for i in range(0, size, _HALF_CHUNK):
+			out[i : i + _HALF_CHUNK] = self.codes[i : min(size, i + _HALF_CHUNK)].astype(np.float32) @ q
+		return out
+
+	def nbytes(self, size: int) -> int:
+		return size * self.codes.shape[1] * 2
+
+
+class _BinaryQuantizer:
+	"""One sign bit per dimension (32x smaller than float32); similarity estimated as 1 - 2 * hamming / dim."""
+
+	mode = "binary"
+
+	def __init__(self, dim: int, capacity: int):
+		self.dim = dim
+		self.width = -(-dim // 16) * 2  # bytes per row, padded so rows view as uint16
+		self.codes = np.zeros((capacity, self.width), dtype=np.uint8)
+
+	def grow(self, capacity: int):
+		codes = np.zeros((capacity, self.width), dtype=np.uint8)
+		codes[: len(self.codes)] = self.codes
+		self.codes = codes
+
+	def _pack(self, vectors: np.ndarray) -> np.ndarray:
+		packed = np.packbits(vectors > 0, axis=1)
+		return np.pad(packed, ((0, 0), (0, self.width - packed.shape[1])))
+
+	def set(self, start: int, vectors: np.ndarray):
+		self.codes[start : start + len(vectors)] = self._pack(vectors)
+
+	def scores(self, q: np.ndarray, rows: Optional[np.ndarray], size: int) -> np.ndarray:
+		qc = self._pack(q.reshape(1, -1)).view(np.uint16)
+		codes = self.codes[rows] if rows is not None else self.codes[:size]
+		out = np.empty(len(codes), dtype=np.float32)
+		for i in range(0, len(codes), _SCAN_CHUNK):
+			block = codes[i : i + _SCAN_CHUNK].view(np.uint16)
+			out[i : i + len(block)] = _POPCOUNT16[block ^ qc].sum(axis=1, dtype=np.int32)
+		return 1.0 - 2.0 * out / self.dim
+
+	def nbytes(self, size: int) -> int:
+		return size * self.width
+
+
+_QUANTIZERS = {"halfvec": _HalfQuantizer, "binary": _BinaryQuantizer}
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+	"""Indices of the k highest scores, best first."""
+	top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+	return top[np.argsort(-scores[top], kind="stable")][:k]
+
+
+class NumpyCollection:
+	"""Rows of one collection. All methods are thread-safe."""
+
+	def __init__(self, name: str, path: Optional[str] = None):
+		self.name = name
+		self.path = os.path.join(path, name) if path else None
+		self.lock = threading.RLock()
+		self.dim: Optional[int] = None
+		self.size = 0  # rows in use, dead ones included
+		self.vectors = np.zeros((0, 0), dtype=np.float32)
+		self.alive = np.zeros(0, dtype=bool)
+		self.ids: List[str] = []
+		self.texts: List[str] = []
+		self.metadatas: List[Dict[str, Any]] = []
+		self.row_of: Dict[str, int] = {}
+		self.columns: Dict[str, _Column] = {}
+		self.quantization = "none"
+		self.rescore_factor = 10
+		self.quantizer: Optional[Any] = None
+		if self.path and os.path.exists(os.path.join(self.path, _RECORDS_FILE)):
+			self._load()
+
+	# --- writes -----------------------------------------------------------------------------
+
+	def upsert(self, ids: Sequence[str], vectors: np.ndarray, texts: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+		vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+		with self.lock:
+			if self.dim is None:
+				self.dim = vectors.shape[1]
+			elif vectors.shape[1] != self.dim:
+				raise ValueError(f"collection {self.name} has dimension {self.dim}, got {vectors.shape[1]}")
+			start = self.size
+			self._reserve(start + len(ids))
+			self.vectors[start : start + len(ids)] = vectors
+			if self.quantizer is not None:
+				self.quantizer.set(start, vectors)
+			for offset, (id_, text, meta) in enumerate(zip(ids, texts, metadatas)):
+				row = start + offset
+				old = self.row_of.get(id_)
+				if old is not None:
+					self.alive[old] = False
+				self.row_of[id_] = row
+				self.alive[row] = True
+				self.ids.append(id_)
+				self.texts.append(text)
+				self.metadatas.append(meta)
+				for key, value in meta.items():
+					col = self.columns.get(key)
+					if col is None:
+						col = self.columns[key] = _Column(len(self.alive))
+					col.codes[row] = col.code(value, create=True)
+			self.size = start + len(ids)
+			if self.path:
+				self._append_log(ids, vectors, texts, metadatas)
+
+	def delete(self, ids: Iterable[str]) -> int:
+		with self.lock:
+			removed = [i for i in ids if i in self.row_of]
+			for id_ in removed:
+				self.alive[self.row_of.pop(id_)] = False
+			if removed and self.path:
+				with open(os.path.join(self.path, _DELETES_FILE), "a", encoding="utf-8") as f:
+					f.write(json.dumps({"ids": removed, "before": self.size}) + "\n")
+			if self.size and (self.size - len(self.row_of)) / self.size > _COMPACT_RATIO:
+				self.compact()
+			return len(removed)
+
+	def compact(self):
+		"""Drop dead rows (and rewrite the on-disk log when persisted)."""
+		with self.lock:
+			rows = np.flatnonzero(self.alive[: self.size])
+			vectors = np.array(self.vectors[rows], dtype=np.float32)
+			ids = [self.ids[r] for r in rows]
+			texts = [self.texts[r] for r in rows]
+			metadatas = [self.metadatas[r] for r in rows]
+			self._reset()
+			path, self.path = self.path, None
+			if len(ids):
+				self.upsert(ids, vectors, texts, metadatas)
+			self.path = path
+			if self.path:
+				self._rewrite_files()
+
+	def quantize(self, mode: str, rescore_factor: int = 10):
+		"""Scan a quantized copy ("halfvec" or "binary") and rescore the top candidates; "none" drops it."""
+		if mode not in QUANTIZATIONS:
+			raise ValueError(f"unknown quantization: {mode}")
+		with self.lock:
+			self.rescore_factor = max(1, rescore_factor)
+			if mode == self.quantization and (mode == "none" or self.quantizer is not None or self.dim is None):
+				return
+			self.quantization = mode
+			self._build_quantizer()
+
+	# --- reads ------------------------------------------------------------------------------
+
+	def count(self, filter: Optional[Dict[str, Any]] = None) -> int:
+		with self.lock:
+			return int(self._mask(filter).sum()) if self.size else 0
+
+	def search(self, query: np.ndarray, k: int, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[int, float]]:
+		"""Top-k rows by cosine similarity among rows matching `filter`."""
+		q = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+		with self.lock:
+			if not self.size or k <= 0:
+				return []
+			mask = None
+			rows = None  # candidate rows when only a subset is scored
+			available = self.size
+			if filter or len(self.row_of) != self.size:
+				mask = self._mask(filter)
+				available = int(mask.sum())
+				if not available:
+					return []
+				if available < self.size * _SUBSET_RATIO:
+					rows = np.flatnonzero(mask)
+			k = min(k, available)
+			if self.quantizer is not None:
+				approx = self.quantizer.scores(q, rows, self.size)
+				if mask is not None and rows is None:
+					approx[~mask] = -np.inf
+				candidates = _top(approx, min(available, k * self.rescore_factor))
+				rows = rows[candidates] if rows is not None else candidates
+				scores = self.vectors[rows] @ q  # full-precision rescoring of the candidates only
+			elif rows is not None:
+				scores = self.vectors[rows] @ q
+			else:
+				scores = self.vectors[: self.size] @ q
+				if mask is not None:
+					scores[~mask] = -np.inf
+			top = _top(scores, k)
+			picked = rows[top] if rows is not None else top
+			return [(int(r), float(scores[t])) for r, t in zip(picked, top)]
+
+	def vector(self, row: int) -> np.ndarray:
+		return np.asarray(self.vectors[row])
+
+	def document(self, row: int) -> Document:
+		return Document(id=self.ids[row], page_content=self.texts[row], metadata=dict(self.metadatas[row]))
+
+	def _mask(self, filter: Optional[Dict[str, Any]]) -> np.ndarray:
+		alive = self.alive[: self.size]
+		return alive & self._eval(filter) if filter else alive.copy()
+
+	def _eval(self, flt: Dict[str, Any]) -> np.ndarray:
+		result = np.ones(self.size, dtype=bool)
+		for key, cond in flt.items():
+			if key == "$and":
+				for sub in cond:
+					result &= self._eval(sub)
+			elif key == "$or":
+				any_ = np.zeros(self.size, dtype=bool)
+				for sub in cond:
+					any_ |= self._eval(sub)
+				result &= any_
+			elif isinstance(cond, dict):
+				for op, value in cond.items():
+					result &= self._compare(key, op, value)
+			else:
+				result &= self._compare(key, "$eq", cond)
+		return result
+
+	def _compare(self, key: str, op: str, value: Any) -> np.ndarray:
+		col = self.columns.get(key)
+		codes = col.codes[: self.size] if col is not None else np.full(self.size, -1, dtype=np.int32)
+		if op in ("$eq", "$ne"):
+			c = col.code(value) if col is not None else None
+			hit = codes == c if c is not None else np.zeros(self.size, dtype=bool)
+			return hit if op == "$eq" else ~hit
+		if op in ("$in", "$nin"):
+			wanted = [c for c in ((col.code(v) if col is not None else None) for v in value) if c is not None]
+			hit = np.isin(codes, wanted)
+			return hit if op == "$in" else ~hit
+		if op == "$exists":
+			return (codes >= 0) == bool(value)
+		raise ValueError(f"unsupported filter operator: {op}")
+
+	# --- storage ----------------------------------------------------------------------------
+
+	def _reset(self):
+		self.dim = None
+		self.size = 0
+		self.vectors = np.zeros((0, 0), dtype=np.float32)
+		self.alive = np.zeros(0, dtype=bool)
+		self.ids, self.texts, self.metadatas = [], [], []
+		self.row_of, self.columns = {}, {}
+		self.quantizer = None
+
+	def _build_quantizer(self):
+		self.quantizer = None
+		if self.quantization == "none" or self.dim is None:
+			return
+		quantizer = _QUANTIZERS[self.quantization](self.dim, len(self.alive))
+		for i in range(0, self.size, _SCAN_CHUNK):
+			quantizer.set(i, np.asarray(self.vectors[i : min(self.size, i + _SCAN_CHUNK)]))
+		self.quantizer = quantizer
+
+	def _reserve(self, rows: int):
+		capacity = len(self.alive)
+		if rows <= capacity and self.vectors.flags.writeable:
+			return
+		capacity = max(rows, capacity * 2, 1024) if rows > capacity else capacity
+		vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+		if self.size:
+			vectors[: self.size] = self.vectors[: self.size]  # also copies a read-only memmap into RAM
+		self.vectors = vectors
+		alive = np.zeros(capacity, dtype=bool)
+		alive[: self.size] = self.alive[: self.size]
+		self.alive = alive
+		for col in self.columns.values():
+			col.grow(capacity)
+		if self.quantizer is not None:
+			self.quantizer.grow(capacity)
+		elif self.quantization != "none":
+			self._build_quantizer()
+
+	def _append_log(self, ids, vectors: np.ndarray, texts, metadatas):
+		os.makedirs(self.path, exist_ok=True)
+		with open(os.path.join(self.path, _VECTORS_FILE), "ab") as f:
+			f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+		with open(os.path.join(self.path, _RECORDS_FILE), "a", encoding="utf-8") as f:
+			for id_, text, meta in zip(ids, texts, metadatas):
+				f.write(json.dumps({"id": id_, "text": text, "metadata": meta, "dim": self.dim}, ensure_ascii=False, default=str) + "\n")
+
+	def _rewrite_files(self):
+		os.makedirs(self.path, exist_ok=True)
+		for name in (_VECTORS_FILE, _RECORDS_FILE, _DELETES_FILE):
+			try:
+				os.remove(os.path.join(self.path, name))
+			except FileNotFoundError:
+				pass
+		if self.size:
+			self._append_log(self.ids, np.asarray(self.vectors[: self.size]), self.texts, self.metadatas)
+
+	def _load(self):
+		with open(os.path.join(self.path, _RECORDS_FILE), encoding="utf-8") as f:
+			records = [json.loads(line) for line in f if line.strip()]
+		if not records:
+			return
+		self.dim = int(records[0]["dim"])
+		n = len(records)
+		vectors = np.memmap(os.path.join(self.path, _VECTORS_FILE), dtype=np.float32, mode="r", shape=(n, self.dim))
+		self.vectors = vectors  # read-only until the first write copies it into RAM
+		self.alive = np.zeros(n, dtype=bool)
+		self.size = n
+		for row, rec in enumerate(records):
+			old = self.row_of.get(rec["id"])
+			if old is not None:
+				self.alive[old] = False
+			self.row_of[rec["id"]] = row
+			self.alive[row] = True
+			self.ids.append(rec["id"])
+			self.texts.append(rec["text"])
+			self.metadatas.append(rec["metadata"])
+			for key, value in rec["metadata"].items():
+				col = self.columns.get(key)
+				if col is None:
+					col = self.columns[key] = _Column(n)
+				col.codes[row] = col.code(value, create=True)
+		deletes = os.path.join(self.path, _DELETES_FILE)
+		if os.path.exists(deletes):
+			with open(deletes, encoding="utf-8") as f:
+				for line in f:
+					if not line.strip():
+						continue
+					entry = json.loads(line)
+					for id_ in entry["ids"]:
+						row = self.row_of.get(id_)
+						if row is not None and row < entry["before"]:
+							self.alive[row] = False
+							del self.row_of[id_]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+	norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+	norms[norms == 0] = 1.0
+	return vectors / norms
+
+
+_collections: Dict[Tuple[Optional[str], str], NumpyCollection] = {}
+_collections_lock = threading.Lock()
+
+
+def get_collection(name: str, path: Optional[str] = None, quantization: Optional[str] = None, rescore_factor: int = 10) -> NumpyCollection:
+	"""Process-wide collection, so every store instance for the same name sees the same rows."""
+	key = (os.path.abspath(path) if path else None, name)
+	with _collections_lock:
+		col = _collections.get(key)
+		if col is None:
+			col = _collections[key] = NumpyCollection(name, path)
+	if quantization is not None:
+		col.quantize(quantization, rescore_factor)
+	return col
+
+
+def drop_collection(name: str, path: Optional[str] = None):
+	"""Forget a collection and remove its files."""
+	key = (os.path.abspath(path) if path else None, name)
+	with _collections_lock:
+		col = _collections.pop(key, None)
+	if col is not None:
+		with col.lock:
+			col._reset()
+	if path:
+		shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def list_collections(path: Optional[str] = None, prefix: str = "") -> List[str]:
+	"""Names of the collections loaded in this process or persisted under `path`."""
+	root = os.path.abspath(path) if path else None
+	with _collections_lock:
+		names = {name for key_path, name in _collections if key_path == root}
+	if root and os.path.isdir(root):
+		names.update(d for d in os.listdir(root) if os.path.exists(os.path.join(root, d, _RECORDS_FILE)))
+	return sorted(n for n in names if n.startswith(prefix))
+
+
+class NumpyVectorStore(VectorStore):
+	"""LangChain VectorStore over a NumpyCollection. Filters use the PGVector operator syntax ($eq, $ne, $in, $nin, $and, $or)."""
+
+	def __init__(self, embeddings: Embeddings, collection_name: str = "default", path: Optional[str] = None, quantization: Optional[str] = None, rescore_factor: int = 10):
+		self._embeddings = embeddings
+		self.collection_name = collection_name
+		self.collection = get_collection(collection_name, path, quantization, rescore_factor)
+
+	@property
+	def embeddings(self) -> Embeddings:
+		return self._embeddings
+
+	def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+		texts = list(texts)
+		if not texts:
+			return []
+		return self.add_embeddings(texts, self._embeddings.embed_documents(texts), metadatas, ids)
+
+	def add_embeddings(self, texts: Sequence[str], embeddings: Sequence[Sequence[float]], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None) -> List[str]:
+		ids = [str(i) for i in ids] if ids else [str(uuid.uuid4()) for _ in texts]
+		metadatas = metadatas or [{} for _ in texts]
+		self.collection.upsert(ids, np.asarray(embeddings, dtype=np.float32), list(texts), [dict(m or {}) for m in metadatas])
+		return ids
+
+	def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+		if ids is None and any(d.id for d in documents):
+			ids = [d.id or str(uuid.uuid4()) for d in documents]
+		return self.add_texts([d.page_content for d in documents], [d.metadata for d in documents], ids=ids)
+
+	def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+		if ids:
+			self.collection.delete(ids)
+		return True
+
+	def get_by_ids(self, ids: Sequence[str]) -> List[Document]:
+		with self.collection.lock:
+			return [self.collection.document(self.collection.row_of[i]) for i in ids if i in self.collection.row_of]
+
+	def count(self, filter: Optional[Dict[str, Any]] = None) -> int:
+		return self.collection.count(filter)
+
+	def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+		# Scores are cosine distances (lower is closer), as with PGVector.
+		with self.collection.lock:
+			return [(self.collection.document(row), 1.0 - sim) for row, sim in self.collection.search(np.asarray(embedding), k, filter)]
+
+	def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+		return self.similarity_search_with_score_by_vector(self._embeddings.embed_query(query), k=k, filter=filter)
+
+	def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+		return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)]
+
+	def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Document]:
+		return self.similarity_search_by_vector(self._embeddings.embed_query(query), k=k, filter=filter)
+
+	def _select_relevance_score_fn(self) -> Callable[[float], float]:
+		return self._cosine_relevance_score_fn
+
+	def max_marginal_relevance_search_by_vector(
+		self, embedding: List[float], k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+	) -> List[Document]:
+		with self.collection.lock:
+			hits = self.collection.search(np.asarray(embedding), fetch_k, filter)
+			if not hits:
+				return []
+			candidates = np.stack([self.collection.vector(row) for row, _ in hits])
+			picked = maximal_marginal_relevance(np.asarray(embedding, dtype=np.float32), candidates, lambda_mult=lambda_mult, k=k)
+			return [self.collection.document(hits[i][0]) for i in picked]
+
+	def max_marginal_relevance_search(
+		self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+	) -> List[Document]:
+		return self.max_marginal_relevance_search_by_vector(self._embeddings.embed_query(query), k, fetch_k, lambda_mult, filter)
+
+	@classmethod
+	def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None, **kwargs: Any) -> "NumpyVectorStore":
+		store = cls(embedding, collection_name=kwargs.get("collection_name", "default"), path=kwargs.get("path"))
+		store.add_texts(texts, metadatas, ids=ids)
+		return store
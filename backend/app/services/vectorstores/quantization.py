@@ -0,0 +1,124 @@
+"""
+Reduced-precision search for large collections (VECTOR_QUANTIZATION = halfvec | binary).
+
+pgvector: the table keeps full-precision vectors; a partial HNSW expression index per collection over
+`embedding::halfvec(dim)` (half the size) or `binary_quantize(embedding)::bit(dim)` (1/32) selects the
+top `k * VECTOR_RESCORE_FACTOR` candidates, which are rescored with the exact cosine distance.
+numpy: the collection scans an in-RAM quantized copy and rescores from the float32 rows.
+
+`migrate_collection` builds (or drops, with mode "none") the index for an existing collection.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from sqlalchemy import text
+
+from app.config import get_settings
+from .numpy_store import QUANTIZATIONS, get_collection
+from .registry import PGVector, get_pg_engine, vector_backend
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def quantization_mode() -> str:
+	mode = (settings.VECTOR_QUANTIZATION or "none").lower()
+	if mode not in QUANTIZATIONS:
+		raise ValueError(f"unknown VECTOR_QUANTIZATION: {settings.VECTOR_QUANTIZATION}")
+	return mode
+
+
+def approx_distance_sql(mode: str, dim: int, column: str = "e.embedding", query: str = ":q") -> str:
+	"""ORDER BY expression that matches the quantized index for `mode` (dim is inlined: it is a type modifier)."""
+	dim = int(dim)
+	if mode == "halfvec":
+		return f"{column}::halfvec({dim}) <=> CAST({query} AS halfvec({dim}))"
+	if mode == "binary":
+		return f"binary_quantize({column})::bit({dim}) <~> binary_quantize(CAST({query} AS vector))::bit({dim})"
+	raise ValueError(f"no quantized distance for mode {mode}")
+
+
+def index_name(collection_id: Any, mode: str) -> str:
+	return f"langchain_pg_embedding_{mode}_{str(collection_id).replace('-', '')[:16]}"
+
+
+def index_sql(mode: str, dim: int, name: str, collection_id: Any) -> str:
+	"""Partial HNSW index for one collection; mode "none" indexes the full-precision vectors."""
+	dim = int(dim)
+	if mode == "none":
+		expr, ops = f"(embedding::vector({dim}))", "vector_cosine_ops"
+	elif mode == "halfvec":
+		expr, ops = f"(embedding::halfvec({dim}))", "halfvec_cosine_ops"
+	else:
+		expr, ops = f"(binary_quantize(embedding)::bit({dim}))", "bit_hamming_ops"
+	# collection_id comes from langchain_pg_collection (a uuid), not from user input
+	return (
+		f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON langchain_pg_embedding "
+		f"USING hnsw ({expr} {ops}) WHERE collection_id = '{collection_id}'"
+	)
+
+
+def migrate_collection(collection_name: str, mode: str) -> Dict[str, Any]:
+	"""Build the quantized index for `mode` on an existing collection and drop the other one."""
+	if mode not in QUANTIZATIONS:
+		raise ValueError(f"unknown quantization: {mode}")
+	started = time.perf_counter()
+	if vector_backend() == "numpy":
+		collection = get_collection(collection_name, settings.VECTOR_STORE_PATH, mode, settings.VECTOR_RESCORE_FACTOR)
+		with collection.lock:
+			size = collection.size
+			quantized = collection.quantizer.nbytes(size) if collection.quantizer is not None else 0
+			return {
+				"collection": collection_name,
+				"mode": mode,
+				"dim": collection.dim,
+				"rows": len(collection.row_of),
+				"full_bytes": size * (collection.dim or 0) * 4,
+				"quantized_bytes": quantized,
+				"seconds": round(time.perf_counter() - started, 3),
+			}
+
+	with get_pg_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+		row = conn.execute(text("SELECT uuid FROM langchain_pg_collection WHERE name = :name"), {"name": collection_name}).fetchone()
+		if row is None:
+			raise ValueError(f"collection {collection_name} does not exist")
+		cid = row[0]
+		dim = conn.execute(
+			text("SELECT vector_dims(embedding) FROM langchain_pg_embedding WHERE collection_id = :cid LIMIT 1"), {"cid": cid}
+		).scalar()
+		if dim is None:
+			raise ValueError(f"collection {collection_name} is empty")
+		for other in QUANTIZATIONS[1:]:
+			if other != mode:
+				conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(cid, other)}"))
+		result = {"collection": collection_name, "mode": mode, "dim": int(dim), "index": None, "index_bytes": 0}
+		if mode != "none":
+			name = index_name(cid, mode)
+			conn.execute(text(index_sql(mode, dim, name, cid)))
+			result["index"] = name
+			result["index_bytes"] = int(conn.execute(text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": name}).scalar() or 0)
+		result["rows"] = int(conn.execute(text("SELECT COUNT(*) FROM langchain_pg_embedding WHERE collection_id = :cid"), {"cid": cid}).scalar() or 0)
+	result["seconds"] = round(time.perf_counter() - started, 3)
+	logger.info("quantized index for %s: %s", collection_name, result)
+	return result
+
+
+if PGVector is not None:
+
+	class QuantizedPGVector(PGVector):
+		"""PGVector whose similarity search goes through the quantized candidate scan + exact rescoring."""
+
+		def similarity_search_with_score_by_vector(
+			self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+		) -> List[Tuple[Document, float]]:
+			from .search import search  # search imports this module's helpers
+
+			# cosine distance (lower is closer), as PGVector reports it
+			return [(doc, 1.0 - sim) for doc, sim in search(self.collection_name, embedding, k=k, filter=filter)]
+
+else:
+	QuantizedPGVector = None  # type: ignore
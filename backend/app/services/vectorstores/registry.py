@@ -0,0 +1,65 @@
+from typing import Any, Optional
+from sqlalchemy import create_engine
+from app.config import get_settings
+from app.persistence import db as db_module
+from app.services.llm.provider import PROVIDER_FIELDS, get_embedding_model
+from .numpy_store import NumpyVectorStore
+
+# Optional imports guarded
+try:
+	from langchain_postgres import PGVector
+except Exception:
+	PGVector = None  # type: ignore
+
+
+settings = get_settings()
+
+BACKENDS = ("pgvector", "numpy")
+# settings a built store depends on (embedding provider + backend); holders drop their stores on reload
+STORE_FIELDS = (*PROVIDER_FIELDS, "VECTOR_")
+_engine = None
+
+
+def vector_backend() -> str:
+	backend = (settings.VECTOR_BACKEND or "pgvector").lower()
+	if backend not in BACKENDS:
+		raise ValueError(f"unknown VECTOR_BACKEND: {settings.VECTOR_BACKEND}")
+	return backend
+
+
+def get_vector_store(collection_name: str, embeddings: Any = None) -> Optional[Any]:
+	"""
+	Vector store for `collection_name` on the configured backend (VECTOR_BACKEND):
+	pgvector (default, needs DATABASE_URL) or numpy (in-process, persisted under VECTOR_STORE_PATH when set),
+	searched through a quantized copy when VECTOR_QUANTIZATION is set.
+	Returns None when the backend is not available.
+	"""
+	if vector_backend() == "numpy":
+		return NumpyVectorStore(
+			embeddings or get_embedding_model(),
+			collection_name=collection_name,
+			path=settings.VECTOR_STORE_PATH,
+			quantization=settings.VECTOR_QUANTIZATION,
+			rescore_factor=settings.VECTOR_RESCORE_FACTOR,
+		)
+	if PGVector is None or not settings.DATABASE_URL:
+		return None
+	store_cls = PGVector
+	if (settings.VECTOR_QUANTIZATION or "none").lower() != "none":
+		from .quantization import QuantizedPGVector  # quantization imports this module
+
+		store_cls = QuantizedPGVector
+	return store_cls(embeddings or get_embedding_model(), connection=settings.DATABASE_URL, collection_name=collection_name)
+
+
+def get_pg_engine():
+	"""SQLAlchemy engine for direct pgvector queries: the app engine when it is Postgres, else one for DATABASE_URL."""
+	global _engine
+	engine = db_module.get_engine()
+	if engine is not None and engine.dialect.name == "postgresql":
+		return engine
+	if _engine is None:
+		if not settings.DATABASE_URL:
+			raise RuntimeError("DATABASE_URL not configured")
+		_engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+	return _engine
@@ -0,0 +1,222 @@
+"""
+Vector search with candidate selection pushed down to the backend and MMR computed in NumPy.
+
+pgvector: one SQL statement (collection join + JSONB metadata filter + ORDER BY cosine distance +
+LIMIT fetch_k) that returns only id, document, metadata and similarity, and the embedding only when
+MMR needs it. numpy: `NumpyCollection.search` over the in-process matrix. Either way MMR runs once
+over the returned candidate matrix instead of re-embedding or refetching documents. With
+VECTOR_QUANTIZATION set, candidates come from the quantized index and are rescored exactly
+(see quantization.py).
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from sqlalchemy import text
+
+from app.config import get_settings
+from .numpy_store import get_collection
+from .quantization import approx_distance_sql, quantization_mode
+from .registry import get_pg_engine, vector_backend
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_FETCH_K = 20
+MAX_FETCH_K = 200
+# Marginal cost of one extra candidate (ms): row + vector transfer for pgvector, a matvec row for numpy.
+_CANDIDATE_COST_MS = {"pgvector": 0.05, "numpy": 0.002}
+_OVERHEAD_ALPHA = 0.2  # EWMA weight for the observed fixed cost per search
+
+_overhead_ms: Dict[str, float] = {}
+_overhead_lock = threading.Lock()
+
+
+def fetch_k_for(k: int, fetch_k: Optional[int] = None, latency_budget_ms: Optional[float] = None, backend: Optional[str] = None) -> int:
+	"""
+	Candidates to pull for a top-`k` search. Without a budget this is `fetch_k` (default 20, at least k);
+	with one, it is capped to what fits after the fixed per-search cost observed so far.
+	"""
+	wanted = max(k, min(fetch_k or DEFAULT_FETCH_K, MAX_FETCH_K))
+	if latency_budget_ms is None:
+		return wanted
+	backend = backend or vector_backend()
+	spare = latency_budget_ms - _overhead_ms.get(backend, 0.0)
+	affordable = k + int(max(0.0, spare) / _CANDIDATE_COST_MS[backend])
+	return max(k, min(wanted, affordable))
+
+
+def _observe(backend: str, elapsed_ms: float, fetched: int):
+	fixed = max(0.0, elapsed_ms - fetched * _CANDIDATE_COST_MS[backend])
+	with _overhead_lock:
+		prev = _overhead_ms.get(backend)
+		_overhead_ms[backend] = fixed if prev is None else (1 - _OVERHEAD_ALPHA) * prev + _OVERHEAD_ALPHA * fixed
+
+
+def mmr_select(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = 0.5, similarities: Optional[np.ndarray] = None) -> List[int]:
+	"""
+	Greedy maximal marginal relevance over a candidate matrix. The candidate-candidate similarity matrix
+	is computed once and the running max-similarity to the picked set is updated per pick, so the loop
+	is O(k * n) vector ops instead of recomputing similarities each round.
+	"""
+	n = len(candidates)
+	if n == 0 or k <= 0:
+		return []
+	vecs = np.asarray(candidates, dtype=np.float32)
+	norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+	vecs = vecs / np.where(norms == 0, 1.0, norms)
+	if similarities is None:
+		q = np.asarray(query, dtype=np.float32).ravel()
+		similarities = vecs @ (q / (np.linalg.norm(q) or 1.0))
+	relevance = np.asarray(similarities, dtype=np.float32)
+	pairwise = vecs @ vecs.T
+	picked = [int(np.argmax(relevance))]
+	redundancy = pairwise[picked[0]].copy()
+	available = np.ones(n, dtype=bool)
+	available[picked[0]] = False
+	while len(picked) < min(k, n):
+		scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+		scores[~available] = -np.inf
+		best = int(np.argmax(scores))
+		picked.append(best)
+		available[best] = False
+		np.maximum(redundancy, pairwise[best], out=redundancy)
+	return picked
+
+
+def search(
+	collection_name: str,
+	query_vector: List[float],
+	k: int = 5,
+	filter: Optional[Dict[str, Any]] = None,
+	mmr: bool = False,
+	fetch_k: Optional[int] = None,
+	lambda_mult: float = 0.5,
+	latency_budget_ms: Optional[float] = None,
+) -> List[Tuple[Document, float]]:
+	"""Top-`k` (document, cosine similarity) pairs; with `mmr`, diversified from `fetch_k` candidates."""
+	backend = vector_backend()
+	limit = fetch_k_for(k, fetch_k, latency_budget_ms, backend) if mmr else k
+	started = time.perf_counter()
+	if backend == "numpy":
+		docs, sims, vecs = _numpy_candidates(collection_name, query_vector, limit, filter, with_vectors=mmr)
+	else:
+		docs, sims, vecs = _pg_candidates(collection_name, query_vector, limit, filter, with_vectors=mmr)
+	_observe(backend, (time.perf_counter() - started) * 1000, limit)
+	if not docs:
+		return []
+	order = mmr_select(np.asarray(query_vector), vecs, k, lambda_mult, sims) if mmr else range(min(k, len(docs)))
+	return [(docs[i], float(sims[i])) for i in order]
+
+
+def _numpy_candidates(collection_name: str, query_vector: List[float], limit: int, filter: Optional[Dict[str, Any]], with_vectors: bool):
+	collection = get_collection(collection_name, settings.VECTOR_STORE_PATH, quantization_mode(), settings.VECTOR_RESCORE_FACTOR)
+	with collection.lock:
+		hits = collection.search(np.asarray(query_vector), limit, filter)
+		docs = [collection.document(row) for row, _ in hits]
+		vecs = np.stack([collection.vector(row) for row, _ in hits]) if with_vectors and hits else None
+	return docs, np.array([s for _, s in hits], dtype=np.float32), vecs
+
+
+def _pg_candidates(collection_name: str, query_vector: List[float], limit: int, filter: Optional[Dict[str, Any]], with_vectors: bool):
+	where, params = compile_filter(filter)
+	params.update({"collection": collection_name, "q": _vector_literal(query_vector), "limit": limit})
+	exact = "e.embedding <=> CAST(:q AS vector)"
+	mode = quantization_mode()
+	with get_pg_engine().connect() as conn:
+		if mode == "none":
+			sql = (
+				f"SELECT e.id, e.document, e.cmetadata, 1 - ({exact}) AS similarity"
+				+ (", e.embedding::text AS embedding" if with_vectors else "")
+				+ " FROM langchain_pg_embedding e JOIN langchain_pg_collection c ON c.uuid = e.collection_id"
+				+ " WHERE c.name = :collection"
+				+ (f" AND {where}" if where else "")
+				+ f" ORDER BY {exact} LIMIT :limit"
+			)
+		else:
+			# The quantized HNSW index is partial on collection_id, so filter on the id itself; it picks
+			# limit * factor candidates and only those are rescored at full precision.
+			cid = conn.execute(text("SELECT uuid FROM langchain_pg_collection WHERE name = :collection"), params).scalar()
+			if cid is None:
+				return [], np.zeros(0, dtype=np.float32), None
+			params.update({"cid": cid, "candidates": limit * max(1, settings.VECTOR_RESCORE_FACTOR)})
+			conn.execute(text(f"SET LOCAL hnsw.ef_search = {min(1000, max(40, params['candidates']))}"))
+			sql = (
+				"WITH candidates AS (SELECT e.id, e.document, e.cmetadata, e.embedding FROM langchain_pg_embedding e"
+				" WHERE e.collection_id = :cid" + (f" AND {where}" if where else "")
+				+ f" ORDER BY {approx_distance_sql(mode, len(query_vector))} LIMIT :candidates)"
+				f" SELECT e.id, e.document, e.cmetadata, 1 - ({exact}) AS similarity"
+				+ (", e.embedding::text AS embedding" if with_vectors else "")
+				+ f" FROM candidates e ORDER BY {exact} LIMIT :limit"
+			)
+		rows = conn.execute(text(sql), params).fetchall()
+	docs = [Document(id=str(r.id), page_content=r.document or "", metadata=r.cmetadata or {}) for r in rows]
+	sims = np.array([r.similarity for r in rows], dtype=np.float32)
+	vecs = np.stack([_parse_vector(r.embedding) for r in rows]) if with_vectors and rows else None
+	return docs, sims, vecs
+
+
+def _vector_literal(vector: List[float]) -> str:
+	return "[" + ",".join(repr(float(x)) for x in vector) + "]"
+
+
+def _parse_vector(value: Any) -> np.ndarray:
+	if isinstance(value, str):
+		return np.array(value.strip("[]").split(","), dtype=np.float32)
+	return np.asarray(value, dtype=np.float32)
+
+
+def compile_filter(flt: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+	"""
+	Translate a PGVector-style metadata filter ({"key": value}, $eq/$ne/$in/$nin/$exists, $and/$or)
+	into a SQL condition on `e.cmetadata`. Equality uses JSONB containment so a GIN index applies.
+	"""
+	params: Dict[str, Any] = {}
+	if not flt:
+		return "", params
+	return _compile(flt, params), params
+
+
+def _param(params: Dict[str, Any], value: Any) -> str:
+	name = f"f{len(params)}"
+	params[name] = value
+	return f":{name}"
+
+
+def _compile(flt: Dict[str, Any], params: Dict[str, Any]) -> str:
+	parts = []
+	for key, cond in flt.items():
+		if key in ("$and", "$or"):
+			joiner = " AND " if key == "$and" else " OR "
+			parts.append("(" + joiner.join(_compile(sub, params) for sub in cond) + ")")
+			continue
+		if not isinstance(cond, dict):
+			cond = {"$eq": cond}
+		for op, value in cond.items():
+			parts.append(_compare(key, op, value, params))
+	return " AND ".join(parts) if parts else "TRUE"
+
+
+def _contains(key: str, value: Any, params: Dict[str, Any]) -> str:
+	return f"e.cmetadata @> CAST({_param(params, json.dumps({key: value}))} AS jsonb)"
+
+
+def _compare(key: str, op: str, value: Any, params: Dict[str, Any]) -> str:
+	if op == "$eq":
+		return _contains(key, value, params)
+	if op == "$ne":
+		return f"NOT ({_contains(key, value, params)})"
+	if op in ("$in", "$nin"):
+		if not value:
+			return "FALSE" if op == "$in" else "TRUE"
+		any_of = "(" + " OR ".join(_contains(key, v, params) for v in value) + ")"
+		return any_of if op == "$in" else f"NOT {any_of}"
+	if op == "$exists":
+		return f"(e.cmetadata -> {_param(params, key)}) IS {'NOT ' if value else ''}NULL"
+	raise ValueError(f"unsupported filter operator: {op}")
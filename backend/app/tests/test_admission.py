@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services import admission
+from app.services.admission import AdmissionController, Overloaded
+from app.services.channels.inbox import InboundMessage, SessionInbox
+from app.services.conversation import run_conversation
+
+
+def test_waiters_are_admitted_in_order_and_shed_when_full_or_late():
+	controller = AdmissionController("test", limit=1, queue_size=1)
+	controller.acquire(timeout=0)
+	admitted = threading.Event()
+	waiter = threading.Thread(target=lambda: (controller.acquire(timeout=5), admitted.set()))
+	waiter.start()
+	while not controller.stats()["waiting"]:
+		threading.Event().wait(0.01)
+
+	with pytest.raises(Overloaded) as shed:
+		controller.acquire(timeout=5)
+	assert shed.value.reason == "queue_full"
+
+	controller.release()
+	waiter.join()
+	assert admitted.is_set() and controller.stats() == {"backend": "test", "limit": 1, "active": 1, "waiting": 0}
+
+	with pytest.raises(Overloaded) as shed:
+		controller.acquire(timeout=0.05)
+	assert shed.value.reason == "timeout"
+	assert controller.stats()["waiting"] == 0
+	assert admission.ADMISSION_REJECTED.value(backend="test", reason="timeout") >= 1
+
+
+def test_shed_turn_gets_cached_or_busy_answer(monkeypatch):
+	controller = AdmissionController("saturated", limit=1, queue_size=0)
+	monkeypatch.setattr(admission, "turn_backend", lambda: "saturated")
+	monkeypatch.setitem(admission._controllers, "saturated", controller)
+	controller.acquire(timeout=0)
+	try:
+		busy = run_conversation(session_id="s-adm", message="Good morning, what are your opening hours?", channel="web", user_meta={})
+		assert busy["degraded"] == "busy" and busy["assistant_response"] == admission.BUSY_MESSAGES["en"]
+
+		admission.remember_answer("what are your opening hours", {"current_task": "General_Inquiry", "assistant_response": "9 to 5."})
+		admission.remember_answer("where is my order 12345", {"current_task": "Order_Status", "assistant_response": "Shipped."})
+		with_history = [{"type": "human", "content": "I am Budi, budi@example.com"}, {"type": "human", "content": "do you ship abroad?"}]
+		admission.remember_answer("do you ship abroad?", {"current_task": "General_Inquiry", "assistant_response": "Yes Budi.", "conversation_history": with_history})
+		admission.remember_answer("how do I contact you", {"current_task": "General_Inquiry", "assistant_response": "Mail cs@example.com."})
+		cached = run_conversation(session_id="s-adm", message="What are your opening hours?", channel="web", user_meta={})
+		assert cached["degraded"] == "cached" and cached["assistant_response"] == "9 to 5."
+		assert run_conversation(session_id="s-adm", message="Where is my order 12345", channel="web", user_meta={})["degraded"] == "busy"
+		assert run_conversation(session_id="s-adm", message="Do you ship abroad?", channel="web", user_meta={})["degraded"] == "busy"
+		contact = run_conversation(session_id="s-adm", message="How do I contact you?", channel="web", user_meta={})["assistant_response"]
+		assert "cs@example.com" not in contact
+
+		with pytest.raises(Overloaded):
+			run_conversation(session_id="s-adm", message="any news on my refund?", channel="telegram", user_meta={}, degrade=False)
+	finally:
+		controller.release()
+		admission.reset_admission()
+
+
+def test_inbox_defers_shed_turns():
+	attempts = []
+
+	async def handler(m):
+		attempts.append((m.text, m.deferrals))
+		if m.deferrals < 2:
+			raise Overloaded("test", "timeout")
+
+	async def main():
+		inbox = SessionInbox(handler, workers=1, dedupe_ttl=60, coalesce_window=0, defer_delay=0.01)
+		inbox.enqueue(InboundMessage(channel="telegram", session_id="d", chat_id="d", text="hello", message_id="d-1"))
+		while len(attempts) < 3:
+			await asyncio.sleep(0.01)
+		await inbox.aclose()
+
+	asyncio.run(main())
+	assert attempts == [("hello", 0), ("hello", 1), ("hello", 2)]
+
+
+def test_deferred_turn_keeps_its_place_ahead_of_newer_messages():
+	processed = []
+	shed = []
+
+	async def handler(m):
+		if m.text == "first" and not shed:
+			shed.append(m.text)
+			raise Overloaded("test", "timeout")
+		processed.append(m.text)
+
+	async def main():
+		inbox = SessionInbox(handler, workers=2, dedupe_ttl=60, coalesce_window=0, defer_delay=0.05)
+		inbox.enqueue(InboundMessage(channel="telegram", session_id="o", chat_id="o", text="first", message_id="o-1"))
+		while not shed:
+			await asyncio.sleep(0.005)
+		inbox.enqueue(InboundMessage(channel="telegram", session_id="o", chat_id="o", text="second", message_id="o-2"))
+		assert inbox.stats()["depth"] == 2  # the deferred message still counts against max_pending
+		while len(processed) < 2:
+			await asyncio.sleep(0.01)
+		await inbox.aclose()
+
+	asyncio.run(main())
+	assert processed == ["first", "second"]
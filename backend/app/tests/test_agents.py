@@ -1,10 +1,16 @@
 from app.services.langgraph.agent_react import (
+    REACT_RULES,
+    _react_prompt,
     make_order_status_agent,
     make_product_reco_agent,
     make_general_qa_agent,
     make_handover_agent,
+    prompt_report,
 )
 
+# Estimated tokens of each agent's first ReAct prompt (before: 500-700 with the full tool docstrings)
+PROMPT_TOKEN_BUDGET = {"order_status": 380, "product_reco": 340, "general_qa": 350, "handover": 330}
+
 
 def test_agents_constructible():
     a1 = make_order_status_agent()
@@ -27,6 +33,15 @@ def test_agents_have_min_two_tools():
     print("✅ test_agents_have_min_two_tools passed")
 
 
+def test_agent_prompts_fit_budget_and_share_prefix():
+    rows = {row["agent"]: row for row in prompt_report(exact=False)}
+    assert set(rows) == set(PROMPT_TOKEN_BUDGET)
+    for name, row in rows.items():
+        assert row["total_tokens"] <= PROMPT_TOKEN_BUDGET[name], row
+    system = _react_prompt("role").messages[0].prompt.template
+    assert system.startswith(REACT_RULES) and "{input}" not in system and "{agent_scratchpad}" not in system
+
+
 if __name__ == "__main__":
     try:
         test_agents_constructible()
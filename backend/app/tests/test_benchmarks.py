@@ -0,0 +1,36 @@
+from benchmarks.pipeline import compare, run_benchmark
+
+
+def test_offline_pipeline_benchmark_runs():
+	result = run_benchmark(mode="pipeline", concurrency=2, repeat=1, warmup=0)
+	assert result["errors"] == 0
+	assert result["turns"] == 24
+	assert result["latency_ms"]["p50"] <= result["latency_ms"]["p95"] <= result["latency_ms"]["p99"]
+	# agent turns take router + ReAct action + final answer; small talk and order ids with a status question skip the agent
+	assert 2 <= result["llm_calls_per_turn"] < 4
+	assert result["db_queries_per_turn"] > 0
+	assert "graph" in result["stage_mean_ms"]
+	assert len(compare(result, result)) == 6
+
+
+def test_model_profile_mix_benchmark_splits_calls_by_tier():
+	from benchmarks.model_profiles import run_mix
+
+	tiers = {
+		"local": {"latency_ms": 0.0, "usd_per_m_in": 0.0, "usd_per_m_out": 0.0},
+		"cloud": {"latency_ms": 0.0, "usd_per_m_in": 1.0, "usd_per_m_out": 1.0},
+	}
+	cloud, tiered = run_mix("all-cloud", tiers, concurrency=2), run_mix("tiered", tiers, concurrency=2)
+	assert cloud["errors"] == tiered["errors"] == 0
+	assert set(cloud["calls_per_turn"]) == {"cloud"} and tiered["calls_per_turn"]["local"] >= 1
+	assert 0 < tiered["usd_per_1k_turns"] < cloud["usd_per_1k_turns"]
+
+
+def test_order_status_fast_path_saves_llm_calls():
+	from benchmarks.order_status import run_comparison
+
+	result = run_comparison(concurrency=2, llm_latency_ms=0.0)
+	assert result["agent"]["errors"] == result["fast_path"]["errors"] == 0
+	assert result["agent"]["turns"] == result["fast_path"]["turns"] == 5
+	assert result["fast_path"]["llm_calls_per_turn"] == 1.0  # the router only
+	assert result["savings"]["llm_calls_per_turn"] >= 2
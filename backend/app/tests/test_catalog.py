@@ -0,0 +1,81 @@
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.persistence import db as db_module
+from app.persistence.models import Product
+from app.services.ecommerce import catalog
+from app.services.ecommerce.mock import MockEcommerce
+
+
+class _Feed(MockEcommerce):
+	def __init__(self, products):
+		self.products = products
+
+	def iter_products(self, updated_since=None):
+		for p in self.products:
+			if updated_since is None or p["updated_at"] > updated_since:
+				yield dict(p)
+
+
+def _use_sqlite(monkeypatch):
+	engine = create_engine("sqlite://")
+	Product.__table__.create(engine)
+	monkeypatch.setattr(db_module, "_SessionLocal", sessionmaker(bind=engine))
+	monkeypatch.setattr(catalog, "_get_product_vectorstore", lambda: None)
+
+
+def _product(pid, title, ts):
+	return {"id": pid, "title": title, "description": "", "url": f"https://shop/{pid}", "price": "10", "updated_at": ts}
+
+
+def test_full_and_incremental_sync(monkeypatch):
+	_use_sqlite(monkeypatch)
+	feed = _Feed([_product("1", "Blue Casual Shirt", datetime(2024, 1, 1)), _product("2", "Black Slim Jeans", datetime(2024, 1, 2))])
+	sync = catalog.CatalogSync(adapter=feed)
+
+	stats = sync.full_sync()
+	assert stats["upserted"] == 2 and stats["deleted"] == 0
+	assert sync.high_watermark() == datetime(2024, 1, 2)
+
+	feed.products.append(_product("3", "White Canvas Sneakers", datetime(2024, 1, 3)))
+	stats = sync.incremental_sync()
+	assert stats["mode"] == "incremental" and stats["upserted"] == 1
+
+	feed.products = feed.products[1:]
+	assert sync.full_sync()["deleted"] == 1
+
+
+def test_search_is_typo_tolerant_and_falls_back_when_empty(monkeypatch):
+	_use_sqlite(monkeypatch)
+	feed = _Feed([_product("1", "Blue Casual Shirt", datetime(2024, 1, 1)), _product("2", "Black Slim Jeans", datetime(2024, 1, 2))])
+	assert catalog.search_catalog("shirt", adapter=feed) is None
+
+	catalog.CatalogSync(adapter=feed).full_sync()
+	items = catalog.search_catalog("blue shrit", adapter=feed)
+	assert [i["id"] for i in items] == ["1"]
+	assert catalog.search_catalog("laptop", adapter=feed) == []
+
+
+def test_webhook_and_manual_sync_are_closed_without_credentials(monkeypatch):
+	import base64
+	import hashlib
+	import hmac
+	from fastapi.testclient import TestClient
+
+	from app.api import catalog as catalog_api
+	from app.main import app
+
+	client = TestClient(app)
+	body = b'{"id": ""}'
+	monkeypatch.setattr(catalog_api.settings, "CATALOG_WEBHOOK_SECRET", None)
+	assert client.post("/api/catalog/webhook", content=body).status_code == 503
+	monkeypatch.setattr(catalog_api.settings, "CATALOG_WEBHOOK_SECRET", "hook")
+	assert client.post("/api/catalog/webhook", content=body).status_code == 401
+	signature = base64.b64encode(hmac.new(b"hook", body, hashlib.sha256).digest()).decode()
+	assert client.post("/api/catalog/webhook", content=body, headers={"X-Shopify-Hmac-Sha256": signature}).json() == {"ok": True}
+
+	monkeypatch.setattr(catalog_api.settings, "ADMIN_TOKEN", None)
+	assert client.post("/api/catalog/sync").status_code == 403
+	monkeypatch.setattr(catalog_api.settings, "ADMIN_TOKEN", "s3cret")
+	assert client.post("/api/catalog/sync", headers={"X-Admin-Token": "nope"}).status_code == 401
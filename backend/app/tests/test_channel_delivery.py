@@ -0,0 +1,77 @@
+import asyncio
+import json
+import httpx
+import pytest
+
+from app.services.channels.delivery import ChannelSender, DeliveryError, TelegramSender, DELIVERY_RETRIES
+
+
+class _MockProvider:
+	"""Stands in for the Telegram Bot API: throttles the first call, rejects chat 'blocked'."""
+
+	def __init__(self):
+		self.received = []
+		self.calls = 0
+
+	def __call__(self, request: httpx.Request) -> httpx.Response:
+		self.calls += 1
+		body = json.loads(request.content)
+		if self.calls == 1:
+			return httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 0}})
+		if body["chat_id"] == "blocked":
+			return httpx.Response(403, json={"ok": False, "description": "bot was blocked"})
+		self.received.append((body["chat_id"], body["text"]))
+		return httpx.Response(200, json={"ok": True})
+
+
+def _sender(provider, monkeypatch):
+	from app.services.channels import delivery
+	monkeypatch.setattr(delivery.settings, "TELEGRAM_BOT_TOKEN", "t")
+	return TelegramSender(transport=httpx.MockTransport(provider), rate_per_sec=1000, chat_rate_per_sec=1000, backoff_seconds=0)
+
+
+def test_retries_and_preserves_per_chat_order(monkeypatch):
+	provider = _MockProvider()
+
+	async def main():
+		sender = _sender(provider, monkeypatch)
+		futures = []
+		for i in range(5):
+			futures += sender.submit("a", f"a{i}")
+			futures += sender.submit("b", f"b{i}")
+		await asyncio.gather(*futures)
+		await sender.aclose()
+
+	retries_before = DELIVERY_RETRIES.value(provider="telegram")
+	asyncio.run(main())
+	assert [t for c, t in provider.received if c == "a"] == [f"a{i}" for i in range(5)]
+	assert [t for c, t in provider.received if c == "b"] == [f"b{i}" for i in range(5)]
+	assert DELIVERY_RETRIES.value(provider="telegram") == retries_before + 1
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+	provider = _MockProvider()
+	provider.calls = 1  # skip the initial throttle
+
+	async def main():
+		sender = _sender(provider, monkeypatch)
+		try:
+			await sender.send("blocked", "hi")
+		finally:
+			await sender.aclose()
+
+	with pytest.raises(DeliveryError) as exc:
+		asyncio.run(main())
+	assert exc.value.status_code == 403
+	assert provider.calls == 2
+
+
+def test_sender_without_build_request_cannot_be_created():
+	class Incomplete(ChannelSender):
+		provider = "incomplete"
+
+	async def main():
+		Incomplete("https://example.invalid")
+
+	with pytest.raises(TypeError):
+		asyncio.run(main())
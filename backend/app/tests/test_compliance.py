@@ -21,5 +21,10 @@ def test_require_consent_blocks_when_false():
 		assert e.status_code == 403
 
 
-def test_request_pii_deletion_returns_true():
-	assert request_pii_deletion("user-1") is True
\ No newline at end of file
+def test_request_pii_deletion_returns_true(monkeypatch):
+	from app.services import retention
+
+	scheduled = []
+	monkeypatch.setattr(retention, "schedule_erasure", lambda session_id: scheduled.append(session_id) or True)
+	assert request_pii_deletion("session-1") is True
+	assert scheduled == ["session-1"]
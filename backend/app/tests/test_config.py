@@ -0,0 +1,45 @@
+from app.config import get_settings, on_settings_reload, reload_settings
+from app.services.langgraph import agent_react
+from app.services.llm import provider
+
+
+def test_settings_are_loaded_once_and_reloaded_in_place(monkeypatch):
+	settings = get_settings()
+	assert get_settings() is settings
+	calls = []
+	monkeypatch.setattr("app.config._listeners", [])
+	on_settings_reload(lambda: calls.append("model"), "OLLAMA_")
+	on_settings_reload(lambda: calls.append("any"))
+
+	monkeypatch.setenv("OLLAMA_MODEL", "test-model")
+	try:
+		assert reload_settings() == {"OLLAMA_MODEL"}
+		assert get_settings() is settings and settings.OLLAMA_MODEL == "test-model"
+		assert calls == ["model", "any"]
+		assert reload_settings() == set() and calls == ["model", "any"]
+	finally:
+		monkeypatch.undo()
+		reload_settings()
+	assert settings.OLLAMA_MODEL != "test-model"
+
+
+def test_models_and_agents_are_rebuilt_after_a_provider_change(monkeypatch):
+	built = []
+	provider.set_model_factories(chat=lambda temperature=0.0, task=None: built.append(temperature) or object())
+	try:
+		model = provider.get_chat_model(temperature=0.0)
+		assert provider.get_chat_model(temperature=0.0) is model and built == [0.0]
+		generation = provider.generation
+		monkeypatch.setenv("OLLAMA_BASE_URL", "http://ollama.internal:11434")
+		reload_settings()
+		assert provider.generation == generation + 1
+		assert provider.get_chat_model(temperature=0.0) is not model and built == [0.0, 0.0]
+	finally:
+		provider.set_model_factories()
+		monkeypatch.undo()
+		reload_settings()
+
+	agent = agent_react.make_handover_agent()
+	assert agent_react.make_handover_agent() is agent
+	provider.reset_models()
+	assert agent_react.make_handover_agent() is not agent
@@ -6,4 +6,11 @@ def test_health():
 	client = TestClient(app)
 	resp = client.get("/health")
 	assert resp.status_code == 200
-	assert resp.json()["status"] == "ok"
\ No newline at end of file
+	assert resp.json()["status"] == "ok"
+
+
+def test_metrics_exposition():
+	client = TestClient(app)
+	resp = client.get("/metrics")
+	assert resp.status_code == 200
+	assert "# TYPE channel_delivery_seconds histogram" in resp.text
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.channels import inbox as inbox_module
+from app.services.channels.inbox import InboundMessage, InboxFull, SessionInbox
+
+
+def _msg(session, text, mid):
+	return InboundMessage(channel="telegram", session_id=session, chat_id=session, text=text, message_id=mid)
+
+
+def test_turns_are_serial_per_session_and_parallel_across_sessions():
+	processed = []
+	active = {}
+
+	async def handler(m):
+		assert not active.get(m.session_id), "two turns of one session overlapped"
+		active[m.session_id] = True
+		await asyncio.sleep(0.05)
+		processed.append((m.session_id, m.text))
+		active[m.session_id] = False
+
+	async def main():
+		inbox = SessionInbox(handler, workers=4, dedupe_ttl=60, coalesce_window=0)
+		started = time.monotonic()
+		for i in range(3):
+			for s in ("a", "b", "c"):
+				inbox.enqueue(_msg(s, f"{s}{i}", f"{s}-{i}"))
+		assert inbox.enqueue(_msg("a", "a0", "a-0")) is False  # provider redelivery
+		while inbox.stats()["depth"] or len(processed) < 9:
+			await asyncio.sleep(0.01)
+		await inbox.aclose()
+		return time.monotonic() - started
+
+	elapsed = asyncio.run(main())
+	for s in ("a", "b", "c"):
+		assert [t for sid, t in processed if sid == s] == [f"{s}0", f"{s}1", f"{s}2"]
+	assert elapsed < 0.05 * 9  # sessions overlapped
+
+
+def test_burst_is_answered_as_one_turn():
+	turns = []
+
+	async def handler(m):
+		turns.append((m.text, m.coalesced))
+
+	async def main():
+		inbox = SessionInbox(handler, workers=2, dedupe_ttl=60, coalesce_window=0.05, coalesce_max_wait=1.0)
+		for i, text in enumerate(["halo", "mau tanya", "pesanan saya 12345 kok belum sampai"]):
+			inbox.enqueue(_msg("a", text, f"a-{i}"))
+			await asyncio.sleep(0.01)
+		inbox.enqueue(_msg("b", "terima kasih", "b-0"))
+		await asyncio.sleep(0.2)
+		await inbox.aclose()
+
+	asyncio.run(main())
+	assert sorted(turns) == [("halo\nmau tanya\npesanan saya 12345 kok belum sampai", 3), ("terima kasih", 1)]
+
+
+def test_telegram_webhook_acks_and_dedupes(monkeypatch):
+	handled = []
+
+	async def handler(m):
+		handled.append(m.text)
+
+	monkeypatch.setattr(inbox_module, "handle_message", handler)
+	monkeypatch.setattr(inbox_module, "_inbox", None)
+	monkeypatch.setattr(inbox_module.settings, "INBOUND_COALESCE_WINDOW_MS", 0)
+	update = {"update_id": 42, "message": {"message_id": 1, "chat": {"id": 7}, "text": "halo"}}
+	with TestClient(app) as client:
+		first = client.post("/api/telegram/webhook", json=update)
+		second = client.post("/api/telegram/webhook", json=update)
+		for _ in range(100):
+			if handled:
+				break
+			time.sleep(0.01)
+	assert first.json() == {"ok": True, "queued": True}
+	assert second.json() == {"ok": True, "queued": False}
+	assert handled == ["halo"]
+
+
+def test_rejected_message_is_processed_when_redelivered():
+	processed = []
+
+	async def main():
+		gate = asyncio.Event()
+
+		async def handler(m):
+			await gate.wait()
+			processed.append(m.text)
+
+		inbox = SessionInbox(handler, workers=1, max_pending=1, dedupe_ttl=60, coalesce_window=0)
+		inbox.enqueue(_msg("a", "first", "a-0"))
+		with pytest.raises(InboxFull):
+			inbox.enqueue(_msg("b", "second", "b-0"))
+		gate.set()
+		while inbox.stats()["depth"] or len(processed) < 1:
+			await asyncio.sleep(0.01)
+		assert inbox.enqueue(_msg("b", "second", "b-0")) is True  # the provider's redelivery
+		while len(processed) < 2:
+			await asyncio.sleep(0.01)
+		await inbox.aclose()
+
+	asyncio.run(main())
+	assert processed == ["first", "second"]
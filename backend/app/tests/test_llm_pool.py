@@ -0,0 +1,184 @@
+import threading
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langsmith.utils import get_env_var
+
+from app.services.llm import pool as pool_module
+from app.services.llm import provider
+from app.config import ModelProfile
+from app.services.llm.pool import CircuitBreaker, ModelPool, ModelSpec, ProviderUnavailable
+
+
+class FakeProvider(BaseChatModel):
+	reply: str = "ok"
+	fail: bool = False
+	gate: Any = None  # threading.Event the call waits for
+	calls: List[str] = []
+
+	@property
+	def _llm_type(self) -> str:
+		return "fake-provider"
+
+	def _generate(self, messages, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+		self.calls.append(self.reply)
+		if self.gate is not None:
+			self.gate.wait(5)
+		if self.fail:
+			raise ConnectionError(f"{self.reply} is down")
+		return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+	def _stream(self, messages, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs):
+		if self.fail:
+			raise ConnectionError(f"{self.reply} is down")
+		for word in self.reply.split():
+			yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+@pytest.fixture(autouse=True)
+def no_tracing(monkeypatch):
+	# app.main turns LangSmith tracing on; these calls must not try to ship runs
+	monkeypatch.setenv("LANGCHAIN_TRACING_V2", "false")
+	get_env_var.cache_clear()
+	yield
+	monkeypatch.undo()
+	get_env_var.cache_clear()
+
+
+def _pool(models, limits=None, **kwargs):
+	return ModelPool({name: (lambda spec, m=m: m) for name, m in models.items()}, limits=limits or {}, acquire_timeout=0, **kwargs)
+
+
+def _specs(*names):
+	return [ModelSpec(name, "", 0.0) for name in names]
+
+
+def test_fails_over_and_opens_the_breaker():
+	down, up = FakeProvider(reply="down", fail=True, calls=[]), FakeProvider(reply="up", calls=[])
+	pool = _pool({"down": down, "up": up}, breaker_failures=2, breaker_reset_seconds=60)
+	model = pool.chat_model(_specs("down", "up"))
+
+	assert [model.invoke("hi").content for _ in range(4)] == ["up"] * 4
+	assert len(down.calls) == 2  # skipped once its breaker opened
+	assert pool.breaker("down", "").state == "open"
+	assert pool_module.PROVIDER_CALLS.value(provider="down", result="open") >= 2
+
+
+def test_breaker_half_opens_after_the_reset_time():
+	now = [0.0]
+	breaker = CircuitBreaker(failures=1, reset_seconds=10, clock=lambda: now[0])
+	breaker.record_failure()
+	assert not breaker.allow()
+	now[0] = 11
+	assert breaker.allow() and not breaker.allow()  # one trial at a time
+	breaker.record_failure()
+	assert breaker.state == "open"
+	now[0] = 22
+	assert breaker.allow()
+	breaker.record_success()
+	assert breaker.state == "closed" and breaker.allow()
+
+
+def test_saturated_provider_is_skipped():
+	gate = threading.Event()
+	slow, spare = FakeProvider(reply="slow", gate=gate, calls=[]), FakeProvider(reply="spare", calls=[])
+	model = _pool({"slow": slow, "spare": spare}, limits={"slow": 1}).chat_model(_specs("slow", "spare"))
+	first = threading.Thread(target=model.invoke, args=("hi",))
+	first.start()
+	try:
+		while not slow.calls:
+			threading.Event().wait(0.01)
+		assert model.invoke("hi").content == "spare"
+	finally:
+		gate.set()
+		first.join()
+	assert model.invoke("hi").content == "slow"
+
+
+def test_busy_provider_does_not_use_up_the_half_open_trial():
+	gate = threading.Event()
+	now = [0.0]
+	flaky, spare = FakeProvider(reply="flaky", gate=gate, calls=[]), FakeProvider(reply="spare", calls=[])
+	pool = _pool({"flaky": flaky, "spare": spare}, limits={"flaky": 1}, breaker_failures=1, breaker_reset_seconds=10)
+	breaker = pool.breaker("flaky", "")
+	breaker._clock = lambda: now[0]
+	breaker.record_failure()
+	now[0] = 11  # half-open
+	model = pool.chat_model(_specs("flaky", "spare"))
+	holder = pool.chat_model([ModelSpec("flaky", "other", 0.0)])  # another model of the provider takes its only slot
+	first = threading.Thread(target=holder.invoke, args=("hi",))
+	first.start()
+	try:
+		while not flaky.calls:
+			threading.Event().wait(0.01)
+		assert model.invoke("hi").content == "spare"
+	finally:
+		gate.set()
+		first.join()
+	flaky.gate = None
+	assert model.invoke("hi").content == "flaky"
+	assert breaker.state == "closed"
+
+
+def test_stream_fails_over_before_the_first_chunk():
+	model = _pool({"a": FakeProvider(reply="a", fail=True), "b": FakeProvider(reply="hello there")}).chat_model(_specs("a", "b"))
+	assert "".join(chunk.content for chunk in model.stream("hi")) == "hello there "
+	with pytest.raises(ProviderUnavailable):
+		_pool({"a": FakeProvider(reply="a", fail=True)}).chat_model(_specs("a")).invoke("hi")
+
+
+def test_closed_stream_gives_its_slot_back():
+	pool = _pool({"a": FakeProvider(reply="one two three")}, limits={"a": 1})
+	model = pool.chat_model(_specs("a"))
+	for _ in range(2):
+		stream = model._stream([])
+		assert next(stream).message.content == "one "
+		stream.close()  # the client stops reading after the first chunk
+	assert "".join(chunk.content for chunk in model.stream("hi")) == "one two three "
+	assert pool.breaker("a", "").state == "closed"
+
+
+def test_get_chat_model_reuses_clients_per_spec(monkeypatch):
+	built = []
+
+	def build(spec):
+		built.append(spec)
+		return FakeProvider(reply=f"{spec.model}@{spec.temperature}")
+
+	monkeypatch.setattr(provider._settings, "LLM_PROVIDERS", "fake:2")
+	monkeypatch.setitem(provider.PROVIDERS, "fake", build)
+	provider.reset_models()
+	try:
+		assert provider.get_chat_model(0.0).invoke("hi").content == "@0.0"
+		assert provider.get_chat_model(0.0) is provider.get_chat_model(0.0)
+		provider.get_chat_model(0.2)
+		assert built == [ModelSpec("fake", "", 0.0), ModelSpec("fake", "", 0.2)]
+		assert provider.provider_chain() == [("fake", 2)]
+	finally:
+		monkeypatch.undo()
+		provider.reset_models()
+
+
+def test_task_profiles_pick_model_chain_and_limits(monkeypatch):
+	built = []
+	monkeypatch.setattr(provider._settings, "LLM_PROVIDERS", "cloud")
+	monkeypatch.setattr(provider._settings, "LLM_ROUTER_PROFILE", ModelProfile(providers="local/tiny,*", temperature=0.0, max_tokens=16, timeout=5))
+	monkeypatch.setattr(provider._settings, "LLM_AGENT_PROFILE", ModelProfile(providers="cloud/strong", max_tokens=800))
+	monkeypatch.setitem(provider.PROVIDERS, "local", lambda spec: built.append(spec) or FakeProvider(reply="local", fail=True))
+	monkeypatch.setitem(provider.PROVIDERS, "cloud", lambda spec: built.append(spec) or FakeProvider(reply=spec.model or "cloud"))
+	provider.reset_models()
+	try:
+		# local model is down: the router falls back to the main chain
+		assert provider.get_chat_model(0.7, task="router").invoke("hi").content == "cloud"
+		assert provider.get_chat_model(0.2, task="agent").invoke("hi").content == "strong"
+		assert built == [
+			ModelSpec("local", "tiny", 0.0, 16, 5.0),
+			ModelSpec("cloud", "", 0.0, 16, 5.0),
+			ModelSpec("cloud", "strong", 0.2, 800, None),
+		]
+	finally:
+		monkeypatch.undo()
+		provider.reset_models()
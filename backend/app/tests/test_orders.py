@@ -0,0 +1,30 @@
+from app.services.ecommerce import orders
+from app.services.ecommerce.orders import extract_order_ids, is_ambiguous_order_query, render_order_status
+
+
+class _Store:
+	def __init__(self):
+		self.calls = 0
+
+	def get_order_status(self, order_id):
+		self.calls += 1
+		return {"order_id": order_id, "fulfillment_status": "fulfilled", "financial_status": "paid"}
+
+
+def test_extracts_ids_and_flags_requests_beyond_status():
+	assert extract_order_ids("Pesanan #1234567, bukan 1234567 atau 123") == ["1234567"]
+	assert extract_order_ids("order 12345 and 678901") == ["12345", "678901"]
+	assert not is_ambiguous_order_query("Paket 4445556 statusnya masih dikemas, kapan dikirim?")
+	assert is_ambiguous_order_query("Saya mau refund order 1234567")
+
+
+def test_lookups_are_cached_and_rendered_per_locale(monkeypatch):
+	monkeypatch.setattr(orders, "_cache", orders.OrderStatusCache(max_entries=10, ttl=60))
+	store = _Store()
+	status = orders.get_order_status("1234567", adapter=store)
+	assert orders.get_order_status("1234567", adapter=store) == status and store.calls == 1
+	assert render_order_status("1234567", status, "id") == "Pesanan #1234567 sudah dikirim. Ada lagi yang bisa saya bantu?"
+	assert render_order_status("1234567", {"status": "in_transit", "eta": "tomorrow"}, "en-US") == (
+		"Your order #1234567 is in transit. Estimated arrival: tomorrow. Is there anything else I can help with?"
+	)
+	assert render_order_status("1", {"status": "unknown"}, "en").startswith("Sorry, we could not find the status of order #1.")
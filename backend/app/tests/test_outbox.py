@@ -0,0 +1,100 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.persistence import db as db_module
+from app.persistence.models import Conversation, Message, NotificationOutbox
+from app.persistence.repositories import ConversationRepository
+from app.services.notifications import email_service, outbox
+
+
+class _FakeSMTP:
+	connections = 0
+	sent = []
+	fail_next = 0
+
+	def __init__(self, host, port, timeout=None):
+		_FakeSMTP.connections += 1
+
+	def starttls(self):
+		pass
+
+	def login(self, user, password):
+		pass
+
+	def noop(self):
+		return (250, b"ok")
+
+	def sendmail(self, from_addr, to_addrs, msg):
+		if _FakeSMTP.fail_next:
+			_FakeSMTP.fail_next -= 1
+			raise RuntimeError("451 try later")
+		_FakeSMTP.sent.append(msg)
+
+	def quit(self):
+		pass
+
+
+def _setup(monkeypatch):
+	engine = create_engine("sqlite://")
+	for model in (Conversation, Message, NotificationOutbox):
+		model.__table__.create(engine)
+	monkeypatch.setattr(db_module, "_SessionLocal", sessionmaker(bind=engine))
+	monkeypatch.setattr(email_service.settings, "SMTP_HOST", "localhost")
+	monkeypatch.setattr(email_service.settings, "SUPPORT_EMAIL_TO", "support@example.com")
+	monkeypatch.setattr(email_service.settings, "TELEGRAM_BOT_TOKEN", None)
+	_FakeSMTP.connections, _FakeSMTP.sent, _FakeSMTP.fail_next = 0, [], 0
+	return engine
+
+
+def test_handover_is_queued_once_and_sent_over_one_connection(monkeypatch):
+	engine = _setup(monkeypatch)
+	repo = ConversationRepository()
+	convs = [repo.get_or_create_conversation(f"s{i}", "web", {}) for i in range(3)]
+	for conv in convs:
+		repo.add_message(conv.id, "user", "saya mau komplain")
+		with outbox.handover_scope(conv.id, "turn-1"):
+			outbox.request_notification("email", body="agent note")  # tool call inside the agent
+		repo.add_message(conv.id, "assistant", "Mohon tunggu", notifications=outbox.handover_notifications(conv.id, turn_id="turn-1"))
+
+	with engine.connect() as conn:
+		assert len(conn.execute(select(NotificationOutbox.id)).all()) == 3
+
+	dispatcher = outbox.OutboxDispatcher(mailer=email_service.SupportMailer(smtp_factory=_FakeSMTP))
+	assert dispatcher.run_once() == {"sent": 3, "retried": 0, "failed": 0}
+	assert _FakeSMTP.connections == 1
+	assert "User: saya mau komplain" in _FakeSMTP.sent[0]
+	assert dispatcher.run_once()["sent"] == 0
+
+
+def test_each_handover_of_a_conversation_is_notified(monkeypatch):
+	engine = _setup(monkeypatch)
+	repo = ConversationRepository()
+	conv = repo.get_or_create_conversation("telegram:7", "telegram", {})
+	for turn in ("turn-1", "turn-2"):
+		repo.add_message(conv.id, "user", "saya mau komplain")
+		repo.add_message(conv.id, "assistant", "Mohon tunggu", notifications=outbox.handover_notifications(conv.id, turn_id=turn))
+	for _ in range(2):
+		outbox.request_notification("email", subject="Restock", body="same body")  # outside a turn: once per window
+
+	with engine.connect() as conn:
+		keys = conn.execute(select(NotificationOutbox.dedupe_key)).scalars().all()
+	assert len([k for k in keys if k.startswith(f"handover:{conv.id}:")]) == 2
+	assert len([k for k in keys if k.startswith("adhoc:")]) == 1
+
+
+def test_failed_send_is_retried_with_backoff(monkeypatch):
+	engine = _setup(monkeypatch)
+	repo = ConversationRepository()
+	conv = repo.get_or_create_conversation("s1", "web", {})
+	repo.add_message(conv.id, "assistant", "Mohon tunggu", notifications=outbox.handover_notifications(conv.id))
+
+	_FakeSMTP.fail_next = 1
+	dispatcher = outbox.OutboxDispatcher(mailer=email_service.SupportMailer(smtp_factory=_FakeSMTP))
+	assert dispatcher.run_once()["retried"] == 1
+	assert dispatcher.run_once()["sent"] == 0  # backoff not elapsed yet
+
+	with engine.begin() as conn:
+		row = conn.execute(select(NotificationOutbox)).one()
+		assert row.status == "pending" and row.attempts == 1 and row.last_error
+		conn.execute(NotificationOutbox.__table__.update().values(next_attempt_at=row.created_at))
+	assert dispatcher.run_once()["sent"] == 1
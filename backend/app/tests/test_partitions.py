@@ -0,0 +1,50 @@
+import time
+from datetime import date, datetime
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import app.services.vectorstores.registry as registry
+from app.persistence import partitions
+from app.services import retention
+from app.services.memory import vector_memory
+from app.services.vectorstores import numpy_store
+
+
+def test_monthly_partition_ddl_and_expiry():
+	table = partitions.MESSAGE_TABLE
+	assert partitions.add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+	assert partitions.partition_sql(table, date(2026, 12, 1)) == (
+		f"CREATE TABLE IF NOT EXISTS {table}_p202612 PARTITION OF {table} FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+	)
+	assert "PRIMARY KEY (id, created_at)" in partitions.partitioned_table_sql()
+	assert "nextval('seq')" in partitions.partitioned_table_sql(sequence="seq")
+	names = [f"{table}_p202607", f"{table}_p202608", f"{table}_p202609", f"{table}_default"]
+	assert partitions.expired_partitions(table, names, datetime(2026, 9, 15)) == [f"{table}_p202607", f"{table}_p202608"]
+
+
+def test_memory_goes_to_monthly_collections_and_old_months_are_dropped(monkeypatch):
+	monkeypatch.setattr(registry.settings, "VECTOR_BACKEND", "numpy")
+	monkeypatch.setattr(retention.settings, "VECTOR_STORE_PATH", None)
+	monkeypatch.setattr(vector_memory._settings, "MEMORY_MONTHLY_COLLECTIONS", True)
+	monkeypatch.setattr(vector_memory, "_memstores", {})
+	monkeypatch.setattr(registry, "get_embedding_model", lambda: DeterministicFakeEmbedding(size=16))
+	monkeypatch.setattr(vector_memory, "detect_language", lambda text: "en")
+	base = f"{vector_memory._settings.DB_SCHEMA}_memory"
+	current, previous = vector_memory.recent_collections(2)
+	old = f"{base}_200001"
+	try:
+		vector_memory.add_memory("s1", "user", "my order is late")
+		assert vector_memory.memory_collection() == current
+		vector_memory._get_memstore(previous).add_texts(["last month"], metadatas=[{"session_id": "s1", "ts": int(time.time())}])
+		vector_memory._get_memstore(old).add_texts(["long ago"], metadatas=[{"session_id": "s1", "ts": 946684800}])
+
+		docs = vector_memory.retrieve_memory("s1", "order", k=4)
+		assert sorted(d.page_content for d in docs) == ["last month", "my order is late"]
+
+		stats = retention.RetentionEngine(pause_seconds=0).purge_memory()
+		assert stats["memory_collections_dropped"] == 1
+		assert old not in numpy_store.list_collections(prefix=base)
+		assert {current, previous} <= set(numpy_store.list_collections(prefix=base))
+	finally:
+		for name in (current, previous, old):
+			numpy_store.drop_collection(name)
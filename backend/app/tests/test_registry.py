@@ -1,29 +1,40 @@
-import importlib
-import os
-import types
-
-
-def test_registry_default_is_mock(monkeypatch):
-	# Ensure env is clean
-	for key in [
-		"SHOPIFY_STORE_DOMAIN","SHOPIFY_ACCESS_TOKEN",
-		"WOO_BASE_URL","WOO_CONSUMER_KEY","WOO_CONSUMER_SECRET",
-		"SHOPEE_PARTNER_ID","SHOPEE_PARTNER_KEY","SHOPEE_SHOP_ID","SHOPEE_BASE_URL",
-		"TOKO_CLIENT_ID","TOKO_CLIENT_SECRET","TOKO_MERCHANT_ID","TOKO_BASE_URL",
-	]:
+import pytest
+
+from app.config import reload_settings
+from app.services.ecommerce import registry
+
+
+STORE_ENV = [
+	"SHOPIFY_STORE_DOMAIN","SHOPIFY_ACCESS_TOKEN",
+	"WOO_BASE_URL","WOO_CONSUMER_KEY","WOO_CONSUMER_SECRET",
+	"SHOPEE_PARTNER_ID","SHOPEE_PARTNER_KEY","SHOPEE_SHOP_ID","SHOPEE_BASE_URL",
+	"TOKO_CLIENT_ID","TOKO_CLIENT_SECRET","TOKO_MERCHANT_ID","TOKO_BASE_URL",
+]
+
+
+@pytest.fixture
+def env(monkeypatch):
+	# Ensure env is clean; settings are cached, so reload them before and after the test
+	for key in STORE_ENV:
 		monkeypatch.delenv(key, raising=False)
+	reload_settings()
+	yield monkeypatch
+	monkeypatch.undo()
+	reload_settings()
+
 
-	reg = importlib.import_module("app.services.ecommerce.registry")
-	importlib.reload(reg)
-	provider = reg.get_active_ecommerce()
+def test_registry_default_is_mock(env):
+	provider = registry.get_active_ecommerce()
 	assert provider.__class__.__name__ == "MockEcommerce"
 
 
-def test_registry_shopify_when_env_set(monkeypatch):
-	monkeypatch.setenv("SHOPIFY_STORE_DOMAIN", "example.myshopify.com")
-	monkeypatch.setenv("SHOPIFY_ACCESS_TOKEN", "dummy")
-	reg = importlib.import_module("app.services.ecommerce.registry")
-	importlib.reload(reg)
-	provider = reg.get_active_ecommerce()
+def test_registry_shopify_when_env_set(env):
+	assert registry.get_active_ecommerce().__class__.__name__ == "MockEcommerce"
+	env.setenv("SHOPIFY_STORE_DOMAIN", "example.myshopify.com")
+	env.setenv("SHOPIFY_ACCESS_TOKEN", "dummy")
+	assert reload_settings() == {"SHOPIFY_STORE_DOMAIN", "SHOPIFY_ACCESS_TOKEN"}
+	provider = registry.get_active_ecommerce()
 	assert provider.__class__.__name__ in {"ShopifyAdapter", "MockEcommerce"}
-	# If import works, should be ShopifyAdapter; if not available in env, fallback is MockEcommerce.
\ No newline at end of file
+	# If import works, should be ShopifyAdapter; if not available in env, fallback is MockEcommerce.
+	if registry.ShopifyAdapter is not None:
+		assert provider.__class__.__name__ == "ShopifyAdapter"
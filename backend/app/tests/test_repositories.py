@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.services.conversation as conversation_module
+from app.persistence import db as db_module
+from app.persistence.models import Conversation, Message, NotificationOutbox
+from app.persistence.repositories import ConversationRepository
+from app.services import session_cache
+
+
+class _Graph:
+	def invoke(self, graph_input, config=None):
+		return {"assistant_response": f"echo {len(graph_input['conversation_history'])}", "handoff_to_human": False}
+
+
+def _setup(monkeypatch):
+	engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+	for model in (Conversation, Message, NotificationOutbox):
+		model.__table__.create(engine)
+	monkeypatch.setattr(db_module, "_SessionLocal", sessionmaker(bind=engine))
+	statements = []
+	event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, params, context, many: statements.append(sql))
+	return engine, statements
+
+
+def test_turn_uses_a_bounded_number_of_statements(monkeypatch):
+	engine, statements = _setup(monkeypatch)
+	monkeypatch.setattr(conversation_module, "_repo", ConversationRepository())
+	monkeypatch.setattr(session_cache, "_cache", session_cache.SessionCache())
+	monkeypatch.setattr(conversation_module, "_graph", _Graph())
+	monkeypatch.setattr(conversation_module, "add_memory", lambda **kw: None)
+	monkeypatch.setattr(conversation_module, "retrieve_memory", lambda **kw: [])
+	monkeypatch.setattr(conversation_module, "detect_language", lambda text: "id")
+	monkeypatch.setattr(conversation_module, "translate_to_language", lambda text, target_lang, callbacks=None: text)
+
+	first = conversation_module.run_conversation("s1", "halo, mau tanya", "web", {})
+	# new conversation: one upsert, one history select, one insert for both messages
+	assert first["assistant_response"] == "echo 1"
+	assert len(statements) == 3
+	statements.clear()
+
+	second = conversation_module.run_conversation("s1", "pesanan saya?", "web", {})
+	assert second["assistant_response"] == "echo 3"
+	# warm session cache: no reads from the conversation tables, one insert for both messages
+	assert len(statements) == 1 and statements[0].lstrip().upper().startswith("INSERT")
+
+	session_cache._cache.invalidate("s1")
+	statements.clear()
+	third = conversation_module.run_conversation("s1", "terima kasih infonya", "web", {})
+	assert third["assistant_response"] == "echo 5"
+	assert len(statements) <= 3
+
+	repo = ConversationRepository()
+	assert repo.get_transcript(1).splitlines()[:4] == ["User: halo, mau tanya", "Assistant: echo 1", "User: pesanan saya?", "Assistant: echo 3"]
+
+
+def test_failed_turn_still_persists_the_user_message(monkeypatch):
+	_setup(monkeypatch)
+	monkeypatch.setattr(conversation_module, "_repo", ConversationRepository())
+	monkeypatch.setattr(session_cache, "_cache", session_cache.SessionCache())
+	monkeypatch.setattr(conversation_module, "_graph", _Graph())
+	monkeypatch.setattr(conversation_module, "add_memory", lambda **kw: None)
+	monkeypatch.setattr(conversation_module, "retrieve_memory", lambda **kw: [])
+	monkeypatch.setattr(conversation_module, "detect_language", lambda text: "id")
+	conversation_module.run_conversation("s-fail", "halo, mau tanya", "web", {})
+
+	def broken(text, target_lang, callbacks=None):
+		raise RuntimeError("translator down")
+
+	monkeypatch.setattr(conversation_module, "translate_to_language", broken)
+	with pytest.raises(RuntimeError):
+		conversation_module.run_conversation("s-fail", "pesanan saya belum sampai", "web", {})
+
+	monkeypatch.setattr(conversation_module, "translate_to_language", lambda text, target_lang, callbacks=None: text)
+	assert conversation_module.run_conversation("s-fail", "tolong dicek", "web", {})["assistant_response"] == "echo 4"
+	assert ConversationRepository().get_transcript(1).splitlines()[2:] == ["User: pesanan saya belum sampai", "User: tolong dicek", "Assistant: echo 4"]
+
+
+def test_message_table_has_the_composite_history_index():
+	names = {index.name for index in Message.__table__.indexes}
+	assert any(name.endswith("_message_conversation_id_id") for name in names)
+
+
+def test_get_or_create_is_race_free_under_parallel_first_messages(tmp_path, monkeypatch):
+	engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+	Conversation.__table__.create(engine)
+	monkeypatch.setattr(db_module, "_SessionLocal", sessionmaker(bind=engine))
+	repo = ConversationRepository()
+	start = threading.Barrier(16)
+
+	def first_message(_):
+		start.wait()
+		return repo.get_or_create_conversation("wa:628123", "whatsapp", {"name": "Budi"}).id
+
+	with ThreadPoolExecutor(max_workers=16) as pool:
+		ids = list(pool.map(first_message, range(16)))
+
+	assert len(set(ids)) == 1
+	with engine.connect() as conn:
+		rows = conn.execute(select(Conversation.id, Conversation.user_profile)).all()
+	assert len(rows) == 1 and rows[0].user_profile == {"name": "Budi"}
@@ -0,0 +1,107 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import app.services.vectorstores.registry as registry
+from app.persistence import db as db_module
+from app.persistence.models import Conversation, Message, NotificationOutbox, SensitiveData
+from app.services import retention
+from app.services.memory import vector_memory
+from app.services.vectorstores import numpy_store
+from app.services.vectorstores.numpy_store import NumpyVectorStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+	engine = create_engine("sqlite://")
+	for model in (Conversation, Message, SensitiveData, NotificationOutbox):
+		model.__table__.create(engine)
+	monkeypatch.setattr(db_module, "_SessionLocal", sessionmaker(bind=engine))
+	monkeypatch.setattr(registry.settings, "VECTOR_BACKEND", "numpy")
+	monkeypatch.setattr(retention.settings, "VECTOR_STORE_PATH", None)
+	memstore = NumpyVectorStore(DeterministicFakeEmbedding(size=16), collection_name="ret_memory")
+	monkeypatch.setattr(vector_memory, "_memstores", {"ret_memory": memstore})
+	yield engine, memstore
+	numpy_store.drop_collection("ret_memory")
+
+
+def _engine(**kwargs):
+	return retention.RetentionEngine(memory_collection="ret_memory", batch_size=2, pause_seconds=0, **kwargs)
+
+
+def _memories(memstore, session_id, n, age_days):
+	ts = int(time.time()) - age_days * 86400
+	memstore.add_texts(
+		[f"{session_id} turn {i}" for i in range(n)],
+		metadatas=[{"session_id": session_id, "role": "user", "ts": ts + i} for i in range(n)],
+	)
+
+
+def test_purge_deletes_expired_rows_in_batches(store):
+	engine, memstore = store
+	old = datetime.utcnow() - timedelta(days=90)
+	with sessionmaker(bind=engine)() as db:
+		stale = Conversation(session_id="stale", channel="web", updated_at=old)
+		live = Conversation(session_id="live", channel="web")
+		db.add_all([stale, live])
+		db.flush()
+		db.add_all([Message(conversation_id=stale.id, role="user", content=f"m{i}", created_at=old) for i in range(5)])
+		db.add(Message(conversation_id=live.id, role="user", content="fresh"))
+		db.add(SensitiveData(conversation_id=live.id, data={"phone": "x"}, expires_at=datetime.utcnow() - timedelta(hours=2)))
+		db.add(SensitiveData(conversation_id=live.id, data={"phone": "y"}, expires_at=datetime.utcnow() + timedelta(hours=1)))
+		db.commit()
+	_memories(memstore, "stale", 3, age_days=90)
+	_memories(memstore, "live", 2, age_days=0)
+	memstore.add_texts(["legacy row"], metadatas=[{"session_id": "live", "role": "user"}])
+
+	stats = _engine().run()
+
+	assert stats["messages"] == 5 and stats["sensitive"] == 1 and stats["conversations"] == 1
+	assert stats["memory"] == 3 and stats["memory_stamped"] == 1
+	with engine.connect() as conn:
+		assert conn.execute(select(Conversation.session_id)).scalars().all() == ["live"]
+		assert len(conn.execute(select(SensitiveData.id)).all()) == 1
+	assert memstore.count() == 3
+	assert any(line.startswith('retention_rows_purged_total{kind="messages"}') for line in retention.ROWS_PURGED.render())
+
+
+def test_compaction_replaces_old_session_memories_with_a_summary(store, monkeypatch):
+	_, memstore = store
+	monkeypatch.setattr(retention.settings, "MEMORY_COMPACT_MIN_ROWS", 3)
+	_memories(memstore, "s1", 4, age_days=10)
+	_memories(memstore, "s1", 1, age_days=0)
+	_memories(memstore, "s2", 2, age_days=10)
+	seen = []
+
+	stats = _engine(summarizer=lambda lines: seen.append(lines) or "summary of s1").compact_memory()
+
+	assert stats == {"sessions_compacted": 1, "memory_compacted": 4}
+	assert len(seen[0]) == 4 and seen[0][0] == "user: s1 turn 0"
+	summaries = memstore.similarity_search("s1", k=10, filter={"role": "summary"})
+	assert [d.page_content for d in summaries] == ["summary of s1"]
+	assert summaries[0].metadata["compacted"] == 4
+	assert memstore.count({"session_id": "s1"}) == 2 and memstore.count({"session_id": "s2"}) == 2
+
+
+def test_erase_session_removes_everything_for_the_session(store):
+	engine, memstore = store
+	with sessionmaker(bind=engine)() as db:
+		conv = Conversation(session_id="gone", channel="web")
+		db.add(conv)
+		db.flush()
+		db.add_all([Message(conversation_id=conv.id, role="user", content=f"m{i}") for i in range(3)])
+		db.add(SensitiveData(conversation_id=conv.id, data={"email": "a@b.c"}, expires_at=datetime.utcnow() + timedelta(hours=1)))
+		db.commit()
+	_memories(memstore, "gone", 3, age_days=0)
+	_memories(memstore, "kept", 1, age_days=0)
+
+	stats = _engine().erase_session("gone")
+
+	assert stats == {"memory": 3, "sensitive": 1, "messages": 3, "outbox": 0, "conversations": 1}
+	with engine.connect() as conn:
+		assert conn.execute(select(Message.id)).all() == []
+	assert memstore.count() == 1
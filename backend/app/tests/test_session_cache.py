@@ -0,0 +1,63 @@
+import time
+
+from app.services.session_cache import LocalStore, SessionCache, SessionState
+
+
+def test_write_through_is_seen_by_other_workers():
+	shared = LocalStore()
+	a, b = SessionCache(shared, window=3), SessionCache(shared, window=3)
+	a.put("s1", SessionState(conversation_id=7, locale="id", history=[{"type": "human", "content": "m0"}]), 0)
+	b.put("s1", SessionState(conversation_id=7, locale="id", history=[{"type": "human", "content": "m0"}]), 0)
+
+	a.append("s1", a.get("s1"), [{"type": "human", "content": "m1"}, {"type": "ai", "content": "m2"}])
+
+	# b's local copy is stale (version moved on); it picks up a's state from the shared store
+	state = b.get("s1")
+	assert [m["content"] for m in state.history] == ["m0", "m1", "m2"] and state.version == 1
+	b.append("s1", state, [{"type": "human", "content": "m3"}])
+	assert [m["content"] for m in a.get("s1").history] == ["m1", "m2", "m3"]
+
+
+def test_concurrent_writes_and_invalidation_force_a_reload():
+	shared = LocalStore()
+	a, b = SessionCache(shared), SessionCache(shared)
+	state_a = a.put("s1", SessionState(conversation_id=1), 0)
+	state_b = b.put("s1", SessionState(conversation_id=1), 0)
+	a.append("s1", state_a, [{"type": "human", "content": "from a"}])
+	b.append("s1", state_b, [{"type": "human", "content": "from b"}])  # raced with a
+	assert a.get("s1") is None and b.get("s1") is None
+
+	a.put("s1", SessionState(conversation_id=1), a.lookup("s1")[1])
+	assert a.get("s1") is not None
+	b.invalidate("s1")
+	assert a.get("s1") is None
+
+
+def test_snapshot_loaded_before_another_workers_turn_is_not_cached():
+	shared = LocalStore()
+	a, b = SessionCache(shared), SessionCache(shared)
+	missed, version = a.lookup("s1")  # a misses and reads history from the database: [m0]
+	assert missed is None
+
+	b_state = b.put("s1", SessionState(conversation_id=1, history=[{"type": "human", "content": "m0"}]), b.lookup("s1")[1])
+	b.append("s1", b_state, [{"type": "human", "content": "m1"}])  # b commits a turn meanwhile
+
+	stale = a.put("s1", SessionState(conversation_id=1, history=[{"type": "human", "content": "m0"}]), version)
+	assert [m["content"] for m in b.get("s1").history] == ["m0", "m1"]
+	assert [m["content"] for m in a.get("s1").history] == ["m0", "m1"]
+	a.append("s1", stale, [{"type": "human", "content": "m2"}])  # a's turn on the stale snapshot drops the cache
+	assert a.get("s1") is None and b.get("s1") is None
+
+
+def test_lru_and_ttl_eviction():
+	cache = SessionCache(LocalStore(), max_entries=2)
+	for sid in ("s1", "s2"):
+		cache.put(sid, SessionState(conversation_id=1), 0)
+	cache.get("s1")
+	cache.put("s3", SessionState(conversation_id=3), 0)
+	assert list(cache._local) == ["s1", "s3"]
+
+	expired = SessionCache(LocalStore(), ttl=0.0001)
+	expired.put("s1", SessionState(conversation_id=1), 0)
+	time.sleep(0.01)
+	assert expired.get("s1") is None
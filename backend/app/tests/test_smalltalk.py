@@ -0,0 +1,56 @@
+import pytest
+
+import app.services.conversation as conversation_module
+from app.persistence.repositories import ConversationRepository
+from app.services import session_cache, smalltalk
+from app.services.smalltalk import SmallTalkMatcher, match_small_talk
+from app.tests.test_repositories import _Graph, _setup
+
+
+@pytest.mark.parametrize(
+	"text, intent, lang",
+	[
+		("halo", "greeting", "id"),
+		("Haloooo kak!", "greeting", "id"),
+		("terima kasih banyak ya min", "thanks", "id"),
+		("hai, selamat malam kak", "time_greeting", "id"),
+		("Thanks so much!", "thanks", "en"),
+		("hi", "greeting", None),
+		("halo, pesanan 12345 di mana?", None, None),
+		("this is hi", None, None),
+		("ok", None, None),
+	],
+)
+def test_matches_whole_messages_only(text, intent, lang):
+	match = match_small_talk(text)
+	assert (match.intent, match.lang) == (intent, lang) if intent else match is None
+
+
+def test_replies_follow_the_phrase_or_the_conversation_locale():
+	matcher = smalltalk.get_matcher()
+	assert matcher.render(matcher.match("selamat pagi")) == "Selamat pagi! Ada yang bisa saya bantu hari ini?"
+	assert matcher.render(matcher.match("good evening")) == "Good evening! How can I help you today?"
+	assert matcher.render(matcher.match("hi"), "en") == "Hello! How can I help you today?"
+	custom = SmallTalkMatcher({"thanks": {"phrases": {"su": ["hatur nuhun"]}, "responses": {"su": "Sami-sami!"}}}, fillers=["pisan"])
+	assert custom.render(custom.match("hatur nuhun pisan")) == "Sami-sami!"
+
+
+def test_small_talk_skips_graph_memory_and_admission(monkeypatch):
+	_setup(monkeypatch)
+	monkeypatch.setattr(conversation_module, "_repo", ConversationRepository())
+	monkeypatch.setattr(session_cache, "_cache", session_cache.SessionCache())
+	monkeypatch.setattr(conversation_module, "_graph", _Graph())
+	embedded = []
+	monkeypatch.setattr(conversation_module, "add_memory", lambda **kw: embedded.append(kw))
+	monkeypatch.setattr(conversation_module, "retrieve_memory", lambda **kw: [])
+	monkeypatch.setattr(conversation_module, "detect_language", lambda text: "id")
+	monkeypatch.setattr(conversation_module, "translate_to_language", lambda text, target_lang, callbacks=None: text)
+	monkeypatch.setattr(conversation_module, "admit_turn", None)  # must not be used for small talk
+	before = conversation_module.TURNS.value(path="small_talk")
+
+	result = conversation_module.run_conversation("st1", "Terima kasih kak!", "web", {})
+	assert result["assistant_response"] == "Sama-sama! Ada yang bisa saya bantu lagi?"
+	assert result["current_task"] == "Small_Talk" and result["small_talk"] == "thanks"
+	assert embedded == []
+	assert conversation_module.TURNS.value(path="small_talk") == before + 1
+	assert ConversationRepository().get_transcript(1).splitlines() == ["User: Terima kasih kak!", "Assistant: Sama-sama! Ada yang bisa saya bantu lagi?"]
@@ -0,0 +1,20 @@
+from benchmarks.startup import parse_importtime, run_benchmark
+
+
+def test_app_import_does_not_load_heavy_modules():
+	result = run_benchmark(runs=1, top=5)
+	assert result["eager_heavy"] == []
+	# generous bound: the eager version took ~4s here, the lazy one ~2s
+	assert 0 < result["total_ms"] < 15000
+	assert any(m["module"] == "app.api.chat" for m in result["top_app_cumulative"])
+
+
+def test_parse_importtime():
+	stderr = "\n".join([
+		"import time: self [us] | cumulative | imported package",
+		"import time:       120 |        120 |     json.decoder",
+		"import time:       300 |        420 |   json",
+	])
+	modules = parse_importtime(stderr)
+	assert modules["json"] == {"self_us": 300, "cumulative_us": 420, "depth": 1}
+	assert modules["json.decoder"]["depth"] == 2
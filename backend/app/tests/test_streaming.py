@@ -0,0 +1,77 @@
+import json
+from typing import TypedDict
+
+from fastapi.testclient import TestClient
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph
+
+import app.services.conversation as conversation_module
+from app.main import app
+
+
+@tool
+def get_order_status(order_id: str) -> str:
+	"""Look up an order."""
+	return "shipped"
+
+
+class _State(TypedDict):
+	user_query: str
+	current_task: str
+	assistant_response: str
+
+
+def _fake_run_conversation(session_id, message, channel, user_meta, callbacks=None):
+	model = GenericFakeChatModel(messages=iter([
+		AIMessage(content="Thought: look it up\nAction: get_order_status\nAction Input: 123"),
+		AIMessage(content="Thought: done\nFinal Answer: Pesanan 123 sudah dikirim."),
+	]))
+	prompt = PromptTemplate.from_template("{tools} {tool_names} {input} {agent_scratchpad}")
+	tools = [get_order_status]
+
+	def router(state):
+		return {"current_task": "Order_Status"}
+
+	def order_status(state):
+		agent = AgentExecutor(agent=create_react_agent(model, tools, prompt), tools=tools)
+		return {"assistant_response": agent.invoke({"input": state["user_query"]})["output"]}
+
+	workflow = StateGraph(_State)
+	workflow.add_node("router", router)
+	workflow.add_node("order_status", order_status)
+	workflow.add_edge("router", "order_status")
+	workflow.set_entry_point("router")
+	workflow.set_finish_point("order_status")
+	final = workflow.compile().invoke({"user_query": message}, config={"callbacks": callbacks or []})
+	return {**final, "handoff_to_human": False}
+
+
+def _parse(body: str):
+	events = []
+	for block in body.strip().split("\n\n"):
+		lines = dict(line.split(": ", 1) for line in block.splitlines())
+		events.append((lines["event"], json.loads(lines["data"])))
+	return events
+
+
+def test_chat_stream_emits_progress_tokens_and_done(monkeypatch):
+	monkeypatch.setattr(conversation_module, "run_conversation", _fake_run_conversation)
+	with TestClient(app) as client:
+		resp = client.post("/api/chat/stream", json={"session_id": "s1", "message": "status pesanan 123"})
+	assert resp.status_code == 200
+	assert resp.headers["content-type"].startswith("text/event-stream")
+
+	events = _parse(resp.text)
+	kinds = [e for e, _ in events]
+	assert kinds[:2] == ["node", "route"] and events[1][1] == {"task": "Order_Status"}
+	assert ("tool", {"tool": "get_order_status"}) in events
+	tokens = "".join(d["text"] for e, d in events if e == "token")
+	assert tokens == "Pesanan 123 sudah dikirim."
+	assert kinds[-1] == "done"
+	done = events[-1][1]
+	assert done["answer"] == "Pesanan 123 sudah dikirim."
+	assert done["timings"]["ttft_ms"] <= done["timings"]["total_ms"]
@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import TypedDict
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph
+
+import app.services.conversation as conversation_module
+from app.services import session_cache
+from app.main import app
+
+
+class _FakeRepo:
+	@contextmanager
+	def unit_of_work(self):
+		yield SimpleNamespace(commit=lambda: None)
+
+	def get_or_create_conversation(self, session_id, channel, user_meta, db=None):
+		return SimpleNamespace(id=1, locale="id", user_profile={})
+
+	def add_messages(self, conversation_id, messages, notifications=None, db=None):
+		pass
+
+	def get_history_as_messages(self, conversation_id, db=None, limit=None):
+		return []
+
+
+class _State(TypedDict):
+	user_query: str
+	assistant_response: str
+
+
+def _graph():
+	model = GenericFakeChatModel(messages=iter([
+		AIMessage(content="Jam operasional 09.00-17.00.", usage_metadata={"input_tokens": 42, "output_tokens": 7, "total_tokens": 49}),
+	]))
+
+	def general_qa(state):
+		return {"assistant_response": model.invoke(state["user_query"]).content}
+
+	workflow = StateGraph(_State)
+	workflow.add_node("general_qa", general_qa)
+	workflow.set_entry_point("general_qa")
+	workflow.set_finish_point("general_qa")
+	return workflow.compile()
+
+
+def test_chat_response_carries_stage_timings(monkeypatch):
+	monkeypatch.setattr(conversation_module, "_repo", _FakeRepo())
+	monkeypatch.setattr(session_cache, "_cache", session_cache.SessionCache())
+	monkeypatch.setattr(conversation_module, "_graph", _graph())
+	monkeypatch.setattr(conversation_module, "add_memory", lambda **kw: None)
+	monkeypatch.setattr(conversation_module, "retrieve_memory", lambda **kw: [])
+	monkeypatch.setattr(conversation_module, "detect_language", lambda text: "id")
+	monkeypatch.setattr(conversation_module, "translate_to_language", lambda text, target_lang, callbacks=None: text)
+
+	client = TestClient(app)
+	resp = client.post("/api/chat", json={"session_id": "s1", "message": "jam buka?"})
+	assert resp.status_code == 200
+	assert resp.json()["answer"] == "Jam operasional 09.00-17.00."
+
+	timings = resp.json()["metadata"]["timings"]
+	for stage in ("load_conversation", "load_history", "retrieve_memory", "graph", "node:general_qa", "translate", "persist_messages"):
+		assert stage in timings["spans"]
+	assert timings["spans"]["node:general_qa"] <= timings["spans"]["graph"] <= timings["total_ms"]
+	assert timings["llm"] == {"calls": 1, "prompt_tokens": 42, "completion_tokens": 7}
+
+	text = client.get("/metrics").text
+	assert 'pipeline_stage_seconds_count{stage="graph"}' in text
+	assert 'graph_node_seconds_count{node="general_qa"}' in text
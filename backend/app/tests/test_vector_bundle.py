@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import app.api.rag as rag_api
+import app.services.vectorstores.registry as registry
+from app.main import app
+from app.services.vectorstores import bundle, numpy_store
+from app.services.vectorstores.numpy_store import NumpyVectorStore
+
+
+@pytest.fixture
+def numpy_backend(monkeypatch):
+	monkeypatch.setattr(registry.settings, "VECTOR_BACKEND", "numpy")
+	monkeypatch.setattr(bundle.settings, "VECTOR_STORE_PATH", None)
+	yield
+	for name in ("kb_src", "kb_dst"):
+		numpy_store.drop_collection(name)
+
+
+def _seed(n=7):
+	store = NumpyVectorStore(DeterministicFakeEmbedding(size=32), collection_name="kb_src")
+	store.add_texts([f"snippet {i}" for i in range(n)], metadatas=[{"n": i} for i in range(n)], ids=[f"id-{i}" for i in range(n)])
+	store.delete(["id-3"])
+	return store
+
+
+def test_export_import_round_trip_in_batches(numpy_backend, tmp_path):
+	src = _seed()
+	manifest = bundle.export_collection("kb_src", str(tmp_path / "b1"), batch_size=2)
+	assert manifest["count"] == 6 and manifest["dim"] == 32
+	assert os.path.getsize(tmp_path / "b1" / bundle.VECTORS_FILE) == 6 * 32 * 4
+	assert json.loads((tmp_path / "b1" / bundle.RECORDS_FILE).read_text().splitlines()[0])["id"] == "id-0"
+
+	result = bundle.import_collection(str(tmp_path / "b1"), collection_name="kb_dst", batch_size=4)
+	assert result["imported"] == 6
+	dst = numpy_store.get_collection("kb_dst")
+	assert dst.count() == 6 and "id-3" not in dst.row_of
+	row = dst.row_of["id-5"]
+	assert dst.document(row).metadata == {"n": 5}
+	assert np.allclose(dst.vector(row), src.collection.vector(src.collection.row_of["id-5"]))
+
+	bundle.import_collection(str(tmp_path / "b1"), collection_name="kb_dst", replace=True)
+	assert dst.count() == 6
+
+
+def test_export_does_not_hold_the_collection_lock_between_batches(numpy_backend, tmp_path):
+	src = _seed()
+	batches = bundle._numpy_batches("kb_src", batch_size=2)
+	first_ids = next(batches)[0]
+	writer = threading.Thread(target=lambda: src.delete(["id-6"]))
+	writer.start()
+	writer.join(timeout=5)
+	assert not writer.is_alive()  # a write between batches does not wait for the export to finish
+	rest = [id_ for ids, *_ in batches for id_ in ids]
+	assert first_ids + rest == ["id-0", "id-1", "id-2", "id-4", "id-5"]
+
+
+def test_import_rejects_tampered_or_incomplete_bundles(numpy_backend, tmp_path):
+	_seed()
+	bundle.export_collection("kb_src", str(tmp_path / "b1"))
+	with open(tmp_path / "b1" / bundle.VECTORS_FILE, "r+b") as f:
+		f.write(b"\x00\x00\x00\x00")
+	with pytest.raises(ValueError, match="checksum"):
+		bundle.import_collection(str(tmp_path / "b1"), collection_name="kb_dst")
+	os.remove(tmp_path / "b1" / bundle.MANIFEST_FILE)
+	with pytest.raises(ValueError, match="not a complete"):
+		bundle.import_collection(str(tmp_path / "b1"))
+	assert numpy_store.get_collection("kb_dst").count() == 0
+
+
+def test_admin_endpoints_require_token_and_round_trip(numpy_backend, monkeypatch, tmp_path):
+	_seed()
+	monkeypatch.setattr(rag_api.settings, "VECTOR_BUNDLE_DIR", str(tmp_path))
+	client = TestClient(app)
+	monkeypatch.setattr(rag_api.settings, "ADMIN_TOKEN", None)
+	assert client.post("/api/rag/admin/export", json={"collection_name": "kb_src"}).status_code == 403
+	monkeypatch.setattr(rag_api.settings, "ADMIN_TOKEN", "s3cret")
+	assert client.post("/api/rag/admin/export", json={"collection_name": "kb_src"}, headers={"X-Admin-Token": "nope"}).status_code == 401
+
+	headers = {"X-Admin-Token": "s3cret"}
+	resp = client.post("/api/rag/admin/export", json={"collection_name": "kb_src", "bundle": "kb-2024"}, headers=headers)
+	assert resp.status_code == 200 and resp.json()["count"] == 6
+	assert [b["bundle"] for b in client.get("/api/rag/admin/bundles", headers=headers).json()["bundles"]] == ["kb-2024"]
+	assert client.post("/api/rag/admin/import", json={"bundle": "../etc"}, headers=headers).status_code == 400
+	resp = client.post("/api/rag/admin/import", json={"bundle": "kb-2024", "collection_name": "kb_dst"}, headers=headers)
+	assert resp.status_code == 200 and resp.json()["imported"] == 6
@@ -0,0 +1,72 @@
+import uuid
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+import app.services.vectorstores.registry as registry
+from app.services.vectorstores import numpy_store
+from app.services.vectorstores import search as vector_search
+from app.services.vectorstore_service import VectorStoreService
+
+
+def test_mmr_select_matches_reference_implementation():
+	rng = np.random.default_rng(3)
+	query = rng.standard_normal(32)
+	candidates = rng.standard_normal((40, 32))
+	for lambda_mult in (0.0, 0.5, 1.0):
+		expected = maximal_marginal_relevance(query, candidates, lambda_mult=lambda_mult, k=6)
+		assert vector_search.mmr_select(query, candidates, 6, lambda_mult) == expected
+
+
+def test_compile_filter_uses_jsonb_containment():
+	where, params = vector_search.compile_filter({"user_id": "u1", "$or": [{"n": {"$in": [1, 2]}}, {"tag": {"$exists": False}}]})
+	assert where == (
+		"e.cmetadata @> CAST(:f0 AS jsonb) AND ((e.cmetadata @> CAST(:f1 AS jsonb) OR e.cmetadata @> CAST(:f2 AS jsonb))"
+		" OR (e.cmetadata -> :f3) IS NULL)"
+	)
+	assert params == {"f0": '{"user_id": "u1"}', "f1": '{"n": 1}', "f2": '{"n": 2}', "f3": "tag"}
+	with pytest.raises(ValueError):
+		vector_search.compile_filter({"n": {"$gt": 1}})
+
+
+def test_fetch_k_is_capped_by_latency_budget(monkeypatch):
+	monkeypatch.setattr(vector_search, "_overhead_ms", {"pgvector": 4.0})
+	assert vector_search.fetch_k_for(5, backend="pgvector") == 20
+	assert vector_search.fetch_k_for(5, 100, backend="pgvector") == 100
+	assert vector_search.fetch_k_for(5, 100, latency_budget_ms=4.5, backend="pgvector") == 15
+	assert vector_search.fetch_k_for(5, 100, latency_budget_ms=1.0, backend="pgvector") == 5
+
+
+def test_service_search_returns_similarity_with_filter_and_mmr(monkeypatch):
+	embeddings = DeterministicFakeEmbedding(size=64)
+	monkeypatch.setattr(registry.settings, "VECTOR_BACKEND", "numpy")
+	monkeypatch.setattr(vector_search.settings, "VECTOR_STORE_PATH", None)
+	monkeypatch.setattr("app.services.vectorstore_service.get_embedding_model", lambda: embeddings)
+	name = f"search_{uuid.uuid4().hex[:8]}"
+	service = VectorStoreService(default_collection=name)
+	texts = ["Store hours are 09:00-21:00", "We accept COD", "Returns within 7 days", "Ships to Malaysia"]
+	service.add_texts(texts[:2], user_id="u1")
+	service.add_texts(texts[2:], user_id="u2")
+
+	hits = service.search_with_scores(texts[2], user_id="u2", k=2, mmr=False)
+	assert [d.page_content for d, _ in hits][0] == texts[2]
+	assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+	assert {d.metadata["user_id"] for d, _ in hits} == {"u2"}
+	assert hits[1][1] < hits[0][1]
+
+	diverse = service.search_with_scores(texts[0], k=3, mmr=True, fetch_k=4, latency_budget_ms=50)
+	assert len(diverse) == 3 and diverse[0][0].page_content == texts[0]
+	assert all(abs(s) <= 1.0 + 1e-5 for _, s in diverse)
+	assert service.search("   ") == []
+	numpy_store.drop_collection(name)
+
+
+def test_quantized_candidate_sql_matches_index_expressions():
+	from app.services.vectorstores import quantization
+
+	assert quantization.approx_distance_sql("halfvec", 768) == "e.embedding::halfvec(768) <=> CAST(:q AS halfvec(768))"
+	assert "(embedding::halfvec(768)) halfvec_cosine_ops" in quantization.index_sql("halfvec", 768, "ix", "c1")
+	assert "binary_quantize(e.embedding)::bit(384) <~>" in quantization.approx_distance_sql("binary", 384)
+	assert "(binary_quantize(embedding)::bit(384)) bit_hamming_ops) WHERE collection_id = 'c1'" in quantization.index_sql("binary", 384, "ix", "c1")
@@ -0,0 +1,114 @@
+import os
+import uuid
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.services.vectorstores import numpy_store
+from app.services.vectorstores.numpy_store import NumpyCollection, NumpyVectorStore
+
+
+_TEXTS = [
+	"Store hours are 09:00-21:00 WIB",
+	"We accept bank transfer and COD",
+	"Returns are accepted within 7 days",
+	"Shipping to Malaysia takes 5 days",
+	"Blue casual shirt size L",
+]
+
+
+@pytest.fixture(params=["numpy", "pgvector"])
+def store(request):
+	"""The same contract runs against every backend; pgvector only when PGVECTOR_TEST_URL is set."""
+	embeddings = DeterministicFakeEmbedding(size=64)
+	name = f"contract_{uuid.uuid4().hex[:8]}"
+	if request.param == "numpy":
+		yield NumpyVectorStore(embeddings, collection_name=name)
+		numpy_store.drop_collection(name)
+		return
+	url = os.environ.get("PGVECTOR_TEST_URL")
+	if not url:
+		pytest.skip("PGVECTOR_TEST_URL not set")
+	from langchain_postgres import PGVector
+
+	vs = PGVector(embeddings, connection=url, collection_name=name)
+	yield vs
+	vs.delete_collection()
+
+
+def _seed(store):
+	return store.add_texts(
+		_TEXTS,
+		metadatas=[{"user_id": "u1" if i % 2 == 0 else "u2", "n": i} for i in range(len(_TEXTS))],
+		ids=[f"doc-{i}" for i in range(len(_TEXTS))],
+	)
+
+
+def test_contract_search_filter_upsert_delete(store):
+	assert _seed(store) == [f"doc-{i}" for i in range(len(_TEXTS))]
+
+	hits = store.similarity_search_with_score(_TEXTS[2], k=3)
+	assert len(hits) == 3
+	assert hits[0][0].page_content == _TEXTS[2] and hits[0][0].metadata["n"] == 2
+	assert hits[0][1] == pytest.approx(0.0, abs=1e-5)  # cosine distance
+	assert [s for _, s in hits] == sorted(s for _, s in hits)
+
+	docs = store.similarity_search(_TEXTS[2], k=5, filter={"user_id": {"$eq": "u2"}})
+	assert {d.metadata["n"] for d in docs} == {1, 3}
+	docs = store.similarity_search(_TEXTS[0], k=5, filter={"n": {"$in": [0, 4]}})
+	assert {d.metadata["n"] for d in docs} == {0, 4}
+
+	store.add_texts(["Store hours changed to 10:00-22:00"], metadatas=[{"user_id": "u1", "n": 0}], ids=["doc-0"])
+	docs = store.similarity_search("Store hours changed to 10:00-22:00", k=5)
+	assert [d.page_content for d in docs].count("Store hours changed to 10:00-22:00") == 1
+	assert _TEXTS[0] not in [d.page_content for d in docs]
+
+	store.delete(["doc-1", "doc-3"])
+	docs = store.similarity_search(_TEXTS[1], k=5)
+	assert {d.metadata["n"] for d in docs} == {0, 2, 4}
+
+	mmr = store.max_marginal_relevance_search(_TEXTS[4], k=2, fetch_k=3)
+	assert len(mmr) == 2 and mmr[0].page_content == _TEXTS[4]
+
+
+def test_numpy_store_persists_and_reloads_memory_mapped(tmp_path):
+	embeddings = DeterministicFakeEmbedding(size=64)
+	store = NumpyVectorStore(embeddings, collection_name="kb", path=str(tmp_path))
+	_seed(store)
+	store.delete(["doc-1"])
+	store.add_texts(["Returns within 14 days"], metadatas=[{"user_id": "u1", "n": 2}], ids=["doc-2"])
+
+	reloaded = NumpyCollection("kb", str(tmp_path))  # what a restarted process sees
+	assert isinstance(reloaded.vectors, np.memmap)
+	assert reloaded.count() == 4 and reloaded.count({"user_id": "u2"}) == 1
+	hit = reloaded.search(np.asarray(embeddings.embed_query("Returns within 14 days")), k=1)
+	assert reloaded.document(hit[0][0]).id == "doc-2"
+
+	reloaded.upsert(["doc-9"], np.ones((1, 64), dtype=np.float32), ["new"], [{}])  # first write leaves the memmap
+	assert not isinstance(reloaded.vectors, np.memmap) and reloaded.count() == 5
+	numpy_store.drop_collection("kb", str(tmp_path))
+
+
+@pytest.mark.parametrize("mode", ["halfvec", "binary"])
+def test_quantized_search_rescores_at_full_precision(mode, tmp_path):
+	embeddings = DeterministicFakeEmbedding(size=64)
+	store = NumpyVectorStore(embeddings, collection_name="kb_q", path=str(tmp_path), quantization=mode, rescore_factor=3)
+	_seed(store)
+	assert store.collection.quantizer.mode == mode
+
+	hits = store.similarity_search_with_score(_TEXTS[3], k=2)
+	assert hits[0][0].page_content == _TEXTS[3]
+	assert hits[0][1] == pytest.approx(0.0, abs=1e-5)  # exact distance from the float32 rows
+	docs = store.similarity_search(_TEXTS[0], k=5, filter={"user_id": "u2"})
+	assert {d.metadata["n"] for d in docs} == {1, 3}
+
+	store.delete(["doc-0", "doc-1", "doc-2"])  # compaction rebuilds the quantized copy
+	assert store.collection.quantizer.nbytes(store.collection.size) > 0
+	assert store.similarity_search(_TEXTS[4], k=1)[0].page_content == _TEXTS[4]
+
+	numpy_store._collections.clear()  # restart: memory-mapped rows, quantized copy rebuilt
+	reloaded = NumpyVectorStore(embeddings, collection_name="kb_q", path=str(tmp_path), quantization=mode)
+	assert isinstance(reloaded.collection.vectors, np.memmap)
+	assert reloaded.similarity_search(_TEXTS[3], k=1)[0].page_content == _TEXTS[3]
+	numpy_store.drop_collection("kb_q", str(tmp_path))
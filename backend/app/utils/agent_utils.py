@@ -5,6 +5,7 @@ Utility functions for handling agent parsing errors and fallback responses
 import logging
 from typing import Dict, Any, Optional
 from langchain_core.exceptions import OutputParserException
+from app.services.smalltalk import get_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -50,16 +51,12 @@ def handle_parsing_error(error: OutputParserException, user_query: str, agent_ty
 
 def _get_general_qa_fallback(query: str) -> str:
     """Get fallback response for general QA agent"""
-    if any(word in query for word in ["halo", "hello", "hi", "hai"]):
-        return "Halo! Ada yang bisa saya bantu hari ini?"
-    elif any(word in query for word in ["terima kasih", "thanks", "thank you"]):
-        return "Sama-sama! Ada yang bisa saya bantu lagi?"
-    elif any(word in query for word in ["selamat pagi", "selamat siang", "selamat sore", "selamat malam"]):
-        return "Selamat! Ada yang bisa saya bantu hari ini?"
-    elif any(word in query for word in ["apa kabar", "how are you"]):
-        return "Baik, terima kasih! Ada yang bisa saya bantu?"
-    else:
-        return "Maaf, saya mengalami kendala memproses pertanyaan Anda. Mohon coba lagi atau hubungi customer service kami."
+    # Same phrases and templates as the small-talk fast path, matched anywhere in the query
+    matcher = get_matcher()
+    match = matcher.match(query, whole=False)
+    if match is not None:
+        return matcher.render(match)
+    return "Maaf, saya mengalami kendala memproses pertanyaan Anda. Mohon coba lagi atau hubungi customer service kami."
 
 
 def _get_order_status_fallback(query: str) -> str:
@@ -1,11 +1,9 @@
 from langdetect import detect
-from typing import Optional
-from functools import lru_cache
+from typing import Any, List, Optional
 import logging
 
 
 SUPPORTED_LANGS = {"id", "en"}
-logging.basicConfig(level=logging.INFO)
 
 
 def detect_language(text: str) -> Optional[str]:
@@ -20,14 +18,13 @@ def detect_language(text: str) -> Optional[str]:
 		return "en"
 
 
-@lru_cache(maxsize=5)
 def _get_translator_model():
-	# Lazy import to avoid heavy import at module load time
+	# Lazy import to avoid heavy import at module load time; the provider caches the model
 	from app.services.llm.provider import get_chat_model
-	return get_chat_model(temperature=0.0)
+	return get_chat_model(temperature=0.0, task="translator")
 
 
-def translate_text(text: str, target_lang: str) -> str:
+def translate_text(text: str, target_lang: str, callbacks: Optional[List[Any]] = None) -> str:
 	if not text:
 		return text
 	# Simple LLM-based translation
@@ -38,18 +35,21 @@ def translate_text(text: str, target_lang: str) -> str:
 	)
 	prompt = f"Target language: {target_lang}.\nText: {text}"
 	try:
-		resp = model.invoke([{"role": "system", "content": system}, {"role": "user", "content": prompt}])
+		resp = model.invoke(
+			[{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+			config={"callbacks": callbacks} if callbacks else None,
+		)
 		return getattr(resp, "content", str(resp))
 	except Exception:
 		return text
 
 
-def translate_to_language(text: str, target_lang: str) -> str:
+def translate_to_language(text: str, target_lang: str, callbacks: Optional[List[Any]] = None) -> str:
 	# If already in target language, return as is
 	try:
 		src = detect_language(text)
 		if src == target_lang:
 			return text
-		return translate_text(text, target_lang)
+		return translate_text(text, target_lang, callbacks=callbacks)
 	except Exception:
 		return text
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Minimal in-process metrics (counters, gauges, histograms) with Prometheus text exposition.
+
+Kept dependency-free on purpose; served at GET /metrics.
+"""
+
+import bisect
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+	return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+	items = list(key) + ([extra] if extra else [])
+	if not items:
+		return ""
+	return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(v: float) -> str:
+	if math.isinf(v):
+		return "+Inf" if v > 0 else "-Inf"
+	return repr(float(v))
+
+
+class _Metric:
+	kind = "untyped"
+
+	def __init__(self, name: str, documentation: str):
+		self.name = name
+		self.documentation = documentation
+		self._lock = threading.Lock()
+
+	def render(self) -> List[str]:
+		return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+	kind = "counter"
+
+	def __init__(self, name: str, documentation: str):
+		super().__init__(name, documentation)
+		self._values: Dict[LabelKey, float] = {}
+
+	def inc(self, amount: float = 1.0, **labels):
+		key = _key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0.0) + amount
+
+	def value(self, **labels) -> float:
+		return self._values.get(_key(labels), 0.0)
+
+	def render(self) -> List[str]:
+		lines = super().render()
+		with self._lock:
+			for key, v in self._values.items():
+				lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(v)}")
+		return lines
+
+
+class Gauge(Counter):
+	kind = "gauge"
+
+	def set(self, value: float, **labels):
+		with self._lock:
+			self._values[_key(labels)] = float(value)
+
+	def dec(self, amount: float = 1.0, **labels):
+		self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+	kind = "histogram"
+
+	def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+		super().__init__(name, documentation)
+		self.buckets = tuple(sorted(buckets))
+		self._counts: Dict[LabelKey, List[int]] = {}
+		self._sums: Dict[LabelKey, float] = {}
+
+	def observe(self, value: float, **labels):
+		key = _key(labels)
+		idx = bisect.bisect_left(self.buckets, value)
+		with self._lock:
+			counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+			counts[idx] += 1
+			self._sums[key] = self._sums.get(key, 0.0) + value
+
+	def count(self, **labels) -> int:
+		return sum(self._counts.get(_key(labels), []))
+
+	def sum(self, **labels) -> float:
+		return self._sums.get(_key(labels), 0.0)
+
+	def render(self) -> List[str]:
+		lines = super().render()
+		with self._lock:
+			for key, counts in self._counts.items():
+				cumulative = 0
+				for bound, c in zip(list(self.buckets) + [math.inf], counts):
+					cumulative += c
+					lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_value(bound)))} {cumulative}")
+				lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(self._sums[key])}")
+				lines.append(f"{self.name}_count{_fmt_labels(key)} {cumulative}")
+		return lines
+
+
+class MetricsRegistry:
+	def __init__(self):
+		self._metrics: Dict[str, _Metric] = {}
+		self._lock = threading.Lock()
+
+	def _get_or_create(self, cls, name: str, documentation: str, **kwargs):
+		with self._lock:
+			metric = self._metrics.get(name)
+			if metric is None:
+				metric = cls(name, documentation, **kwargs)
+				self._metrics[name] = metric
+			elif type(metric) is not cls:
+				raise ValueError(f"metric {name} already registered as {metric.kind}")
+			return metric
+
+	def counter(self, name: str, documentation: str) -> Counter:
+		return self._get_or_create(Counter, name, documentation)
+
+	def gauge(self, name: str, documentation: str) -> Gauge:
+		return self._get_or_create(Gauge, name, documentation)
+
+	def histogram(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+		return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+	def render(self) -> str:
+		with self._lock:
+			metrics = list(self._metrics.values())
+		lines: List[str] = []
+		for m in metrics:
+			lines.extend(m.render())
+		return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str) -> Counter:
+	return REGISTRY.counter(name, documentation)
+
+
+def gauge(name: str, documentation: str) -> Gauge:
+	return REGISTRY.gauge(name, documentation)
+
+
+def histogram(name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+	return REGISTRY.histogram(name, documentation, buckets=buckets)
@@ -1,10 +1,16 @@
+from functools import lru_cache
 from typing import Optional
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-_analyzer = SentimentIntensityAnalyzer()
+
+@lru_cache(maxsize=1)
+def _analyzer():
+	# loading the VADER lexicon takes a while; do it on the first scored message, not at import
+	from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+	return SentimentIntensityAnalyzer()
 
 
 def compute_sentiment(text: str) -> float:
-	scores = _analyzer.polarity_scores(text)
+	scores = _analyzer().polarity_scores(text)
 	# compound is already in [-1,1]
 	return float(scores.get("compound", 0.0))
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Prompt token counting. Uses tiktoken's cl100k_base when the encoding is available locally (it is
+downloaded on first use) and otherwise an offline estimate that errs on the high side for English
+and Indonesian text, so budgets checked with either stay safe.
+"""
+
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+	try:
+		import tiktoken
+
+		return tiktoken.get_encoding("cl100k_base")
+	except Exception as e:
+		logger.debug("tiktoken encoding unavailable, estimating token counts: %s", e)
+		return None
+
+
+def estimate_tokens(text: str) -> int:
+	"""Words count one token per 4 characters (at least one), punctuation one each."""
+	return sum(math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1 for piece in _PIECES.findall(text))
+
+
+def count_tokens(text: str, exact: bool = True) -> int:
+	encoding = _encoding() if exact else None
+	if encoding is not None:
+		return len(encoding.encode(text))
+	return estimate_tokens(text)
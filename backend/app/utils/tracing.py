@@ -0,0 +1,182 @@
+"""
+Per-request timing spans and LLM usage accounting.
+
+A `Trace` collects the spans of one conversation turn; `span()` times a block into the current
+trace and the `pipeline_stage_seconds` histogram. `PipelineCallbackHandler` is attached to graph
+runs to time nodes, tool calls and LLM calls and to count tokens. Everything stays in-process
+(served at /metrics and in the chat response metadata), independent of LangSmith.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from app.utils.metrics import counter, histogram
+from app.utils.tokens import count_tokens
+
+
+STAGE_SECONDS = histogram("pipeline_stage_seconds", "Duration of conversation pipeline stages")
+NODE_SECONDS = histogram("graph_node_seconds", "Duration of LangGraph node executions")
+TOOL_SECONDS = histogram("tool_call_seconds", "Duration of agent tool calls")
+LLM_SECONDS = histogram("llm_call_seconds", "Duration of LLM calls")
+LLM_TOKENS = counter("llm_tokens_total", "LLM tokens by kind (prompt/completion)")
+LLM_PROMPT_TOKENS = histogram(
+	"llm_prompt_tokens", "Prompt size of each LLM call by graph node", buckets=(64, 128, 256, 512, 768, 1024, 1536, 2048, 4096, 8192)
+)
+
+
+class Trace:
+	"""Timings of one request: accumulated milliseconds per span name, plus LLM call and token counts."""
+
+	def __init__(self):
+		self.started = time.monotonic()
+		self._lock = threading.Lock()
+		self.spans: Dict[str, float] = {}
+		self.llm_calls = 0
+		self.prompt_tokens = 0
+		self.completion_tokens = 0
+
+	def add(self, name: str, seconds: float):
+		with self._lock:
+			self.spans[name] = self.spans.get(name, 0.0) + seconds * 1000
+
+	def add_llm_call(self, prompt_tokens: int, completion_tokens: int):
+		with self._lock:
+			self.llm_calls += 1
+			self.prompt_tokens += prompt_tokens
+			self.completion_tokens += completion_tokens
+
+	def summary(self) -> Dict[str, Any]:
+		with self._lock:
+			return {
+				"total_ms": round((time.monotonic() - self.started) * 1000, 1),
+				"spans": {k: round(v, 1) for k, v in self.spans.items()},
+				"llm": {"calls": self.llm_calls, "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens},
+			}
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def start_trace() -> Iterator[Trace]:
+	trace = Trace()
+	token = _current_trace.set(trace)
+	try:
+		yield trace
+	finally:
+		_current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+	return _current_trace.get()
+
+
+@contextmanager
+def span(name: str):
+	"""Time a pipeline stage into the current trace (if any) and the stage histogram."""
+	started = time.monotonic()
+	try:
+		yield
+	finally:
+		elapsed = time.monotonic() - started
+		STAGE_SECONDS.observe(elapsed, stage=name)
+		trace = _current_trace.get()
+		if trace is not None:
+			trace.add(name, elapsed)
+
+
+def _token_usage(response: Any) -> Tuple[int, int]:
+	"""Prompt/completion tokens from an LLMResult; providers report them in different places."""
+	usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+	if usage:
+		return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+	prompt = completion = 0
+	for generations in getattr(response, "generations", None) or []:
+		for g in generations:
+			meta = getattr(getattr(g, "message", None), "usage_metadata", None) or {}
+			prompt += int(meta.get("input_tokens") or 0)
+			completion += int(meta.get("output_tokens") or 0)
+	return prompt, completion
+
+
+class PipelineCallbackHandler(BaseCallbackHandler):
+	"""Times graph nodes (`node:<name>`), tool calls (`tool:<name>`) and LLM calls of one graph run."""
+
+	raise_error = False
+
+	def __init__(self, trace: Optional[Trace] = None):
+		# Callbacks may fire on LangGraph executor threads, so hold the trace instead of reading the context var.
+		self.trace = trace
+		self._runs: Dict[UUID, Tuple[str, str, float]] = {}
+		self._prompts: Dict[UUID, Tuple[str, int]] = {}  # LLM run -> (graph node, estimated prompt tokens)
+
+	def _start(self, run_id: UUID, kind: str, name: str):
+		self._runs[run_id] = (kind, name, time.monotonic())
+
+	def _end(self, run_id: UUID) -> Optional[Tuple[str, str, float]]:
+		run = self._runs.pop(run_id, None)
+		if run is None:
+			return None
+		kind, name, started = run
+		elapsed = time.monotonic() - started
+		if kind == "node":
+			NODE_SECONDS.observe(elapsed, node=name)
+		elif kind == "tool":
+			TOOL_SECONDS.observe(elapsed, tool=name)
+		else:
+			LLM_SECONDS.observe(elapsed)
+		if self.trace is not None and kind != "llm":
+			self.trace.add(f"{kind}:{name}", elapsed)
+		return kind, name, elapsed
+
+	def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any):
+		node = (metadata or {}).get("langgraph_node")
+		if node and kwargs.get("name") == node and not node.startswith("__"):
+			self._start(run_id, "node", node)
+
+	def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+		self._end(run_id)
+
+	def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+		self._end(run_id)
+
+	def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+		self._start(run_id, "tool", (serialized or {}).get("name") or kwargs.get("name") or "tool")
+
+	def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+		self._end(run_id)
+
+	def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+		self._end(run_id)
+
+	def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any):
+		self._start(run_id, "llm", "llm")
+		self._prompt(run_id, "".join(prompts or []), kwargs.get("metadata"))
+
+	def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any):
+		self._start(run_id, "llm", "llm")
+		text = "".join(str(m.content) for batch in messages or [] for m in batch)
+		self._prompt(run_id, text, kwargs.get("metadata"))
+
+	def _prompt(self, run_id: UUID, text: str, metadata: Optional[Dict[str, Any]]):
+		# offline estimate, used when the provider does not report usage
+		self._prompts[run_id] = ((metadata or {}).get("langgraph_node") or "none", count_tokens(text, exact=False))
+
+	def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any):
+		self._end(run_id)
+		prompt, completion = _token_usage(response)
+		node, estimate = self._prompts.pop(run_id, ("none", 0))
+		LLM_PROMPT_TOKENS.observe(prompt or estimate, node=node)
+		LLM_TOKENS.inc(prompt, kind="prompt")
+		LLM_TOKENS.inc(completion, kind="completion")
+		if self.trace is not None:
+			self.trace.add_llm_call(prompt, completion)
+
+	def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+		self._end(run_id)
+		self._prompts.pop(run_id, None)
@@ -0,0 +1,179 @@
+"""
+Offline stand-ins for the benchmark harness: a scripted chat model that speaks the router / ReAct /
+translation prompt formats and a deterministic embedding model. Vector stores use the in-process
+NumPy backend.
+"""
+
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+EMBEDDING_SIZE = 256
+
+_ORDER_WORDS = ("pesanan", "order", "resi", "paket", "kirim", "shipping", "delivery", "status")
+_PRODUCT_WORDS = ("rekomendasi", "recommend", "produk", "product", "cari", "looking for", "kemeja", "shirt", "sepatu", "sneakers", "jeans", "celana")
+_COMPLAINT_WORDS = ("kecewa", "marah", "refund", "komplain", "complain", "terrible", "angry", "rusak", "broken", "penipuan")
+_TOOL_PREFERENCE = ("get_order_status", "search_products", "retrieve_kb_snippets", "notify_telegram_support")
+
+
+def _classify(text: str) -> str:
+	t = text.lower()
+	if any(w in t for w in _COMPLAINT_WORDS):
+		return "Complaint"
+	if any(w in t for w in _ORDER_WORDS):
+		return "Order_Status"
+	if any(w in t for w in _PRODUCT_WORDS):
+		return "Product_Recommendation"
+	return "General_Inquiry"
+
+
+def _between(text: str, start: str, end: str = "\n") -> str:
+	i = text.find(start)
+	if i < 0:
+		return ""
+	i += len(start)
+	j = text.find(end, i)
+	return text[i:j if j >= 0 else None].strip()
+
+
+class ScriptedChatModel(BaseChatModel):
+	"""
+	Deterministic chat model for offline runs. Replies are derived from the prompt shape:
+	intent labels for the router, one Action then a Final Answer for ReAct agents, and the
+	input text for translations. `latency_ms` simulates provider latency per call.
+	"""
+
+	latency_ms: float = 0.0
+
+	@property
+	def _llm_type(self) -> str:
+		return "scripted-fake"
+
+	def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+		prompt = "\n".join(str(m.content) for m in messages)
+		if self.latency_ms:
+			time.sleep(self.latency_ms / 1000)
+		text = self._reply(prompt)
+		tokens_in, tokens_out = len(prompt.split()), len(text.split())
+		message = AIMessage(content=text, usage_metadata={"input_tokens": tokens_in, "output_tokens": tokens_out, "total_tokens": tokens_in + tokens_out})
+		return ChatResult(generations=[ChatGeneration(message=message)])
+
+	def _reply(self, prompt: str) -> str:
+		if "Classify the user intent" in prompt:
+			return _classify(_between(prompt, "User:"))
+		if "Tool names:" in prompt:
+			return self._react_step(prompt)
+		if "Target language:" in prompt:
+			return _between(prompt, "Text:", "\x00")
+		return "OK"
+
+	def _react_step(self, prompt: str) -> str:
+		turn = prompt[prompt.rfind("Question:"):]  # the rules above show the format with placeholders
+		question = _between(turn, "Question:")
+		if "Observation:" in turn:
+			observation = _between(turn, "Observation:")
+			return f"Thought: I now know the final answer\nFinal Answer: Berikut informasinya: {observation[:200]}"
+		tools = [t.strip() for t in _between(prompt, "Tool names:").split(",") if t.strip()]
+		tool = next((t for t in _TOOL_PREFERENCE if t in tools), tools[0] if tools else "")
+		if not tool:
+			return "Thought: I now know the final answer\nFinal Answer: Terima kasih, ada lagi yang bisa dibantu?"
+		tool_input = question
+		if tool == "get_order_status":
+			m = re.search(r"\d{5,}", question)
+			tool_input = m.group(0) if m else question
+		return f"Thought: I should use {tool}\nAction: {tool}\nAction Input: {tool_input}"
+
+
+def fake_embeddings() -> DeterministicFakeEmbedding:
+	return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+
+
+@contextmanager
+def offline_environment(
+	llm_latency_ms: float = 0.0,
+	db_url: Optional[str] = None,
+	kb_snippets: Optional[List[str]] = None,
+	chat_model: Optional[Callable[..., Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""
+	Point the app at local fakes: scripted chat model (or `chat_model(temperature=..., task=...)`),
+	deterministic embeddings, the NumPy vector store backend (in memory), the mock store adapter,
+	and SQLite (temp file unless `db_url`). Everything is restored on exit.
+	"""
+	from langdetect import DetectorFactory
+	from langsmith.utils import get_env_var
+
+	import app.main  # noqa: F401  (sets the LangSmith env vars on import; overridden below)
+	import app.persistence.db as db_module
+	import app.services.ecommerce.catalog as catalog_module
+	import app.services.langgraph.tools as tools_module
+	import app.services.memory.vector_memory as memory_module
+	import app.services.rag.retriever as retriever_module
+	import app.services.session_cache as session_cache_module
+	import app.services.vectorstores.registry as vector_registry
+	from app.services.ecommerce.mock import MockEcommerce
+	from app.services.llm import provider
+	from app.services.vectorstores.numpy_store import drop_collection
+
+	DetectorFactory.seed = 0  # langdetect is randomized otherwise
+	saved_tracing = os.environ.get("LANGCHAIN_TRACING_V2")
+	os.environ["LANGCHAIN_TRACING_V2"] = "false"  # offline: never ship traces to LangSmith
+	get_env_var.cache_clear()
+	saved = {
+		"engine": db_module._engine,
+		"session": db_module._SessionLocal,
+		"memstore": dict(memory_module._memstores),
+		"kb": retriever_module._vectorstore,
+		"products": catalog_module._product_vs,
+		"ecom": tools_module.ecom,
+		"sessions": session_cache_module._cache,
+		"backend": (vector_registry.settings.VECTOR_BACKEND, vector_registry.settings.VECTOR_STORE_PATH),
+	}
+	schema = memory_module._settings.DB_SCHEMA
+	collections = [schema, f"{schema}_memory", f"{schema}_products"]
+	with tempfile.TemporaryDirectory(prefix="ai-cs-bench-") as tmp:
+		provider.set_model_factories(
+			chat=chat_model or (lambda temperature=0.0, task=None: ScriptedChatModel(latency_ms=llm_latency_ms)),
+			embeddings=fake_embeddings,
+		)
+		db_module.init_db(db_url or f"sqlite:///{Path(tmp) / 'bench.db'}")
+		vector_registry.settings.VECTOR_BACKEND, vector_registry.settings.VECTOR_STORE_PATH = "numpy", None
+		for name in collections:
+			drop_collection(name)
+		memory_module._memstores.clear()
+		retriever_module._vectorstore = catalog_module._product_vs = None
+		memory, kb = memory_module._get_memstore(), retriever_module._get_vectorstore()
+		if kb_snippets:
+			kb.add_texts(kb_snippets)
+		tools_module.ecom = MockEcommerce()
+		session_cache_module._cache = session_cache_module.SessionCache()  # conversation ids belong to this database
+		try:
+			yield {"engine": db_module.get_engine(), "memory": memory, "kb": kb}
+		finally:
+			provider.set_model_factories()
+			db_module.get_engine().dispose()
+			db_module._engine, db_module._SessionLocal = saved["engine"], saved["session"]
+			for name in collections:
+				drop_collection(name)
+			vector_registry.settings.VECTOR_BACKEND, vector_registry.settings.VECTOR_STORE_PATH = saved["backend"]
+			memory_module._memstores.clear()
+			memory_module._memstores.update(saved["memstore"])
+			retriever_module._vectorstore = saved["kb"]
+			catalog_module._product_vs = saved["products"]
+			tools_module.ecom = saved["ecom"]
+			session_cache_module._cache = saved["sessions"]
+			if saved_tracing is None:
+				os.environ.pop("LANGCHAIN_TRACING_V2", None)
+			else:
+				os.environ["LANGCHAIN_TRACING_V2"] = saved_tracing
+			get_env_var.cache_clear()
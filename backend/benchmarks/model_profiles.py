@@ -0,0 +1,111 @@
+"""
+Cost and latency per chat turn for different model profile mixes (LLM_*_PROFILE), fully offline.
+
+Each task (router, translator, summarizer, agent) is served by a tier: `local` (small Ollama model:
+fast, free) or `cloud` (strong hosted model: slower, priced per token). Tiers are scripted fakes
+with simulated latency; token counts come from the prompts the pipeline actually sends, so the cost
+column reflects how much of each turn's traffic a mix moves off the paid model:
+
+	python -m benchmarks.model_profiles --repeat 2 --concurrency 4
+	python -m benchmarks.model_profiles --cloud-ms 800 --cloud-in 0.15 --cloud-out 0.60 --mixes all-cloud,tiered
+"""
+
+import argparse
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fakes import ScriptedChatModel
+from benchmarks.pipeline import RESULTS_DIR, _git_commit, run_benchmark
+
+
+TASKS = ("router", "translator", "summarizer", "agent")
+MIXES: Dict[str, Dict[str, str]] = {
+	"all-cloud": {task: "cloud" for task in TASKS},
+	"tiered": {"router": "local", "translator": "local", "summarizer": "cloud", "agent": "cloud"},
+	"all-local": {task: "local" for task in TASKS},
+}
+
+
+class Meter:
+	"""Calls and tokens per tier, shared by every fake model of one run."""
+
+	def __init__(self):
+		self.usage: Dict[str, Dict[str, int]] = {}
+		self._lock = threading.Lock()
+
+	def add(self, tier: str, tokens_in: int, tokens_out: int):
+		with self._lock:
+			row = self.usage.setdefault(tier, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+			row["calls"] += 1
+			row["input_tokens"] += tokens_in
+			row["output_tokens"] += tokens_out
+
+
+class MeteredChatModel(ScriptedChatModel):
+	tier: str = "cloud"
+	meter: Any = None
+
+	def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+		result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+		usage = result.generations[0].message.usage_metadata or {}
+		self.meter.add(self.tier, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+		return result
+
+
+def run_mix(name: str, tiers: Dict[str, Dict[str, float]], concurrency: int = 4, repeat: int = 1) -> Dict[str, Any]:
+	mix, meter = MIXES[name], Meter()
+
+	def chat_model(temperature: float = 0.0, task: Optional[str] = None):
+		tier = mix.get(task or "agent", "cloud")
+		return MeteredChatModel(tier=tier, meter=meter, latency_ms=tiers[tier]["latency_ms"])
+
+	result = run_benchmark(concurrency=concurrency, repeat=repeat, warmup=0, chat_model=chat_model)
+	turns = max(1, result["turns"])
+	cost = sum(
+		(u["input_tokens"] * tiers[tier]["usd_per_m_in"] + u["output_tokens"] * tiers[tier]["usd_per_m_out"]) / 1e6
+		for tier, u in meter.usage.items()
+	)
+	return {
+		"mix": name,
+		"tasks": mix,
+		"turns": result["turns"],
+		"errors": result["errors"],
+		"latency_ms": result["latency_ms"],
+		"usd_per_1k_turns": round(cost / turns * 1000, 4),
+		"calls_per_turn": {tier: round(u["calls"] / turns, 2) for tier, u in sorted(meter.usage.items())},
+		"tokens_per_turn": {tier: round((u["input_tokens"] + u["output_tokens"]) / turns, 1) for tier, u in sorted(meter.usage.items())},
+	}
+
+
+def main(argv: Optional[List[str]] = None):
+	parser = argparse.ArgumentParser(description="Model profile mix benchmark (cost and latency per turn)")
+	parser.add_argument("--mixes", default=",".join(MIXES), help=f"comma-separated, from: {', '.join(MIXES)}")
+	parser.add_argument("--concurrency", type=int, default=4)
+	parser.add_argument("--repeat", type=int, default=1)
+	parser.add_argument("--local-ms", type=float, default=80.0, help="simulated latency per call of the local model")
+	parser.add_argument("--cloud-ms", type=float, default=600.0, help="simulated latency per call of the hosted model")
+	parser.add_argument("--cloud-in", type=float, default=0.15, help="hosted model USD per 1M input tokens")
+	parser.add_argument("--cloud-out", type=float, default=0.60, help="hosted model USD per 1M output tokens")
+	parser.add_argument("--out", type=Path, default=None)
+	args = parser.parse_args(argv)
+
+	tiers = {
+		"local": {"latency_ms": args.local_ms, "usd_per_m_in": 0.0, "usd_per_m_out": 0.0},
+		"cloud": {"latency_ms": args.cloud_ms, "usd_per_m_in": args.cloud_in, "usd_per_m_out": args.cloud_out},
+	}
+	runs = []
+	for name in (m.strip() for m in args.mixes.split(",") if m.strip()):
+		run = run_mix(name, tiers, args.concurrency, args.repeat)
+		print(json.dumps({k: run[k] for k in ("mix", "usd_per_1k_turns", "latency_ms", "calls_per_turn")}))
+		runs.append(run)
+
+	out = args.out or RESULTS_DIR / f"model-profiles-{_git_commit()}.json"
+	out.parent.mkdir(parents=True, exist_ok=True)
+	out.write_text(json.dumps({"commit": _git_commit(), "tiers": tiers, "runs": runs}, indent=2), encoding="utf-8")
+	print(f"written to {out}")
+
+
+if __name__ == "__main__":
+	main()
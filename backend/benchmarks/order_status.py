@@ -0,0 +1,72 @@
+"""
+Order-status fast path against the ReAct agent, fully offline: replays the corpus turns that carry
+an order id with ORDER_FAST_PATH_ENABLED off and on, and reports latency and LLM calls per turn
+with the savings. Simulated LLM latency makes the difference visible:
+
+	python -m benchmarks.order_status --llm-latency-ms 200 --repeat 3
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.pipeline import DEFAULT_CORPUS, run_benchmark
+
+
+def _order_corpus(source: Path, target: Path) -> int:
+	from app.services.ecommerce.orders import extract_order_ids
+
+	lines = [line for line in source.read_text(encoding="utf-8").splitlines() if line.strip()]
+	picked = [line for line in lines if extract_order_ids(json.loads(line)["text"])]
+	target.write_text("\n".join(picked) + "\n", encoding="utf-8")
+	return len(picked)
+
+
+def run_comparison(concurrency: int = 4, repeat: int = 1, llm_latency_ms: float = 50.0, corpus: Path = DEFAULT_CORPUS) -> Dict[str, Any]:
+	from app.config import get_settings
+	from app.services.ecommerce import orders
+
+	settings = get_settings()
+	saved = settings.ORDER_FAST_PATH_ENABLED
+	runs: Dict[str, Dict[str, Any]] = {}
+	with tempfile.TemporaryDirectory(prefix="ai-cs-orders-") as tmp:
+		order_corpus = Path(tmp) / "orders.jsonl"
+		_order_corpus(corpus, order_corpus)
+		try:
+			for name, enabled in (("agent", False), ("fast_path", True)):
+				settings.ORDER_FAST_PATH_ENABLED = enabled
+				orders._reset_cache()  # each run starts with a cold order status cache
+				runs[name] = run_benchmark(concurrency=concurrency, repeat=repeat, llm_latency_ms=llm_latency_ms, corpus=order_corpus, warmup=0)
+		finally:
+			settings.ORDER_FAST_PATH_ENABLED = saved
+
+	def headline(run: Dict[str, Any]) -> Dict[str, Any]:
+		return {"turns": run["turns"], "errors": run["errors"], "latency_ms": run["latency_ms"], "llm_calls_per_turn": run["llm_calls_per_turn"]}
+
+	agent, fast = runs["agent"], runs["fast_path"]
+	return {
+		"llm_latency_ms": llm_latency_ms,
+		"agent": headline(agent),
+		"fast_path": headline(fast),
+		"savings": {
+			"llm_calls_per_turn": round(agent["llm_calls_per_turn"] - fast["llm_calls_per_turn"], 2),
+			"latency_ms_p50": round(agent["latency_ms"]["p50"] - fast["latency_ms"]["p50"], 2),
+			"latency_ms_p95": round(agent["latency_ms"]["p95"] - fast["latency_ms"]["p95"], 2),
+		},
+	}
+
+
+def main(argv: Optional[List[str]] = None):
+	parser = argparse.ArgumentParser(description="Order-status fast path vs ReAct agent (offline)")
+	parser.add_argument("--concurrency", type=int, default=4)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="simulated latency per LLM call")
+	parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+	args = parser.parse_args(argv)
+	print(json.dumps(run_comparison(args.concurrency, args.repeat, args.llm_latency_ms, args.corpus), indent=2))
+
+
+if __name__ == "__main__":
+	main()
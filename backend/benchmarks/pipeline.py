@@ -0,0 +1,221 @@
+"""
+End-to-end latency/throughput benchmark for the chat pipeline, fully offline.
+
+Replays benchmarks/corpus.jsonl through `run_conversation` (or POST /api/chat on the FastAPI app)
+with the fakes from benchmarks/fakes.py. Turns of one session run in order; sessions run
+concurrently. Results are written as JSON so runs can be compared between commits:
+
+	python -m benchmarks.pipeline --concurrency 8 --repeat 5 --llm-latency-ms 50
+	python -m benchmarks.pipeline --mode app --compare benchmarks/results/pipeline-abc1234.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+
+from benchmarks.fakes import offline_environment
+
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_CORPUS = HERE / "corpus.jsonl"
+RESULTS_DIR = HERE / "results"
+KB_SNIPPETS = [
+	"Store hours are 09:00-21:00 WIB every day, including weekends.",
+	"We accept bank transfer, e-wallets, credit cards and cash on delivery (COD).",
+	"Returns are accepted within 7 days of delivery; refunds take 3-5 business days.",
+	"We ship within Indonesia and to Malaysia and Singapore.",
+]
+
+
+def load_corpus(path: Path, repeat: int = 1) -> "OrderedDict[str, List[str]]":
+	"""Corpus lines grouped into sessions; `repeat` replays it under fresh session ids."""
+	sessions: "OrderedDict[str, List[str]]" = OrderedDict()
+	lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+	for r in range(repeat):
+		for item in lines:
+			sessions.setdefault(f"{item['session']}-{r}", []).append(item["text"])
+	return sessions
+
+
+def percentile(values: List[float], pct: float) -> float:
+	if not values:
+		return 0.0
+	ordered = sorted(values)
+	idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+	return ordered[idx]
+
+
+class _QueryCounter:
+	def __init__(self, engine):
+		self.count = 0
+		self._lock = threading.Lock()
+		self._engine = engine
+		event.listen(engine, "before_cursor_execute", self._on_execute)
+
+	def _on_execute(self, *args, **kwargs):
+		with self._lock:
+			self.count += 1
+
+	def close(self):
+		event.remove(self._engine, "before_cursor_execute", self._on_execute)
+
+
+def _pipeline_turn() -> Callable[[str, str], Dict[str, Any]]:
+	from app.services.conversation import run_conversation
+
+	def turn(session_id: str, text: str) -> Dict[str, Any]:
+		result = run_conversation(session_id=session_id, message=text, channel="bench", user_meta={})
+		return result.get("timings") or {}
+
+	return turn
+
+
+def _app_turn() -> Callable[[str, str], Dict[str, Any]]:
+	from fastapi.testclient import TestClient
+	from app.main import app
+
+	client = TestClient(app)
+
+	def turn(session_id: str, text: str) -> Dict[str, Any]:
+		resp = client.post("/api/chat", json={"session_id": session_id, "message": text, "channel": "bench"})
+		resp.raise_for_status()
+		return resp.json().get("metadata", {}).get("timings") or {}
+
+	return turn
+
+
+def run_benchmark(
+	mode: str = "pipeline",
+	concurrency: int = 4,
+	repeat: int = 1,
+	llm_latency_ms: float = 0.0,
+	corpus: Path = DEFAULT_CORPUS,
+	db_url: Optional[str] = None,
+	warmup: int = 2,
+	chat_model: Optional[Callable[..., Any]] = None,
+) -> Dict[str, Any]:
+	sessions = load_corpus(corpus, repeat)
+	latencies: List[float] = []
+	llm_calls: List[int] = []
+	stages: Dict[str, List[float]] = {}
+	errors: List[str] = []
+	lock = threading.Lock()
+
+	with offline_environment(llm_latency_ms=llm_latency_ms, db_url=db_url, kb_snippets=KB_SNIPPETS, chat_model=chat_model) as env:
+		turn = _pipeline_turn() if mode == "pipeline" else _app_turn()
+		for i in range(warmup):
+			turn(f"warmup-{i}", "Halo")
+
+		def run_session(item):
+			session_id, texts = item
+			for text in texts:
+				started = time.perf_counter()
+				try:
+					timings = turn(session_id, text)
+				except Exception as e:
+					with lock:
+						errors.append(f"{session_id}: {e!r}")
+					continue
+				elapsed = (time.perf_counter() - started) * 1000
+				with lock:
+					latencies.append(elapsed)
+					llm_calls.append((timings.get("llm") or {}).get("calls", 0))
+					for name, ms in (timings.get("spans") or {}).items():
+						stages.setdefault(name, []).append(ms)
+
+		queries = _QueryCounter(env["engine"])
+		started = time.perf_counter()
+		try:
+			with ThreadPoolExecutor(max_workers=concurrency) as pool:
+				list(pool.map(run_session, sessions.items()))
+		finally:
+			wall = time.perf_counter() - started
+			queries.close()
+
+	turns = len(latencies)
+	return {
+		"meta": {
+			"commit": _git_commit(),
+			"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+			"mode": mode,
+			"concurrency": concurrency,
+			"repeat": repeat,
+			"llm_latency_ms": llm_latency_ms,
+			"corpus": corpus.name,
+			"sessions": len(sessions),
+		},
+		"turns": turns,
+		"errors": len(errors),
+		"error_samples": errors[:5],
+		"wall_seconds": round(wall, 3),
+		"turns_per_second": round(turns / wall, 2) if wall > 0 else 0.0,
+		"latency_ms": {
+			"p50": round(percentile(latencies, 50), 2),
+			"p95": round(percentile(latencies, 95), 2),
+			"p99": round(percentile(latencies, 99), 2),
+			"mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+			"max": round(max(latencies), 2) if latencies else 0.0,
+		},
+		"llm_calls_per_turn": round(statistics.fmean(llm_calls), 2) if llm_calls else 0.0,
+		"db_queries_per_turn": round(queries.count / turns, 2) if turns else 0.0,
+		"stage_mean_ms": {k: round(statistics.fmean(v), 2) for k, v in sorted(stages.items())},
+	}
+
+
+def _git_commit() -> str:
+	try:
+		return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True).stdout.strip()
+	except Exception:
+		return "unknown"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+	"""Human-readable deltas of the headline numbers against a previous result file."""
+	rows = [("turns_per_second", current["turns_per_second"], baseline["turns_per_second"])]
+	for p in ("p50", "p95", "p99"):
+		rows.append((f"latency_ms.{p}", current["latency_ms"][p], baseline["latency_ms"][p]))
+	for key in ("llm_calls_per_turn", "db_queries_per_turn"):
+		rows.append((key, current[key], baseline[key]))
+	lines = []
+	for name, now, before in rows:
+		delta = f"{(now - before) / before * 100:+.1f}%" if before else "n/a"
+		lines.append(f"{name:22} {before:>10} -> {now:>10}  ({delta})")
+	return lines
+
+
+def main(argv: Optional[List[str]] = None):
+	parser = argparse.ArgumentParser(description="Offline chat pipeline benchmark")
+	parser.add_argument("--mode", choices=["pipeline", "app"], default="pipeline", help="call run_conversation directly or POST /api/chat")
+	parser.add_argument("--concurrency", type=int, default=4)
+	parser.add_argument("--repeat", type=int, default=3, help="replay the corpus N times under fresh sessions")
+	parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated latency per fake LLM call")
+	parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+	parser.add_argument("--db-url", default=None, help="database URL (default: temporary SQLite file)")
+	parser.add_argument("--out", type=Path, default=None, help="result JSON (default: benchmarks/results/pipeline-<commit>.json)")
+	parser.add_argument("--compare", type=Path, default=None, help="previous result JSON to diff against")
+	args = parser.parse_args(argv)
+
+	result = run_benchmark(args.mode, args.concurrency, args.repeat, args.llm_latency_ms, args.corpus, args.db_url)
+	out = args.out or RESULTS_DIR / f"pipeline-{result['meta']['commit']}.json"
+	out.parent.mkdir(parents=True, exist_ok=True)
+	out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+	print(json.dumps({k: result[k] for k in ("turns", "errors", "turns_per_second", "latency_ms", "llm_calls_per_turn", "db_queries_per_turn")}, indent=2))
+	print(f"written to {out}")
+	if args.compare:
+		for line in compare(result, json.loads(args.compare.read_text(encoding="utf-8"))):
+			print(line)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,27 @@
+"""
+Token counts of the ReAct agent prompts: the prefix shared by every agent, the static part per
+agent (rules, role and tool list; what prefix caching can reuse) and the whole first prompt.
+Counts use tiktoken when its encoding is available, else the offline estimate:
+
+	python -m benchmarks.prompts
+	python -m benchmarks.prompts --estimate --question "Rekomendasi sepatu lari"
+"""
+
+import argparse
+import json
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None):
+	from app.services.langgraph.agent_react import prompt_report
+
+	parser = argparse.ArgumentParser(description="ReAct agent prompt size report")
+	parser.add_argument("--question", default="Where is my order 12345?")
+	parser.add_argument("--estimate", action="store_true", help="use the offline estimate instead of tiktoken")
+	args = parser.parse_args(argv)
+	for row in prompt_report(args.question, exact=not args.estimate):
+		print(json.dumps(row))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the per-call costs removed from hot paths by the cached settings and the
+model/agent registries: loading settings (environment + .env), building a chat model and building
+a ReAct agent executor, each against the cached lookup that replaces it. Uses the scripted offline
+chat model, so no provider is contacted:
+
+	python -m benchmarks.settings --number 2000
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fakes import ScriptedChatModel
+
+
+def _per_call_us(fn: Callable[[], Any], number: int) -> float:
+	fn()  # warm: first call pays for imports and cache fill
+	return round(min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6, 2)
+
+
+def run_benchmark(number: int = 1000) -> List[Dict[str, Any]]:
+	from app.config import Settings, get_settings
+	from app.services.langgraph import agent_react
+	from app.services.llm import provider
+
+	provider.set_model_factories(chat=lambda temperature=0.0, task=None: ScriptedChatModel())
+	try:
+		cases = [
+			("settings", Settings, get_settings, number),
+			("chat_model", lambda: provider._build_chat_model(0.0, None), lambda: provider.get_chat_model(0.0), number),
+			(
+				"agent",
+				lambda: agent_react._create_agent_with_fallback("bench", agent_react._order_status_tools(), temperature=0.0),
+				agent_react.make_order_status_agent,
+				max(1, number // 10),  # building an executor is slow; fewer rounds
+			),
+		]
+		results = []
+		for name, uncached, cached, rounds in cases:
+			before, after = _per_call_us(uncached, rounds), _per_call_us(cached, number)
+			results.append({"case": name, "uncached_us": before, "cached_us": after, "speedup": round(before / after, 1) if after else None})
+		return results
+	finally:
+		provider.set_model_factories()
+
+
+def main(argv: Optional[List[str]] = None):
+	parser = argparse.ArgumentParser(description="Settings / model / agent lookup micro-benchmark")
+	parser.add_argument("--number", type=int, default=1000, help="calls per timing round")
+	args = parser.parse_args(argv)
+	for row in run_benchmark(args.number):
+		print(json.dumps(row))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,120 @@
+"""
+Import-time profile of the app: how long a fresh interpreter takes to `import app.main`, which modules
+dominate, and whether any of the heavy optional modules got imported eagerly again.
+
+Each run is a separate `python -X importtime` process (nothing cached in sys.modules); the fastest
+run is reported, since startup noise only ever adds time. Exits non-zero when a heavy module is
+imported at startup or the import takes longer than --max-ms:
+
+	python -m benchmarks.startup --runs 5 --top 15
+	python -m benchmarks.startup --max-ms 3000 --compare benchmarks/results/startup-abc1234.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.pipeline import RESULTS_DIR, _git_commit
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# loaded on first use (document upload, first chat turn, first sentiment score), never at startup
+HEAVY_MODULES = (
+	"pandas",
+	"pypdf",
+	"docx",
+	"markdown",
+	"vaderSentiment",
+	"langchain_openai",
+	"langchain_groq",
+	"langchain_ollama",
+	"langgraph",
+	"app.services.langgraph.graph",
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+	"""`-X importtime` lines -> {module: {"self_us", "cumulative_us", "depth"}} (first import wins)."""
+	modules: Dict[str, Dict[str, int]] = {}
+	for line in stderr.splitlines():
+		if not line.startswith("import time:") or "self [us]" in line:
+			continue
+		self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+		depth = (len(name) - len(name.lstrip())) // 2
+		modules.setdefault(name.strip(), {"self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": depth})
+	return modules
+
+
+def profile_import(module: str = "app.main") -> Dict[str, Any]:
+	"""Import `module` in a fresh interpreter; total time, per-module times and heavy modules that were loaded."""
+	code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+	proc = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", code],
+		cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+	)
+	modules = parse_importtime(proc.stderr)
+	loaded = set(json.loads(proc.stdout.strip().splitlines()[-1]))
+	return {
+		"module": module,
+		"total_ms": round(modules.get(module, {}).get("cumulative_us", 0) / 1000, 1),
+		"modules": modules,
+		"eager_heavy": sorted(m for m in HEAVY_MODULES if m in loaded),
+	}
+
+
+def top_modules(modules: Dict[str, Dict[str, int]], n: int = 15, key: str = "self_us") -> List[Dict[str, Any]]:
+	ranked = sorted(modules.items(), key=lambda item: item[1][key], reverse=True)[:n]
+	return [{"module": name, "self_ms": round(t["self_us"] / 1000, 1), "cumulative_ms": round(t["cumulative_us"] / 1000, 1)} for name, t in ranked]
+
+
+def run_benchmark(module: str = "app.main", runs: int = 3, top: int = 15) -> Dict[str, Any]:
+	profiles = [profile_import(module) for _ in range(max(1, runs))]
+	best = min(profiles, key=lambda p: p["total_ms"])
+	app_modules = {name: t for name, t in best["modules"].items() if name.startswith("app.")}
+	return {
+		"meta": {"commit": _git_commit(), "module": module, "runs": len(profiles), "python": sys.version.split()[0]},
+		"total_ms": best["total_ms"],
+		"runs_ms": [p["total_ms"] for p in profiles],
+		"eager_heavy": best["eager_heavy"],
+		"top_self": top_modules(best["modules"], top),
+		"top_app_cumulative": top_modules(app_modules, top, key="cumulative_us"),
+	}
+
+
+def main(argv: Optional[List[str]] = None):
+	parser = argparse.ArgumentParser(description="App import-time (cold start) benchmark")
+	parser.add_argument("--module", default="app.main")
+	parser.add_argument("--runs", type=int, default=3)
+	parser.add_argument("--top", type=int, default=15)
+	parser.add_argument("--max-ms", type=float, default=None, help="fail when the import takes longer than this")
+	parser.add_argument("--compare", type=Path, default=None, help="previous result JSON to diff against")
+	parser.add_argument("--out", type=Path, default=None)
+	args = parser.parse_args(argv)
+
+	result = run_benchmark(args.module, args.runs, args.top)
+	out = args.out or RESULTS_DIR / f"startup-{result['meta']['commit']}.json"
+	out.parent.mkdir(parents=True, exist_ok=True)
+	out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+	print(json.dumps({k: result[k] for k in ("total_ms", "runs_ms", "eager_heavy", "top_app_cumulative")}, indent=2))
+	if args.compare:
+		base = json.loads(args.compare.read_text(encoding="utf-8"))
+		print(f"total_ms: {base['total_ms']} -> {result['total_ms']} ({result['total_ms'] - base['total_ms']:+.1f})")
+
+	failures = []
+	if result["eager_heavy"]:
+		failures.append(f"imported at startup: {', '.join(result['eager_heavy'])}")
+	if args.max_ms is not None and result["total_ms"] > args.max_ms:
+		failures.append(f"import took {result['total_ms']} ms > {args.max_ms} ms")
+	for failure in failures:
+		print(f"FAIL {failure}", file=sys.stderr)
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
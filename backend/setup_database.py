@@ -104,6 +104,63 @@ def check_database_status():
         print(f"❌ Database check failed: {e}")
         return False
 
+def export_vectors(collection_name, path):
+    """Export a vector collection to a bundle directory"""
+    from app.services.vectorstores.bundle import export_collection
+
+    print(f"📤 Exporting collection '{collection_name}' to {path} ...")
+    try:
+        manifest = export_collection(collection_name, path)
+        print(f"✅ Exported {manifest['count']} vectors (dim={manifest['dim']})")
+        return True
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        return False
+
+def import_vectors(path, collection_name=None, replace=False):
+    """Import a bundle directory into a vector collection"""
+    from app.services.vectorstores.bundle import import_collection
+
+    print(f"📥 Importing {path} ...")
+    try:
+        result = import_collection(path, collection_name=collection_name, replace=replace)
+        print(f"✅ Imported {result['imported']} vectors into '{result['collection']}' in {result['seconds']}s")
+        return True
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        return False
+
+def quantize_vectors(collection_name, mode):
+    """Build (or drop) the quantized search index of an existing collection"""
+    from app.services.vectorstores.quantization import migrate_collection
+
+    print(f"🗜️ Migrating collection '{collection_name}' to {mode} search ...")
+    try:
+        result = migrate_collection(collection_name, mode)
+        print(f"✅ {result}")
+        if mode != "none":
+            print(f"   Set VECTOR_QUANTIZATION={mode} to search through it")
+        return True
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+def partition_messages(drop_legacy=False):
+    """Convert the message table to monthly range partitions"""
+    from app.persistence.db import get_engine, init_db
+    from app.persistence.partitions import migrate_messages
+
+    print("🗂️ Partitioning the message table by month ...")
+    try:
+        init_db()
+        result = migrate_messages(get_engine(), drop_legacy=drop_legacy)
+        print(f"✅ {result}")
+        print("   Set MESSAGE_PARTITIONING=true so new months are created and old ones dropped")
+        return True
+    except Exception as e:
+        print(f"❌ Partitioning failed: {e}")
+        return False
+
 def main():
     """Main function"""
     if len(sys.argv) > 1:
@@ -115,15 +172,32 @@ def main():
         elif command == "status":
             success = check_database_status()
             sys.exit(0 if success else 1)
+        elif command == "export-vectors" and len(sys.argv) >= 4:
+            success = export_vectors(sys.argv[2], sys.argv[3])
+            sys.exit(0 if success else 1)
+        elif command == "import-vectors" and len(sys.argv) >= 3:
+            args = [a for a in sys.argv[2:] if a != "--replace"]
+            success = import_vectors(args[0], args[1] if len(args) > 1 else None, replace="--replace" in sys.argv)
+            sys.exit(0 if success else 1)
+        elif command == "quantize-vectors" and len(sys.argv) >= 4:
+            success = quantize_vectors(sys.argv[2], sys.argv[3])
+            sys.exit(0 if success else 1)
+        elif command == "partition-messages":
+            success = partition_messages(drop_legacy="--drop-legacy" in sys.argv)
+            sys.exit(0 if success else 1)
         else:
             print(f"Unknown command: {command}")
-            print("Available commands: setup, status")
+            print("Available commands: setup, status, export-vectors, import-vectors, quantize-vectors, partition-messages")
             sys.exit(1)
     else:
         print("RAG Database Setup Script")
         print("\nUsage:")
         print("  python setup_database.py setup   - Setup database and create initial schema")
         print("  python setup_database.py status  - Check database status")
+        print("  python setup_database.py export-vectors <collection> <dir>            - Export vectors to a bundle")
+        print("  python setup_database.py import-vectors <dir> [collection] [--replace] - Import a bundle (no re-embedding)")
+        print("  python setup_database.py quantize-vectors <collection> <halfvec|binary|none> - Build a quantized search index")
+        print("  python setup_database.py partition-messages [--drop-legacy]             - Move messages to monthly partitions")
         print("\nEnvironment Variables:")
         print("  DATABASE_URL - PostgreSQL connection string")
         print("  OPENAI_API_KEY - OpenAI API key for embeddings")